@@ -6,7 +6,8 @@ maintaining backward compatibility with existing synchronous commands.
 """
 
 import logging
-import asyncio
+
+from chuk_virtual_shell.core.async_runner import run_sync
 
 logger = logging.getLogger(__name__)
 
@@ -44,57 +45,73 @@ class ShellCommand:
         # Default implementation calls the sync version
         return self.execute(args)
 
+    def has_async(self) -> bool:
+        """Whether the command overrides execute_async()."""
+        return (
+            hasattr(self, "execute_async")
+            and getattr(self.execute_async, "__func__", None)
+            is not ShellCommand.execute_async
+        )
+
     def run(self, args):
         """
         Run the command with the appropriate execution mode (sync or async)
 
-        This method determines whether to run the command synchronously or asynchronously
-        based on if the command has overridden execute_async and handles event loop issues.
+        Commands that override execute_async are run on a reused event loop
+        (see chuk_virtual_shell.core.async_runner): the calling thread's own
+        loop, or a background loop when the caller is already inside a
+        running loop, which is never blocked on itself.
 
         Shell interpreters should call this method instead of execute() directly.
         """
-        # Check if this command has an async implementation that's different from the base class
-        has_custom_async = (
-            hasattr(self, "execute_async")
-            and self.execute_async.__func__ is not ShellCommand.execute_async
-        )
-
-        if has_custom_async:
-            # If this command has a custom async implementation, handle it appropriately
-            try:
-                # Try to get the current event loop
-                try:
-                    loop = asyncio.get_running_loop()
-                    if loop.is_running():
-                        # We're in an already running event loop, create a new task
-                        logger.debug(
-                            f"Running command '{self.name}' in existing event loop"
-                        )
-                        future = asyncio.run_coroutine_threadsafe(
-                            self.execute_async(args), loop
-                        )
-                        return future.result(timeout=30)  # Wait for up to 30 seconds
-                except RuntimeError:
-                    # No loop is running, create one
-                    logger.debug(f"Creating new event loop for command '{self.name}'")
-                    # Use asyncio.new_event_loop() for better control
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    try:
-                        return loop.run_until_complete(self.execute_async(args))
-                    finally:
-                        # Properly close the loop
-                        try:
-                            loop.close()
-                        except Exception:
-                            pass
-            except Exception as e:
-                logger.exception(f"Error executing async command '{self.name}': {e}")
-                return f"Error executing command '{self.name}': {e}"
-        else:
+        if not self.has_async():
             # For commands that only implement execute(), call it directly
             return self.execute(args)
 
+        try:
+            return run_sync(self.execute_async(args))
+        except Exception as e:
+            logger.exception(f"Error executing async command '{self.name}': {e}")
+            return f"Error executing command '{self.name}': {e}"
+
+    async def run_async(self, args):
+        """
+        Run the command from a coroutine
+
+        Async commands are awaited on the caller's loop; synchronous ones are
+        called directly. Errors are reported as run() reports them.
+        """
+        if not self.has_async():
+            return self.execute(args)
+
+        try:
+            return await self.execute_async(args)
+        except Exception as e:
+            logger.exception(f"Error executing async command '{self.name}': {e}")
+            return f"Error executing command '{self.name}': {e}"
+
+    def stream(self, args, stdin=None):
+        """
+        Run the command as a pipeline stage, yielding output lazily
+
+        ``stdin`` is an iterator of text chunks from the upstream stage, or None
+        when the stage has no input. Commands that can work incrementally
+        override this to consume and produce chunks on demand (see
+        chuk_virtual_shell.core.streaming). This default adapter materializes
+        stdin into the shell's stdin buffer and defers to run().
+        """
+        if stdin is not None:
+            content = "".join(stdin)
+            if content:
+                self.shell._stdin_buffer = content
+        try:
+            result = self.run(args)
+        finally:
+            if hasattr(self.shell, "_stdin_buffer"):
+                del self.shell._stdin_buffer
+        if result:
+            yield result
+
     def get_help(self):
         """Return help text for the command"""
         return self.help_text
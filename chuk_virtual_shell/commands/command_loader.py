@@ -3,27 +3,141 @@ import os
 import importlib
 import inspect
 import logging
-from typing import Dict, Any
+import threading
+from collections.abc import MutableMapping
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
 from chuk_virtual_shell.commands.command_base import ShellCommand
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class CommandSpec:
+    """Registry entry describing where a command class lives."""
+
+    name: str
+    module: str
+    class_name: str
+    category: str
+    help_text: str
+    command_class: type = field(compare=False, repr=False)
+
+
+class CommandRegistry(MutableMapping):
+    """
+    Per-shell command mapping that instantiates commands on first use.
+
+    Membership tests and name listings only consult the shared registry;
+    a command object is created the first time it is looked up. Commands
+    registered explicitly (e.g. MCP tools) are stored as-is.
+    """
+
+    def __init__(self, shell_context, specs: Dict[str, CommandSpec]):
+        self.shell_context = shell_context
+        self._specs = dict(specs)
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name: str) -> Any:
+        command = self._instances.get(name)
+        if command is not None:
+            return command
+
+        spec = self._specs.get(name)
+        if spec is None:
+            raise KeyError(name)
+
+        try:
+            command = spec.command_class(self.shell_context)
+        except Exception as e:
+            print(
+                f"Error instantiating command {spec.class_name} "
+                f"from module {spec.module}: {e}"
+            )
+            self._specs.pop(name, None)
+            raise KeyError(name) from e
+
+        with self._lock:
+            return self._instances.setdefault(name, command)
+
+    def __setitem__(self, name: str, command: Any) -> None:
+        with self._lock:
+            self._instances[name] = command
+            self._specs.pop(name, None)
+
+    def __delitem__(self, name: str) -> None:
+        with self._lock:
+            found = self._instances.pop(name, None) is not None
+            found = self._specs.pop(name, None) is not None or found
+        if not found:
+            raise KeyError(name)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._instances or name in self._specs
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._specs.keys() | self._instances.keys()))
+
+    def __len__(self) -> int:
+        return len(self._specs.keys() | self._instances.keys())
+
+    def loaded(self) -> List[str]:
+        """Return the names of commands that have been instantiated."""
+        return list(self._instances)
+
+    def spec(self, name: str) -> Optional[CommandSpec]:
+        """Return the registry entry for a discovered command, if any."""
+        return self._specs.get(name)
+
+
 class CommandLoader:
     """Utility class for dynamically loading shell commands"""
 
-    @staticmethod
-    def discover_commands(shell_context) -> dict:
+    # Built on first use and shared by every shell in the process
+    _registry: Optional[Dict[str, CommandSpec]] = None
+    _registry_lock = threading.Lock()
+
+    @classmethod
+    def registry(cls) -> Dict[str, CommandSpec]:
+        """
+        Return the command registry (name -> CommandSpec), building it once.
+
+        Returns:
+            dict: Registry entries for all commands in the commands package
+        """
+        if cls._registry is None:
+            with cls._registry_lock:
+                if cls._registry is None:
+                    cls._registry = cls._scan_commands()
+        return cls._registry
+
+    @classmethod
+    def clear_registry(cls) -> None:
+        """Forget the cached registry so the next lookup rescans the package."""
+        with cls._registry_lock:
+            cls._registry = None
+
+    @classmethod
+    def discover_commands(cls, shell_context) -> CommandRegistry:
         """
-        Discover and instantiate all command classes in the commands package recursively.
+        Discover all command classes in the commands package recursively.
+
+        The package is only scanned on the first call; commands are
+        instantiated lazily the first time each one is looked up.
 
         Args:
             shell_context: The shell interpreter instance.
 
         Returns:
-            dict: Dictionary of command instances (name -> command)
+            CommandRegistry: Mapping of command names to command instances
         """
-        commands: Dict[str, Any] = {}
+        return CommandRegistry(shell_context, cls.registry())
+
+    @staticmethod
+    def _scan_commands() -> Dict[str, CommandSpec]:
+        """Walk the commands package and collect a spec for every command."""
+        specs: Dict[str, CommandSpec] = {}
         # Determine the root directory for the commands package.
         # __file__ refers to this file: chuk_virtual_shell/commands/command_loader.py
         base_dir = os.path.dirname(__file__)
@@ -56,15 +170,15 @@ class CommandLoader:
                     # Inspect module for command classes.
                     for _, obj in inspect.getmembers(module, inspect.isclass):
                         if issubclass(obj, ShellCommand) and obj is not ShellCommand:
-                            try:
-                                cmd_instance = obj(shell_context)
-                                commands[cmd_instance.name] = cmd_instance
-                            except Exception as e:
-                                print(
-                                    f"Error instantiating command {obj.__name__} "
-                                    f"from module {full_module_name}: {e}"
-                                )
-        return commands
+                            specs[obj.name] = CommandSpec(
+                                name=obj.name,
+                                module=obj.__module__,
+                                class_name=obj.__qualname__,
+                                category=obj.category,
+                                help_text=obj.help_text,
+                                command_class=obj,
+                            )
+        return specs
 
     @staticmethod
     def load_commands_from_path(shell_context, path: str) -> dict:
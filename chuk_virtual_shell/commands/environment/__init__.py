@@ -7,5 +7,12 @@ from chuk_virtual_shell.commands.environment.env import EnvCommand
 from chuk_virtual_shell.commands.environment.export import ExportCommand
 from chuk_virtual_shell.commands.environment.alias import AliasCommand
 from chuk_virtual_shell.commands.environment.unalias import UnaliasCommand
+from chuk_virtual_shell.commands.environment.let import LetCommand
 
-__all__ = ["EnvCommand", "ExportCommand", "AliasCommand", "UnaliasCommand"]
+__all__ = [
+    "EnvCommand",
+    "ExportCommand",
+    "AliasCommand",
+    "UnaliasCommand",
+    "LetCommand",
+]
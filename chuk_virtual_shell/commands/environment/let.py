@@ -0,0 +1,37 @@
+"""
+chuk_virtual_shell/commands/environment/let.py - Evaluate arithmetic expressions
+"""
+
+from typing import List
+
+from chuk_virtual_shell.commands.command_base import ShellCommand
+from chuk_virtual_shell.core.arithmetic import ExpressionError, evaluate
+
+
+class LetCommand(ShellCommand):
+    name = "let"
+    help_text = (
+        "let - Evaluate arithmetic expressions\n"
+        "Usage: let EXPRESSION [EXPRESSION ...]\n"
+        "Evaluates each expression as in $(( )), assigning variables as it\n"
+        "goes (e.g. let i++ 'total += i'). The exit status is 0 if the last\n"
+        "expression is not zero and 1 otherwise."
+    )
+    category = "environment"
+
+    def execute(self, args: List[str]) -> str:
+        if not args:
+            self.shell.return_code = 2
+            return "let: expression expected"
+        if args == ["--help"]:
+            return self.get_help()
+
+        value = 0
+        for expression in args:
+            try:
+                value = evaluate(expression, self.shell.environ)
+            except ExpressionError as e:
+                self.shell.return_code = 1
+                return f"let: {e}"
+        self.shell.return_code = 0 if value else 1
+        return ""
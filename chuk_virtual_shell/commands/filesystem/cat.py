@@ -3,6 +3,7 @@ chuk_virtual_shell/commands/filesystem/cat.py - Display file contents command
 """
 
 from chuk_virtual_shell.commands.command_base import ShellCommand
+from chuk_virtual_shell.core.streaming import iter_chunks
 
 
 class CatCommand(ShellCommand):
@@ -20,46 +21,18 @@ Options:
     category = "file"
 
     def execute(self, args):
-        # Parse options
-        number_lines = False
-        number_nonblank = False
-        squeeze_blank = False
-        show_ends = False
-        show_tabs = False
-        show_nonprinting = False
-
-        files = []
-        i = 0
-        while i < len(args):
-            arg = args[i]
-            if arg.startswith("-") and arg != "-":
-                if arg == "--help":
-                    return self.help_text
-                elif arg == "--":
-                    # End of options
-                    files.extend(args[i + 1 :])
-                    break
-                else:
-                    # Process flags (can be combined like -nE)
-                    for flag in arg[1:]:
-                        if flag == "n":
-                            number_lines = True
-                        elif flag == "b":
-                            number_nonblank = True
-                            number_lines = False  # -b overrides -n
-                        elif flag == "s":
-                            squeeze_blank = True
-                        elif flag == "E":
-                            show_ends = True
-                        elif flag == "T":
-                            show_tabs = True
-                        elif flag == "v":
-                            show_nonprinting = True
-                        else:
-                            return f"cat: invalid option -- '{flag}'"
-            else:
-                files.append(arg)
-            i += 1
+        parsed = self._parse_args(args)
+        if isinstance(parsed, str):
+            return parsed
+        flags, files = parsed
+        (
+            number_lines,
+            number_nonblank,
+            squeeze_blank,
+            show_ends,
+            show_tabs,
+            show_nonprinting,
+        ) = flags
 
         # Check if we have stdin input (from input redirection or pipe)
         if not files:
@@ -128,6 +101,91 @@ Options:
                 return "\n".join(errors)
         return output
 
+    def _parse_args(self, args):
+        """Parse options, returning (flags, files) or an output string."""
+        number_lines = False
+        number_nonblank = False
+        squeeze_blank = False
+        show_ends = False
+        show_tabs = False
+        show_nonprinting = False
+
+        files = []
+        i = 0
+        while i < len(args):
+            arg = args[i]
+            if arg.startswith("-") and arg != "-":
+                if arg == "--help":
+                    return self.help_text
+                elif arg == "--":
+                    # End of options
+                    files.extend(args[i + 1 :])
+                    break
+                else:
+                    # Process flags (can be combined like -nE)
+                    for flag in arg[1:]:
+                        if flag == "n":
+                            number_lines = True
+                        elif flag == "b":
+                            number_nonblank = True
+                            number_lines = False  # -b overrides -n
+                        elif flag == "s":
+                            squeeze_blank = True
+                        elif flag == "E":
+                            show_ends = True
+                        elif flag == "T":
+                            show_tabs = True
+                        elif flag == "v":
+                            show_nonprinting = True
+                        else:
+                            return f"cat: invalid option -- '{flag}'"
+            else:
+                files.append(arg)
+            i += 1
+
+        flags = (
+            number_lines,
+            number_nonblank,
+            squeeze_blank,
+            show_ends,
+            show_tabs,
+            show_nonprinting,
+        )
+        return flags, files
+
+    def stream(self, args, stdin=None):
+        """Stream file contents or stdin without buffering them (no options)."""
+        parsed = self._parse_args(args)
+        if isinstance(parsed, str) or any(parsed[0]):
+            yield from super().stream(args, stdin)
+            return
+        _, files = parsed
+
+        if not files:
+            if stdin is None:
+                yield "cat: missing operand"
+            else:
+                yield from stdin
+            return
+
+        errors = []
+        for path in files:
+            if self.shell.fs.is_dir(path):
+                errors.append(f"cat: {path}: Is a directory")
+                continue
+
+            content = self.shell.fs.read_file(path)
+            if content is None:
+                errors.append(f"cat: {path}: No such file or directory")
+                continue
+
+            content = self.ensure_string(content)
+            yield from iter_chunks(content)
+
+        # Same layout as execute(): content first, then errors
+        if errors:
+            yield "\n".join(errors)
+
     def _process_content(
         self,
         content,
@@ -4,6 +4,7 @@ chuk_virtual_shell/commands/filesystem/cp.py - Copy files command
 """
 
 from chuk_virtual_shell.commands.command_base import ShellCommand
+from chuk_virtual_shell.filesystem_compat import walk_tree
 
 
 class CpCommand(ShellCommand):
@@ -166,36 +167,26 @@ Options:
     def _copy_directory_recursive(self, src, dst, verbose=False):
         """Recursively copy a directory"""
         errors = []
-
-        # Create destination directory
-        if not self.shell.fs.exists(dst):
-            if not self.shell.fs.mkdir(dst):
-                errors.append(f"cp: failed to create directory '{dst}'")
-                return errors
-
-        # List source directory contents
-        if hasattr(self.shell.fs, "list_dir"):
-            items = self.shell.fs.list_dir(src)
-        elif hasattr(self.shell.fs, "ls"):
-            items = self.shell.fs.ls(src)
-        else:
-            errors.append(f"cp: failed to list directory '{src}'")
-            return errors
-
-        # Copy each item
-        for item in items:
-            # Use portable path operations with forward slashes
-            src_path = src.rstrip("/") + "/" + item
-            dst_path = dst.rstrip("/") + "/" + item
-
-            src_info = self.shell.fs.get_node_info(src_path)
-            if src_info and src_info.is_dir:
-                # Recursively copy subdirectory
-                sub_errors = self._copy_directory_recursive(src_path, dst_path, verbose)
-                errors.extend(sub_errors)
+        src_prefix = src.rstrip("/")
+        dst_prefix = dst.rstrip("/")
+        failed_dirs = set()
+
+        for entry in walk_tree(
+            self.shell.fs, src, prune=lambda entry: entry.path in failed_dirs
+        ):
+            dst_path = dst_prefix + entry.path[len(src_prefix) :]
+
+            if entry.is_dir:
+                # Create destination directory
+                if not self.shell.fs.exists(dst_path):
+                    if not self.shell.fs.mkdir(dst_path):
+                        errors.append(f"cp: failed to create directory '{dst_path}'")
+                        if entry.depth == 0:
+                            return errors
+                        failed_dirs.add(entry.path)
             else:
                 # Copy file
-                content = self.shell.fs.read_file(src_path)
+                content = self.shell.fs.read_file(entry.path)
                 if content is not None:
                     if not self.shell.fs.write_file(dst_path, content):
                         errors.append(f"cp: failed to write file '{dst_path}'")
@@ -5,6 +5,7 @@ chuk_virtual_shell/commands/filesystem/df.py - Display disk free space
 import argparse
 from typing import List
 from chuk_virtual_shell.commands.command_base import ShellCommand
+from chuk_virtual_shell.core.usage_index import Usage
 
 
 class DfCommand(ShellCommand):
@@ -76,6 +77,15 @@ class DfCommand(ShellCommand):
         # Get storage statistics
         storage_stats = self.shell.fs.get_storage_stats()
 
+        # Usage totals kept up to date by the filesystem replace the
+        # provider's counts, which may come from listing every object
+        usage = getattr(self.shell.fs, "usage", None)
+        totals = usage("/") if callable(usage) else None
+        if isinstance(totals, Usage):
+            storage_stats = dict(
+                storage_stats, total_size_bytes=totals.bytes, file_count=totals.files
+            )
+
         # Format output
         results = []
 
@@ -3,8 +3,11 @@ chuk_virtual_shell/commands/filesystem/du.py - Display disk usage statistics
 """
 
 import argparse
+import time
 from typing import List, Tuple, Optional
 from chuk_virtual_shell.commands.command_base import ShellCommand
+from chuk_virtual_shell.core.usage_index import Usage
+from chuk_virtual_shell.filesystem_compat import scan_dir, stat_node
 
 
 class DuCommand(ShellCommand):
@@ -191,25 +194,25 @@ class DuCommand(ShellCommand):
             is_dir = self._is_directory(abs_path)
 
             if is_dir:
-                # For directories, compute size recursively
-                dir_items = self._get_dir_items(
-                    abs_path,
-                    parsed_args.all,
-                    parsed_args.summarize,
-                    parsed_args.max_depth,
-                    0,  # current depth
-                    parsed_args.exclude,
-                )
-
                 if parsed_args.summarize:
                     # Only display the total for this directory
-                    total_size = sum(size for _, size in dir_items)
+                    total_size = self._get_total_size(abs_path, parsed_args.exclude)
                     size_str = self._format_size(
                         total_size, divisor, parsed_args.human_readable
                     )
                     results.append(f"{size_str}\t{path}")
                     grand_total += total_size
                 else:
+                    # For directories, compute size recursively
+                    dir_items = self._get_dir_items(
+                        abs_path,
+                        parsed_args.all,
+                        False,
+                        parsed_args.max_depth,
+                        0,  # current depth
+                        parsed_args.exclude,
+                    )
+
                     # Display all items based on options
                     for item_path, size in dir_items:
                         # Format relative to the original path for display
@@ -336,24 +339,20 @@ class DuCommand(ShellCommand):
 
         # Get all contents
         try:
-            contents = []
-            if hasattr(self.shell.fs, "ls"):
-                contents = self.shell.fs.ls(dir_path)
-            elif hasattr(self.shell.fs, "list_dir"):
-                contents = self.shell.fs.list_dir(dir_path)
+            contents = self._list_entries(dir_path)
         except Exception:
             # Return empty if we can't list the directory
             return [(dir_path, 0)]
 
         # Calculate size for each item
-        for item in contents:
+        for item, item_is_dir in contents:
             item_path = f"{dir_path.rstrip('/')}/{item}"
 
             # Check exclude patterns
             if self._should_exclude(item, exclude_patterns):
                 continue
 
-            if self._is_directory(item_path):
+            if item_is_dir:
                 # Check if we should show this directory based on depth
                 if max_depth is not None and current_depth >= max_depth:
                     # Just get total size without recursing or showing subdirectories
@@ -406,24 +405,27 @@ class DuCommand(ShellCommand):
 
     def _get_total_size(self, dir_path: str, exclude_patterns: List[str]) -> int:
         """Get total size of a directory without detailed breakdown."""
+        if not exclude_patterns:
+            # Kept up to date by the filesystem; no walk needed
+            usage = getattr(self.shell.fs, "usage", None)
+            totals = usage(dir_path) if callable(usage) else None
+            if isinstance(totals, Usage):
+                return totals.bytes
+
         total = 0
 
         try:
-            contents = []
-            if hasattr(self.shell.fs, "ls"):
-                contents = self.shell.fs.ls(dir_path)
-            elif hasattr(self.shell.fs, "list_dir"):
-                contents = self.shell.fs.list_dir(dir_path)
+            contents = self._list_entries(dir_path)
         except Exception:
             return 0
 
-        for item in contents:
+        for item, item_is_dir in contents:
             item_path = f"{dir_path.rstrip('/')}/{item}"
 
             if self._should_exclude(item, exclude_patterns):
                 continue
 
-            if self._is_directory(item_path):
+            if item_is_dir:
                 total += self._get_total_size(item_path, exclude_patterns)
             else:
                 try:
@@ -433,6 +435,22 @@ class DuCommand(ShellCommand):
 
         return total
 
+    def _list_entries(self, dir_path: str) -> List[Tuple[str, bool]]:
+        """List a directory as (name, is_dir) pairs in one pass."""
+        if hasattr(self.shell.fs, "ls") and hasattr(self.shell.fs, "get_node_info"):
+            return [
+                (name, bool(info is not None and info.is_dir))
+                for name, info in scan_dir(self.shell.fs, dir_path)
+            ]
+
+        contents = []
+        if hasattr(self.shell.fs, "list_dir"):
+            contents = self.shell.fs.list_dir(dir_path)
+        return [
+            (item, self._is_directory(f"{dir_path.rstrip('/')}/{item}"))
+            for item in contents
+        ]
+
     def _is_directory(self, path: str) -> bool:
         """Check if a path is a directory."""
         try:
@@ -456,32 +474,23 @@ class DuCommand(ShellCommand):
             return False
 
     def _get_file_size(self, path: str) -> int:
-        """Get the size of a file."""
+        """Get the size of a file from its metadata."""
         try:
-            if hasattr(self.shell.fs, "get_size"):
-                return self.shell.fs.get_size(path)
-            elif hasattr(self.shell, "get_size"):
-                return self.shell.get_size(path)
-            else:
-                # Read the file and get its length
-                content = self.shell.fs.read_file(path)
-                if content is not None:
-                    if isinstance(content, bytes):
-                        return len(content)
-                    elif isinstance(content, str):
-                        # Count bytes, not characters
-                        return len(content.encode("utf-8"))
-                    else:
-                        return len(str(content))
-                return 0
+            node = stat_node(self.shell.fs, path)
+            return node.size if node is not None else 0
         except Exception:
             return 0
 
     def _get_modification_time(self, path: str) -> str:
         """Get modification time of a file/directory."""
-        # This is a placeholder - real implementation would get actual mtime
-        # For now, return a sample time
-        return "2024-01-01 12:00"
+        try:
+            node = stat_node(self.shell.fs, path)
+        except Exception:
+            node = None
+        if node is None or node.mtime is None:
+            # The filesystem keeps no times
+            return "2024-01-01 12:00"
+        return time.strftime("%Y-%m-%d %H:%M", time.localtime(node.mtime))
 
     def _parse_block_size(self, size_str: str) -> int:
         """Parse block size string like 1K, 1M, etc."""
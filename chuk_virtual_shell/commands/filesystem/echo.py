@@ -89,15 +89,19 @@ Options:
             if self.shell.fs.is_directory(redirection):
                 return f"echo: cannot write to '{redirection}': Is a directory"
 
-            if redirect_mode == ">>":
+            append_file = getattr(self.shell.fs, "append_file", None)
+            if redirect_mode == ">>" and callable(append_file):
+                # Append mode without rewriting the file
+                written = append_file(redirection, output)
+            elif redirect_mode == ">>":
                 # Append mode
                 current = self.shell.fs.read_file(redirection) or ""
-                final_output = current + output
+                written = self.shell.fs.write_file(redirection, current + output)
             else:
                 # Overwrite mode
-                final_output = output
+                written = self.shell.fs.write_file(redirection, output)
 
-            if not self.shell.fs.write_file(redirection, final_output):
+            if not written:
                 return f"echo: cannot write to '{redirection}'"
             return ""
 
@@ -4,8 +4,10 @@ chuk_virtual_shell/commands/filesystem/find.py - Find files and directories
 
 import fnmatch
 import re
+import time
 from typing import List, Optional, Any, Dict
 from chuk_virtual_shell.commands.command_base import ShellCommand
+from chuk_virtual_shell.filesystem_compat import stat_node, walk_tree
 
 
 class FindCommand(ShellCommand):
@@ -268,92 +270,87 @@ class FindCommand(ShellCommand):
         if max_depth is not None and current_depth > max_depth:
             return []
 
-        results = []
-        node_info = self.shell.fs.get_node_info(path)
-        if not node_info:
-            return []
-
-        include_this = current_depth >= min_depth
+        def on_error(dir_path: str, error: Exception) -> None:
+            if hasattr(self.shell, "error_log"):
+                self.shell.error_log.append(f"find: '{dir_path}': {str(error)}")
 
-        # Filter by type
-        if type_filter == "d" and not node_info.is_dir:
-            include_this = False
-        elif type_filter == "f" and node_info.is_dir:
-            include_this = False
-
-        # Get basename for name matching
-        base_name = path.split("/")[-1] if "/" in path else path or path
-
-        # Name pattern matching
-        if name_pattern and include_this:
-            if not fnmatch.fnmatch(base_name, name_pattern):
+        results = []
+        walk_depth = None if max_depth is None else max_depth - current_depth
+
+        def prune_top(entry) -> bool:
+            # -prune stops the descent below the starting point only
+            return prune and entry.depth == 0
+
+        # A content index lists the tree without asking the provider
+        entries = None
+        walk_index = getattr(self.shell.fs, "walk_index", None)
+        if walk_index is not None:
+            entries = walk_index(path, max_depth=walk_depth, prune=prune_top)
+        if entries is None:
+            entries = walk_tree(
+                self.shell.fs,
+                path,
+                max_depth=walk_depth,
+                prune=prune_top,
+                onerror=on_error,
+            )
+        for entry in entries:
+            depth = current_depth + entry.depth
+            include_this = depth >= min_depth
+            node_info = entry.info
+            entry_path = entry.path
+
+            # Filter by type
+            if type_filter == "d" and not node_info.is_dir:
                 include_this = False
-
-        # Case-insensitive name pattern
-        if iname_pattern and include_this:
-            if not fnmatch.fnmatch(base_name.lower(), iname_pattern.lower()):
+            elif type_filter == "f" and node_info.is_dir:
                 include_this = False
 
-        # Path pattern matching
-        if path_pattern and include_this:
-            if not fnmatch.fnmatch(path, path_pattern):
-                include_this = False
+            # Get basename for name matching
+            base_name = entry_path.split("/")[-1] if "/" in entry_path else entry_path
 
-        # Regex pattern matching
-        if regex_pattern and include_this:
-            if not regex_pattern.search(base_name):
-                include_this = False
+            # Name pattern matching
+            if name_pattern and include_this:
+                if not fnmatch.fnmatch(base_name, name_pattern):
+                    include_this = False
 
-        # Size filter
-        if size_filter and include_this:
-            if not self._check_size_filter(path, size_filter):
-                include_this = False
+            # Case-insensitive name pattern
+            if iname_pattern and include_this:
+                if not fnmatch.fnmatch(base_name.lower(), iname_pattern.lower()):
+                    include_this = False
 
-        # Empty filter
-        if empty_filter and include_this:
-            if not self._is_empty(path):
-                include_this = False
+            # Path pattern matching
+            if path_pattern and include_this:
+                if not fnmatch.fnmatch(entry_path, path_pattern):
+                    include_this = False
 
-        # Modification time filter
-        if mtime_filter and include_this:
-            if not self._check_mtime_filter(path, mtime_filter):
-                include_this = False
+            # Regex pattern matching
+            if regex_pattern and include_this:
+                if not regex_pattern.search(base_name):
+                    include_this = False
 
-        # Newer than file filter
-        if newer_file and include_this:
-            if not self._is_newer_than(path, newer_file):
-                include_this = False
+            # Size filter
+            if size_filter and include_this:
+                if not self._check_size_filter(entry_path, size_filter):
+                    include_this = False
 
-        if include_this:
-            results.append(path)
+            # Empty filter
+            if empty_filter and include_this:
+                if not self._is_empty(entry_path):
+                    include_this = False
 
-        # Recurse into directories unless pruned
-        if node_info.is_dir and not prune:
-            try:
-                contents = self.shell.fs.ls(path)
-                for item in contents:
-                    item_path = path.rstrip("/") + "/" + item
-                    results.extend(
-                        self._find_recursive(
-                            item_path,
-                            current_depth + 1,
-                            max_depth,
-                            min_depth,
-                            name_pattern,
-                            iname_pattern,
-                            path_pattern,
-                            type_filter,
-                            regex_pattern,
-                            size_filter,
-                            empty_filter,
-                            mtime_filter,
-                            newer_file,
-                            False,  # Don't propagate prune to children
-                        )
-                    )
-            except Exception as e:
-                if hasattr(self.shell, "error_log"):
-                    self.shell.error_log.append(f"find: '{path}': {str(e)}")
+            # Modification time filter
+            if mtime_filter and include_this:
+                if not self._check_mtime_filter(entry_path, mtime_filter):
+                    include_this = False
+
+            # Newer than file filter
+            if newer_file and include_this:
+                if not self._is_newer_than(entry_path, newer_file):
+                    include_this = False
+
+            if include_this:
+                results.append(entry_path)
 
         return results
 
@@ -393,23 +390,12 @@ class FindCommand(ShellCommand):
         }
         size_bytes = size_value * multipliers.get(unit, 1)
 
-        # Get actual file size
+        # Get actual file size from metadata, not by reading the file
         try:
-            if (
-                hasattr(self.shell.fs, "get_size")
-                and self.shell.fs.get_size is not None
-            ):
-                actual_size = self.shell.fs.get_size(path)
-            else:
-                content = self.shell.fs.read_file(path)
-                if content is not None:
-                    actual_size = (
-                        len(content) if isinstance(content, (str, bytes)) else 0
-                    )
-                else:
-                    actual_size = 0
+            node = stat_node(self.shell.fs, path)
         except Exception:
             return False
+        actual_size = node.size if node is not None else 0
 
         # Compare
         if comparison == ">":
@@ -435,28 +421,48 @@ class FindCommand(ShellCommand):
         else:
             # Check if file is empty
             try:
-                if (
-                    hasattr(self.shell.fs, "get_size")
-                    and self.shell.fs.get_size is not None
-                ):
-                    return self.shell.fs.get_size(path) == 0
-                else:
-                    content = self.shell.fs.read_file(path)
-                    return content is None or len(content) == 0
+                node = stat_node(self.shell.fs, path)
+                return node is not None and node.size == 0
             except Exception:
                 return False
 
     def _check_mtime_filter(self, path: str, mtime_filter: str) -> bool:
-        """Check modification time filter."""
-        # This is a simplified implementation
-        # Real implementation would check actual modification times
-        return True
+        """Check modification time filter (age in whole days, like -mtime)."""
+        comparison = "="
+        if mtime_filter[:1] in ("+", "-"):
+            comparison = mtime_filter[0]
+            mtime_filter = mtime_filter[1:]
+        try:
+            days = int(mtime_filter)
+        except ValueError:
+            return False
+
+        node = stat_node(self.shell.fs, path)
+        if node is None:
+            return False
+        if node.mtime is None:
+            # The filesystem keeps no times; do not filter
+            return True
+        age = int((time.time() - node.mtime) // 86400)
+        if comparison == "+":
+            return age > days
+        elif comparison == "-":
+            return age < days
+        else:
+            return age == days
 
     def _is_newer_than(self, path: str, reference_file: str) -> bool:
         """Check if file is newer than reference file."""
-        # This is a simplified implementation
-        # Real implementation would compare actual modification times
-        return True
+        reference = stat_node(self.shell.fs, self.shell.fs.resolve_path(reference_file))
+        if reference is None:
+            return False
+        node = stat_node(self.shell.fs, path)
+        if node is None:
+            return False
+        if node.mtime is None or reference.mtime is None:
+            # The filesystem keeps no times; do not filter
+            return True
+        return node.mtime > reference.mtime
 
     def _execute_command(self, path: str, exec_args: List[str]):
         """Execute command for matched path."""
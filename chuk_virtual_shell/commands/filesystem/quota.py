@@ -6,6 +6,8 @@ import argparse
 import os
 from typing import Dict, Optional, Any, Tuple
 from chuk_virtual_shell.commands.command_base import ShellCommand
+from chuk_virtual_shell.core.usage_index import Usage
+from chuk_virtual_shell.filesystem_compat import stat_node
 
 
 class QuotaCommand(ShellCommand):
@@ -166,7 +168,7 @@ class QuotaCommand(ShellCommand):
 
     def _calculate_usage_stats(self, target, is_group=False) -> Tuple[int, int]:
         """Calculate actual disk usage stats for the user."""
-        blocks_used = 0
+        bytes_used = 0
         files_used = 0
 
         # Try to get the user's home directory without hardcoding paths
@@ -187,6 +189,12 @@ class QuotaCommand(ShellCommand):
         if base_path is None:
             return 0, 0
 
+        # Totals kept up to date by the filesystem; no walk needed
+        usage = getattr(self.shell.fs, "usage", None)
+        totals = usage(base_path) if callable(usage) else None
+        if isinstance(totals, Usage):
+            return totals.bytes // 1024, totals.files
+
         try:
             # Different methods to find files based on available APIs
             all_files = []
@@ -198,43 +206,22 @@ class QuotaCommand(ShellCommand):
                     for file in files:
                         all_files.append(os.path.join(root, file))
 
-            # Calculate size and count
+            # Calculate size and count from metadata (one lookup per path)
             for file_path in all_files:
-                # Check if file (not directory)
-                is_dir = False
-                if hasattr(self.shell.fs, "is_dir"):
-                    is_dir = self.shell.fs.is_dir(file_path)
-                elif hasattr(self.shell.fs, "isdir"):
-                    is_dir = self.shell.fs.isdir(file_path)
-                elif hasattr(self.shell.fs, "get_node_info"):
-                    node_info = self.shell.fs.get_node_info(file_path)
-                    is_dir = (
-                        node_info and hasattr(node_info, "is_dir") and node_info.is_dir
-                    )
-
-                if not is_dir:
-                    try:
-                        # Get file size
-                        size = 0
-                        if hasattr(self.shell.fs, "get_size"):
-                            size = self.shell.fs.get_size(file_path)
-                        elif hasattr(self.shell, "get_size"):
-                            size = self.shell.get_size(file_path)
-                        elif hasattr(self.shell.fs, "read_file"):
-                            content = self.shell.fs.read_file(file_path)
-                            if content:
-                                size = len(content)
-
-                        blocks_used += size // 1024  # Convert to KB blocks
-                        files_used += 1
-                    except Exception:
-                        # Skip files with errors
-                        pass
+                try:
+                    node = stat_node(self.shell.fs, file_path)
+                except Exception:
+                    # Skip files with errors
+                    continue
+                if node is None or node.is_dir:
+                    continue
+                bytes_used += node.size
+                files_used += 1
         except Exception:
             # If any error occurs, return zeros
             pass
 
-        return blocks_used, files_used
+        return bytes_used // 1024, files_used  # Convert to KB blocks
 
     def _get_security_wrapper_quota_info(
         self, target, is_group=False
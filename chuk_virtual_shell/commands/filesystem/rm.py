@@ -3,6 +3,7 @@ chuk_virtual_shell/commands/filesystem/rm.py - Remove files command
 """
 
 from chuk_virtual_shell.commands.command_base import ShellCommand
+from chuk_virtual_shell.filesystem_compat import walk_tree
 
 
 class RmCommand(ShellCommand):
@@ -166,20 +167,20 @@ Options:
 
     def _remove_recursive_compat(self, path, force, verbose, results, errors):
         """Recursively remove for FileSystemCompat using API methods"""
-        to_remove = []
-
-        # Recursively collect all paths under this directory
-        self._collect_paths_to_remove(path, to_remove)
+        # Collect all paths under this directory (with their type) in one walk
+        to_remove = [
+            (entry.path, entry.is_dir) for entry in walk_tree(self.shell.fs, path)
+        ]
 
         # Sort in reverse order so we remove deepest items first
         to_remove.sort(reverse=True)
 
         # Remove files and directories
-        for item_path in to_remove:
+        for item_path, is_dir in to_remove:
             if item_path == path:
                 continue  # Handle the parent directory last
 
-            if self.shell.fs.is_dir(item_path):
+            if is_dir:
                 # Remove empty directory
                 if hasattr(self.shell.fs, "rmdir"):
                     if self.shell.fs.rmdir(item_path):
@@ -211,26 +212,3 @@ Options:
                 return True
 
         return False
-
-    def _collect_paths_to_remove(self, path, to_remove):
-        """Recursively collect all paths under a directory"""
-        # Add the current path
-        to_remove.append(path)
-
-        # If it's a directory, recursively process its contents
-        if self.shell.fs.is_dir(path):
-            try:
-                # List directory contents
-                contents = self.shell.fs.ls(path)
-                if contents:
-                    for item in contents:
-                        # Skip . and ..
-                        if item in [".", ".."]:
-                            continue
-                        # Construct full path
-                        item_path = f"{path}/{item}" if path != "/" else f"/{item}"
-                        # Recursively collect paths
-                        self._collect_paths_to_remove(item_path, to_remove)
-            except Exception:
-                # If we can't list the directory, just add the path itself
-                pass
@@ -0,0 +1,72 @@
+"""
+chuk_virtual_shell/commands/filesystem/updatedb.py - Rebuild the search index
+"""
+
+import argparse
+import time
+from typing import List
+from chuk_virtual_shell.commands.command_base import ShellCommand
+
+
+class UpdatedbCommand(ShellCommand):
+    name = "updatedb"
+    help_text = (
+        "updatedb - Build or rebuild the filesystem search index\n"
+        "Usage: updatedb [--status | --disable]\n"
+        "Options:\n"
+        "  --status   Show index statistics without rebuilding\n"
+        "  --disable  Drop the index\n"
+        "  --help     Display this help and exit\n"
+        "The index lists every path and the trigrams of file contents. Once\n"
+        "built it is kept up to date as files change, and grep -r and find\n"
+        "use it to skip directory scans and files that cannot match."
+    )
+    category = "filesystem"
+
+    def execute(self, args: List[str]) -> str:
+        parser = argparse.ArgumentParser(prog=self.name, add_help=False)
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument("--status", action="store_true", help="Show statistics")
+        group.add_argument("--disable", action="store_true", help="Drop the index")
+        parser.add_argument("--help", action="store_true", help="Display help and exit")
+
+        try:
+            parsed_args = parser.parse_args(args)
+        except SystemExit:
+            return self.get_help()
+
+        if parsed_args.help:
+            return self.get_help()
+
+        fs = self.shell.fs
+        if not hasattr(fs, "rebuild_index"):
+            self.shell.return_code = 1
+            return "updatedb: this filesystem does not support indexing"
+
+        if parsed_args.disable:
+            fs.disable_index()
+            return "updatedb: index disabled"
+
+        if parsed_args.status:
+            stats = fs.index_stats()
+            if not stats:
+                return "updatedb: no index (run updatedb to build one)"
+            return self._format_stats(stats)
+
+        start = time.time()
+        stats = fs.rebuild_index()
+        elapsed = time.time() - start
+        return f"{self._format_stats(stats)}\nbuilt in {elapsed:.2f}s"
+
+    def _format_stats(self, stats) -> str:
+        """Render index statistics one per line."""
+        unindexed = stats["files"] - stats["indexed_files"]
+        lines = [
+            f"directories: {stats['directories']}",
+            f"files: {stats['files']} ({unindexed} not content-indexed)",
+            f"trigrams: {stats['trigrams']} of {stats['max_trigrams']}"
+            f" ({stats['distinct_trigrams']} distinct)",
+        ]
+        if stats["dirty"]:
+            lines.append(f"pending updates: {stats['dirty']}")
+        return "\n".join(lines)
@@ -3,6 +3,7 @@ import argparse
 import os
 import time
 from chuk_virtual_shell.commands.command_base import ShellCommand
+from chuk_virtual_shell.filesystem_compat import stat_node
 
 
 class LsCommand(ShellCommand):
@@ -150,20 +151,7 @@ class LsCommand(ShellCommand):
                 owner = self.shell.environ.get("USER", "user")
                 group = "staff"
 
-                # Get file size
-                size = 0
-                try:
-                    if hasattr(self.shell.fs, "get_size"):
-                        size = self.shell.fs.get_size(full_path)
-                    elif not is_dir and hasattr(self.shell.fs, "read_file"):
-                        # Alternative: get size from file content
-                        content = self.shell.fs.read_file(full_path)
-                        if content is not None:
-                            size = len(content)
-                except Exception:
-                    size = 0  # Default if size can't be determined
-
-                mod_date = time.strftime("%b %d %H:%M", time.localtime())
+                size, mod_date = self._size_and_date(full_path)
                 # Format the line with right-aligned file size
                 lines.append(f"{mode} {nlink} {owner} {group} {size:>5} {mod_date} {f}")
 
@@ -179,21 +167,22 @@ class LsCommand(ShellCommand):
             nlink = 1
             owner = self.shell.environ.get("USER", "user")
             group = "staff"
-            size = 0
-            try:
-                full_path = os.path.join(base_path, f) if base_path else f
-                if hasattr(self.shell.fs, "get_size"):
-                    size = self.shell.fs.get_size(full_path)
-                elif hasattr(self.shell.fs, "read_file"):
-                    content = self.shell.fs.read_file(full_path)
-                    if content is not None:
-                        size = len(content)
-            except Exception:
-                size = 0
-            mod_date = time.strftime("%b %d %H:%M", time.localtime())
+            full_path = os.path.join(base_path, f) if base_path else f
+            size, mod_date = self._size_and_date(full_path)
             lines.append(f"{mode} {nlink} {owner} {group} {size:>5} {mod_date} {f}")
         return "\n".join(lines)
 
+    def _size_and_date(self, path):
+        """Size and modification date column of a long listing entry."""
+        try:
+            node = stat_node(self.shell.fs, path)
+        except Exception:
+            node = None  # Default if size can't be determined
+        size = node.size if node is not None else 0
+        mtime = node.mtime if node is not None else None
+        mod_date = time.strftime("%b %d %H:%M", time.localtime(mtime))
+        return size, mod_date
+
     def _directory_exists(self, path):
         """Check if a directory exists using available methods."""
         try:
@@ -5,7 +5,10 @@ chuk_virtual_shell/commands/navigation/tree.py - tree command implementation
 Displays directory structure in a tree-like format.
 """
 
+import fnmatch
+
 from chuk_virtual_shell.commands.command_base import ShellCommand
+from chuk_virtual_shell.filesystem_compat import scan_dir
 
 
 class TreeCommand(ShellCommand):
@@ -161,8 +164,12 @@ Examples:
             return dir_count, file_count
 
         try:
-            # Get directory contents
-            items = self.shell.fs.list_directory(path)
+            # Get directory contents with their types in one pass
+            entries = scan_dir(self.shell.fs, path)
+            is_dir_by_name = {
+                name: bool(info is not None and info.is_dir) for name, info in entries
+            }
+            items = [name for name, _ in entries]
 
             # Filter hidden files if needed
             if not show_all:
@@ -170,8 +177,6 @@ Examples:
 
             # Filter by ignore pattern
             if ignore_pattern:
-                import fnmatch
-
                 items = [
                     item for item in items if not fnmatch.fnmatch(item, ignore_pattern)
                 ]
@@ -181,8 +186,7 @@ Examples:
             files = []
 
             for item in items:
-                item_path = f"{path}/{item}"
-                if self.shell.fs.is_dir(item_path):
+                if is_dir_by_name[item]:
                     dirs.append(item)
                 else:
                     files.append(item)
@@ -201,7 +205,7 @@ Examples:
             for i, item in enumerate(all_items):
                 is_last = i == len(all_items) - 1
                 item_path = f"{path}/{item}"
-                is_dir = self.shell.fs.is_dir(item_path)
+                is_dir = is_dir_by_name[item]
 
                 # Skip files if dirs_only
                 if dirs_only and not is_dir:
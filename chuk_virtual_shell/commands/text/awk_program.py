@@ -0,0 +1,2408 @@
+# src/chuk_virtual_shell/commands/text/awk_program.py
+"""
+chuk_virtual_shell/commands/text/awk_program.py - awk language front end
+
+An awk program is tokenized, parsed into an AST and compiled into a tree of
+Python closures once. Compiled programs are cached by program text, so
+running awk only evaluates the closures for each input record.
+"""
+
+import math
+import operator
+import random
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from chuk_virtual_shell.core.columnar import AWK_NUMBER, ColumnTable
+from chuk_virtual_shell.core.command_ast import LRUCache
+
+
+class AwkError(Exception):
+    """Syntax or runtime error in an awk program."""
+
+
+# ---------------------------------------------------------------------------
+# Values
+# ---------------------------------------------------------------------------
+#
+# Numbers are floats. Plain ``str`` values come from input (fields, -v
+# assignments, split() elements) and compare numerically when they look like
+# numbers. String constants and results of string operations are AwkString
+# and always compare as strings. UNINIT is the value of unset variables.
+
+
+class AwkString(str):
+    """String value that never takes part in numeric comparisons."""
+
+    __slots__ = ()
+
+
+class _Uninit(str):
+    """Value of an uninitialized variable: both "" and 0."""
+
+    __slots__ = ()
+
+
+UNINIT = _Uninit("")
+
+_STRNUM_RE = re.compile(r"^[ \t\n]*[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?[ \t\n]*$")
+_LEADING_NUM_RE = AWK_NUMBER
+
+
+def to_num(value) -> float:
+    """Convert an awk value to a number."""
+    if value.__class__ is float:
+        return value
+    match = _LEADING_NUM_RE.match(value)
+    return float(match.group()) if match else 0.0
+
+
+def to_str(value, fmt: str = "%.6g") -> str:
+    """Convert an awk value to a string, formatting numbers with fmt."""
+    if value.__class__ is float:
+        if value.is_integer() and abs(value) < 1e16:
+            return str(int(value))
+        return fmt % value
+    return value
+
+
+def to_bool(value) -> bool:
+    """Return the truth value of an awk value."""
+    cls = value.__class__
+    if cls is float:
+        return value != 0.0
+    if cls is str and _STRNUM_RE.match(value):
+        return float(value) != 0.0
+    return value != ""
+
+
+def _numeric_value(value) -> Optional[float]:
+    """Return the number a value compares as, or None for strings."""
+    cls = value.__class__
+    if cls is float:
+        return value
+    if cls is str:
+        return float(value) if _STRNUM_RE.match(value) else None
+    if value is UNINIT:
+        return 0.0
+    return None
+
+
+def _compare_operands(left, right, fmt: str) -> Tuple[Any, Any]:
+    """Return the pair to compare: numbers when both sides are numeric."""
+    x = _numeric_value(left)
+    if x is not None:
+        y = _numeric_value(right)
+        if y is not None:
+            return x, y
+    return to_str(left, fmt), to_str(right, fmt)
+
+
+_POSIX_CLASSES = {
+    "[:alpha:]": "a-zA-Z",
+    "[:digit:]": "0-9",
+    "[:alnum:]": "a-zA-Z0-9",
+    "[:upper:]": "A-Z",
+    "[:lower:]": "a-z",
+    "[:space:]": r" \t\n\r\f\v",
+    "[:blank:]": r" \t",
+    "[:punct:]": r"!-/:-@\[-`{-~",
+    "[:xdigit:]": "0-9A-Fa-f",
+    "[:cntrl:]": r"\x00-\x1f\x7f",
+    "[:print:]": r" -~",
+    "[:graph:]": r"!-~",
+}
+
+_regex_cache: Dict[str, "re.Pattern"] = {}
+
+
+def compile_regex(pattern: str) -> "re.Pattern":
+    """Compile an awk extended regular expression (cached)."""
+    compiled = _regex_cache.get(pattern)
+    if compiled is None:
+        translated = pattern
+        if "[:" in translated:
+            for name, chars in _POSIX_CLASSES.items():
+                translated = translated.replace(name, chars)
+        try:
+            compiled = re.compile(translated)
+        except re.error as e:
+            raise AwkError(f"invalid regular expression /{pattern}/: {e}")
+        if len(_regex_cache) >= 512:
+            _regex_cache.clear()
+        _regex_cache[pattern] = compiled
+    return compiled
+
+
+def make_splitter(separator: str) -> Callable[[str], List[str]]:
+    """Return a function splitting text by an awk field separator."""
+    if separator == " ":
+        return str.split
+    if separator == "":
+        return list
+    if separator == "\\t":
+        separator = "\t"
+    if len(separator) == 1 and separator != "\\":
+
+        def split_literal(text):
+            return text.split(separator) if text else []
+
+        # Lets column-at-a-time code split with str.split directly
+        split_literal.separator = separator
+        return split_literal
+
+    regex = compile_regex(separator)
+
+    def split_regex(text):
+        return regex.split(text) if text else []
+
+    return split_regex
+
+
+# ---------------------------------------------------------------------------
+# Lexer
+# ---------------------------------------------------------------------------
+
+KEYWORDS = {
+    "BEGIN",
+    "END",
+    "function",
+    "func",
+    "if",
+    "else",
+    "while",
+    "for",
+    "do",
+    "break",
+    "continue",
+    "next",
+    "nextfile",
+    "exit",
+    "return",
+    "delete",
+    "in",
+    "print",
+    "printf",
+    "getline",
+}
+
+BUILTINS = {
+    "length",
+    "substr",
+    "index",
+    "split",
+    "sub",
+    "gsub",
+    "match",
+    "sprintf",
+    "tolower",
+    "toupper",
+    "int",
+    "sqrt",
+    "exp",
+    "log",
+    "sin",
+    "cos",
+    "atan2",
+    "rand",
+    "srand",
+    "system",
+    "close",
+    "fflush",
+}
+
+_OPERATORS = [
+    "**=", "^=", "+=", "-=", "*=", "/=", "%=", "==", "<=", ">=", "!=", "++",
+    "--", "&&", "||", ">>", "!~", "**", "{", "}", "(", ")", "[", "]", ";",
+    ",", "+", "-", "*", "/", "%", "^", "!", ">", "<", "|", "?", ":", "~",
+    "$", "=",
+]  # fmt: skip
+
+_OPERATOR_ALIASES = {"**": "^", "**=": "^="}
+
+# Tokens after which "/" means division rather than the start of a regex
+_OPERAND_END = {"NUMBER", "STRING", "ERE", "NAME", "BUILTIN", ")", "]", "++", "--"}
+
+_ESCAPES = {
+    "n": "\n",
+    "t": "\t",
+    "r": "\r",
+    "\\": "\\",
+    '"': '"',
+    "/": "/",
+    "a": "\a",
+    "b": "\b",
+    "f": "\f",
+    "v": "\v",
+    "'": "'",
+}
+
+_ESCAPE_RE = re.compile(r"\\([0-7]{1,3}|.)", re.DOTALL)
+
+_NUMBER_RE = re.compile(r"(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+_NAME_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+
+@dataclass
+class Token:
+    """Lexical token; kind is the literal text for keywords and operators."""
+
+    kind: str
+    value: Any
+    line: int
+
+
+def decode_escapes(text: str) -> str:
+    """Process string escapes, as awk does for -v and command-line assignments."""
+
+    def replace(match):
+        escape = match.group(1)
+        if escape[0] in "01234567":
+            return chr(int(escape, 8))
+        return _ESCAPES.get(escape, "\\" + escape)
+
+    return _ESCAPE_RE.sub(replace, text)
+
+
+def tokenize(source: str) -> List[Token]:
+    """Split awk program text into tokens."""
+    tokens: List[Token] = []
+    i = 0
+    n = len(source)
+    line = 1
+    while i < n:
+        c = source[i]
+        if c in " \t\r":
+            i += 1
+        elif c == "\\" and source.startswith("\n", i + 1):
+            i += 2
+            line += 1
+        elif c == "\\" and source.startswith("\r\n", i + 1):
+            i += 3
+            line += 1
+        elif c == "#":
+            while i < n and source[i] != "\n":
+                i += 1
+        elif c == "\n":
+            tokens.append(Token("NEWLINE", c, line))
+            i += 1
+            line += 1
+        elif c == '"':
+            value, i = _read_string(source, i + 1, line)
+            tokens.append(Token("STRING", value, line))
+        elif c == "/" and (not tokens or tokens[-1].kind not in _OPERAND_END):
+            value, i = _read_regex(source, i + 1, line)
+            tokens.append(Token("ERE", value, line))
+        elif c.isdigit() or (c == "." and source[i + 1 : i + 2].isdigit()):
+            match = _NUMBER_RE.match(source, i)
+            tokens.append(Token("NUMBER", float(match.group()), line))
+            i = match.end()
+        elif c.isalpha() or c == "_":
+            match = _NAME_RE.match(source, i)
+            word = match.group()
+            i = match.end()
+            if word in KEYWORDS:
+                kind = "function" if word == "func" else word
+            elif word in BUILTINS:
+                kind = "BUILTIN"
+            elif source.startswith("(", i):
+                kind = "FUNC_NAME"
+            else:
+                kind = "NAME"
+            tokens.append(Token(kind, word, line))
+        else:
+            for op in _OPERATORS:
+                if source.startswith(op, i):
+                    kind = _OPERATOR_ALIASES.get(op, op)
+                    tokens.append(Token(kind, kind, line))
+                    i += len(op)
+                    break
+            else:
+                raise AwkError(f"syntax error at source line {line}: unexpected '{c}'")
+    tokens.append(Token("EOF", None, line))
+    return tokens
+
+
+def _read_string(source: str, i: int, line: int) -> Tuple[str, int]:
+    """Read a string literal body starting after the opening quote."""
+    chars = []
+    n = len(source)
+    while i < n:
+        c = source[i]
+        if c == '"':
+            return "".join(chars), i + 1
+        if c == "\n":
+            break
+        if c == "\\" and i + 1 < n:
+            nxt = source[i + 1]
+            if nxt in _ESCAPES:
+                chars.append(_ESCAPES[nxt])
+                i += 2
+                continue
+            if nxt in "01234567":
+                j = i + 1
+                while j < n and j < i + 4 and source[j] in "01234567":
+                    j += 1
+                chars.append(chr(int(source[i + 1 : j], 8)))
+                i = j
+                continue
+            if nxt == "\n":
+                i += 2
+                continue
+            # Unknown escapes keep their backslash so "\." works as a regex
+        chars.append(c)
+        i += 1
+    raise AwkError(f"unterminated string at source line {line}")
+
+
+def _read_regex(source: str, i: int, line: int) -> Tuple[str, int]:
+    """Read a regex literal body starting after the opening slash."""
+    chars = []
+    n = len(source)
+    in_bracket = False
+    while i < n:
+        c = source[i]
+        if c == "\n":
+            break
+        if c == "\\" and i + 1 < n:
+            chars.append("/" if source[i + 1] == "/" else source[i : i + 2])
+            i += 2
+            continue
+        if in_bracket:
+            if c == "[" and source.startswith(":", i + 1):
+                end = source.find(":]", i + 2)
+                if end != -1:
+                    chars.append(source[i : end + 2])
+                    i = end + 2
+                    continue
+            if c == "]":
+                in_bracket = False
+        elif c == "[":
+            chars.append(c)
+            i += 1
+            if source.startswith("^", i):
+                chars.append("^")
+                i += 1
+            if source.startswith("]", i):
+                chars.append("\\]")
+                i += 1
+            in_bracket = True
+            continue
+        elif c == "/":
+            return "".join(chars), i + 1
+        chars.append(c)
+        i += 1
+    raise AwkError(f"unterminated regular expression at source line {line}")
+
+
+# ---------------------------------------------------------------------------
+# AST
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class Num:
+    value: float
+
+
+@dataclass
+class Str:
+    value: str
+
+
+@dataclass
+class Regex:
+    pattern: str
+
+
+@dataclass
+class Var:
+    name: str
+
+
+@dataclass
+class Field:
+    index: Any
+
+
+@dataclass
+class Index:
+    name: str
+    subscripts: List[Any]
+
+
+@dataclass
+class Group:
+    expr: Any
+
+
+@dataclass
+class ExprList:
+    items: List[Any]
+
+
+@dataclass
+class Assign:
+    op: str
+    target: Any
+    value: Any
+
+
+@dataclass
+class Cond:
+    test: Any
+    yes: Any
+    no: Any
+
+
+@dataclass
+class Binary:
+    op: str
+    left: Any
+    right: Any
+
+
+@dataclass
+class Logical:
+    op: str
+    left: Any
+    right: Any
+
+
+@dataclass
+class Match:
+    negate: bool
+    subject: Any
+    pattern: Any
+
+
+@dataclass
+class In:
+    subscripts: List[Any]
+    name: str
+
+
+@dataclass
+class Unary:
+    op: str
+    operand: Any
+
+
+@dataclass
+class IncDec:
+    op: str
+    prefix: bool
+    target: Any
+
+
+@dataclass
+class Call:
+    name: str
+    args: List[Any]
+
+
+@dataclass
+class UserCall:
+    name: str
+    args: List[Any]
+
+
+@dataclass
+class Print:
+    args: List[Any]
+    redirect: Optional[str] = None
+    dest: Any = None
+
+
+@dataclass
+class Printf:
+    args: List[Any]
+    redirect: Optional[str] = None
+    dest: Any = None
+
+
+@dataclass
+class ExprStmt:
+    expr: Any
+
+
+@dataclass
+class If:
+    test: Any
+    body: Any
+    orelse: Any = None
+
+
+@dataclass
+class While:
+    test: Any
+    body: Any
+
+
+@dataclass
+class DoWhile:
+    body: Any
+    test: Any
+
+
+@dataclass
+class For:
+    init: Any
+    test: Any
+    update: Any
+    body: Any
+
+
+@dataclass
+class ForIn:
+    var: str
+    array: str
+    body: Any
+
+
+@dataclass
+class Block:
+    body: List[Any]
+
+
+@dataclass
+class Next:
+    pass
+
+
+@dataclass
+class NextFile:
+    pass
+
+
+@dataclass
+class Exit:
+    status: Any = None
+
+
+@dataclass
+class Break:
+    pass
+
+
+@dataclass
+class Continue:
+    pass
+
+
+@dataclass
+class Return:
+    value: Any = None
+
+
+@dataclass
+class Delete:
+    name: str
+    subscripts: Optional[List[Any]] = None
+
+
+@dataclass
+class Rule:
+    pattern: Any
+    end_pattern: Any
+    action: Optional[Block]
+
+
+@dataclass
+class Function:
+    name: str
+    params: List[str]
+    body: Block
+
+
+@dataclass
+class ProgramAST:
+    begin: List[Block] = field(default_factory=list)
+    rules: List[Rule] = field(default_factory=list)
+    end: List[Block] = field(default_factory=list)
+    functions: Dict[str, Function] = field(default_factory=dict)
+
+
+_LVALUES = (Var, Field, Index)
+
+_ASSIGN_OPS = {"=", "+=", "-=", "*=", "/=", "%=", "^="}
+
+_COMPARISONS = {"<", "<=", "==", "!=", ">", ">="}
+
+_CONCAT_START = {
+    "NUMBER",
+    "STRING",
+    "ERE",
+    "NAME",
+    "FUNC_NAME",
+    "BUILTIN",
+    "$",
+    "(",
+    "++",
+    "--",
+}
+
+
+# ---------------------------------------------------------------------------
+# Parser
+# ---------------------------------------------------------------------------
+
+
+class Parser:
+    """Recursive-descent parser producing a ProgramAST."""
+
+    def __init__(self, source: str):
+        self.tokens = tokenize(source)
+        self.pos = 0
+        # False while parsing print arguments, where ">" is a redirection
+        self.allow_gt = True
+
+    # Token helpers -------------------------------------------------------
+
+    def peek(self, offset: int = 0) -> Token:
+        index = min(self.pos + offset, len(self.tokens) - 1)
+        return self.tokens[index]
+
+    def advance(self) -> Token:
+        token = self.tokens[self.pos]
+        if token.kind != "EOF":
+            self.pos += 1
+        return token
+
+    def check(self, *kinds: str) -> bool:
+        return self.tokens[self.pos].kind in kinds
+
+    def accept(self, kind: str) -> Optional[Token]:
+        if self.tokens[self.pos].kind == kind:
+            return self.advance()
+        return None
+
+    def expect(self, kind: str) -> Token:
+        if self.tokens[self.pos].kind != kind:
+            self.error(f"expected '{kind}'")
+        return self.advance()
+
+    def error(self, message: str = "syntax error"):
+        token = self.peek()
+        near = "end of program" if token.kind == "EOF" else repr(str(token.value))
+        raise AwkError(f"{message} at source line {token.line} near {near}")
+
+    def skip_newlines(self) -> None:
+        while self.tokens[self.pos].kind == "NEWLINE":
+            self.pos += 1
+
+    def skip_terminators(self) -> None:
+        while self.tokens[self.pos].kind in ("NEWLINE", ";"):
+            self.pos += 1
+
+    def at_terminator(self) -> bool:
+        return self.check(";", "NEWLINE", "}", "EOF")
+
+    # Program structure ---------------------------------------------------
+
+    def parse_program(self) -> ProgramAST:
+        program = ProgramAST()
+        self.skip_terminators()
+        while not self.check("EOF"):
+            if self.accept("BEGIN"):
+                self.skip_newlines()
+                program.begin.append(self.parse_block())
+            elif self.accept("END"):
+                self.skip_newlines()
+                program.end.append(self.parse_block())
+            elif self.check("function"):
+                function = self.parse_function()
+                if function.name in program.functions:
+                    raise AwkError(f"function '{function.name}' redefined")
+                program.functions[function.name] = function
+            else:
+                pattern = end_pattern = None
+                if not self.check("{"):
+                    pattern = self.parse_expr()
+                    if self.accept(","):
+                        self.skip_newlines()
+                        end_pattern = self.parse_expr()
+                action = self.parse_block() if self.check("{") else None
+                program.rules.append(Rule(pattern, end_pattern, action))
+            self.skip_terminators()
+        return program
+
+    def parse_function(self) -> Function:
+        self.expect("function")
+        name = self.advance()
+        if name.kind not in ("NAME", "FUNC_NAME"):
+            self.error("expected function name")
+        self.expect("(")
+        params: List[str] = []
+        while not self.check(")"):
+            params.append(self.expect("NAME").value)
+            if not self.accept(","):
+                break
+            self.skip_newlines()
+        self.expect(")")
+        self.skip_newlines()
+        return Function(name.value, params, self.parse_block())
+
+    def parse_block(self) -> Block:
+        self.expect("{")
+        body = []
+        self.skip_terminators()
+        while not self.check("}"):
+            if self.check("EOF"):
+                self.error("missing '}'")
+            body.append(self.parse_statement())
+            self.skip_terminators()
+        self.expect("}")
+        return Block(body)
+
+    # Statements ----------------------------------------------------------
+
+    def parse_statement(self):
+        kind = self.peek().kind
+        if kind == "{":
+            return self.parse_block()
+        if kind == "if":
+            self.advance()
+            self.expect("(")
+            test = self.parse_expr()
+            self.expect(")")
+            body = self.parse_body()
+            mark = self.pos
+            self.skip_terminators()
+            if self.accept("else"):
+                self.skip_newlines()
+                return If(test, body, self.parse_statement())
+            self.pos = mark
+            return If(test, body)
+        if kind == "while":
+            self.advance()
+            self.expect("(")
+            test = self.parse_expr()
+            self.expect(")")
+            return While(test, self.parse_body())
+        if kind == "do":
+            self.advance()
+            self.skip_newlines()
+            body = self.parse_statement()
+            self.skip_terminators()
+            self.expect("while")
+            self.expect("(")
+            test = self.parse_expr()
+            self.expect(")")
+            self.end_simple_statement()
+            return DoWhile(body, test)
+        if kind == "for":
+            return self.parse_for()
+        if kind == ";":
+            self.advance()
+            return Block([])
+        statement = self.parse_simple_statement()
+        self.end_simple_statement()
+        return statement
+
+    def parse_body(self):
+        """Parse the body of if/while/for, which may be an empty ';'."""
+        if self.accept(";"):
+            return Block([])
+        self.skip_newlines()
+        return self.parse_statement()
+
+    def parse_for(self):
+        self.expect("for")
+        self.expect("(")
+        if (
+            self.check("NAME")
+            and self.peek(1).kind == "in"
+            and self.peek(2).kind == "NAME"
+            and self.peek(3).kind == ")"
+        ):
+            var = self.advance().value
+            self.advance()
+            array = self.advance().value
+            self.expect(")")
+            return ForIn(var, array, self.parse_body())
+        init = None if self.check(";") else self.parse_simple_statement()
+        self.expect(";")
+        self.skip_newlines()
+        test = None if self.check(";") else self.parse_expr()
+        self.expect(";")
+        self.skip_newlines()
+        update = None if self.check(")") else self.parse_simple_statement()
+        self.expect(")")
+        return For(init, test, update, self.parse_body())
+
+    def end_simple_statement(self) -> None:
+        if self.check(";", "NEWLINE"):
+            self.advance()
+        elif not self.check("}", "EOF"):
+            self.error()
+
+    def parse_simple_statement(self):
+        kind = self.peek().kind
+        if kind in ("print", "printf"):
+            return self.parse_print()
+        if kind == "next":
+            self.advance()
+            return Next()
+        if kind == "nextfile":
+            self.advance()
+            return NextFile()
+        if kind in ("exit", "return"):
+            self.advance()
+            value = None if self.at_terminator() else self.parse_expr()
+            return Exit(value) if kind == "exit" else Return(value)
+        if kind == "break":
+            self.advance()
+            return Break()
+        if kind == "continue":
+            self.advance()
+            return Continue()
+        if kind == "delete":
+            self.advance()
+            name = self.expect("NAME").value
+            subscripts = None
+            if self.accept("["):
+                subscripts = self.parse_enclosed_list("]")
+            return Delete(name, subscripts)
+        if kind == "getline":
+            raise AwkError("getline is not supported")
+        return ExprStmt(self.parse_expr())
+
+    def parse_print(self):
+        kind = self.advance().kind
+        args: List[Any] = []
+        saved, self.allow_gt = self.allow_gt, False
+        try:
+            if not self.at_terminator() and not self.check(">", ">>", "|"):
+                args = self.parse_expr_list()
+        finally:
+            self.allow_gt = saved
+        if len(args) == 1 and isinstance(args[0], Group):
+            if isinstance(args[0].expr, ExprList):
+                args = args[0].expr.items
+        redirect = dest = None
+        if self.check(">", ">>", "|"):
+            redirect = self.advance().kind
+            if redirect == "|":
+                raise AwkError("output pipes are not supported")
+            dest = self.parse_concat()
+        if kind == "printf":
+            if not args:
+                self.error("printf: no format")
+            return Printf(args, redirect, dest)
+        return Print(args, redirect, dest)
+
+    # Expressions ---------------------------------------------------------
+
+    def parse_expr_list(self) -> List[Any]:
+        items = [self.parse_expr()]
+        while self.accept(","):
+            self.skip_newlines()
+            items.append(self.parse_expr())
+        return items
+
+    def parse_enclosed_list(self, closing: str) -> List[Any]:
+        """Parse a comma list up to closing, where ">" is a comparison again."""
+        saved, self.allow_gt = self.allow_gt, True
+        try:
+            self.skip_newlines()
+            items = [] if self.check(closing) else self.parse_expr_list()
+            self.skip_newlines()
+            self.expect(closing)
+        finally:
+            self.allow_gt = saved
+        return items
+
+    def parse_expr(self):
+        test = self.parse_or()
+        if self.accept("?"):
+            self.skip_newlines()
+            yes = self.parse_expr()
+            self.skip_newlines()
+            self.expect(":")
+            self.skip_newlines()
+            return Cond(test, yes, self.parse_expr())
+        return test
+
+    def parse_or(self):
+        left = self.parse_and()
+        while self.accept("||"):
+            self.skip_newlines()
+            left = Logical("||", left, self.parse_and())
+        return left
+
+    def parse_and(self):
+        left = self.parse_in()
+        while self.accept("&&"):
+            self.skip_newlines()
+            left = Logical("&&", left, self.parse_in())
+        return left
+
+    def parse_in(self):
+        left = self.parse_match()
+        while self.accept("in"):
+            left = In([left], self.expect("NAME").value)
+        return left
+
+    def parse_match(self):
+        left = self.parse_comparison()
+        while self.check("~", "!~"):
+            negate = self.advance().kind == "!~"
+            left = Match(negate, left, self.parse_comparison())
+        return left
+
+    def parse_comparison(self):
+        left = self.parse_concat()
+        kind = self.peek().kind
+        if kind in _COMPARISONS and (kind != ">" or self.allow_gt):
+            self.advance()
+            return Binary(kind, left, self.parse_concat())
+        return left
+
+    def parse_concat(self):
+        left = self.parse_additive()
+        while self.peek().kind in _CONCAT_START:
+            left = Binary("concat", left, self.parse_additive())
+        return left
+
+    def parse_additive(self):
+        left = self.parse_multiplicative()
+        while self.check("+", "-"):
+            op = self.advance().kind
+            left = Binary(op, left, self.parse_multiplicative())
+        return left
+
+    def parse_multiplicative(self):
+        left = self.parse_unary()
+        while self.check("*", "/", "%"):
+            op = self.advance().kind
+            left = Binary(op, left, self.parse_unary())
+        return left
+
+    def parse_unary(self):
+        if self.check("!", "-", "+"):
+            op = self.advance().kind
+            return Unary(op, self.parse_unary())
+        return self.parse_power()
+
+    def parse_power(self):
+        base = self.parse_postfix()
+        if self.accept("^"):
+            return Binary("^", base, self.parse_unary())
+        return base
+
+    def parse_postfix(self):
+        if self.check("++", "--"):
+            op = self.advance().kind
+            return IncDec(op, True, self.parse_lvalue())
+        node = self.parse_primary()
+        if isinstance(node, _LVALUES):
+            return self.parse_lvalue_tail(node)
+        return node
+
+    def parse_lvalue(self):
+        node = self.parse_primary()
+        if not isinstance(node, _LVALUES):
+            self.error("expected a variable")
+        return node
+
+    def parse_lvalue_tail(self, node):
+        """Handle assignment and post-increment after an lvalue."""
+        kind = self.peek().kind
+        if kind in _ASSIGN_OPS:
+            self.advance()
+            self.skip_newlines()
+            return Assign(kind, node, self.parse_expr())
+        if kind in ("++", "--"):
+            self.advance()
+            return IncDec(kind, False, node)
+        return node
+
+    def parse_field_operand(self):
+        if self.check("++", "--"):
+            op = self.advance().kind
+            return IncDec(op, True, self.parse_lvalue())
+        if self.check("-", "+", "!"):
+            op = self.advance().kind
+            return Unary(op, self.parse_field_operand())
+        return self.parse_primary()
+
+    def parse_primary(self):
+        token = self.advance()
+        kind = token.kind
+        if kind == "NUMBER":
+            return Num(token.value)
+        if kind == "STRING":
+            return Str(token.value)
+        if kind == "ERE":
+            return Regex(token.value)
+        if kind == "$":
+            return Field(self.parse_field_operand())
+        if kind == "NAME":
+            if self.accept("["):
+                return Index(token.value, self.parse_enclosed_list("]"))
+            return Var(token.value)
+        if kind == "FUNC_NAME":
+            self.expect("(")
+            return UserCall(token.value, self.parse_enclosed_list(")"))
+        if kind == "BUILTIN":
+            if self.accept("("):
+                return Call(token.value, self.parse_enclosed_list(")"))
+            if token.value != "length":
+                self.error(f"{token.value} requires arguments")
+            return Call("length", [])
+        if kind == "(":
+            items = self.parse_enclosed_list(")")
+            if not items:
+                self.error()
+            if len(items) > 1:
+                if self.accept("in"):
+                    return In(items, self.expect("NAME").value)
+                return Group(ExprList(items))
+            return Group(items[0])
+        if kind == "getline":
+            raise AwkError("getline is not supported")
+        self.pos -= 1
+        self.error()
+
+
+def parse(source: str) -> ProgramAST:
+    """Parse awk program text into an AST."""
+    return Parser(source).parse_program()
+
+
+# ---------------------------------------------------------------------------
+# Runtime
+# ---------------------------------------------------------------------------
+
+
+class _Next(Exception):
+    pass
+
+
+class _NextFile(Exception):
+    pass
+
+
+class _Exit(Exception):
+    def __init__(self, status: int):
+        super().__init__(status)
+        self.status = status
+
+
+class _Break(Exception):
+    pass
+
+
+class _Continue(Exception):
+    pass
+
+
+class _Return(Exception):
+    def __init__(self, value):
+        super().__init__()
+        self.value = value
+
+
+class AwkRuntime:
+    """Execution state of one awk invocation: variables, record and output."""
+
+    def __init__(
+        self,
+        program: "AwkProgram",
+        variables: Optional[Dict[str, str]] = None,
+        field_separator: Optional[str] = None,
+        environ: Optional[Dict[str, str]] = None,
+        system: Optional[Callable[[str], Tuple[str, int]]] = None,
+    ):
+        self.program = program
+        self.vars: Dict[str, Any] = {
+            "FS": " ",
+            "OFS": " ",
+            "ORS": "\n",
+            "RS": "\n",
+            "SUBSEP": "\x1c",
+            "CONVFMT": "%.6g",
+            "OFMT": "%.6g",
+            "NR": 0.0,
+            "FNR": 0.0,
+            "RSTART": 0.0,
+            "RLENGTH": -1.0,
+            "FILENAME": "",
+            "ENVIRON": dict(environ or {}),
+        }
+        self.convfmt = "%.6g"
+        self.ofmt = "%.6g"
+        self._splitter = str.split
+        self.record: str = ""
+        self.fields: Optional[List[str]] = None
+        if field_separator is not None:
+            self.set_var("FS", field_separator)
+        for name, value in (variables or {}).items():
+            self.set_var(name, value)
+        self.out: List[str] = []
+        self.redirects: Dict[str, List[str]] = {}
+        self.redirect_modes: Dict[str, str] = {}
+        self.frames: List[list] = []
+        self.range_active = [False] * len(program.rules)
+        self.system = system
+        self.random = random.Random(0)
+        self.seed = 0.0
+        self.exit_status = 0
+        self.exiting = False
+
+    # Variables -----------------------------------------------------------
+
+    def set_var(self, name: str, value) -> None:
+        """Assign a global variable, updating derived state."""
+        if name == "NF":
+            self.set_nf(value)
+            return
+        self.vars[name] = value
+        if name == "FS":
+            self._splitter = make_splitter(to_str(value, self.convfmt))
+        elif name == "CONVFMT":
+            self.convfmt = to_str(value)
+        elif name == "OFMT":
+            self.ofmt = to_str(value)
+
+    def get_array(self, name: str) -> dict:
+        array = self.vars.get(name)
+        if array.__class__ is dict:
+            return array
+        if array is None or array is UNINIT:
+            array = self.vars[name] = {}
+            return array
+        raise AwkError(f"can't use scalar {name} as array")
+
+    # Records and fields --------------------------------------------------
+
+    def set_record(self, text: str) -> None:
+        self.record = text
+        self.fields = None
+
+    def split_record(self) -> List[str]:
+        self.fields = self._splitter(self.record)
+        return self.fields
+
+    def get_field(self, index: int):
+        if index == 0:
+            return self.record
+        fields = self.fields
+        if fields is None:
+            fields = self.split_record()
+        if 0 < index <= len(fields):
+            return fields[index - 1]
+        if index < 0:
+            raise AwkError(f"attempt to access field {index}")
+        return UNINIT
+
+    def set_field(self, index: int, value) -> None:
+        text = to_str(value, self.convfmt)
+        if index == 0:
+            self.set_record(text)
+            return
+        if index < 0:
+            raise AwkError(f"attempt to access field {index}")
+        fields = self.fields
+        if fields is None:
+            fields = self.split_record()
+        if index > len(fields):
+            fields.extend([""] * (index - len(fields)))
+        fields[index - 1] = text
+        self.record = to_str(self.vars["OFS"], self.convfmt).join(fields)
+
+    def get_nf(self) -> float:
+        fields = self.fields
+        if fields is None:
+            fields = self.split_record()
+        return float(len(fields))
+
+    def set_nf(self, value) -> None:
+        count = int(to_num(value))
+        if count < 0:
+            raise AwkError(f"NF set to negative value {count}")
+        fields = self.fields
+        if fields is None:
+            fields = self.split_record()
+        del fields[count:]
+        fields.extend([""] * (count - len(fields)))
+        self.record = to_str(self.vars["OFS"], self.convfmt).join(fields)
+
+    # Output --------------------------------------------------------------
+
+    def emit(self, text: str, redirect: Optional[str], dest) -> None:
+        if redirect is None:
+            self.out.append(text)
+            return
+        name = to_str(dest, self.convfmt)
+        if name in ("/dev/stdout", "-", "/dev/stderr"):
+            self.out.append(text)
+            return
+        if name not in self.redirects:
+            self.redirects[name] = []
+            self.redirect_modes[name] = redirect
+        self.redirects[name].append(text)
+
+    def output(self) -> str:
+        return "".join(self.out)
+
+    # Execution -----------------------------------------------------------
+
+    def run_begin(self) -> None:
+        """Run the BEGIN actions."""
+        try:
+            for action in self.program.begin:
+                action(self)
+        except _Exit as e:
+            self.exit_status = e.status
+            self.exiting = True
+        except (_Next, _NextFile):
+            raise AwkError("next used in BEGIN action")
+
+    def run_records(self, records: Iterable[str], filename: str = "") -> None:
+        """Run the main rules over records from one input."""
+        if self.exiting:
+            return
+        rules = self.program.rules
+        vars_ = self.vars
+        vars_["FILENAME"] = filename
+        vars_["FNR"] = 0.0
+        if self.program.columnar is not None and isinstance(records, list):
+            self._run_columnar(records)
+            return
+        try:
+            for record in records:
+                vars_["NR"] += 1.0
+                vars_["FNR"] += 1.0
+                self.record = record
+                self.fields = None
+                try:
+                    for index, (pattern, end_pattern, action) in enumerate(rules):
+                        if end_pattern is not None:
+                            if not self._in_range(index, pattern, end_pattern):
+                                continue
+                        elif pattern is not None and not to_bool(pattern(self)):
+                            continue
+                        action(self)
+                except _Next:
+                    continue
+        except _NextFile:
+            pass
+        except _Exit as e:
+            self.exit_status = e.status
+            self.exiting = True
+
+    def _run_columnar(self, records: List[str]) -> None:
+        """Apply an accumulate-only program to all records a column at a time."""
+        table = ColumnTable(records, self._splitter)
+        count = len(records)
+        if not count:
+            return
+        for name, key_field, sign, source, amount in self.program.columnar:
+            if key_field is None:
+                current = self.vars.get(name, UNINIT)
+                if current.__class__ is dict:
+                    raise AwkError(f"attempt to use array {name} in scalar context")
+                change = table.sum(amount) if source == "field" else amount * count
+                self.vars[name] = to_num(current) + sign * change
+                continue
+            array = self.get_array(name)
+            if source == "field":
+                changes = table.group_sum(key_field, amount)
+            else:
+                changes = {
+                    key: amount * n for key, n in table.group_count(key_field).items()
+                }
+            for key, change in changes.items():
+                array[key] = to_num(array.get(key, UNINIT)) + sign * change
+        self.vars["NR"] += count
+        self.vars["FNR"] = float(count)
+        self.set_record(records[-1])
+
+    def _in_range(self, index, start, stop) -> bool:
+        if self.range_active[index]:
+            if to_bool(stop(self)):
+                self.range_active[index] = False
+            return True
+        if to_bool(start(self)):
+            self.range_active[index] = not to_bool(stop(self))
+            return True
+        return False
+
+    def run_end(self) -> None:
+        """Run the END actions; exit inside END stops immediately."""
+        try:
+            for action in self.program.end:
+                action(self)
+        except _Exit as e:
+            self.exit_status = e.status
+        except (_Next, _NextFile):
+            raise AwkError("next used in END action")
+
+    def split_records(self, text: str) -> List[str]:
+        """Split input text into records according to RS."""
+        separator = to_str(self.vars["RS"], self.convfmt)
+        if separator == "\n":
+            return text.splitlines()
+        if separator == "":
+            return [p for p in re.split(r"\n\n+", text.strip("\n")) if p]
+        if len(separator) == 1:
+            records = text.split(separator)
+        else:
+            records = compile_regex(separator).split(text)
+        if records and records[-1] in ("", "\n"):
+            records.pop()
+        return records
+
+
+# ---------------------------------------------------------------------------
+# Compiler
+# ---------------------------------------------------------------------------
+
+_ARITHMETIC = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+}
+
+_COMPARE_OPS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+def _divide(x: float, y: float) -> float:
+    if y == 0.0:
+        raise AwkError("division by zero")
+    return x / y
+
+
+def _modulo(x: float, y: float) -> float:
+    if y == 0.0:
+        raise AwkError("division by zero in %")
+    return math.fmod(x, y)
+
+
+def _power(x: float, y: float) -> float:
+    try:
+        return float(x**y)
+    except OverflowError:
+        return math.inf
+    except (ZeroDivisionError, TypeError):
+        return math.nan
+
+
+_ARITHMETIC.update({"/": _divide, "%": _modulo, "^": _power})
+
+
+def _to_int(value) -> int:
+    number = to_num(value)
+    return int(number) if math.isfinite(number) else 0
+
+
+_FORMAT_RE = re.compile(r"%([-+ #0]*)(\*|\d+)?(?:\.(\*|\d*))?([a-zA-Z%])")
+
+
+def awk_sprintf(fmt: str, values: List[Any], convfmt: str = "%.6g") -> str:
+    """Format values with an awk printf format string."""
+    parts = []
+    position = 0
+    args = iter(values)
+    for spec in _FORMAT_RE.finditer(fmt):
+        parts.append(fmt[position : spec.start()])
+        position = spec.end()
+        flags, width, precision, conv = spec.groups()
+        if conv == "%":
+            parts.append("%")
+            continue
+        if conv not in "cdiouxXeEfFgGs":
+            parts.append(spec.group())
+            continue
+        if width == "*":
+            width = _to_int(next(args, UNINIT))
+            if width < 0:
+                flags += "-"
+                width = -width
+            width = str(width)
+        if precision == "*":
+            precision = str(max(_to_int(next(args, UNINIT)), 0))
+        value = next(args, UNINIT)
+        prefix = "%" + flags + (width or "")
+        if precision is not None and conv != "c":
+            prefix += "." + (precision or "0")
+        try:
+            if conv in "di":
+                parts.append((prefix + "d") % _to_int(value))
+            elif conv in "ouxX":
+                number = _to_int(value)
+                parts.append((prefix + ("d" if conv == "u" else conv)) % number)
+            elif conv in "eEfFgG":
+                parts.append((prefix + conv) % to_num(value))
+            elif conv == "c":
+                if value.__class__ is float:
+                    char = chr(int(value) % 0x110000)
+                else:
+                    char = value[:1]
+                parts.append((prefix + "s") % char)
+            else:
+                parts.append((prefix + "s") % to_str(value, convfmt))
+        except (ValueError, TypeError, OverflowError) as e:
+            raise AwkError(f"invalid format '{spec.group()}': {e}")
+    parts.append(fmt[position:])
+    return "".join(parts)
+
+
+def _expand_replacement(replacement: str) -> Callable:
+    """Build a re.sub callback for an awk sub/gsub replacement string."""
+    if "&" not in replacement and "\\" not in replacement:
+        return lambda match: replacement
+    pieces: List[Optional[str]] = []
+    i = 0
+    while i < len(replacement):
+        c = replacement[i]
+        if c == "\\" and replacement[i + 1 : i + 2] in ("&", "\\"):
+            pieces.append(replacement[i + 1])
+            i += 2
+            continue
+        pieces.append(None if c == "&" else c)
+        i += 1
+
+    def expand(match):
+        text = match.group()
+        return "".join(text if piece is None else piece for piece in pieces)
+
+    return expand
+
+
+@dataclass
+class CompiledFunction:
+    name: str
+    params: List[str]
+    body: Optional[Callable] = None
+
+
+_SPECIAL_VARS = {
+    "NF",
+    "NR",
+    "FNR",
+    "FS",
+    "OFS",
+    "ORS",
+    "RS",
+    "SUBSEP",
+    "CONVFMT",
+    "OFMT",
+    "RSTART",
+    "RLENGTH",
+    "FILENAME",
+    "ENVIRON",
+}
+
+
+def _field_number(node) -> Optional[int]:
+    """Return N for a constant field reference $N, else None."""
+    if isinstance(node, Field) and isinstance(node.index, Num):
+        value = node.index.value
+        if value >= 0 and value == int(value):
+            return int(value)
+    return None
+
+
+def columnar_plan(ast: ProgramAST) -> Optional[List[Tuple]]:
+    """
+    Recognize main rules that only accumulate fields into variables.
+
+    Programs such as '{ s += $2 }', '{ s[$1] += $2 }' or '{ c[$1]++ }' do
+    not need per-record evaluation: the sums and counts can be computed a
+    column at a time. Returns a list of (name, key_field, sign, source,
+    amount) steps, where key_field is None for scalars and source is
+    "field" (amount is a field number) or "const"; None when any rule needs
+    the general path.
+    """
+    if not ast.rules:
+        return None
+    plan = []
+    targets = set()
+    for rule in ast.rules:
+        if rule.pattern is not None or rule.action is None:
+            return None
+        for statement in rule.action.body:
+            expr = statement.expr if isinstance(statement, ExprStmt) else None
+            if isinstance(expr, Assign) and expr.op in ("+=", "-="):
+                sign = 1.0 if expr.op == "+=" else -1.0
+                field_number = _field_number(expr.value)
+                if field_number is not None:
+                    source, amount = "field", field_number
+                elif isinstance(expr.value, Num):
+                    source, amount = "const", expr.value.value
+                else:
+                    return None
+            elif isinstance(expr, IncDec):
+                sign = 1.0 if expr.op == "++" else -1.0
+                source, amount = "const", 1.0
+            else:
+                return None
+
+            target = expr.target
+            if isinstance(target, Var) and target.name not in _SPECIAL_VARS:
+                key_field = None
+            elif isinstance(target, Index) and len(target.subscripts) == 1:
+                key_field = _field_number(target.subscripts[0])
+                if key_field is None:
+                    return None
+            else:
+                return None
+            if target.name in targets:
+                return None
+            targets.add(target.name)
+            plan.append((target.name, key_field, sign, source, amount))
+    return plan
+
+
+class AwkProgram:
+    """A compiled awk program, reusable across invocations."""
+
+    def __init__(self, source: str):
+        self.source = source
+        ast = parse(source)
+        self.ast = ast
+        self.functions: Dict[str, CompiledFunction] = {
+            name: CompiledFunction(name, fn.params)
+            for name, fn in ast.functions.items()
+        }
+        compiler = _Compiler(self.functions)
+        for name, fn in ast.functions.items():
+            self.functions[name].body = compiler.compile_function(fn)
+        self.begin = [compiler.block(b) for b in ast.begin]
+        self.end = [compiler.block(b) for b in ast.end]
+        self.rules = [compiler.rule(rule) for rule in ast.rules]
+        self.columnar = columnar_plan(ast)
+
+    @property
+    def reads_input(self) -> bool:
+        """Whether the program reads input (has main rules or END)."""
+        return bool(self.rules or self.end)
+
+
+class _Compiler:
+    """Compile AST nodes into closures taking an AwkRuntime."""
+
+    def __init__(self, functions: Dict[str, CompiledFunction]):
+        self.functions = functions
+        self.locals: Dict[str, int] = {}
+        self.in_function = False
+        self.loop_depth = 0
+
+    # Program pieces ------------------------------------------------------
+
+    def compile_function(self, fn: Function) -> Callable:
+        if len(set(fn.params)) != len(fn.params):
+            raise AwkError(f"function '{fn.name}': duplicate parameter")
+        self.locals = {name: i for i, name in enumerate(fn.params)}
+        self.in_function = True
+        try:
+            return self.block(fn.body)
+        finally:
+            self.locals = {}
+            self.in_function = False
+
+    def rule(self, rule: Rule):
+        pattern = self.expr(rule.pattern) if rule.pattern is not None else None
+        end_pattern = None
+        if rule.end_pattern is not None:
+            end_pattern = self.expr(rule.end_pattern)
+        if rule.action is None:
+            action = self.statement(Print([]))
+        else:
+            action = self.block(rule.action)
+        return pattern, end_pattern, action
+
+    # Statements ----------------------------------------------------------
+
+    def block(self, block: Block) -> Callable:
+        statements = [self.statement(s) for s in block.body]
+        if not statements:
+            return lambda rt: None
+        if len(statements) == 1:
+            return statements[0]
+
+        def run_block(rt):
+            for statement in statements:
+                statement(rt)
+
+        return run_block
+
+    def statement(self, node) -> Callable:
+        method = getattr(self, "stmt_" + type(node).__name__)
+        return method(node)
+
+    def loop_body(self, node) -> Callable:
+        self.loop_depth += 1
+        try:
+            return self.statement(node)
+        finally:
+            self.loop_depth -= 1
+
+    def stmt_Block(self, node):
+        return self.block(node)
+
+    def stmt_ExprStmt(self, node):
+        return self.expr(node.expr)
+
+    def _destination(self, node):
+        return self.expr(node.dest) if node.dest is not None else None
+
+    def stmt_Print(self, node):
+        args = [self.expr(a) for a in node.args]
+        redirect = node.redirect
+        dest = self._destination(node)
+
+        def run_print(rt):
+            if not args:
+                text = rt.record
+            else:
+                fmt = rt.ofmt
+                text = to_str(rt.vars["OFS"], rt.convfmt).join(
+                    [to_str(arg(rt), fmt) for arg in args]
+                )
+            text += to_str(rt.vars["ORS"], rt.convfmt)
+            rt.emit(text, redirect, dest(rt) if dest else None)
+
+        return run_print
+
+    def stmt_Printf(self, node):
+        fmt = self.expr(node.args[0])
+        args = [self.expr(a) for a in node.args[1:]]
+        redirect = node.redirect
+        dest = self._destination(node)
+
+        def run_printf(rt):
+            text = awk_sprintf(
+                to_str(fmt(rt), rt.convfmt), [arg(rt) for arg in args], rt.convfmt
+            )
+            rt.emit(text, redirect, dest(rt) if dest else None)
+
+        return run_printf
+
+    def stmt_If(self, node):
+        test = self.expr(node.test)
+        body = self.statement(node.body)
+        orelse = self.statement(node.orelse) if node.orelse is not None else None
+
+        def run_if(rt):
+            if to_bool(test(rt)):
+                body(rt)
+            elif orelse is not None:
+                orelse(rt)
+
+        return run_if
+
+    def stmt_While(self, node):
+        test = self.expr(node.test)
+        body = self.loop_body(node.body)
+
+        def run_while(rt):
+            while to_bool(test(rt)):
+                try:
+                    body(rt)
+                except _Break:
+                    break
+                except _Continue:
+                    pass
+
+        return run_while
+
+    def stmt_DoWhile(self, node):
+        test = self.expr(node.test)
+        body = self.loop_body(node.body)
+
+        def run_do(rt):
+            while True:
+                try:
+                    body(rt)
+                except _Break:
+                    break
+                except _Continue:
+                    pass
+                if not to_bool(test(rt)):
+                    break
+
+        return run_do
+
+    def stmt_For(self, node):
+        init = self.statement(node.init) if node.init is not None else None
+        test = self.expr(node.test) if node.test is not None else None
+        update = self.statement(node.update) if node.update is not None else None
+        body = self.loop_body(node.body)
+
+        def run_for(rt):
+            if init is not None:
+                init(rt)
+            while test is None or to_bool(test(rt)):
+                try:
+                    body(rt)
+                except _Break:
+                    break
+                except _Continue:
+                    pass
+                if update is not None:
+                    update(rt)
+
+        return run_for
+
+    def stmt_ForIn(self, node):
+        array = self.array_ref(node.array)
+        _, _, assign = self.lvalue(Var(node.var))
+        body = self.loop_body(node.body)
+
+        def run_for_in(rt):
+            items = array(rt)
+            for key in list(items):
+                if key not in items:
+                    continue
+                assign(rt, None, key)
+                try:
+                    body(rt)
+                except _Break:
+                    break
+                except _Continue:
+                    pass
+
+        return run_for_in
+
+    def stmt_Next(self, node):
+        def run_next(rt):
+            raise _Next()
+
+        return run_next
+
+    def stmt_NextFile(self, node):
+        def run_nextfile(rt):
+            raise _NextFile()
+
+        return run_nextfile
+
+    def stmt_Exit(self, node):
+        status = self.expr(node.status) if node.status is not None else None
+
+        def run_exit(rt):
+            raise _Exit(_to_int(status(rt)) if status else rt.exit_status)
+
+        return run_exit
+
+    def stmt_Break(self, node):
+        if not self.loop_depth:
+            raise AwkError("break is not allowed outside a loop")
+
+        def run_break(rt):
+            raise _Break()
+
+        return run_break
+
+    def stmt_Continue(self, node):
+        if not self.loop_depth:
+            raise AwkError("continue is not allowed outside a loop")
+
+        def run_continue(rt):
+            raise _Continue()
+
+        return run_continue
+
+    def stmt_Return(self, node):
+        if not self.in_function:
+            raise AwkError("return used outside function context")
+        value = self.expr(node.value) if node.value is not None else None
+
+        def run_return(rt):
+            raise _Return(value(rt) if value else UNINIT)
+
+        return run_return
+
+    def stmt_Delete(self, node):
+        array = self.array_ref(node.name)
+        if node.subscripts is None:
+            return lambda rt: array(rt).clear()
+        key = self.subscript(node.subscripts)
+
+        def run_delete(rt):
+            array(rt).pop(key(rt), None)
+
+        return run_delete
+
+    # Expressions ---------------------------------------------------------
+
+    def expr(self, node) -> Callable:
+        method = getattr(self, "expr_" + type(node).__name__, None)
+        if method is None:
+            raise AwkError("syntax error")
+        return method(node)
+
+    def expr_Num(self, node):
+        value = node.value
+        return lambda rt: value
+
+    def expr_Str(self, node):
+        value = AwkString(node.value)
+        return lambda rt: value
+
+    def expr_Regex(self, node):
+        search = compile_regex(node.pattern).search
+        return lambda rt: 1.0 if search(rt.record) else 0.0
+
+    def expr_Group(self, node):
+        return self.expr(node.expr)
+
+    def expr_Var(self, node):
+        _, get, _ = self.lvalue(node)
+        return lambda rt: get(rt, None)
+
+    def expr_Field(self, node):
+        if isinstance(node.index, Num):
+            index = int(node.index.value)
+            if index == 0:
+                return lambda rt: rt.record
+            return lambda rt: rt.get_field(index)
+        index_fn = self.expr(node.index)
+        return lambda rt: rt.get_field(_to_int(index_fn(rt)))
+
+    def expr_Index(self, node):
+        array = self.array_ref(node.name)
+        key = self.subscript(node.subscripts)
+
+        def get_element(rt):
+            items = array(rt)
+            k = key(rt)
+            value = items.get(k)
+            if value is None:
+                value = items[k] = UNINIT
+            return value
+
+        return get_element
+
+    def expr_Assign(self, node):
+        prepare, get, assign = self.lvalue(node.target)
+        value_fn = self.expr(node.value)
+        if node.op == "=":
+            if prepare is None:
+
+                def run_assign(rt):
+                    value = value_fn(rt)
+                    assign(rt, None, value)
+                    return value
+
+                return run_assign
+
+            def run_slot_assign(rt):
+                slot = prepare(rt)
+                value = value_fn(rt)
+                assign(rt, slot, value)
+                return value
+
+            return run_slot_assign
+
+        op = _ARITHMETIC[node.op[:-1]]
+
+        def run_augmented(rt):
+            slot = prepare(rt) if prepare else None
+            value = op(to_num(get(rt, slot)), to_num(value_fn(rt)))
+            assign(rt, slot, value)
+            return value
+
+        return run_augmented
+
+    def expr_IncDec(self, node):
+        prepare, get, assign = self.lvalue(node.target)
+        delta = 1.0 if node.op == "++" else -1.0
+        prefix = node.prefix
+
+        def run_incdec(rt):
+            slot = prepare(rt) if prepare else None
+            old = to_num(get(rt, slot))
+            new = old + delta
+            assign(rt, slot, new)
+            return new if prefix else old
+
+        return run_incdec
+
+    def expr_Cond(self, node):
+        test = self.expr(node.test)
+        yes = self.expr(node.yes)
+        no = self.expr(node.no)
+        return lambda rt: yes(rt) if to_bool(test(rt)) else no(rt)
+
+    def expr_Logical(self, node):
+        left = self.expr(node.left)
+        right = self.expr(node.right)
+        if node.op == "&&":
+            return lambda rt: 1.0 if to_bool(left(rt)) and to_bool(right(rt)) else 0.0
+        return lambda rt: 1.0 if to_bool(left(rt)) or to_bool(right(rt)) else 0.0
+
+    def expr_Unary(self, node):
+        operand = self.expr(node.operand)
+        if node.op == "!":
+            return lambda rt: 0.0 if to_bool(operand(rt)) else 1.0
+        if node.op == "-":
+            return lambda rt: -to_num(operand(rt))
+        return lambda rt: to_num(operand(rt))
+
+    def expr_Binary(self, node):
+        if node.op == "concat":
+            return self._concat(node)
+        left = self.expr(node.left)
+        right = self.expr(node.right)
+        if node.op in _COMPARE_OPS:
+            return self._comparison(node, left, right)
+        op = _ARITHMETIC[node.op]
+        return lambda rt: op(to_num(left(rt)), to_num(right(rt)))
+
+    def _concat(self, node):
+        operands = []
+        stack = [node]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, Binary) and item.op == "concat":
+                stack.append(item.right)
+                stack.append(item.left)
+            else:
+                operands.append(self.expr(item))
+
+        def run_concat(rt):
+            fmt = rt.convfmt
+            return AwkString("".join([to_str(part(rt), fmt) for part in operands]))
+
+        return run_concat
+
+    def _comparison(self, node, left, right):
+        op = _COMPARE_OPS[node.op]
+        if isinstance(node.right, Num):
+            # Common case: comparing a field or counter with a constant
+            number = node.right.value
+
+            def run_constant_compare(rt):
+                value = left(rt)
+                x = _numeric_value(value)
+                if x is not None:
+                    return 1.0 if op(x, number) else 0.0
+                return 1.0 if op(value, to_str(number, rt.convfmt)) else 0.0
+
+            return run_constant_compare
+
+        def run_compare(rt):
+            x, y = _compare_operands(left(rt), right(rt), rt.convfmt)
+            return 1.0 if op(x, y) else 0.0
+
+        return run_compare
+
+    def expr_Match(self, node):
+        subject = self.expr(node.subject)
+        regex = self.regex(node.pattern)
+        negate = node.negate
+
+        def run_match(rt):
+            found = regex(rt).search(to_str(subject(rt), rt.convfmt)) is not None
+            return 1.0 if found != negate else 0.0
+
+        return run_match
+
+    def expr_In(self, node):
+        array = self.array_ref(node.name)
+        key = self.subscript(node.subscripts)
+        return lambda rt: 1.0 if key(rt) in array(rt) else 0.0
+
+    def expr_ExprList(self, node):
+        raise AwkError("syntax error: unexpected expression list")
+
+    def expr_UserCall(self, node):
+        function = self.functions.get(node.name)
+        if function is None:
+            raise AwkError(f"function '{node.name}' not defined")
+        if len(node.args) > len(function.params):
+            raise AwkError(f"function '{node.name}' called with too many arguments")
+        # Bare names may be arrays, which are passed by reference
+        args = []
+        for arg in node.args:
+            if isinstance(arg, Var):
+                args.append((self.expr(arg), self.array_ref(arg.name, create=False)))
+            else:
+                args.append((self.expr(arg), None))
+        padding = len(function.params) - len(args)
+
+        def run_call(rt):
+            frame = []
+            for value_fn, array_fn in args:
+                array = array_fn(rt) if array_fn else None
+                frame.append(array if array is not None else value_fn(rt))
+            frame.extend([UNINIT] * padding)
+            if len(rt.frames) > 1000:
+                raise AwkError(f"function '{node.name}': recursion too deep")
+            rt.frames.append(frame)
+            try:
+                function.body(rt)
+            except _Return as e:
+                return e.value
+            finally:
+                rt.frames.pop()
+            return UNINIT
+
+        return run_call
+
+    def expr_Call(self, node):
+        method = getattr(self, "builtin_" + node.name)
+        return method(node.args)
+
+    # References ----------------------------------------------------------
+
+    def lvalue(self, node):
+        """
+        Compile an assignable expression.
+
+        Returns (prepare, get, set): prepare(rt) evaluates subscripts or field
+        numbers once (None when there is nothing to evaluate), get(rt, slot)
+        reads and set(rt, slot, value) writes the target.
+        """
+        if isinstance(node, Group):
+            return self.lvalue(node.expr)
+        if isinstance(node, Var):
+            name = node.name
+            if name in self.locals:
+                index = self.locals[name]
+
+                def get_local(rt, slot):
+                    value = rt.frames[-1][index]
+                    if value.__class__ is dict:
+                        raise AwkError(f"attempt to use array {name} in scalar context")
+                    return value
+
+                def set_local(rt, slot, value):
+                    rt.frames[-1][index] = value
+
+                return None, get_local, set_local
+            if name == "NF":
+                return (
+                    None,
+                    lambda rt, slot: rt.get_nf(),
+                    lambda rt, slot, value: rt.set_nf(value),
+                )
+
+            def get_global(rt, slot):
+                value = rt.vars.get(name, UNINIT)
+                if value.__class__ is dict:
+                    raise AwkError(f"attempt to use array {name} in scalar context")
+                return value
+
+            if name in ("FS", "CONVFMT", "OFMT"):
+                return None, get_global, lambda rt, slot, value: rt.set_var(name, value)
+
+            def set_global(rt, slot, value):
+                rt.vars[name] = value
+
+            return None, get_global, set_global
+        if isinstance(node, Field):
+            index_fn = self.expr(node.index)
+            return (
+                lambda rt: _to_int(index_fn(rt)),
+                lambda rt, slot: rt.get_field(slot),
+                lambda rt, slot, value: rt.set_field(slot, value),
+            )
+        if isinstance(node, Index):
+            array = self.array_ref(node.name)
+            key = self.subscript(node.subscripts)
+
+            def set_element(rt, slot, value):
+                slot[0][slot[1]] = value
+
+            return (
+                lambda rt: (array(rt), key(rt)),
+                lambda rt, slot: slot[0].get(slot[1], UNINIT),
+                set_element,
+            )
+        raise AwkError("assignment to non-variable")
+
+    def array_ref(self, name: str, create: bool = True) -> Callable:
+        """Compile a reference to the array called name."""
+        if name in self.locals:
+            index = self.locals[name]
+
+            def local_array(rt):
+                frame = rt.frames[-1]
+                value = frame[index]
+                if value.__class__ is dict:
+                    return value
+                if not create:
+                    return None
+                if value is not UNINIT:
+                    raise AwkError(f"can't use scalar {name} as array")
+                frame[index] = {}
+                return frame[index]
+
+            return local_array
+        if not create:
+
+            def existing_array(rt):
+                value = rt.vars.get(name)
+                return value if value.__class__ is dict else None
+
+            return existing_array
+        return lambda rt: rt.get_array(name)
+
+    def subscript(self, subscripts: List[Any]) -> Callable:
+        parts = [self.expr(s) for s in subscripts]
+        if len(parts) == 1:
+            part = parts[0]
+            return lambda rt: to_str(part(rt), rt.convfmt)
+
+        def joined(rt):
+            fmt = rt.convfmt
+            return to_str(rt.vars["SUBSEP"], fmt).join(
+                [to_str(p(rt), fmt) for p in parts]
+            )
+
+        return joined
+
+    def regex(self, node) -> Callable:
+        """Compile a regex operand: a literal or a dynamic string."""
+        if isinstance(node, Regex):
+            compiled = compile_regex(node.pattern)
+            return lambda rt: compiled
+        value = self.expr(node)
+        return lambda rt: compile_regex(to_str(value(rt), rt.convfmt))
+
+    # Builtins ------------------------------------------------------------
+
+    def _arity(self, name, args, low, high):
+        if not low <= len(args) <= high:
+            raise AwkError(f"{name}: wrong number of arguments")
+        return [self.expr(a) for a in args]
+
+    def builtin_length(self, args):
+        if not args:
+            return lambda rt: float(len(rt.record))
+        (value,) = self._arity("length", args, 1, 1)
+        arg = args[0]
+        if isinstance(arg, Var):
+            array = self.array_ref(arg.name, create=False)
+            scalar = self.expr(arg)
+
+            def length_of_name(rt):
+                items = array(rt)
+                if items is not None:
+                    return float(len(items))
+                return float(len(to_str(scalar(rt), rt.convfmt)))
+
+            return length_of_name
+
+        return lambda rt: float(len(to_str(value(rt), rt.convfmt)))
+
+    def builtin_substr(self, args):
+        fns = self._arity("substr", args, 2, 3)
+        text, start = fns[0], fns[1]
+        length = fns[2] if len(fns) == 3 else None
+
+        def substr(rt):
+            s = to_str(text(rt), rt.convfmt)
+            first = to_num(start(rt))
+            first = round(first) if math.isfinite(first) else 0
+            if length is None:
+                last = len(s) + 1
+            else:
+                count = to_num(length(rt))
+                if math.isnan(count):
+                    return AwkString("")
+                last = first + (round(count) if math.isfinite(count) else len(s) + 1)
+            first = max(first, 1)
+            last = min(last, len(s) + 1)
+            return AwkString(s[first - 1 : last - 1] if last > first else "")
+
+        return substr
+
+    def builtin_index(self, args):
+        text, target = self._arity("index", args, 2, 2)
+
+        def index(rt):
+            fmt = rt.convfmt
+            return float(to_str(text(rt), fmt).find(to_str(target(rt), fmt)) + 1)
+
+        return index
+
+    def builtin_split(self, args):
+        if not 2 <= len(args) <= 3 or not isinstance(args[1], Var):
+            raise AwkError("split: second argument must be an array name")
+        text = self.expr(args[0])
+        array = self.array_ref(args[1].name)
+        separator = None
+        if len(args) == 3:
+            if isinstance(args[2], Regex):
+                compiled = compile_regex(args[2].pattern)
+
+                def regex_split(s):
+                    return compiled.split(s) if s else []
+
+                separator = lambda rt: regex_split  # noqa: E731
+            else:
+                sep = self.expr(args[2])
+                separator = lambda rt: make_splitter(to_str(sep(rt), rt.convfmt))  # noqa: E731
+
+        def split(rt):
+            s = to_str(text(rt), rt.convfmt)
+            splitter = separator(rt) if separator else rt._splitter
+            pieces = splitter(s)
+            items = array(rt)
+            items.clear()
+            for i, piece in enumerate(pieces, 1):
+                items[str(i)] = piece
+            return float(len(pieces))
+
+        return split
+
+    def _substitute(self, name, args, count):
+        if not 2 <= len(args) <= 3:
+            raise AwkError(f"{name}: wrong number of arguments")
+        regex = self.regex(args[0])
+        replacement = self.expr(args[1])
+        target = args[2] if len(args) == 3 else Field(Num(0.0))
+        prepare, get, assign = self.lvalue(target)
+
+        def substitute(rt):
+            slot = prepare(rt) if prepare else None
+            text = to_str(get(rt, slot), rt.convfmt)
+            expand = _expand_replacement(to_str(replacement(rt), rt.convfmt))
+            result, made = regex(rt).subn(expand, text, count=count)
+            if made:
+                assign(rt, slot, AwkString(result))
+            return float(made)
+
+        return substitute
+
+    def builtin_sub(self, args):
+        return self._substitute("sub", args, 1)
+
+    def builtin_gsub(self, args):
+        return self._substitute("gsub", args, 0)
+
+    def builtin_match(self, args):
+        if len(args) != 2:
+            raise AwkError("match: wrong number of arguments")
+        text = self.expr(args[0])
+        regex = self.regex(args[1])
+
+        def match(rt):
+            found = regex(rt).search(to_str(text(rt), rt.convfmt))
+            if found:
+                start = float(found.start() + 1)
+                rt.vars["RSTART"] = start
+                rt.vars["RLENGTH"] = float(found.end() - found.start())
+                return start
+            rt.vars["RSTART"] = 0.0
+            rt.vars["RLENGTH"] = -1.0
+            return 0.0
+
+        return match
+
+    def builtin_sprintf(self, args):
+        if not args:
+            raise AwkError("sprintf: no format")
+        fmt, *rest = [self.expr(a) for a in args]
+        return lambda rt: AwkString(
+            awk_sprintf(to_str(fmt(rt), rt.convfmt), [a(rt) for a in rest], rt.convfmt)
+        )
+
+    def builtin_tolower(self, args):
+        (text,) = self._arity("tolower", args, 1, 1)
+        return lambda rt: AwkString(to_str(text(rt), rt.convfmt).lower())
+
+    def builtin_toupper(self, args):
+        (text,) = self._arity("toupper", args, 1, 1)
+        return lambda rt: AwkString(to_str(text(rt), rt.convfmt).upper())
+
+    def builtin_int(self, args):
+        (value,) = self._arity("int", args, 1, 1)
+
+        def to_integer(rt):
+            number = to_num(value(rt))
+            return float(math.trunc(number)) if math.isfinite(number) else number
+
+        return to_integer
+
+    def _math(self, name, args, function):
+        (value,) = self._arity(name, args, 1, 1)
+
+        def run_math(rt):
+            try:
+                return float(function(to_num(value(rt))))
+            except OverflowError:
+                return math.inf
+            except ValueError:
+                return math.nan
+
+        return run_math
+
+    def builtin_sqrt(self, args):
+        return self._math("sqrt", args, math.sqrt)
+
+    def builtin_exp(self, args):
+        return self._math("exp", args, math.exp)
+
+    def builtin_log(self, args):
+        return self._math("log", args, math.log)
+
+    def builtin_sin(self, args):
+        return self._math("sin", args, math.sin)
+
+    def builtin_cos(self, args):
+        return self._math("cos", args, math.cos)
+
+    def builtin_atan2(self, args):
+        y, x = self._arity("atan2", args, 2, 2)
+        return lambda rt: math.atan2(to_num(y(rt)), to_num(x(rt)))
+
+    def builtin_rand(self, args):
+        self._arity("rand", args, 0, 0)
+        return lambda rt: rt.random.random()
+
+    def builtin_srand(self, args):
+        fns = self._arity("srand", args, 0, 1)
+        seed = fns[0] if fns else None
+
+        def srand(rt):
+            previous = rt.seed
+            rt.seed = to_num(seed(rt)) if seed else float(int(time.time()))
+            rt.random.seed(rt.seed)
+            return previous
+
+        return srand
+
+    def builtin_system(self, args):
+        (command,) = self._arity("system", args, 1, 1)
+
+        def system(rt):
+            if rt.system is None:
+                raise AwkError("system() is not available")
+            output, status = rt.system(to_str(command(rt), rt.convfmt))
+            if output:
+                rt.out.append(output if output.endswith("\n") else output + "\n")
+            return float(status)
+
+        return system
+
+    def builtin_close(self, args):
+        self._arity("close", args, 0, 1)
+        return lambda rt: 0.0
+
+    def builtin_fflush(self, args):
+        self._arity("fflush", args, 0, 1)
+        return lambda rt: 0.0
+
+
+_program_cache = LRUCache(AwkProgram, maxsize=128)
+
+
+def compile_program(source: str) -> AwkProgram:
+    """Return the compiled program for source, compiling it at most once."""
+    return _program_cache.get(source)
@@ -4,13 +4,51 @@ chuk_virtual_shell/commands/text/grep.py - Search for patterns in files
 """
 
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from chuk_virtual_shell.commands.command_base import ShellCommand
+from chuk_virtual_shell.commands.text.grep_engine import GrepMatcher
+from chuk_virtual_shell.core.streaming import count_lines, iter_line_blocks, join_lines
+from chuk_virtual_shell.filesystem_compat import walk_tree
+
+# Threads reading and searching files for grep -r
+GREP_WORKERS = 8
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Single-letter flags and the option each one sets
+_FLAGS = {
+    "i": "case_insensitive",
+    "v": "invert",
+    "n": "line_numbers",
+    "c": "count_only",
+    "r": "recursive",
+    "E": "extended_regex",
+    "F": "fixed_strings",
+    "w": "whole_word",
+    "l": "files_only",
+    "h": "no_filename",
+    "q": "quiet",
+}
+
+
+def _get_pool():
+    """Return the thread pool shared by all grep invocations."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=GREP_WORKERS, thread_name_prefix="grep"
+            )
+        return _pool
 
 
 class GrepCommand(ShellCommand):
     name = "grep"
     help_text = """grep - Search for patterns in files
 Usage: grep [OPTIONS] PATTERN [FILE]...
+       grep [OPTIONS] -e PATTERN... [-f FILE]... [FILE]...
 Options:
   -i    Case insensitive search
   -v    Invert match (show non-matching lines)
@@ -18,79 +56,52 @@ Options:
   -c    Count matching lines only
   -r    Recursive search in directories
   -E    Extended regex (ERE)
+  -F    Patterns are fixed strings
   -w    Match whole words only
   -l    List only filenames with matches
-  -h    Suppress filename prefix"""
+  -h    Suppress filename prefix
+  -q    Quiet; exit status only, stop at the first match
+  -e PATTERN  Use PATTERN (may be repeated)
+  -f FILE     Read patterns from FILE, one per line
+  -m NUM      Stop reading a file after NUM matching lines"""
     category = "text"
 
     def execute(self, args):
-        if not args:
-            return "grep: missing pattern"
-
-        # Parse options
-        options = {
-            "case_insensitive": False,
-            "invert": False,
-            "line_numbers": False,
-            "count_only": False,
-            "recursive": False,
-            "extended_regex": False,
-            "whole_word": False,
-            "files_only": False,
-            "no_filename": False,
-        }
-
-        pattern = None
-        files = []
-        i = 0
-
-        # Parse arguments
-        while i < len(args):
-            arg = args[i]
-            if arg.startswith("-") and pattern is None:
-                for char in arg[1:]:
-                    if char == "i":
-                        options["case_insensitive"] = True
-                    elif char == "v":
-                        options["invert"] = True
-                    elif char == "n":
-                        options["line_numbers"] = True
-                    elif char == "c":
-                        options["count_only"] = True
-                    elif char == "r":
-                        options["recursive"] = True
-                    elif char == "E":
-                        options["extended_regex"] = True
-                    elif char == "w":
-                        options["whole_word"] = True
-                    elif char == "l":
-                        options["files_only"] = True
-                    elif char == "h":
-                        options["no_filename"] = True
-            elif pattern is None:
-                pattern = arg
-            else:
-                files.append(arg)
-            i += 1
+        parsed = self._parse_args(args)
+        if isinstance(parsed, str):
+            self.shell.return_code = 2
+            return parsed
+        options, patterns, files = parsed
 
-        if pattern is None:
-            return "grep: missing pattern"
+        matcher = self._compile_patterns(patterns, options)
+        if isinstance(matcher, str):
+            self.shell.return_code = 2
+            return matcher
 
         # If no files specified, use stdin (if available)
         if not files:
             # Check if shell has stdin buffer
             if hasattr(self.shell, "_stdin_buffer") and self.shell._stdin_buffer:
                 content = self.shell._stdin_buffer
-                return self._search_content(content, pattern, options, "<stdin>")
+                output, matched = self._search_content(
+                    content, matcher, options, "<stdin>"
+                )
+                self.shell.return_code = 0 if matched else 1
+                return "" if options["quiet"] else output
             else:
+                self.shell.return_code = 2
                 return "grep: no input files"
 
         # Process files
         results = []
+        found = False
+        failed = False
         for filepath in files:
             if options["recursive"] and self.shell.fs.is_dir(filepath):
                 # Recursive directory search
-                dir_results = self._search_directory(filepath, pattern, options)
+                dir_results, matched = self._search_directory(
+                    filepath, matcher, options
+                )
                 if dir_results:
                     results.append(dir_results)
             else:
@@ -98,94 +109,245 @@ Options:
                 content = self.shell.fs.read_file(filepath)
                 if content is None:
                     results.append(f"grep: {filepath}: No such file or directory")
-                else:
-                    file_results = self._search_content(
-                        content, pattern, options, filepath, len(files) > 1
-                    )
-                    if file_results:
-                        results.append(file_results)
-
+                    failed = True
+                    continue
+                file_results, matched = self._search_content(
+                    content, matcher, options, filepath, len(files) > 1
+                )
+                if file_results:
+                    results.append(file_results)
+            found = found or matched
+            if found and options["quiet"]:
+                # The exit status is known; nothing else needs reading
+                self.shell.return_code = 0
+                return ""
+
+        # An error decides the status unless -q already found a match
+        self.shell.return_code = 2 if failed else 0 if found else 1
         return "\n".join(results) if results else ""
 
-    def _search_content(self, content, pattern, options, filename, show_filename=False):
-        """Search for pattern in content"""
-        # Prepare regex pattern
-        regex_pattern = pattern
+    def _parse_args(self, args):
+        """Parse arguments into (options, patterns, files) or an error string."""
+        if not args:
+            return "grep: missing pattern"
 
-        flags = 0
-        if options["case_insensitive"]:
-            flags |= re.IGNORECASE
+        # Parse options
+        options = {flag: False for flag in _FLAGS.values()}
+        options["max_count"] = None
 
-        # For basic grep, common regex patterns should still work
-        # Don't escape the pattern - let regex compile handle it
+        patterns = []
+        patterns_given = False
+        files = []
+        i = 0
 
-        if options["whole_word"]:
-            regex_pattern = r"\b" + regex_pattern + r"\b"
+        # Parse arguments; options come before the first operand
+        while i < len(args):
+            arg = args[i]
+            if arg == "--" and not files:
+                # Everything after -- is an operand
+                files.extend(args[i + 1 :])
+                break
+            if arg.startswith("--") and not files:
+                # Long options (e.g. --color) are accepted and ignored
+                pass
+            elif arg.startswith("-") and len(arg) > 1 and not files:
+                for position, char in enumerate(arg[1:], 2):
+                    if char not in "efm":
+                        if char in _FLAGS:
+                            options[_FLAGS[char]] = True
+                        continue
+                    # -e, -f and -m take the rest of the word or the next one
+                    value = arg[position:]
+                    if not value:
+                        if i + 1 >= len(args):
+                            return f"grep: option requires an argument -- '{char}'"
+                        i += 1
+                        value = args[i]
+                    if char == "e":
+                        patterns.append(value)
+                        patterns_given = True
+                    elif char == "f":
+                        content = self.shell.fs.read_file(value)
+                        if content is None:
+                            return f"grep: {value}: No such file or directory"
+                        patterns.extend(content.splitlines())
+                        patterns_given = True
+                    else:
+                        try:
+                            options["max_count"] = int(value)
+                        except ValueError:
+                            return "grep: invalid max count"
+                    break
+            else:
+                files.append(arg)
+            i += 1
 
+        if not patterns_given:
+            if not files:
+                return "grep: missing pattern"
+            patterns.append(files.pop(0))
+
+        return options, patterns, files
+
+    def _compile_patterns(self, patterns, options):
+        """Compile the patterns into one matcher, or an error string"""
         try:
-            compiled = re.compile(regex_pattern, flags)
+            return GrepMatcher(
+                patterns,
+                ignore_case=options["case_insensitive"],
+                whole_word=options["whole_word"],
+                fixed=options["fixed_strings"],
+            )
         except re.error as e:
             return f"grep: invalid pattern: {e}"
 
-        lines = content.splitlines()
-        matches = []
+    def _limit(self, options):
+        """Number of selected lines after which a file can be abandoned"""
+        if options["files_only"] or options["quiet"]:
+            return 1 if options["max_count"] is None else min(options["max_count"], 1)
+        return options["max_count"]
+
+    def stream(self, args, stdin=None):
+        """Filter piped input a block at a time, stopping early for -l, -q and -m."""
+        parsed = self._parse_args(args)
+        if isinstance(parsed, str) or parsed[2] or stdin is None:
+            yield from super().stream(args, stdin)
+            return
+        options, patterns, _ = parsed
+
+        matcher = self._compile_patterns(patterns, options)
+        if isinstance(matcher, str):
+            self.shell.return_code = 2
+            yield matcher
+            return
+
+        blocks = self._stream_matches(matcher, options, stdin)
+        yield from join_lines("\n".join(lines) for lines in blocks if lines)
+
+    def _stream_matches(self, matcher, options, stdin):
+        """Yield the formatted output lines for each block of a chunk stream"""
         match_count = 0
-
-        for line_num, line in enumerate(lines, 1):
-            is_match = bool(compiled.search(line))
-
-            if options["invert"]:
-                is_match = not is_match
-
-            if is_match:
-                match_count += 1
-
-                if options["files_only"]:
-                    return filename
-
-                if not options["count_only"]:
-                    prefix = ""
-
-                    # Add filename prefix
-                    if show_filename and not options["no_filename"]:
-                        prefix = f"{filename}:"
-
-                    # Add line number
-                    if options["line_numbers"]:
-                        prefix += f"{line_num}:"
-
-                    matches.append(prefix + line)
+        limit = self._limit(options)
+        print_lines = not (
+            options["quiet"] or options["files_only"] or options["count_only"]
+        )
+        # Lines in the blocks before the current one
+        offset = 0
+        # Whether most lines match, judged from the first block
+        dense = None
+        for block in iter_line_blocks(stdin):
+            if limit is not None and match_count >= limit:
+                break
+            if dense is None:
+                dense = not options["invert"] and matcher.is_dense(block)
+            remaining = None if limit is None else limit - match_count
+            selected = list(
+                matcher.search(
+                    block, invert=options["invert"], limit=remaining, dense=dense
+                )
+            )
+            match_count += len(selected)
+            if print_lines:
+                if options["line_numbers"]:
+                    yield [f"{offset + n}:{line}" for n, line in selected]
+                    offset += count_lines(block)
+                else:
+                    yield [line for _, line in selected]
+
+        self.shell.return_code = 0 if match_count else 1
+        if options["quiet"]:
+            return
+        if options["files_only"]:
+            if match_count:
+                yield ["<stdin>"]
+        elif options["count_only"]:
+            yield [str(match_count)]
+
+    def _search_content(self, content, matcher, options, filename, show_filename=False):
+        """Search for the patterns in content, returning (output, matched)"""
+        selected = matcher.search(
+            content, invert=options["invert"], limit=self._limit(options)
+        )
+
+        if options["files_only"] or options["quiet"]:
+            matched = next(selected, None) is not None
+            return (filename if matched and options["files_only"] else ""), matched
+
+        prefix = ""
+        # Add filename prefix
+        if show_filename and not options["no_filename"]:
+            prefix = f"{filename}:"
 
         if options["count_only"]:
-            if show_filename and not options["no_filename"]:
-                return f"{filename}:{match_count}"
-            return str(match_count)
+            match_count = sum(1 for _ in selected)
+            return f"{prefix}{match_count}", match_count > 0
+
+        # Add line number
+        if options["line_numbers"]:
+            matches = [f"{prefix}{line_num}:{line}" for line_num, line in selected]
+        elif prefix:
+            matches = [prefix + line for _, line in selected]
+        else:
+            matches = [line for _, line in selected]
+
+        return "\n".join(matches), bool(matches)
+
+    def _search_directory(self, dirpath, matcher, options):
+        """
+        Recursively search a directory, returning (output, matched)
+
+        Files are read and searched on a thread pool, a window at a time;
+        results are collected in walk order. With -q the search stops at the
+        first file with a match.
+        """
+        # A content index can list the files and rule out those that cannot
+        # contain any of the literal patterns; -v and -c report on those too
+        paths = None
+        indexed_files = getattr(self.shell.fs, "indexed_files", None)
+        if indexed_files is not None:
+            needles = matcher.literals
+            if options["invert"] or options["count_only"]:
+                needles = None
+            paths = indexed_files(dirpath, needles, options["case_insensitive"])
+        if paths is None:
+            paths = [
+                entry.path
+                for entry in walk_tree(self.shell.fs, dirpath)
+                if not entry.is_dir
+            ]
+        paths = [path.replace("//", "/") for path in paths]
+
+        def search_file(path):
+            content = self.shell.fs.read_file(path)
+            if content is None:
+                return "", False
+            return self._search_content(content, matcher, options, path, True)
 
-        return "\n".join(matches)
-
-    def _search_directory(self, dirpath, pattern, options):
-        """Recursively search directory"""
         results = []
-
-        # List directory contents
-        items = self.shell.fs.list_dir(dirpath)
-
-        for item in items:
-            item_path = f"{dirpath}/{item}".replace("//", "/")
-
-            if self.shell.fs.is_dir(item_path):
-                # Recurse into subdirectory
-                sub_results = self._search_directory(item_path, pattern, options)
-                if sub_results:
-                    results.append(sub_results)
-            else:
-                # Search file
-                content = self.shell.fs.read_file(item_path)
-                if content is not None:
-                    file_results = self._search_content(
-                        content, pattern, options, item_path, True
-                    )
-                    if file_results:
-                        results.append(file_results)
-
-        return "\n".join(results) if results else ""
+        found = False
+        if len(paths) < 2:
+            outcomes = map(search_file, paths)
+        else:
+            outcomes = self._ordered(search_file, paths, options["quiet"])
+        for file_results, matched in outcomes:
+            if file_results:
+                results.append(file_results)
+            found = found or matched
+
+        return "\n".join(results), found
+
+    def _ordered(self, function, paths, stop_on_match):
+        """Map function over paths on the shared pool, yielding in order"""
+        pool = _get_pool()
+        window = GREP_WORKERS * 4
+        for start in range(0, len(paths), window):
+            futures = [
+                pool.submit(function, path) for path in paths[start : start + window]
+            ]
+            for index, future in enumerate(futures):
+                outcome = future.result()
+                yield outcome
+                if stop_on_match and outcome[1]:
+                    for pending in futures[index + 1 :]:
+                        pending.cancel()
+                    return
@@ -0,0 +1,198 @@
+# src/chuk_virtual_shell/commands/text/grep_engine.py
+"""
+chuk_virtual_shell/commands/text/grep_engine.py - Pattern matching for grep
+
+All patterns of one grep invocation (the positional pattern, every -e and
+every line of each -f file) are compiled into a single matcher. A lone
+pattern without regex metacharacters is located with str.find; anything
+else becomes one alternation regex. Matching runs over the whole buffer and
+only lines containing a match are sliced out, so callers that stop after
+the first (or first N) matches never look at the rest of the input. Inverted
+searches and texts where most lines match are tested line by line instead.
+"""
+
+import operator
+import re
+from itertools import compress, count, islice
+from typing import Iterator, List, Optional, Tuple
+
+from chuk_virtual_shell.core.streaming import has_other_line_breaks
+
+_REGEX_META = frozenset(".^$*+?()[]{}|\\")
+
+# A buffer search costs more per matching line than testing every line
+# does; texts where this share of a leading sample matches go line by line
+DENSE_SAMPLE = 64 * 1024
+DENSE_RATIO = 0.25
+
+# Constructs that could look past a line boundary in a whole-buffer search
+_BUFFER_UNSAFE = re.compile(r"\(\?<[=!]|\\[AZ]")
+
+
+def is_literal(pattern: str) -> bool:
+    """Whether a pattern has no regex metacharacters."""
+    return not _REGEX_META.intersection(pattern)
+
+
+class GrepMatcher:
+    """Line matcher for one or more grep patterns."""
+
+    def __init__(
+        self,
+        patterns: List[str],
+        ignore_case: bool = False,
+        whole_word: bool = False,
+        fixed: bool = False,
+    ):
+        """
+        Compile the patterns.
+
+        Args:
+            patterns: Patterns; a line matches if any of them matches
+            ignore_case: Match case-insensitively (-i)
+            whole_word: Only match whole words (-w)
+            fixed: Treat patterns as fixed strings (-F)
+
+        Raises:
+            re.error: if a pattern is not a valid regex
+        """
+        self.patterns = list(patterns)
+        self.ignore_case = ignore_case
+
+        sources = []
+        for pattern in self.patterns:
+            if fixed or is_literal(pattern):
+                pattern = re.escape(pattern)
+            if whole_word:
+                pattern = r"\b" + pattern + r"\b"
+            sources.append(pattern)
+        if len(sources) == 1:
+            source = sources[0]
+        else:
+            # No pattern at all matches nothing
+            source = "|".join(f"(?:{s})" for s in sources) or "(?!)"
+
+        # Strings a matching line must contain one of (for index lookups);
+        # None when some pattern is a real regex
+        self.literals: Optional[List[str]] = None
+        if fixed or all(map(is_literal, self.patterns)):
+            self.literals = self.patterns
+
+        flags = re.IGNORECASE if ignore_case else 0
+        self.regex = re.compile(source, flags)
+        self.buffer_regex = None
+        if not _BUFFER_UNSAFE.search(source):
+            self.buffer_regex = re.compile(source, flags | re.MULTILINE)
+
+        # str.find is only used where it agrees with the regex: a single
+        # literal, and for -i an ASCII one searched in ASCII text
+        self.literal: Optional[str] = None
+        if len(self.patterns) == 1 and not whole_word:
+            pattern = self.patterns[0]
+            if (fixed or is_literal(pattern)) and (
+                not ignore_case or pattern.isascii()
+            ):
+                self.literal = pattern.lower() if ignore_case else pattern
+
+    def match_line(self, line: str) -> bool:
+        """Whether a single line matches."""
+        return self.regex.search(line) is not None
+
+    def search(
+        self,
+        content: str,
+        invert: bool = False,
+        limit: Optional[int] = None,
+        dense: Optional[bool] = None,
+    ) -> Iterator[Tuple[int, str]]:
+        """
+        Return an iterator of (line number, line) for each selected line.
+
+        Args:
+            content: Text to search
+            invert: Select the lines that do not match (-v)
+            limit: Stop after this many selected lines (-m, -l, -q)
+            dense: Whether most lines match, as is_dense() tells (None =
+                sample long contents to find out)
+        """
+        if dense is None:
+            dense = len(content) > DENSE_SAMPLE and self.is_dense(content)
+        if (
+            invert
+            or self.buffer_regex is None
+            or has_other_line_breaks(content)
+            or dense
+        ):
+            selected = self._search_lines(content, invert)
+        else:
+            selected = self._number_spans(content, self._matching_spans(content))
+        return selected if limit is None else islice(selected, max(limit, 0))
+
+    def _search_lines(self, content: str, invert: bool) -> Iterator[Tuple[int, str]]:
+        """Match line by line; used where a buffer search would not pay off."""
+        lines = content.splitlines()
+        matched = map(self.regex.search, lines)
+        if invert:
+            matched = map(operator.not_, matched)
+        return compress(zip(count(1), lines), matched)
+
+    def is_dense(self, content: str) -> bool:
+        """Whether matches are frequent enough that testing each line is cheaper"""
+        if self.buffer_regex is None or has_other_line_breaks(content):
+            return False
+        sample = content[:DENSE_SAMPLE]
+        lines = sample.count("\n") + 1
+        hits = sum(1 for _ in self._matching_spans(sample))
+        return hits > lines * DENSE_RATIO
+
+    def _matching_spans(self, content: str) -> Iterator[Tuple[int, int]]:
+        """Yield (start, end) of every matching line, searching the buffer."""
+        size = len(content)
+        # A final "\n" ends the last line rather than starting an empty one
+        last = size if size and content[-1] != "\n" else size - 1
+        literal = self.literal
+        if literal is not None and self.ignore_case:
+            if content.isascii():
+                text = content.lower()
+            else:
+                literal = None
+        else:
+            text = content
+        search = self.buffer_regex.search
+
+        pos = 0
+        while pos <= last:
+            if literal is not None:
+                start = text.find(literal, pos)
+                if start < 0:
+                    return
+                crosses = False
+            else:
+                match = search(content, pos)
+                if match is None:
+                    return
+                start = match.start()
+            if start > last:
+                return
+            line_start = content.rfind("\n", pos, start) + 1 or pos
+            line_end = content.find("\n", start)
+            if line_end < 0:
+                line_end = size
+            if literal is None:
+                crosses = match.end() > line_end
+            # A match running into the next line may hide a match that lies
+            # wholly inside this one
+            if not crosses or search(content, line_start, line_end):
+                yield line_start, line_end
+            pos = line_end + 1
+
+    def _number_spans(
+        self, content: str, spans: Iterator[Tuple[int, int]]
+    ) -> Iterator[Tuple[int, str]]:
+        """Attach line numbers to spans, counting newlines between them."""
+        line_num = 1
+        pos = 0
+        for start, end in spans:
+            line_num += content.count("\n", pos, start)
+            pos = start
+            yield line_num, content[start:end]
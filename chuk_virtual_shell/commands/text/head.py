@@ -4,6 +4,12 @@ chuk_virtual_shell/commands/text/head.py - Display first lines of files
 """
 
 from chuk_virtual_shell.commands.command_base import ShellCommand
+from chuk_virtual_shell.core.streaming import (
+    has_other_line_breaks,
+    iter_line_blocks,
+    join_lines,
+)
+from chuk_virtual_shell.filesystem_compat import has_ranged_reads, read_head
 
 
 class HeadCommand(ShellCommand):
@@ -18,6 +24,42 @@ Options:
     category = "text"
 
     def execute(self, args):
+        parsed = self._parse_args(args)
+        if isinstance(parsed, str):
+            return parsed
+        options, files = parsed
+
+        # If no files specified, use stdin
+        if not files:
+            if hasattr(self.shell, "_stdin_buffer") and self.shell._stdin_buffer:
+                content = self.shell._stdin_buffer
+                return self._process_content(content, options)
+            else:
+                return ""
+
+        # Process files
+        results = []
+        show_headers = options["verbose"] or (len(files) > 1 and not options["quiet"])
+
+        for i, filepath in enumerate(files):
+            processed = self._read_file(filepath, options)
+            if processed is None:
+                results.append(f"head: {filepath}: No such file or directory")
+                continue
+
+            # Add header if needed
+            if show_headers:
+                if i > 0:
+                    results.append("")  # Empty line between files
+                results.append(f"==> {filepath} <==")
+
+            if processed:
+                results.append(processed)
+
+        return "\n".join(results)
+
+    def _parse_args(self, args):
+        """Parse arguments into (options, files) or an error string."""
         # Parse options
         options = {"lines": 10, "bytes": None, "quiet": False, "verbose": False}
 
@@ -65,38 +107,60 @@ Options:
                 files.append(arg)
             i += 1
 
-        # If no files specified, use stdin
-        if not files:
-            if hasattr(self.shell, "_stdin_buffer") and self.shell._stdin_buffer:
-                content = self.shell._stdin_buffer
-                return self._process_content(content, options)
-            else:
-                return ""
+        return options, files
 
-        # Process files
-        results = []
-        show_headers = options["verbose"] or (len(files) > 1 and not options["quiet"])
+    def stream(self, args, stdin=None):
+        """Pass through the first N piped lines, then stop reading upstream."""
+        parsed = self._parse_args(args)
+        if (
+            isinstance(parsed, str)
+            or parsed[1]
+            or stdin is None
+            or parsed[0]["bytes"] is not None
+            or parsed[0]["lines"] < 0
+        ):
+            yield from super().stream(args, stdin)
+            return
+        options, _ = parsed
 
-        for i, filepath in enumerate(files):
-            content = self.shell.fs.read_file(filepath)
-            if content is None:
-                results.append(f"head: {filepath}: No such file or directory")
-                continue
+        yield from join_lines(self._head_blocks(stdin, options["lines"]))
 
-            # Convert bytes to string if necessary
-            content = self.ensure_string(content)
-
-            # Add header if needed
-            if show_headers:
-                if i > 0:
-                    results.append("")  # Empty line between files
-                results.append(f"==> {filepath} <==")
+    @staticmethod
+    def _head_blocks(stdin, count):
+        """Yield the first count lines of a chunk stream, joined per block."""
+        if count <= 0:
+            return
+        for block in iter_line_blocks(stdin):
+            if not has_other_line_breaks(block):
+                lines = block.count("\n") + (not block.endswith("\n"))
+                if lines < count:
+                    # Whole block: drop the terminator of its last line
+                    count -= lines
+                    yield block[:-1] if block.endswith("\n") else block
+                    continue
+            lines = block.splitlines()[:count]
+            count -= len(lines)
+            yield "\n".join(lines)
+            if not count:
+                # Stop reading upstream
+                return
 
-            processed = self._process_content(content, options)
-            if processed:
-                results.append(processed)
+    def _read_file(self, filepath, options):
+        """Read only the start of a file that is shown; None if it is missing."""
+        fs = self.shell.fs
+        count = options["bytes"]
+        if count is not None and count >= 0 and has_ranged_reads(fs):
+            return fs.read_range(filepath, 0, count)
+        if count is None and options["lines"] >= 0:
+            lines = read_head(fs, filepath, options["lines"])
+            return None if lines is None else "\n".join(lines)
+        content = fs.read_file(filepath)
+        if content is None:
+            return None
 
-        return "\n".join(results)
+        # Convert bytes to string if necessary
+        content = self.ensure_string(content)
+        return self._process_content(content, options)
 
     def _process_content(self, content, options):
         """Process content according to options"""
@@ -4,6 +4,14 @@ chuk_virtual_shell/commands/text/sort.py - Sort lines of text files
 """
 
 from chuk_virtual_shell.commands.command_base import ShellCommand
+from chuk_virtual_shell.commands.text.sort_engine import (
+    DEFAULT_BUFFER_SIZE,
+    SortEngine,
+    join_texts,
+    parse_buffer_size,
+)
+from chuk_virtual_shell.core.streaming import iter_chunks, join_lines
+from chuk_virtual_shell.filesystem_compat import read_chunks
 
 
 class SortCommand(ShellCommand):
@@ -17,10 +25,55 @@ Options:
   -k NUM    Sort by field NUM (1-based)
   -t SEP    Field separator
   -f        Ignore case (fold)
-  -b        Ignore leading blanks"""
+  -b        Ignore leading blanks
+  -S SIZE, --buffer-size=SIZE
+            Sort at most SIZE in memory (suffixes b, K, M, G, %; default K);
+            larger input is sorted in runs that are spilled and merged
+  --parallel=N
+            Sort runs in N processes"""
     category = "text"
 
     def execute(self, args):
+        stdin = None
+        if hasattr(self.shell, "_stdin_buffer") and self.shell._stdin_buffer:
+            stdin = iter_chunks(self.shell._stdin_buffer)
+        return "".join(self.stream(args, stdin))
+
+    def stream(self, args, stdin=None):
+        """
+        Sort files or piped input, yielding lines as they are merged.
+
+        Input is read a chunk at a time (ranged reads for files, the
+        upstream stream for pipes), so beyond -S of input only the spilled
+        runs and the output being produced are held.
+        """
+        parsed = self._parse_args(args)
+        if isinstance(parsed, str):
+            yield parsed
+            return
+        options, files, buffer_size, parallel = parsed
+
+        if files:
+            # Check every file before producing output
+            texts = []
+            for filepath in files:
+                chunks = read_chunks(self.shell.fs, filepath)
+                if chunks is None:
+                    yield f"sort: {filepath}: No such file or directory"
+                    return
+                texts.append(chunks)
+            contents = join_texts(texts)
+        elif stdin is not None:
+            contents = stdin
+        else:
+            return
+
+        # Sort the lines
+        engine = SortEngine(options, buffer_size=buffer_size, parallel=parallel)
+        yield from join_lines("\n".join(lines) for lines in engine.sort(contents))
+
+    def _parse_args(self, args):
+        """Parse arguments into (options, files, buffer_size, parallel) or an error."""
         # Parse options
         options = {
             "reverse": False,
@@ -32,6 +85,8 @@ Options:
             "ignore_blanks": False,
         }
 
+        buffer_size = DEFAULT_BUFFER_SIZE
+        parallel = 1
         files = []
         i = 0
 
@@ -52,9 +107,11 @@ Options:
                 if i + 1 < len(args):
                     try:
                         options["field"] = int(args[i + 1]) - 1  # Convert to 0-based
-                        i += 1
                     except ValueError:
                         return f"sort: invalid field number: '{args[i + 1]}'"
+                    if options["field"] < 0:
+                        return f"sort: invalid field number: '{args[i + 1]}'"
+                    i += 1
                 else:
                     return "sort: option requires an argument -- 'k'"
             elif arg == "-t":
@@ -63,6 +120,31 @@ Options:
                     i += 1
                 else:
                     return "sort: option requires an argument -- 't'"
+            elif arg in ("-S", "--buffer-size") or arg.startswith(
+                ("-S", "--buffer-size=")
+            ):
+                if arg in ("-S", "--buffer-size"):
+                    if i + 1 >= len(args):
+                        return "sort: option requires an argument -- 'S'"
+                    value = args[i + 1]
+                    i += 1
+                else:
+                    value = arg.split("=", 1)[1] if arg.startswith("--") else arg[2:]
+                try:
+                    buffer_size = parse_buffer_size(value)
+                except ValueError:
+                    return f"sort: invalid -S argument '{value}'"
+            elif arg == "--parallel" or arg.startswith("--parallel="):
+                if arg == "--parallel":
+                    if i + 1 >= len(args):
+                        return "sort: option '--parallel' requires an argument"
+                    value = args[i + 1]
+                    i += 1
+                else:
+                    value = arg.split("=", 1)[1]
+                if not value.isdigit() or int(value) < 1:
+                    return f"sort: invalid number after '--parallel': '{value}'"
+                parallel = int(value)
             elif arg.startswith("-"):
                 # Handle combined options like -rn
                 for char in arg[1:]:
@@ -80,87 +162,4 @@ Options:
                 files.append(arg)
             i += 1
 
-        # Collect all lines from input
-        all_lines = []
-
-        if not files:
-            # Use stdin if available
-            if hasattr(self.shell, "_stdin_buffer") and self.shell._stdin_buffer:
-                all_lines.extend(self.shell._stdin_buffer.splitlines())
-            else:
-                return ""
-        else:
-            # Read from files
-            for filepath in files:
-                content = self.shell.fs.read_file(filepath)
-                if content is None:
-                    return f"sort: {filepath}: No such file or directory"
-                all_lines.extend(content.splitlines())
-
-        # Sort the lines
-        sorted_lines = self._sort_lines(all_lines, options)
-
-        return "\n".join(sorted_lines)
-
-    def _sort_lines(self, lines, options):
-        """Sort lines according to options"""
-        if not lines:
-            return []
-
-        # Prepare key function for sorting
-        def sort_key(line):
-            # Handle blank line trimming
-            if options["ignore_blanks"]:
-                line = line.lstrip()
-
-            # Handle field-based sorting
-            if options["field"] is not None:
-                separator = options["separator"] or r"[ \t]+"
-
-                # Split line into fields
-                if options["separator"]:
-                    fields = line.split(separator)
-                else:
-                    fields = line.split()
-
-                # Get the specified field (or empty if not enough fields)
-                if options["field"] < len(fields):
-                    value = fields[options["field"]]
-                else:
-                    value = ""
-            else:
-                value = line
-
-            # Handle case-insensitive sorting
-            if options["ignore_case"]:
-                value = value.lower()
-
-            # Handle numeric sorting
-            if options["numeric"]:
-                # Extract numeric part
-                import re
-
-                match = re.match(r"^[+-]?(\d+\.?\d*)", value.strip())
-                if match:
-                    try:
-                        return float(match.group(0))
-                    except ValueError:
-                        return 0
-                return 0
-
-            return value
-
-        # Sort the lines
-        sorted_lines = sorted(lines, key=sort_key, reverse=options["reverse"])
-
-        # Remove duplicates if requested
-        if options["unique"]:
-            seen = set()
-            unique_lines = []
-            for line in sorted_lines:
-                if line not in seen:
-                    seen.add(line)
-                    unique_lines.append(line)
-            sorted_lines = unique_lines
-
-        return sorted_lines
+        return options, files, buffer_size, parallel
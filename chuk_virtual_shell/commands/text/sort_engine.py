@@ -0,0 +1,376 @@
+# src/chuk_virtual_shell/commands/text/sort_engine.py
+"""
+chuk_virtual_shell/commands/text/sort_engine.py - Bounded-memory sorting
+
+Input arrives as a stream of text chunks and is cut into blocks of at most
+``buffer_size`` characters. Each block is sorted on precomputed keys (one
+key column per block, see sort_keys). When all input fits in one block it
+is sorted in memory; otherwise every sorted block is spilled to a temporary
+file on the host's scratch space and the runs are k-way merged while the
+output is consumed. Sorts on the whole line (no -k or -n) skip the key
+column and use sorted() with at most a str method as key. With ``parallel``
+above 1, blocks are sorted in worker processes; these are started with
+forkserver or spawn, as forking a threaded host process is unsafe.
+"""
+
+import heapq
+import multiprocessing
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import ExitStack
+from itertools import chain, islice
+from operator import itemgetter
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from chuk_virtual_shell.core.columnar import (
+    ColumnTable,
+    sort_order,
+    split_on,
+    to_numbers,
+)
+from chuk_virtual_shell.core.streaming import batch_lines, strip_line_ending
+
+# Leading number used by -n; exponents and a leading "." are not part of it
+_SORT_NUMBER = re.compile(r"[+-]?\d+\.?\d*", re.ASCII)
+_SORT_NUMBER_REJECT = re.compile(r"[eE]|(?:^|\n)[+-]?\.")
+
+# Sorted lines handed on at a time, so output is joined in C, not per line
+OUTPUT_BATCH = 4096
+
+# Characters of input sorted in memory before runs are spilled (-S)
+DEFAULT_BUFFER_SIZE = 64 * 1024 * 1024
+
+# Input smaller than this is not worth handing to worker processes
+PARALLEL_MIN_SIZE = 1024 * 1024
+
+# Lines read from each run per key computation while merging
+MERGE_BATCH = 4096
+
+_SIZE_RE = re.compile(r"^(\d+)([bkmgtpeKMGTPE%]?)$")
+_SIZE_UNITS = {"b": 1, "": 1024, "%": None}
+_SIZE_UNITS.update({unit: 1024 ** (i + 1) for i, unit in enumerate("kmgtpe")})
+
+
+def parse_buffer_size(text: str) -> int:
+    """
+    Parse a -S/--buffer-size value.
+
+    A plain number is in KiB; the suffixes b, K, M, G, T, P and E select
+    bytes or powers of 1024, and % a share of physical memory.
+
+    Raises:
+        ValueError: if the value is not a valid size
+    """
+    match = _SIZE_RE.match(text)
+    if not match:
+        raise ValueError(text)
+    number, unit = int(match.group(1)), match.group(2).lower()
+    if unit != "%":
+        return number * _SIZE_UNITS[unit]
+    try:
+        memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, OSError, ValueError):
+        raise ValueError(text)
+    return memory * number // 100
+
+
+def sort_keys(lines: Sequence[str], options: Dict) -> Sequence:
+    """Compute the sort key of every line, a column at a time"""
+    values = lines
+
+    # Handle blank line trimming
+    if options["ignore_blanks"]:
+        values = list(map(str.lstrip, values))
+
+    # Handle field-based sorting
+    if options["field"] is not None:
+        separator = options["separator"]
+        if separator:
+            table = ColumnTable(values, split_on(separator))
+        else:
+            table = ColumnTable(values)
+        values = table.column(options["field"] + 1)
+
+    # Handle case-insensitive sorting
+    if options["ignore_case"]:
+        values = list(map(str.lower, values))
+
+    # Handle numeric sorting
+    if options["numeric"]:
+        return to_numbers(
+            list(map(str.strip, values)), _SORT_NUMBER, _SORT_NUMBER_REJECT
+        )
+
+    return values
+
+
+def line_key(options: Dict) -> Optional[Callable[[str], str]]:
+    """Key function for sorts on the whole line (None = the line itself)"""
+    if options["ignore_blanks"] and options["ignore_case"]:
+        return lambda line: line.lstrip().lower()
+    if options["ignore_blanks"]:
+        return str.lstrip
+    if options["ignore_case"]:
+        return str.lower
+    return None
+
+
+def sort_block(lines: List[str], options: Dict) -> List[str]:
+    """Sort one block of lines; equal keys keep their input order."""
+    if options["field"] is None and not options["numeric"]:
+        # sorted() is stable, also when reversing
+        return sorted(lines, key=line_key(options), reverse=options["reverse"])
+    keys = sort_keys(lines, options)
+    return [lines[i] for i in sort_order(keys, reverse=options["reverse"])]
+
+
+def _process_context():
+    """Start method for worker processes that is safe in threaded hosts."""
+    methods = multiprocessing.get_all_start_methods()
+    method = "forkserver" if "forkserver" in methods else "spawn"
+    return multiprocessing.get_context(method)
+
+
+def split_blocks(
+    contents: Iterable[str], block_size: int
+) -> Iterator[Tuple[List[str], bool]]:
+    """
+    Cut a stream of text chunks into blocks of about ``block_size`` characters.
+
+    Chunks may end anywhere; the text is only cut after a "\\n", so the
+    blocks split into the same lines the whole text would. Each block comes
+    with whether more input follows it, which is known after reading at most
+    one more chunk.
+    """
+    lines: List[str] = []
+    size = 0
+    full: Optional[List[str]] = None  # A block that may be the last one
+    partial: List[str] = []  # Pieces of a line cut by chunk boundaries
+    for chunk in contents:
+        if not chunk:
+            continue
+        if full is not None:
+            yield full, True
+            full = None
+        if "\n" not in chunk:
+            partial.append(chunk)
+            continue
+        text = "".join(partial) + chunk if partial else chunk
+        last = text.rfind("\n") + 1
+        start = 0
+        while start < last:
+            end = text.find("\n", start + max(block_size - size, 1) - 1)
+            end = last if end < 0 else end + 1
+            lines.extend(text[start:end].splitlines())
+            size += end - start
+            start = end
+            if size >= block_size:
+                if start < len(text):
+                    yield lines, True
+                else:
+                    full = lines
+                lines, size = [], 0
+        partial = [text[last:]] if last < len(text) else []
+    if partial:
+        lines.extend("".join(partial).splitlines())
+    if full is not None:
+        yield full, bool(lines)
+    if lines:
+        yield lines, False
+
+
+def join_texts(texts: Iterable[Iterable[str]]) -> Iterator[str]:
+    """
+    Chain the chunk streams of several texts into one stream.
+
+    A text that does not end with a line break gets one, so no line runs
+    from one text into the next.
+    """
+    for chunks in texts:
+        last = ""
+        for chunk in chunks:
+            if chunk:
+                last = chunk
+                yield chunk
+        if last and (last.endswith("\r") or strip_line_ending(last) == last):
+            yield "\n"
+
+
+class SortEngine:
+    """Sort lines within a memory budget, spilling and merging sorted runs."""
+
+    def __init__(
+        self,
+        options: Dict,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        parallel: int = 1,
+    ):
+        """
+        Initialize the engine.
+
+        Args:
+            options: Parsed sort options (reverse, numeric, unique, field,
+                separator, ignore_case, ignore_blanks)
+            buffer_size: Characters of input held in memory at once
+            parallel: Number of processes sorting blocks
+        """
+        self.options = options
+        self.buffer_size = max(buffer_size, 1)
+        self.parallel = max(parallel, 1)
+        self.runs_spilled = 0
+
+    def sort(self, contents: Iterable[str]) -> Iterator[List[str]]:
+        """
+        Sort the lines of a stream of text chunks as one input.
+
+        Input that fits in the buffer is sorted in memory. Larger input is
+        read a block at a time, each sorted block is spilled, and the runs
+        are merged as the result is consumed, so about ``buffer_size``
+        characters of input are held at once.
+
+        Args:
+            contents: Text chunks (cut anywhere)
+
+        Yields:
+            The sorted lines, in batches of up to OUTPUT_BATCH lines
+        """
+        workers = self.parallel
+        # Every worker sorts a share of the budget at a time
+        blocks = split_blocks(contents, max(self.buffer_size // workers, 1))
+        batch: List[List[str]] = []
+        more = True
+        while more and len(batch) < workers:
+            block, more = next(blocks, ([], False))
+            if block:
+                batch.append(block)
+        if not more:
+            yield from self._sort_in_memory(batch)
+            return
+
+        def pending_blocks() -> Iterator[List[str]]:
+            # Hand over the blocks read so far without keeping them alive
+            while batch:
+                yield batch.pop(0)
+            for block, _ in blocks:
+                yield block
+
+        with ExitStack() as stack:
+            runs = []
+            for block in self._sorted_blocks(pending_blocks(), workers):
+                run = stack.enter_context(self._spill(block))
+                runs.append(self._keyed(run, spilled=True))
+            merged = heapq.merge(
+                *runs, key=itemgetter(0), reverse=self.options["reverse"]
+            )
+            yield from batch_lines(self._finish(merged), OUTPUT_BATCH)
+
+    def _sort_in_memory(self, blocks: List[List[str]]) -> Iterator[List[str]]:
+        """Sort input that fits in the buffer, in processes if it is large."""
+        lines = blocks[0] if len(blocks) == 1 else list(chain.from_iterable(blocks))
+        if not lines:
+            return
+        workers = self.parallel
+        if workers > 1 and sum(map(len, lines)) + len(lines) >= PARALLEL_MIN_SIZE:
+            share = -(-len(lines) // workers)
+            parts = [lines[i : i + share] for i in range(0, len(lines), share)]
+            runs = [
+                self._keyed(part, spilled=False)
+                for part in self._sorted_blocks(iter(parts), workers)
+            ]
+            merged = heapq.merge(
+                *runs, key=itemgetter(0), reverse=self.options["reverse"]
+            )
+            yield from batch_lines(self._finish(merged), OUTPUT_BATCH)
+            return
+
+        lines = sort_block(lines, self.options)
+        if self.options["unique"]:
+            # Keeps the first of equal lines, as _finish() does
+            lines = list(dict.fromkeys(lines))
+        for start in range(0, len(lines), OUTPUT_BATCH):
+            yield lines[start : start + OUTPUT_BATCH]
+
+    def _sorted_blocks(
+        self, blocks: Iterator[List[str]], workers: int
+    ) -> Iterator[List[str]]:
+        """Sort blocks in order, ``workers`` blocks at a time in processes."""
+        pool = None
+        if workers > 1:
+            try:
+                pool = ProcessPoolExecutor(
+                    max_workers=workers, mp_context=_process_context()
+                )
+            except (OSError, NotImplementedError, ValueError):
+                pool = None
+        try:
+            while True:
+                batch = list(islice(blocks, workers))
+                if not batch:
+                    return
+                if pool is not None:
+                    options = [self.options] * len(batch)
+                    try:
+                        yield from list(pool.map(sort_block, batch, options))
+                        continue
+                    except (OSError, BrokenProcessPool):
+                        # No worker processes in this sandbox; sort here
+                        pool.shutdown(wait=False)
+                        pool = None
+                for block in batch:
+                    yield sort_block(block, self.options)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    def _spill(self, lines: List[str]):
+        """Write a sorted run to a temporary file positioned at its start."""
+        run = tempfile.TemporaryFile(
+            "w+", encoding="utf-8", errors="surrogatepass", newline="\n"
+        )
+        for line in lines:
+            run.write(line)
+            run.write("\n")
+        run.seek(0)
+        self.runs_spilled += 1
+        return run
+
+    def _keyed(self, run: Iterable[str], spilled: bool) -> Iterator[Tuple]:
+        """Yield (key, line) for a run, computing keys a batch at a time."""
+        run = iter(run)
+        while True:
+            batch = list(islice(run, MERGE_BATCH))
+            if not batch:
+                return
+            if spilled:
+                batch = [line[:-1] for line in batch]
+            yield from zip(sort_keys(batch, self.options), batch)
+
+    def _finish(self, pairs: Iterable[Tuple]) -> Iterator[str]:
+        """Drop duplicate lines for -u and yield the sorted lines."""
+        if not self.options["unique"]:
+            for _, line in pairs:
+                yield line
+            return
+        # Equal lines have equal keys and sorted keys are grouped, so only
+        # lines sharing the current key need remembering
+        seen: set = set()
+        current = object()
+        for key, line in pairs:
+            if key != current:
+                current = key
+                seen.clear()
+            if line not in seen:
+                seen.add(line)
+                yield line
@@ -3,7 +3,12 @@
 chuk_virtual_shell/commands/text/tail.py - Display last lines of files
 """
 
+from collections import deque
+from itertools import islice
+
 from chuk_virtual_shell.commands.command_base import ShellCommand
+from chuk_virtual_shell.core.streaming import iter_lines, join_lines
+from chuk_virtual_shell.filesystem_compat import has_ranged_reads, read_tail
 
 
 class TailCommand(ShellCommand):
@@ -19,6 +24,48 @@ Options:
     category = "text"
 
     def execute(self, args):
+        parsed = self._parse_args(args)
+        if isinstance(parsed, str):
+            return parsed
+        options, files = parsed
+
+        # If no files specified, use stdin
+        if not files:
+            if hasattr(self.shell, "_stdin_buffer") and self.shell._stdin_buffer:
+                content = self.shell._stdin_buffer
+                return self._process_content(content, options)
+            else:
+                return ""
+
+        # Process files
+        results = []
+        show_headers = options["verbose"] or (len(files) > 1 and not options["quiet"])
+
+        for i, filepath in enumerate(files):
+            processed = self._read_file(filepath, options)
+            if processed is None:
+                results.append(f"tail: {filepath}: No such file or directory")
+                continue
+
+            # Add header if needed
+            if show_headers:
+                if i > 0:
+                    results.append("")  # Empty line between files
+                results.append(f"==> {filepath} <==")
+
+            if processed:
+                results.append(processed)
+
+            # Note: -f (follow) mode not fully implemented for virtual FS
+            if options["follow"]:
+                results.append(
+                    "tail: follow mode not fully supported in virtual filesystem"
+                )
+
+        return "\n".join(results)
+
+    def _parse_args(self, args):
+        """Parse arguments into (options, files) or an error string."""
         # Parse options
         options = {
             "lines": 10,
@@ -84,41 +131,46 @@ Options:
                 files.append(arg)
             i += 1
 
-        # If no files specified, use stdin
-        if not files:
-            if hasattr(self.shell, "_stdin_buffer") and self.shell._stdin_buffer:
-                content = self.shell._stdin_buffer
-                return self._process_content(content, options)
-            else:
-                return ""
-
-        # Process files
-        results = []
-        show_headers = options["verbose"] or (len(files) > 1 and not options["quiet"])
-
-        for i, filepath in enumerate(files):
-            content = self.shell.fs.read_file(filepath)
-            if content is None:
-                results.append(f"tail: {filepath}: No such file or directory")
-                continue
-
-            # Add header if needed
-            if show_headers:
-                if i > 0:
-                    results.append("")  # Empty line between files
-                results.append(f"==> {filepath} <==")
+        return options, files
 
-            processed = self._process_content(content, options)
-            if processed:
-                results.append(processed)
+    def stream(self, args, stdin=None):
+        """Keep only a window of the last N piped lines in memory."""
+        parsed = self._parse_args(args)
+        if (
+            isinstance(parsed, str)
+            or parsed[1]
+            or stdin is None
+            or parsed[0]["bytes"] is not None
+            or parsed[0].get("from_line", 1) < 1
+        ):
+            yield from super().stream(args, stdin)
+            return
+        options, _ = parsed
 
-            # Note: -f (follow) mode not fully implemented for virtual FS
-            if options["follow"]:
-                results.append(
-                    "tail: follow mode not fully supported in virtual filesystem"
-                )
+        lines = iter_lines(stdin)
+        if options.get("from_line"):
+            # Output from the Nth line onwards
+            yield from join_lines(islice(lines, options["from_line"] - 1, None))
+        elif options["lines"] and options["lines"] > 0:
+            yield from join_lines(deque(lines, maxlen=options["lines"]))
 
-        return "\n".join(results)
+    def _read_file(self, filepath, options):
+        """Read only the end of a file that is shown; None if it is missing."""
+        fs = self.shell.fs
+        count = options["bytes"]
+        if count is not None and count > 0 and has_ranged_reads(fs):
+            end = fs.size(filepath)
+            if end is None:
+                return None
+            return fs.read_range(filepath, max(end - count, 0))
+        if count is None and not options.get("from_line") and options["lines"]:
+            if options["lines"] > 0:
+                lines = read_tail(fs, filepath, options["lines"])
+                return None if lines is None else "\n".join(lines)
+        content = fs.read_file(filepath)
+        if content is None:
+            return None
+        return self._process_content(self.ensure_string(content), options)
 
     def _process_content(self, content, options):
         """Process content according to options"""
@@ -4,6 +4,8 @@ chuk_virtual_shell/commands/text/uniq.py - Report or omit repeated lines
 """
 
 from chuk_virtual_shell.commands.command_base import ShellCommand
+from chuk_virtual_shell.core.columnar import run_lengths
+from chuk_virtual_shell.core.streaming import iter_line_blocks, join_lines
 
 
 class UniqCommand(ShellCommand):
@@ -21,6 +23,38 @@ Options:
     category = "text"
 
     def execute(self, args):
+        parsed = self._parse_args(args)
+        if isinstance(parsed, str):
+            return parsed
+        options, files = parsed
+
+        # Get input content
+        if not files:
+            # Use stdin if available
+            if hasattr(self.shell, "_stdin_buffer") and self.shell._stdin_buffer:
+                content = self.shell._stdin_buffer
+            else:
+                return ""
+        else:
+            # Read from first file
+            input_file = files[0]
+            content = self.shell.fs.read_file(input_file)
+            if content is None:
+                return f"uniq: {input_file}: No such file or directory"
+
+        # Process the content
+        result = self._process_uniq(content, options)
+
+        # Handle output file if specified
+        if len(files) > 1:
+            output_file = files[1]
+            self.shell.fs.write_file(output_file, result)
+            return ""
+
+        return result
+
+    def _parse_args(self, args):
+        """Parse arguments into (options, files) or an error string."""
         # Parse options
         options = {
             "count": False,
@@ -90,30 +124,18 @@ Options:
                 files.append(arg)
             i += 1
 
-        # Get input content
-        if not files:
-            # Use stdin if available
-            if hasattr(self.shell, "_stdin_buffer") and self.shell._stdin_buffer:
-                content = self.shell._stdin_buffer
-            else:
-                return ""
-        else:
-            # Read from first file
-            input_file = files[0]
-            content = self.shell.fs.read_file(input_file)
-            if content is None:
-                return f"uniq: {input_file}: No such file or directory"
-
-        # Process the content
-        result = self._process_uniq(content, options)
+        return options, files
 
-        # Handle output file if specified
-        if len(files) > 1:
-            output_file = files[1]
-            self.shell.fs.write_file(output_file, result)
-            return ""
+    def stream(self, args, stdin=None):
+        """Collapse adjacent duplicates of piped input a block at a time."""
+        parsed = self._parse_args(args)
+        if isinstance(parsed, str) or parsed[1] or stdin is None:
+            yield from super().stream(args, stdin)
+            return
+        options, _ = parsed
 
-        return result
+        blocks = self._uniq_blocks(iter_line_blocks(stdin), options)
+        yield from join_lines("\n".join(output) for output in blocks if output)
 
     def _process_uniq(self, content, options):
         """Process content for unique/duplicate lines"""
@@ -124,35 +146,57 @@ Options:
         if not lines:
             return ""
 
-        result = []
+        # Find runs of equal lines over the whole input at once
+        starts, counts = run_lengths(self._comparison_keys(lines, options))
+        output = []
+        for start, count in zip(starts, counts):
+            formatted = self._format_line(lines[start], count, options)
+            if formatted is not None:
+                output.append(formatted)
+        return "\n".join(output)
+
+    def _comparison_keys(self, lines, options):
+        """Return the comparison form of every line"""
+        if options["skip_fields"] or options["skip_chars"]:
+            return [self._prepare_for_comparison(line, options) for line in lines]
+        keys = lines
+        if options["max_chars"] is not None:
+            width = options["max_chars"]
+            keys = [line[:width] for line in keys]
+        if options["ignore_case"]:
+            keys = list(map(str.lower, keys))
+        return keys
+
+    def _uniq_blocks(self, blocks, options):
+        """Yield the output lines for each block of input lines"""
+        # The last run of a block may continue into the next one
         prev_line = None
         prev_compare = None
         count = 0
 
-        for line in lines:
-            # Prepare line for comparison
-            compare_line = self._prepare_for_comparison(line, options)
-
-            if prev_compare is None:
-                # First line
-                prev_line = line
-                prev_compare = compare_line
-                count = 1
-            elif compare_line == prev_compare:
-                # Duplicate of previous line
-                count += 1
-            else:
-                # Different from previous line
-                self._output_line(result, prev_line, count, options)
-                prev_line = line
-                prev_compare = compare_line
-                count = 1
-
-        # Output the last line
+        for block in blocks:
+            lines = block.splitlines()
+            keys = self._comparison_keys(lines, options)
+            starts, counts = run_lengths(keys)
+            output = []
+            for start, run in zip(starts, counts):
+                if prev_line is not None:
+                    if start == 0 and keys[0] == prev_compare:
+                        count += run
+                        continue
+                    formatted = self._format_line(prev_line, count, options)
+                    if formatted is not None:
+                        output.append(formatted)
+                prev_line = lines[start]
+                prev_compare = keys[start]
+                count = run
+            yield output
+
+        # Output the last run
         if prev_line is not None:
-            self._output_line(result, prev_line, count, options)
-
-        return "\n".join(result)
+            formatted = self._format_line(prev_line, count, options)
+            if formatted is not None:
+                yield [formatted]
 
     def _prepare_for_comparison(self, line, options):
         """Prepare a line for comparison based on options"""
@@ -181,16 +225,15 @@ Options:
 
         return line
 
-    def _output_line(self, result, line, count, options):
-        """Output a line based on options and count"""
+    def _format_line(self, line, count, options):
+        """Format a line based on options and count, or None to drop it"""
         # Check if we should output this line
         if options["duplicates_only"] and count == 1:
-            return
+            return None
         if options["unique_only"] and count > 1:
-            return
+            return None
 
         # Format output
         if options["count"]:
-            result.append(f"   {count:4d} {line}")
-        else:
-            result.append(line)
+            return f"   {count:4d} {line}"
+        return line
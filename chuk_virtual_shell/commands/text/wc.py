@@ -4,6 +4,7 @@ chuk_virtual_shell/commands/text/wc.py - Word, line, character, and byte count
 """
 
 from chuk_virtual_shell.commands.command_base import ShellCommand
+from chuk_virtual_shell.core.streaming import count_lines, iter_line_blocks
 
 
 class WcCommand(ShellCommand):
@@ -20,6 +21,35 @@ Default: Print lines, words, and bytes"""
     category = "text"
 
     def execute(self, args):
+        options, files = self._parse_args(args)
+
+        # Process input
+        if not files:
+            # Use stdin if available
+            if hasattr(self.shell, "_stdin_buffer") and self.shell._stdin_buffer:
+                content = self.shell._stdin_buffer
+                counts = self._count_content(content, options)
+                return self._format_output([counts], [""], options, False)
+            else:
+                return self._format_output([(0, 0, 0, 0, 0)], [""], options, False)
+
+        # Process files
+        all_counts = []
+        filenames = []
+
+        for filepath in files:
+            content = self.shell.fs.read_file(filepath)
+            if content is None:
+                return f"wc: {filepath}: No such file or directory"
+
+            counts = self._count_content(content, options)
+            all_counts.append(counts)
+            filenames.append(filepath)
+
+        return self._format_output(all_counts, filenames, options, len(files) > 1)
+
+    def _parse_args(self, args):
+        """Parse arguments into (options, files)."""
         # Parse options
         options = {
             "lines": False,
@@ -59,57 +89,52 @@ Default: Print lines, words, and bytes"""
             options["words"] = True
             options["bytes"] = True
 
-        # Process input
-        if not files:
-            # Use stdin if available
-            if hasattr(self.shell, "_stdin_buffer") and self.shell._stdin_buffer:
-                content = self.shell._stdin_buffer
-                counts = self._count_content(content, options)
-                return self._format_output([counts], [""], options, False)
-            else:
-                return self._format_output([(0, 0, 0, 0, 0)], [""], options, False)
-
-        # Process files
-        all_counts = []
-        filenames = []
+        return options, files
 
-        for filepath in files:
-            content = self.shell.fs.read_file(filepath)
-            if content is None:
-                return f"wc: {filepath}: No such file or directory"
+    def stream(self, args, stdin=None):
+        """Count piped input incrementally instead of buffering it."""
+        options, files = self._parse_args(args)
+        if files or stdin is None:
+            yield from super().stream(args, stdin)
+            return
 
-            counts = self._count_content(content, options)
-            all_counts.append(counts)
-            filenames.append(filepath)
+        # Blocks end at line boundaries, so their counts add up
+        totals = [0, 0, 0, 0, 0]
+        for block in iter_line_blocks(stdin):
+            counts = self._count_content(block, options)
+            for i in range(4):
+                totals[i] += counts[i]
+            totals[4] = max(totals[4], counts[4])
 
-        return self._format_output(all_counts, filenames, options, len(files) > 1)
+        yield self._format_output([tuple(totals)], [""], options, False)
 
     def _count_content(self, content, options):
-        """Count lines, words, bytes, chars, and max line length"""
+        """Count lines, words, bytes, chars, and max line length (as requested)"""
         if not content:
             return (0, 0, 0, 0, 0)
 
-        lines = content.splitlines()
-        line_count = len(lines)
+        line_count = max_line_length = 0
+        if options["max_line"]:
+            lines = content.splitlines()
+            line_count = len(lines)
+            max_line_length = max(map(len, lines), default=0)
+        elif options["lines"]:
+            line_count = count_lines(content)
 
-        # Count words
-        word_count = 0
-        for line in lines:
-            word_count += len(line.split())
+        # Count words; line boundaries are whitespace, so one split suffices
+        word_count = len(content.split()) if options["words"] else 0
 
         # Count bytes
-        byte_count = len(content.encode("utf-8"))
+        byte_count = 0
+        if options["bytes"]:
+            if content.isascii():
+                byte_count = len(content)
+            else:
+                byte_count = len(content.encode("utf-8"))
 
         # Count characters
         char_count = len(content)
 
-        # Find longest line
-        max_line_length = 0
-        for line in lines:
-            line_length = len(line)
-            if line_length > max_line_length:
-                max_line_length = line_length
-
         return (line_count, word_count, byte_count, char_count, max_line_length)
 
     def _format_output(self, counts_list, filenames, options, show_total):
@@ -0,0 +1,389 @@
+# chuk_virtual_shell/core/arithmetic.py
+"""
+chuk_virtual_shell/core/arithmetic.py - Shell arithmetic
+
+Evaluates the expressions of $(( )), (( )) and let with the operators and
+precedence of sh/bash: post- and pre-increment, unary + - ! ~, **, the
+multiplicative, additive, shift, comparison, equality and bitwise operators,
+&& and || (short-circuit), ?: and the assignment operators, and ",".
+Numbers are 64-bit signed integers written in decimal, octal (010), hex
+(0x1f) or base#digits.
+
+An expression is parsed once into a tree of Python closures, cached by its
+text, and the closures read and assign shell variables directly; nothing is
+rewritten or handed to eval(). Variables hold strings: an unset or empty
+variable is 0, and a value that is not a number is evaluated in turn as an
+expression.
+"""
+
+import re
+from typing import Callable, List, MutableMapping, Optional, Tuple
+
+from chuk_virtual_shell.core.command_ast import LRUCache
+
+Environment = MutableMapping[str, str]
+Evaluator = Callable[[Environment], int]
+
+_SIGN = 1 << 63
+_MASK = (1 << 64) - 1
+
+_TOKEN = re.compile(
+    r"\s*(?:"
+    r"(?P<number>\d+#[0-9A-Za-z@_]+|0[xX][0-9A-Fa-f]+|\d+)"
+    r"|\$\{(?P<braced>[A-Za-z_]\w*)\}"
+    r"|\$(?P<dollar>[A-Za-z_]\w*)"
+    r"|(?P<name>[A-Za-z_]\w*)"
+    r"|(?P<op><<=|>>=|\*\*|\+\+|--|<<|>>|<=|>=|==|!=|&&|\|\||[-+*/%&^|]=|[-+*/%<>=!~&^|?:(),])"
+    r")"
+)
+
+# Binary operators and their precedence (higher binds tighter)
+_PRECEDENCE = {
+    "||": 1,
+    "&&": 2,
+    "|": 3,
+    "^": 4,
+    "&": 5,
+    "==": 6,
+    "!=": 6,
+    "<": 7,
+    "<=": 7,
+    ">": 7,
+    ">=": 7,
+    "<<": 8,
+    ">>": 8,
+    "+": 9,
+    "-": 9,
+    "*": 10,
+    "/": 10,
+    "%": 10,
+    "**": 11,
+}
+
+_ASSIGNMENTS = {"=", "*=", "/=", "%=", "+=", "-=", "<<=", ">>=", "&=", "^=", "|="}
+
+
+class ExpressionError(ValueError):
+    """An arithmetic expression that cannot be parsed or evaluated."""
+
+
+def evaluate(expression: str, env: Environment) -> int:
+    """
+    Evaluate an arithmetic expression against shell variables.
+
+    Args:
+        expression: Expression text (without the surrounding $(( )))
+        env: Shell variables; assignments are written back as strings
+
+    Returns:
+        The value of the expression
+
+    Raises:
+        ExpressionError: for syntax errors, division by zero and the like
+    """
+    try:
+        return compile_expression(expression)(env)
+    except RecursionError:
+        raise ExpressionError("expression recursion level exceeded") from None
+
+
+def compile_expression(expression: str) -> Evaluator:
+    """Return the (cached) evaluator for an expression."""
+    return _compiled.get(expression)
+
+
+def _compile(expression: str) -> Evaluator:
+    return _Parser(expression).parse()
+
+
+# Compiled expressions, shared by all shells
+_compiled = LRUCache(_compile, maxsize=1024)
+
+
+def _wrap(value: int) -> int:
+    """Wrap a result to a 64-bit signed integer."""
+    if -_SIGN <= value < _SIGN:
+        return value
+    return ((value + _SIGN) & _MASK) - _SIGN
+
+
+def parse_number(text: str) -> int:
+    """
+    Convert a numeric literal (decimal, 0octal, 0xhex or base#digits).
+
+    Raises:
+        ExpressionError: if the digits are not valid in the base
+    """
+    try:
+        if "#" in text:
+            base_text, digits = text.split("#", 1)
+            base = int(base_text)
+            if not 2 <= base <= 64 or not digits:
+                raise ExpressionError(f"{text}: invalid arithmetic base")
+            value = 0
+            for char in digits:
+                digit = _digit_value(char, base)
+                if digit >= base:
+                    raise ValueError(char)
+                value = value * base + digit
+            return _wrap(value)
+        if text[:2] in ("0x", "0X"):
+            return _wrap(int(text[2:], 16))
+        if len(text) > 1 and text[0] == "0":
+            return _wrap(int(text, 8))
+        return _wrap(int(text))
+    except ValueError as e:
+        if isinstance(e, ExpressionError):
+            raise
+        raise ExpressionError(f"{text}: value too great for base") from None
+
+
+def _digit_value(char: str, base: int) -> int:
+    if char.isdigit():
+        return ord(char) - ord("0")
+    if "a" <= char <= "z":
+        return ord(char) - ord("a") + 10
+    if "A" <= char <= "Z":
+        return ord(char) - ord("A") + (36 if base > 36 else 10)
+    return 62 if char == "@" else 63
+
+
+def _variable(env: Environment, name: str) -> int:
+    """The numeric value of a shell variable."""
+    text = env.get(name)
+    if text is None:
+        return 0
+    text = text.strip()
+    if not text:
+        return 0
+    if text.isdigit() and (text[0] != "0" or len(text) == 1):
+        return _wrap(int(text))
+    return evaluate(text, env)
+
+
+def _divide(left: int, right: int) -> int:
+    """Integer division truncating toward zero, as in C."""
+    if right == 0:
+        raise ExpressionError("division by 0")
+    quotient = abs(left) // abs(right)
+    return _wrap(quotient if (left < 0) == (right < 0) else -quotient)
+
+
+def _remainder(left: int, right: int) -> int:
+    if right == 0:
+        raise ExpressionError("division by 0")
+    return _wrap(left - right * _divide(left, right))
+
+
+def _power(left: int, right: int) -> int:
+    if right < 0:
+        raise ExpressionError("exponent less than 0")
+    return _wrap(pow(left, right, 1 << 64))
+
+
+# Functions of the binary operators other than && and ||
+_OPERATIONS = {
+    "|": lambda a, b: a | b,
+    "^": lambda a, b: a ^ b,
+    "&": lambda a, b: a & b,
+    "==": lambda a, b: int(a == b),
+    "!=": lambda a, b: int(a != b),
+    "<": lambda a, b: int(a < b),
+    "<=": lambda a, b: int(a <= b),
+    ">": lambda a, b: int(a > b),
+    ">=": lambda a, b: int(a >= b),
+    "<<": lambda a, b: _wrap(a << (b & 63)),
+    ">>": lambda a, b: a >> (b & 63),
+    "+": lambda a, b: _wrap(a + b),
+    "-": lambda a, b: _wrap(a - b),
+    "*": lambda a, b: _wrap(a * b),
+    "/": _divide,
+    "%": _remainder,
+    "**": _power,
+}
+
+
+class _Parser:
+    """Precedence-climbing parser producing evaluator closures."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = self._tokenize(text)
+        self.pos = 0
+
+    def _tokenize(self, text: str) -> List[Tuple[str, str]]:
+        tokens = []
+        pos = 0
+        end = len(text.rstrip())
+        while pos < end:
+            match = _TOKEN.match(text, pos)
+            if match is None or match.end() == pos:
+                raise ExpressionError(
+                    f"{text}: syntax error: invalid arithmetic operator "
+                    f'(error token is "{text[pos:].strip()}")'
+                )
+            kind = match.lastgroup
+            value = match.group(kind)
+            if kind in ("braced", "dollar"):
+                kind = "variable"
+            tokens.append((kind, value))
+            pos = match.end()
+        return tokens
+
+    # Token access
+
+    def _peek(self) -> Optional[str]:
+        if self.pos < len(self.tokens):
+            kind, value = self.tokens[self.pos]
+            return value if kind == "op" else None
+        return None
+
+    def _error(self, message: str = "syntax error in expression") -> ExpressionError:
+        rest = " ".join(value for _, value in self.tokens[self.pos :])
+        return ExpressionError(f'{self.text}: {message} (error token is "{rest}")')
+
+    # Grammar
+
+    def parse(self) -> Evaluator:
+        if not self.tokens:
+            return lambda env: 0
+        evaluator, _ = self._comma()
+        if self.pos < len(self.tokens):
+            raise self._error()
+        return evaluator
+
+    def _comma(self) -> Tuple[Evaluator, Optional[str]]:
+        first, name = self._assignment()
+        while self._peek() == ",":
+            self.pos += 1
+            left = first
+            right, name = self._assignment()
+            first = _sequence(left, right)
+        return first, name
+
+    def _assignment(self) -> Tuple[Evaluator, Optional[str]]:
+        target, name = self._conditional()
+        op = self._peek()
+        if op not in _ASSIGNMENTS:
+            return target, name
+        if name is None:
+            raise self._error("attempted assignment to non-variable")
+        self.pos += 1
+        value, _ = self._assignment()
+        operation = None if op == "=" else _OPERATIONS[op[:-1]]
+        return _assign(name, value, operation), None
+
+    def _conditional(self) -> Tuple[Evaluator, Optional[str]]:
+        condition, name = self._binary(1)
+        if self._peek() != "?":
+            return condition, name
+        self.pos += 1
+        if_true, _ = self._assignment()
+        if self._peek() != ":":
+            raise self._error("expected `:' for conditional expression")
+        self.pos += 1
+        if_false, _ = self._conditional()
+        return (lambda env: if_true(env) if condition(env) else if_false(env)), None
+
+    def _binary(self, min_precedence: int) -> Tuple[Evaluator, Optional[str]]:
+        left, name = self._unary()
+        while True:
+            op = self._peek()
+            precedence = _PRECEDENCE.get(op) if op else None
+            if precedence is None or precedence < min_precedence:
+                return left, name
+            self.pos += 1
+            # ** groups to the right, everything else to the left
+            right, _ = self._binary(precedence if op == "**" else precedence + 1)
+            left, name = _binary(op, left, right), None
+
+    def _unary(self) -> Tuple[Evaluator, Optional[str]]:
+        op = self._peek()
+        if op in ("++", "--"):
+            self.pos += 1
+            _, name = self._unary()
+            if name is None:
+                raise self._error("operand expected")
+            return _increment(name, 1 if op == "++" else -1, prefix=True), None
+        if op in ("+", "-", "!", "~"):
+            self.pos += 1
+            operand, _ = self._unary()
+            if op == "-":
+                return (lambda env: _wrap(-operand(env))), None
+            if op == "!":
+                return (lambda env: int(not operand(env))), None
+            if op == "~":
+                return (lambda env: ~operand(env)), None
+            return operand, None
+        return self._postfix()
+
+    def _postfix(self) -> Tuple[Evaluator, Optional[str]]:
+        operand, name = self._primary()
+        op = self._peek()
+        if name is not None and op in ("++", "--"):
+            self.pos += 1
+            return _increment(name, 1 if op == "++" else -1, prefix=False), None
+        return operand, name
+
+    def _primary(self) -> Tuple[Evaluator, Optional[str]]:
+        if self.pos >= len(self.tokens):
+            raise self._error("syntax error: operand expected")
+        kind, value = self.tokens[self.pos]
+        if kind == "number":
+            self.pos += 1
+            number = parse_number(value)
+            return (lambda env: number), None
+        if kind in ("name", "variable"):
+            self.pos += 1
+            return (lambda env: _variable(env, value)), (
+                value if kind == "name" else None
+            )
+        if value == "(":
+            self.pos += 1
+            inner, _ = self._comma()
+            if self._peek() != ")":
+                raise self._error("missing `)'")
+            self.pos += 1
+            return inner, None
+        raise self._error("syntax error: operand expected")
+
+
+def _sequence(left: Evaluator, right: Evaluator) -> Evaluator:
+    def evaluator(env: Environment) -> int:
+        left(env)
+        return right(env)
+
+    return evaluator
+
+
+def _binary(op: str, left: Evaluator, right: Evaluator) -> Evaluator:
+    if op == "&&":
+        return lambda env: int(bool(left(env)) and bool(right(env)))
+    if op == "||":
+        return lambda env: int(bool(left(env)) or bool(right(env)))
+    operation = _OPERATIONS[op]
+    return lambda env: operation(left(env), right(env))
+
+
+def _assign(
+    name: str, value: Evaluator, operation: Optional[Callable[[int, int], int]]
+) -> Evaluator:
+    def evaluator(env: Environment) -> int:
+        if operation is None:
+            result = value(env)
+        else:
+            result = operation(_variable(env, name), value(env))
+        env[name] = str(result)
+        return result
+
+    return evaluator
+
+
+def _increment(name: str, step: int, prefix: bool) -> Evaluator:
+    def evaluator(env: Environment) -> int:
+        old = _variable(env, name)
+        new = _wrap(old + step)
+        env[name] = str(new)
+        return new if prefix else old
+
+    return evaluator
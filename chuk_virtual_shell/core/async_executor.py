@@ -0,0 +1,187 @@
+# chuk_virtual_shell/core/async_executor.py
+"""
+chuk_virtual_shell/core/async_executor.py - Async command execution
+
+AsyncCommandExecutor runs command lines from a coroutine without blocking
+the event loop. It walks the same plan as CommandExecutor and reuses its
+expansion, assignment, operator and redirection code, so a line gives the
+same output, return codes and side effects either way:
+
+* Commands that implement execute_async() (MCP tools, agents, sleep) are
+  awaited on the caller's loop.
+* Other commands, and expansions that run command substitutions, are
+  handed to a thread pool; the loop serves other sessions meanwhile.
+* Pipelines and control flow structures run as a whole on the thread
+  pool through the synchronous code paths. Async commands inside them use
+  the worker thread's own loop (see async_runner).
+
+The commands of one shell still run one after another; it is separate
+shells (sessions) that interleave on one loop.
+"""
+
+import asyncio
+import time
+from concurrent.futures import Executor
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from chuk_virtual_shell.core.command_ast import (
+    ArithmeticCommand,
+    CommandList,
+    Node,
+    SimpleCommand,
+    plan_cache,
+)
+from chuk_virtual_shell.core.executor import CommandExecutor
+from chuk_virtual_shell.core.words import CompiledCommand
+
+if TYPE_CHECKING:
+    from chuk_virtual_shell.shell_interpreter import ShellInterpreter
+
+
+class AsyncCommandExecutor(CommandExecutor):
+    """Executes command lines from coroutines, awaiting async commands."""
+
+    def __init__(self, shell: "ShellInterpreter", pool: Optional[Executor] = None):
+        """
+        Args:
+            shell: Shell the commands run in
+            pool: Executor for synchronous work (the loop's default if None)
+        """
+        super().__init__(shell)
+        self.pool = pool
+
+    async def execute_line_async(self, cmd_line: str) -> str:
+        """
+        Execute a command line without blocking the event loop.
+
+        Args:
+            cmd_line: Full command line to execute
+
+        Returns:
+            Command output or error message, as execute_line() gives it
+        """
+        cmd_line = cmd_line.strip()
+        if not cmd_line:
+            return ""
+
+        # Handle exit command
+        if cmd_line == "exit":
+            self.shell.running = False
+            return "Goodbye!"
+
+        return await self.execute_node_async(plan_cache.get(cmd_line))
+
+    async def execute_node_async(self, node: Node, expand_aliases: bool = True) -> str:
+        """
+        Execute a parsed command line node without blocking the event loop.
+
+        Args:
+            node: AST node produced by the command line parser
+            expand_aliases: Whether aliases are expanded for this node
+
+        Returns:
+            Command output
+        """
+        if isinstance(node, CommandList):
+            return await self._execute_list_async(node, expand_aliases)
+        if isinstance(node, SimpleCommand):
+            return await self._execute_command_async(node, expand_aliases)
+        if isinstance(node, ArithmeticCommand):
+            return "".join(self._stream_arithmetic(node))
+
+        # Pipelines and control flow run on a worker thread as a whole
+        return await self._in_thread(self.execute_node, node, expand_aliases)
+
+    async def _execute_list_async(self, node: CommandList, expand_aliases: bool) -> str:
+        """Execute commands joined by &&, || and semicolons."""
+        outputs = []
+        skip_next = False
+
+        for item, operator in node.items:
+            # Stop at a command boundary when an interrupt was requested
+            if getattr(self.shell, "_interrupted", False):
+                break
+
+            if skip_next:
+                skip_next = False
+                continue
+
+            output = await self.execute_node_async(item, expand_aliases)
+            if output:
+                outputs.append(output)
+            skip_next = self._skips_next(operator)
+
+        return "\n".join(outputs)
+
+    async def _execute_command_async(
+        self, node: SimpleCommand, expand_aliases: bool
+    ) -> str:
+        """
+        Execute a single command, awaiting it if it is async.
+
+        Args:
+            node: Parsed simple command
+            expand_aliases: Whether the first word may be an alias
+
+        Returns:
+            Command output
+        """
+        if expand_aliases:
+            aliased = self._expand_alias(node)
+            if aliased is not None:
+                return await self.execute_node_async(aliased, expand_aliases=False)
+
+        # Command substitutions run commands, so expand those off the loop
+        if "$(" in node.text or "`" in node.text:
+            compiled = await self._in_thread(self.expansion.expand_command, node.text)
+        else:
+            compiled = self.expansion.expand_command(node.text)
+
+        command = None
+        if compiled is not None and compiled.name:
+            command = self.shell.commands.get(compiled.name)
+        if command is None or not command.has_async():
+            # Lines that cannot be tokenized take the synchronous path too
+            return await self._in_thread(self._execute_sync, node, compiled)
+
+        with self._assigned(compiled.assignments):
+            return await self._execute_compiled_async(compiled)
+
+    def _execute_sync(
+        self, node: SimpleCommand, compiled: Optional[CompiledCommand]
+    ) -> str:
+        """Run a command the way CommandExecutor does (on a worker thread)."""
+        if compiled is None:
+            return self.execute_node(node, expand_aliases=False)
+        return "".join(self._stream_compiled(compiled))
+
+    async def _execute_compiled_async(self, compiled: CompiledCommand) -> str:
+        """
+        Await an async command with possible redirection.
+
+        Mirrors CommandExecutor._execute_compiled() with the command awaited
+        through ShellCommand.run_async() instead of called through run().
+
+        Args:
+            compiled: Expanded command
+
+        Returns:
+            Command output
+        """
+        early = self._prepare_compiled(compiled)
+        if early is not None:
+            return early
+
+        # Track command timing if enabled
+        start_time = time.time() if self.shell.enable_timing else None
+        try:
+            command = self.shell.commands[compiled.name]
+            result = await command.run_async(list(compiled.args))
+            return self._complete_compiled(compiled, result, start_time)
+        except Exception as e:
+            return self._command_failed(compiled, e)
+
+    async def _in_thread(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run blocking shell work on the thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pool, func, *args)
@@ -0,0 +1,92 @@
+# chuk_virtual_shell/core/async_runner.py
+"""
+chuk_virtual_shell/core/async_runner.py - Running coroutines from sync code
+
+ShellCommand.run() needs the result of a command's execute_async() from
+synchronous code. Creating and closing an event loop for every call costs
+more than many commands do, so run_sync() reuses loops:
+
+* A thread with no running loop gets one loop of its own, created on first
+  use and kept for the life of the thread; the coroutine runs on it.
+* A thread that is inside a running loop cannot run the coroutine on that
+  loop while it blocks waiting for the result. The coroutine goes to a
+  background loop on a daemon thread instead. Background loops form a
+  chain: code blocking on background loop N hands its coroutine to loop
+  N + 1, so a loop is never asked to run work it is itself waiting for.
+
+Async callers should await ShellCommand.run_async() rather than block.
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Any, Coroutine, List
+
+_local = threading.local()
+
+_background: List[asyncio.AbstractEventLoop] = []
+_background_lock = threading.Lock()
+
+
+def run_sync(coroutine: Coroutine) -> Any:
+    """
+    Run a coroutine to completion and return its result.
+
+    Args:
+        coroutine: Coroutine to run (it is always consumed)
+
+    Returns:
+        The coroutine's result; its exceptions propagate
+    """
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is None:
+        return thread_loop().run_until_complete(coroutine)
+
+    loop = _background_loop(_chain_level(running) + 1)
+    return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+
+def thread_loop() -> asyncio.AbstractEventLoop:
+    """Return the calling thread's own event loop, creating it if needed."""
+    loop = getattr(_local, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        _local.loop = loop
+        # Close the loop once its thread is gone
+        weakref.finalize(threading.current_thread(), _close_loop, loop)
+    return loop
+
+
+def _close_loop(loop: asyncio.AbstractEventLoop) -> None:
+    if not loop.is_running() and not loop.is_closed():
+        loop.close()
+
+
+def _chain_level(loop: asyncio.AbstractEventLoop) -> int:
+    """Position of loop in the background chain; -1 for other loops."""
+    with _background_lock:
+        for level, background in enumerate(_background):
+            if background is loop:
+                return level
+    return -1
+
+
+def _background_loop(level: int) -> asyncio.AbstractEventLoop:
+    """Return background loop number level, starting it if needed."""
+    with _background_lock:
+        while len(_background) <= level:
+            _background.append(_start_loop(len(_background)))
+        if _background[level].is_closed():
+            _background[level] = _start_loop(level)
+        return _background[level]
+
+
+def _start_loop(level: int) -> asyncio.AbstractEventLoop:
+    loop = asyncio.new_event_loop()
+    threading.Thread(
+        target=loop.run_forever, daemon=True, name=f"command-loop-{level}"
+    ).start()
+    return loop
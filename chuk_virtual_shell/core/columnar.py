@@ -0,0 +1,228 @@
+# chuk_virtual_shell/core/columnar.py
+"""
+chuk_virtual_shell/core/columnar.py - Column-at-a-time helpers for text commands
+
+Large inputs to awk, sort, uniq and wc are split into lines and field columns
+once; sums, counts, group-bys, sort keys and run lengths are then computed
+over whole columns. NumPy is used for the aggregations when it is installed
+and the input is large enough to pay for the conversion; otherwise the same
+operations run on built-in sequences using C-level helpers (map, Counter,
+itertools) instead of per-line Python code.
+"""
+
+import gc
+import math
+import operator
+import re
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+from itertools import compress, islice
+from typing import Callable, Dict, List, Optional, Pattern, Sequence, Tuple
+
+try:
+    import numpy as np  # type: ignore
+
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+# Inputs with fewer rows stay on the built-in path even when NumPy is present
+NUMPY_MIN_ROWS = 50_000
+
+# Leading number of a value as awk reads it ("12abc" -> 12)
+AWK_NUMBER = re.compile(r"[ \t\n]*[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?", re.ASCII)
+
+
+@contextmanager
+def gc_paused():
+    """
+    Pause the cyclic garbage collector around bulk allocation.
+
+    Splitting a million lines allocates a million short-lived lists; with the
+    collector running, most of the time goes into collections that find
+    nothing to free.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def use_numpy(size: int) -> bool:
+    """Whether a column of this size should be processed with NumPy."""
+    return HAS_NUMPY and size >= NUMPY_MIN_ROWS
+
+
+def to_numbers(
+    values: Sequence[str],
+    number: Pattern = AWK_NUMBER,
+    reject: Optional[Pattern] = None,
+) -> "array":
+    """
+    Convert a column of strings to floats, using the leading number of each.
+
+    The whole column is first converted with float() in one C-level pass.
+    That result is kept only if it matches what the per-value regex would
+    give. It must be plain ASCII with no underscores and a finite total,
+    and ``reject`` must not match the joined text. Otherwise each value is
+    matched with ``number``; values without a leading number become 0.
+
+    Args:
+        values: Column of strings
+        number: Regex matching the leading number of a value
+        reject: Regex that flags text float() reads differently from number
+
+    Returns:
+        array('d') of the converted values
+    """
+    if values:
+        try:
+            numbers = array("d", map(float, values))
+        except ValueError:
+            numbers = None
+        if numbers is not None:
+            text = "\n".join(values)
+            if (
+                text.isascii()
+                and "_" not in text
+                and math.isfinite(sum(numbers))
+                and (reject is None or not reject.search(text))
+            ):
+                return numbers
+
+    match = number.match
+    return array("d", [float(m.group()) if m else 0.0 for m in map(match, values)])
+
+
+def total(numbers: Sequence[float]) -> float:
+    """Sum a numeric column."""
+    if use_numpy(len(numbers)):
+        return float(np.frombuffer(numbers, dtype=np.float64).sum())
+    return float(sum(numbers))
+
+
+def split_on(separator: str) -> Callable[[str], List[str]]:
+    """Return a splitter on a literal separator that ColumnTable can shortcut."""
+
+    def split(line):
+        return line.split(separator)
+
+    split.separator = separator
+    return split
+
+
+class ColumnTable:
+    """Input lines with field columns split out on demand."""
+
+    def __init__(
+        self, lines: List[str], splitter: Callable[[str], List[str]] = str.split
+    ):
+        """
+        Initialize the table.
+
+        Args:
+            lines: Input records
+            splitter: Function splitting a record into fields
+        """
+        self.lines = lines
+        # A splitter may carry a ``separator`` attribute naming the literal
+        # string it splits on
+        self.splitter = splitter
+        self._columns: Dict[int, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def column(self, index: int) -> List[str]:
+        """
+        Return one field of every line.
+
+        Args:
+            index: 1-based field number; 0 is the whole line
+
+        Returns:
+            List of field values, "" where a line has too few fields
+        """
+        if index == 0:
+            return self.lines
+        column = self._columns.get(index)
+        if column is None:
+            # Split rows are not kept; each requested column re-splits,
+            # stopping after the field it needs when the separator allows
+            splitter = self.splitter
+            if splitter is str.split:
+                splitter = operator.methodcaller("split", None, index)
+            elif hasattr(splitter, "separator"):
+                splitter = operator.methodcaller("split", splitter.separator, index)
+            with gc_paused():
+                rows = map(splitter, self.lines)
+                try:
+                    column = list(map(operator.itemgetter(index - 1), rows))
+                except IndexError:
+                    column = [
+                        row[index - 1] if len(row) >= index else ""
+                        for row in map(splitter, self.lines)
+                    ]
+            self._columns[index] = column
+        return column
+
+    def numbers(self, index: int) -> "array":
+        """Return a field converted to numbers the way awk reads them."""
+        return to_numbers(self.column(index))
+
+    def sum(self, index: int) -> float:
+        """Sum a field over all lines."""
+        return total(self.numbers(index))
+
+    def group_count(self, key_index: int) -> Dict[str, int]:
+        """Count lines per distinct key, in order of first appearance."""
+        return dict(Counter(self.column(key_index)))
+
+    def group_sum(self, key_index: int, value_index: int) -> Dict[str, float]:
+        """Sum a field per distinct key, in order of first appearance."""
+        keys = self.column(key_index)
+        values = self.numbers(value_index)
+        # A dict accumulation beats np.unique here: sorting string keys
+        # costs more than hashing them
+        totals: Dict[str, float] = {}
+        get = totals.get
+        for key, value in zip(keys, values):
+            totals[key] = get(key, 0.0) + value
+        return totals
+
+
+def sort_order(keys: Sequence, reverse: bool = False) -> List[int]:
+    """
+    Return the stable sorting permutation of a key column.
+
+    Equal keys keep their input order, also when reversing.
+    """
+    if isinstance(keys, array) and use_numpy(len(keys)):
+        numbers = np.frombuffer(keys, dtype=np.float64)
+        return np.argsort(-numbers if reverse else numbers, kind="stable").tolist()
+    return sorted(range(len(keys)), key=keys.__getitem__, reverse=reverse)
+
+
+def run_lengths(keys: Sequence) -> Tuple[List[int], List[int]]:
+    """
+    Find runs of equal adjacent keys.
+
+    Returns:
+        (starts, counts): index of the first line of each run and its length
+    """
+    size = len(keys)
+    if not size:
+        return [], []
+    # Comparing neighbours with map() is faster than building a NumPy object
+    # array from string keys, so there is no NumPy path here
+    starts = [0]
+    starts.extend(
+        compress(range(1, size), map(operator.ne, keys, islice(keys, 1, None)))
+    )
+    counts = list(map(operator.sub, starts[1:] + [size], starts))
+    return starts, counts
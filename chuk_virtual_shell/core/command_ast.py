@@ -0,0 +1,574 @@
+# chuk_virtual_shell/core/command_ast.py
+"""
+chuk_virtual_shell/core/command_ast.py - Command line tokenizer and AST
+
+Splits a raw command line into a tree of lists, pipelines, simple commands,
+brace groups, function definitions and control-flow blocks in a single
+quote-aware scan. Parsing happens before
+any expansion, so the resulting plan only depends on the line text and can
+be cached and reused every time the same line is executed.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from enum import Enum
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+
+class TokenKind(Enum):
+    """Kinds of tokens produced by the line tokenizer."""
+
+    WORD = "word"
+    OPERATOR = "operator"
+
+
+@dataclass(frozen=True)
+class LineToken:
+    """A word or operator with its span in the source line."""
+
+    kind: TokenKind
+    text: str
+    start: int
+    end: int
+    # Span of the here-document body read by a << in this word
+    heredoc: Optional[Tuple[int, int]] = None
+
+
+@dataclass(frozen=True)
+class SimpleCommand:
+    """A single command with its arguments and redirections (unexpanded)."""
+
+    text: str
+    first_word: str
+
+
+@dataclass(frozen=True)
+class BraceGroup:
+    """A { list; } group run in the current shell, with its redirections."""
+
+    body: "Node"
+    redirections: str
+    text: str
+
+
+@dataclass(frozen=True)
+class FunctionDefinition:
+    """A function definition: name() { list; } or function name { list; }."""
+
+    name: str
+    body: BraceGroup
+    text: str
+
+
+@dataclass(frozen=True)
+class Pipeline:
+    """Commands (or brace groups) connected by pipes."""
+
+    stages: Tuple[Union[SimpleCommand, BraceGroup], ...]
+    text: str
+
+
+@dataclass(frozen=True)
+class ControlFlow:
+    """An if/for/while/until/case block, executed as a unit."""
+
+    keyword: str
+    text: str
+
+
+@dataclass(frozen=True)
+class ArithmeticCommand:
+    """An arithmetic command ((expression))."""
+
+    expression: str
+    text: str
+
+
+@dataclass(frozen=True)
+class CommandList:
+    """Commands joined by &&, || and ; (operator follows each item)."""
+
+    items: Tuple[Tuple["Node", str], ...]
+    text: str
+
+
+Node = Union[
+    SimpleCommand,
+    Pipeline,
+    ControlFlow,
+    CommandList,
+    ArithmeticCommand,
+    BraceGroup,
+    FunctionDefinition,
+]
+
+
+class LineTokenizer:
+    """Quote-aware tokenizer for a single command line."""
+
+    OPERATORS = ("&&", "||", "|", ";")
+
+    def tokenize(self, line: str) -> List[LineToken]:
+        """
+        Tokenize a command line into words and control operators.
+
+        Quotes, backslash escapes, command substitutions and arithmetic
+        commands ((...)) are kept inside words, so operators within them are
+        ignored. Here-document bodies are not tokenized either; their span is
+        attached to the word holding the << operator.
+
+        Args:
+            line: Raw command line
+
+        Returns:
+            List of LineToken objects
+        """
+        tokens: List[LineToken] = []
+        # Delimiters waiting for a body, with the index of their word token
+        pending_heredocs: List[Tuple[str, int]] = []
+        word_start: Optional[int] = None
+        length = len(line)
+        i = 0
+
+        while i < length:
+            char = line[i]
+
+            if char in " \t\n":
+                if word_start is not None:
+                    tokens.append(self._word(line, word_start, i))
+                    word_start = None
+                if char == "\n" and pending_heredocs:
+                    i += 1
+                    for delimiter, index in pending_heredocs:
+                        body_end = self._skip_heredoc_body(line, i, delimiter)
+                        tokens[index] = replace(tokens[index], heredoc=(i, body_end))
+                        i = body_end
+                    pending_heredocs = []
+                    continue
+                i += 1
+                continue
+
+            operator = self._match_operator(line, i)
+            if operator:
+                if word_start is not None:
+                    tokens.append(self._word(line, word_start, i))
+                    word_start = None
+                tokens.append(
+                    LineToken(TokenKind.OPERATOR, operator, i, i + len(operator))
+                )
+                i += len(operator)
+                continue
+
+            if word_start is None:
+                word_start = i
+
+            if char == "\\":
+                i += 2
+            elif char == "'":
+                i = self._skip_single_quotes(line, i)
+            elif char == '"':
+                i = self._skip_double_quotes(line, i)
+            elif char == "$" and line.startswith("$(", i):
+                i = self._skip_parens(line, i + 1)
+            elif char == "(" and i == word_start and line.startswith("((", i):
+                i = self._skip_parens(line, i)
+            elif char == "`":
+                i = self._skip_backticks(line, i)
+            elif (
+                char == "<"
+                and line.startswith("<<", i)
+                and not line.startswith("<<<", i)
+            ):
+                i, delimiter = self._read_heredoc_delimiter(line, i)
+                if delimiter:
+                    pending_heredocs.append((delimiter, len(tokens)))
+                    # The delimiter ends the word holding the << operator
+                    tokens.append(self._word(line, word_start, i))
+                    word_start = None
+            else:
+                i += 1
+
+        if word_start is not None:
+            tokens.append(self._word(line, word_start, min(i, length)))
+
+        return tokens
+
+    @staticmethod
+    def _word(line: str, start: int, end: int) -> LineToken:
+        return LineToken(TokenKind.WORD, line[start:end], start, end)
+
+    def _match_operator(self, line: str, i: int) -> Optional[str]:
+        """Return the control operator starting at i, if any."""
+        for operator in self.OPERATORS:
+            if line.startswith(operator, i):
+                # Keep redirections such as 2>&1, &> and >& inside words
+                if operator == "&&" or operator == "||":
+                    return operator
+                if operator == "|" and i > 0 and line[i - 1] == ">":
+                    return None
+                return operator
+        return None
+
+    @staticmethod
+    def _skip_single_quotes(line: str, i: int) -> int:
+        end = line.find("'", i + 1)
+        return len(line) if end == -1 else end + 1
+
+    @staticmethod
+    def _skip_double_quotes(line: str, i: int) -> int:
+        i += 1
+        while i < len(line):
+            if line[i] == "\\":
+                i += 2
+                continue
+            if line[i] == '"':
+                return i + 1
+            i += 1
+        return len(line)
+
+    def _skip_parens(self, line: str, i: int) -> int:
+        """Skip a balanced (...) group starting at i, honouring quotes."""
+        depth = 0
+        while i < len(line):
+            char = line[i]
+            if char == "\\":
+                i += 2
+                continue
+            if char == "'":
+                i = self._skip_single_quotes(line, i)
+                continue
+            if char == '"':
+                i = self._skip_double_quotes(line, i)
+                continue
+            if char == "(":
+                depth += 1
+            elif char == ")":
+                depth -= 1
+                if depth == 0:
+                    return i + 1
+            i += 1
+        return len(line)
+
+    @staticmethod
+    def _skip_backticks(line: str, i: int) -> int:
+        i += 1
+        while i < len(line):
+            if line[i] == "\\":
+                i += 2
+                continue
+            if line[i] == "`":
+                return i + 1
+            i += 1
+        return len(line)
+
+    @staticmethod
+    def _read_heredoc_delimiter(line: str, i: int) -> Tuple[int, Optional[str]]:
+        """Read the delimiter following << or <<-, returning (end, delimiter)."""
+        i += 2
+        if i < len(line) and line[i] == "-":
+            i += 1
+        while i < len(line) and line[i] in " \t":
+            i += 1
+        start = i
+        while i < len(line) and line[i] not in " \t\n;|&<>":
+            i += 1
+        delimiter = line[start:i].strip("'\"")
+        return i, delimiter or None
+
+    @staticmethod
+    def _skip_heredoc_body(line: str, i: int, delimiter: str) -> int:
+        """Skip a here-document body starting at i; returns the index after it."""
+        while i < len(line):
+            end = line.find("\n", i)
+            if end == -1:
+                end = len(line)
+            current = line[i:end]
+            i = end + 1
+            if current.strip() == delimiter:
+                break
+        return min(i, len(line))
+
+
+class CommandLineParser:
+    """Builds the AST for a command line from LineTokenizer output."""
+
+    LIST_OPERATORS = {"&&", "||", ";"}
+
+    # Keywords that open a block and the keyword that closes it
+    BLOCK_OPENERS = {
+        "if": "fi",
+        "for": "done",
+        "while": "done",
+        "until": "done",
+        "case": "esac",
+        "{": "}",
+    }
+
+    # Lines starting with these are handed to the control-flow executor
+    CONTROL_KEYWORDS = {"if", "for", "while", "until", "case"}
+
+    # Function names that can be defined (as with variables)
+    FUNCTION_NAME = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+    # After these keywords the next word is again in command position
+    COMMAND_PREFIX_KEYWORDS = {
+        "if",
+        "then",
+        "elif",
+        "else",
+        "do",
+        "while",
+        "until",
+        "{",
+    }
+
+    def __init__(self):
+        self.tokenizer = LineTokenizer()
+
+    def parse(self, line: str) -> Node:
+        """
+        Parse a command line into an AST.
+
+        Args:
+            line: Raw command line (before any expansion)
+
+        Returns:
+            The root node of the parsed line
+        """
+        tokens = self.tokenizer.tokenize(line)
+
+        items: List[Tuple[List[Tuple[LineToken, int]], str]] = []
+        current: List[Tuple[LineToken, int]] = []
+        # Closers expected for the blocks currently open, innermost last
+        open_blocks: List[str] = []
+        command_position = True
+        function_name = False
+
+        for token in tokens:
+            if token.kind == TokenKind.OPERATOR:
+                command_position = True
+                if not open_blocks and token.text in self.LIST_OPERATORS:
+                    if current:
+                        items.append((current, token.text))
+                    current = []
+                    continue
+                current.append((token, len(open_blocks)))
+                continue
+
+            if function_name:
+                # The body of "function name" follows in command position
+                function_name = False
+                command_position = True
+            elif command_position:
+                if token.text in self.BLOCK_OPENERS:
+                    open_blocks.append(self.BLOCK_OPENERS[token.text])
+                elif open_blocks and token.text == open_blocks[-1]:
+                    open_blocks.pop()
+                function_name = token.text == "function"
+                # So does the body of "name()"
+                command_position = (
+                    token.text in self.COMMAND_PREFIX_KEYWORDS
+                    or token.text.endswith("()")
+                )
+            current.append((token, len(open_blocks)))
+
+        if current:
+            items.append((current, ""))
+
+        nodes = [(self._build_item(line, item), operator) for item, operator in items]
+        if not nodes:
+            return SimpleCommand(text="", first_word="")
+        if len(nodes) == 1 and not nodes[0][1]:
+            return nodes[0][0]
+        return CommandList(items=tuple(nodes), text=line)
+
+    def _build_item(self, line: str, item: List[Tuple[LineToken, int]]) -> Node:
+        """Build the node for one list item (a pipeline or a single command)."""
+        end = max(self._token_end(token) for token, _ in item)
+        text = line[item[0][0].start : end]
+        first_word = item[0][0].text
+
+        if first_word in self.CONTROL_KEYWORDS:
+            return ControlFlow(keyword=first_word, text=text)
+        if len(item) == 1 and first_word.startswith("((") and text.endswith("))"):
+            return ArithmeticCommand(expression=text[2:-2], text=text)
+        if first_word == "function" or (
+            first_word.endswith("()") and len(first_word) > 2
+        ):
+            definition = self._build_function(line, item)
+            if definition is not None:
+                return definition
+
+        stages: List[Union[SimpleCommand, BraceGroup]] = []
+        stage_tokens: List[Tuple[LineToken, int]] = []
+        for token, depth in item:
+            if token.kind == TokenKind.OPERATOR and token.text == "|" and depth == 0:
+                if stage_tokens:
+                    stages.append(self._build_stage(line, stage_tokens))
+                stage_tokens = []
+            else:
+                stage_tokens.append((token, depth))
+        if stage_tokens:
+            stages.append(self._build_stage(line, stage_tokens))
+
+        if len(stages) == 1:
+            return stages[0]
+        return Pipeline(stages=tuple(stages), text=text)
+
+    def _build_stage(
+        self, line: str, tokens: List[Tuple[LineToken, int]]
+    ) -> Union[SimpleCommand, BraceGroup]:
+        """Build one pipeline stage: a brace group or a simple command."""
+        if tokens[0][0].text == "{":
+            group = self._build_group(line, tokens)
+            if group is not None:
+                return group
+        return self._build_simple(line, [token for token, _ in tokens])
+
+    def _build_group(
+        self, line: str, tokens: List[Tuple[LineToken, int]]
+    ) -> Optional[BraceGroup]:
+        """
+        Build a { list; } group from its tokens (starting with "{").
+
+        Words after the closing "}" are the group's redirections. Returns
+        None for an unclosed or empty group, or one followed by other words.
+        """
+        outer = tokens[0][1] - 1
+        close = next(
+            (i for i, (_, depth) in enumerate(tokens) if i and depth == outer), None
+        )
+        if close is None or tokens[close][0].text != "}":
+            return None
+        rest = [token for token, _ in tokens[close + 1 :]]
+        if any(token.kind == TokenKind.OPERATOR for token in rest):
+            return None
+        body = line[tokens[0][0].end : tokens[close][0].start].strip()
+        if not body:
+            return None
+        end = max([self._token_end(token) for token in rest] + [tokens[close][0].end])
+        return BraceGroup(
+            body=self.parse(body),
+            redirections=line[rest[0].start : end] if rest else "",
+            text=line[tokens[0][0].start : end],
+        )
+
+    def _build_function(
+        self, line: str, item: List[Tuple[LineToken, int]]
+    ) -> Optional[FunctionDefinition]:
+        """Build "name() { list; }" or "function name [()] { list; }"."""
+        first = item[0][0]
+        if first.text == "function":
+            if len(item) < 2:
+                return None
+            name = item[1][0].text
+            body = item[2:]
+            if name.endswith("()"):
+                name = name[:-2]
+            elif body and body[0][0].text == "()":
+                body = body[1:]
+        else:
+            name, body = first.text[:-2], item[1:]
+        if not self.FUNCTION_NAME.fullmatch(name) or not body:
+            return None
+        if body[0][0].text != "{":
+            return None
+        group = self._build_group(line, body)
+        if group is None:
+            return None
+        end = max(self._token_end(token) for token, _ in body)
+        return FunctionDefinition(name=name, body=group, text=line[first.start : end])
+
+    @staticmethod
+    def _token_end(token: LineToken) -> int:
+        """Return the end of a token, including its here-document body."""
+        return token.heredoc[1] if token.heredoc else token.end
+
+    @staticmethod
+    def _build_simple(line: str, tokens: List[LineToken]) -> SimpleCommand:
+        """
+        Build a simple command from its tokens.
+
+        Here-document bodies that follow later words on the line (as in
+        "cat <<EOF | grep x") are appended after a newline, so the command
+        text carries its own body.
+        """
+        end = tokens[-1].end
+        text = line[tokens[0].start : end]
+        bodies = [
+            line[start:stop]
+            for start, stop in (token.heredoc for token in tokens if token.heredoc)
+            if start >= end
+        ]
+        if bodies:
+            text += "\n" + "".join(bodies)
+        return SimpleCommand(text=text, first_word=tokens[0].text)
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache that computes missing entries."""
+
+    def __init__(self, loader: Callable, maxsize: int = 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            loader: Function computing the value for a missing key
+            maxsize: Maximum number of entries kept
+        """
+        self.loader = loader
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value for key, computing it on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = self.loader(key)
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and the current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def parse_line(line: str) -> Node:
+    """Parse a command line into an AST (uncached)."""
+    return CommandLineParser().parse(line)
+
+
+# Parsed plans are pure functions of the line text, so one cache is shared
+# by every interpreter in the process.
+plan_cache = LRUCache(parse_line, maxsize=1024)
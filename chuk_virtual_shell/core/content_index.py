@@ -0,0 +1,305 @@
+# chuk_virtual_shell/core/content_index.py
+"""
+chuk_virtual_shell/core/content_index.py - Path and trigram index for a filesystem
+
+The index mirrors the directory tree, with the children of each directory
+kept in listing order, and stores the set of byte trigrams of every indexed
+file. Searches use it to list a subtree without asking the provider and to
+skip files that cannot contain a literal string.
+
+FileSystemCompat keeps the index current. Content passed to write_file is
+indexed directly; every other mutation marks the affected path dirty, and
+dirty paths are re-read from the filesystem before the next query.
+
+Memory is bounded. Files larger than ``max_file_size``, and files that
+would take the total past ``max_trigrams`` stored trigrams, are listed
+but not content-indexed. Such files are always search candidates.
+"""
+
+import posixpath
+import threading
+import time
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+# Files read per batch while (re)building
+READ_BATCH = 256
+
+Trigram = Tuple[int, int, int]
+
+
+def trigrams(data: bytes) -> Set[Trigram]:
+    """Return the set of byte trigrams of data."""
+    return set(zip(data, data[1:], data[2:]))
+
+
+def index_bytes(content: Any) -> bytes:
+    """
+    Bytes that are indexed for a file: UTF-8 with ASCII letters lowercased.
+
+    Lowercasing only ASCII keeps every substring of the text a substring of
+    the indexed bytes, whatever the case of the search string.
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8", "surrogatepass")
+    return bytes(content).lower()
+
+
+class ContentIndex:
+    """Directory tree and per-file trigram sets for one filesystem."""
+
+    def __init__(self, max_file_size: int = 1024 * 1024, max_trigrams: int = 4_000_000):
+        """
+        Initialize an empty index; it is built on the first sync().
+
+        Args:
+            max_file_size: Larger files are not content-indexed
+            max_trigrams: Total trigrams stored over all files
+        """
+        self.max_file_size = max_file_size
+        self.max_trigrams = max_trigrams
+        # directory path -> {child name: is_dir}, in listing order
+        self.children: Dict[str, Dict[str, bool]] = {}
+        # file path -> trigrams; files without an entry are not indexed
+        self.grams: Dict[str, FrozenSet[Trigram]] = {}
+        # indexed files with non-ASCII content (see candidates())
+        self.non_ascii: Set[str] = set()
+        self.trigram_count = 0
+        self.built_at: Optional[float] = None
+        self._shared: Dict[Trigram, Trigram] = {}
+        self._dirty: Set[str] = {"/"}
+        self._relist: Set[str] = set()
+        self._lock = threading.RLock()
+
+    # Change tracking
+
+    def mark_dirty(self, path: str) -> None:
+        """Re-read path (and everything below it) before the next query."""
+        with self._lock:
+            if path == "/":
+                # Rebuild from scratch instead of diffing the whole tree
+                self.children.clear()
+                self.grams.clear()
+                self.non_ascii.clear()
+                self._shared.clear()
+                self._relist.clear()
+                self.trigram_count = 0
+                self._dirty = {"/"}
+            else:
+                self._dirty.add(path)
+
+    def update_file(self, path: str, content: Any) -> None:
+        """Index content just written to path."""
+        with self._lock:
+            parent, name = posixpath.split(path)
+            siblings = self.children.get(parent)
+            if siblings is None or siblings.get(name) or not name:
+                # Unknown parent or a directory of that name: re-read it
+                self._dirty.add(path)
+                return
+            self._dirty.discard(path)
+            if name not in siblings:
+                siblings[name] = False
+                # The provider decides where a new entry is listed
+                self._relist.add(parent)
+            self._put_content(path, content)
+
+    # Queries
+
+    def sync(self, fs) -> None:
+        """
+        Bring dirty paths up to date.
+
+        Args:
+            fs: FileSystemCompat the index belongs to (get_node_info,
+                scan_dir and read_many are used)
+        """
+        with self._lock:
+            while self._dirty or self._relist:
+                done: List[str] = []
+                dirty = sorted(self._dirty, key=lambda p: p.count("/"))
+                self._dirty = set()
+                for path in dirty:
+                    if any(_is_below(path, ancestor) for ancestor in done):
+                        continue
+                    self._resync(fs, path)
+                    done.append(path)
+                relist, self._relist = self._relist, set()
+                for directory in relist:
+                    self._relist_dir(fs, directory)
+            if self.built_at is None:
+                self.built_at = time.time()
+
+    def kind(self, path: str) -> Optional[bool]:
+        """Return True for an indexed directory, False for a file, else None."""
+        if path in self.children:
+            return True
+        parent, name = posixpath.split(path)
+        siblings = self.children.get(parent)
+        if siblings is not None and name in siblings:
+            return siblings[name]
+        return None
+
+    def candidates(
+        self, paths: Iterable[str], needles: List[str], ignore_case: bool = False
+    ) -> List[str]:
+        """
+        Filter files down to those that may contain one of the needles.
+
+        Needles shorter than three bytes cannot be checked, and neither can
+        case-insensitive non-ASCII needles; then every file is a candidate.
+        With -i a regex may match non-ASCII letters (e.g. the Kelvin sign for
+        "k"), so files with non-ASCII content are always candidates then.
+        """
+        paths = list(paths)
+        wanted = []
+        for needle in needles:
+            data = index_bytes(needle)
+            if len(data) < 3 or (ignore_case and not data.isascii()):
+                return paths
+            wanted.append(frozenset(trigrams(data)))
+
+        result = []
+        for path in paths:
+            grams = self.grams.get(path)
+            if (
+                grams is None
+                or (ignore_case and path in self.non_ascii)
+                or any(needle <= grams for needle in wanted)
+            ):
+                result.append(path)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Return sizes of the index."""
+        with self._lock:
+            files = sum(
+                1
+                for siblings in self.children.values()
+                for is_dir in siblings.values()
+                if not is_dir
+            )
+            return {
+                "directories": len(self.children),
+                "files": files,
+                "indexed_files": len(self.grams),
+                "trigrams": self.trigram_count,
+                "distinct_trigrams": len(self._shared),
+                "dirty": len(self._dirty) + len(self._relist),
+                "max_trigrams": self.max_trigrams,
+                "max_file_size": self.max_file_size,
+            }
+
+    # Internals
+
+    def _resync(self, fs, path: str) -> None:
+        """Replace everything known about path with what fs reports now."""
+        self._drop_below(path)
+        info = fs.get_node_info(path)
+        parent, name = posixpath.split(path)
+        siblings = self.children.get(parent) if name else None
+        if info is None:
+            if siblings is not None:
+                siblings.pop(name, None)
+            return
+        if name:
+            if siblings is None:
+                # Created below a directory the index has not seen yet
+                self._dirty.add(parent)
+                return
+            if name not in siblings:
+                self._relist.add(parent)
+            siblings[name] = bool(info.is_dir)
+        self._add_tree(fs, path, bool(info.is_dir))
+
+    def _add_tree(self, fs, path: str, is_dir: bool) -> None:
+        """Index path and, for a directory, everything below it."""
+        files = []
+        if is_dir:
+            self.children[path] = {}
+            stack = [path]
+            while stack:
+                directory = stack.pop()
+                siblings = self.children[directory]
+                for name, info in fs.scan_dir(directory):
+                    if info is None:
+                        continue
+                    child = posixpath.join(directory, name)
+                    siblings[name] = bool(info.is_dir)
+                    if info.is_dir:
+                        self.children[child] = {}
+                        stack.append(child)
+                    else:
+                        files.append(child)
+        else:
+            files.append(path)
+
+        for start in range(0, len(files), READ_BATCH):
+            contents = fs.read_many(files[start : start + READ_BATCH])
+            for file_path, content in contents.items():
+                self._put_content(file_path, content)
+
+    def _relist_dir(self, fs, directory: str) -> None:
+        """Put the children of a directory in the provider's listing order."""
+        current = self.children.get(directory)
+        if current is None:
+            return
+        ordered = {}
+        for name, info in fs.scan_dir(directory):
+            if info is None:
+                continue
+            if name in current:
+                ordered[name] = current.pop(name)
+            else:
+                ordered[name] = bool(info.is_dir)
+                self._dirty.add(posixpath.join(directory, name))
+        for name in current:
+            # Gone from the listing
+            self._drop_below(posixpath.join(directory, name))
+        self.children[directory] = ordered
+
+    def _drop_below(self, path: str) -> None:
+        """Forget the contents of path (and of everything below a directory)."""
+        self._drop_content(path)
+        stack = [path]
+        while stack:
+            directory = stack.pop()
+            siblings = self.children.pop(directory, None)
+            if not siblings:
+                continue
+            for name, is_dir in siblings.items():
+                child = posixpath.join(directory, name)
+                if is_dir:
+                    stack.append(child)
+                else:
+                    self._drop_content(child)
+
+    def _drop_content(self, path: str) -> None:
+        grams = self.grams.pop(path, None)
+        if grams is not None:
+            self.trigram_count -= len(grams)
+        self.non_ascii.discard(path)
+
+    def _put_content(self, path: str, content: Any) -> None:
+        """Store the trigrams of a file, within the memory bounds."""
+        self._drop_content(path)
+        if content is None or len(content) > self.max_file_size:
+            return
+        data = index_bytes(content)
+        grams = trigrams(data)
+        if self.trigram_count + len(grams) > self.max_trigrams:
+            return
+        # Trigram tuples are shared between files
+        shared = self._shared.setdefault
+        self.grams[path] = frozenset([shared(gram, gram) for gram in grams])
+        self.trigram_count += len(grams)
+        if not data.isascii():
+            self.non_ascii.add(path)
+
+
+def _is_below(path: str, ancestor: str) -> bool:
+    """Whether path is ancestor or lies below it."""
+    return (
+        path == ancestor
+        or ancestor == "/"
+        or path.startswith(ancestor.rstrip("/") + "/")
+    )
@@ -10,6 +10,8 @@ from typing import List, Optional, Dict, Any
 from dataclasses import dataclass
 from enum import Enum
 
+from chuk_virtual_shell.core.command_ast import LRUCache
+
 
 class TokenType(Enum):
     """Token types for shell parsing."""
@@ -166,11 +168,8 @@ class ShellTokenizer:
                 # Find the matching ))
                 end = text.find("))", i + 3)
                 if end != -1:
-                    if current:
-                        tokens.append("".join(current))
-                        current = []
-                    # Keep the entire arithmetic expression as one token
-                    tokens.append(text[i : end + 2])
+                    # Keep the arithmetic expression inside the current word
+                    current.append(text[i : end + 2])
                     i = end + 2
                     continue
 
@@ -219,9 +218,72 @@ class ShellTokenizer:
             return TokenType.COMMAND
 
 
+@dataclass
+class LoopControl:
+    """A break or continue statement inside a loop body."""
+
+    keyword: str
+
+
+@dataclass
+class CompiledError:
+    """A structure that failed to parse; executing it returns the message."""
+
+    message: str
+
+
+@dataclass
+class CompiledBlock:
+    """
+    A parsed command list.
+
+    Each step is a command string (dispatched through the shell executor,
+    whose plans are cached by text), a LoopControl, or a nested compiled
+    structure.
+    """
+
+    steps: List[Any]
+
+
+@dataclass
+class IfBranch:
+    """One if/elif/else branch; condition is None for else."""
+
+    condition: Optional[str]
+    body: CompiledBlock
+
+
+@dataclass
+class CompiledIf:
+    """A compiled if/elif/else/fi statement."""
+
+    branches: List[IfBranch]
+
+
+@dataclass
+class CompiledFor:
+    """A compiled for loop; items are expanded each time the loop starts."""
+
+    variable: str
+    items: str
+    body: CompiledBlock
+
+
+@dataclass
+class CompiledWhile:
+    """A compiled while loop (or until loop when until is True)."""
+
+    condition: str
+    body: CompiledBlock
+    until: bool = False
+
+
 class ControlFlowExecutor:
     """Executes control flow structures for the shell."""
 
+    # Maximum iterations for while/until loops
+    MAX_ITERATIONS = 10000
+
     def __init__(self, shell):
         """
         Initialize the control flow executor.
@@ -232,6 +294,10 @@ class ControlFlowExecutor:
         self.shell = shell
         self.tokenizer = ShellTokenizer()
 
+        # Structures are compiled once per distinct text and reused, so loop
+        # bodies are never re-tokenized between iterations.
+        self._compiled = LRUCache(self.compile, maxsize=256)
+
     def execute_control_flow(self, cmd_line: str) -> str:
         """
         Main entry point for control flow execution.
@@ -242,12 +308,25 @@ class ControlFlowExecutor:
         Returns:
             Output from execution
         """
-        # Tokenize the command
-        tokens = self.tokenizer.tokenize(cmd_line)
+        return self._run(self._compiled.get(cmd_line))
 
+    def compile(self, cmd_line: str):
+        """
+        Compile a control flow command line into an executable node tree.
+
+        Args:
+            cmd_line: The control flow command line
+
+        Returns:
+            A compiled structure, or None for an empty line
+        """
+        tokens = self.tokenizer.tokenize(cmd_line)
         if not tokens:
-            return ""
+            return None
+        return self._compile_structure(tokens)
 
+    def _compile_structure(self, tokens: List[Token]):
+        """Compile tokens of an if/for/while/until structure."""
         # Check first keyword to determine structure type
         first_keyword = None
         for token in tokens:
@@ -256,42 +335,145 @@ class ControlFlowExecutor:
                 break
 
         if first_keyword == "if":
-            return self._execute_if_statement(tokens)
+            structure = self._parse_if_structure(tokens)
+            if not structure:
+                return CompiledError("if: syntax error")
+            return CompiledIf(
+                [
+                    IfBranch(
+                        (
+                            None
+                            if branch["type"] == "else"
+                            else self._join(branch["condition"])
+                        ),
+                        self._compile_block(branch["commands"]),
+                    )
+                    for branch in structure["branches"]
+                ]
+            )
         elif first_keyword == "for":
-            return self._execute_for_loop(tokens)
-        elif first_keyword == "while":
-            return self._execute_while_loop(tokens)
-        elif first_keyword == "until":
-            return self._execute_until_loop(tokens)
+            structure = self._parse_for_structure(tokens)
+            if not structure:
+                return CompiledError("for: syntax error")
+            return CompiledFor(
+                structure["variable"],
+                self._join(structure["items"]),
+                self._compile_block(structure["commands"]),
+            )
+        elif first_keyword in ("while", "until"):
+            structure = self._parse_while_structure(tokens, first_keyword)
+            if not structure:
+                return CompiledError(f"{first_keyword}: syntax error")
+            return CompiledWhile(
+                self._join(structure["condition"]),
+                self._compile_block(structure["commands"]),
+                until=first_keyword == "until",
+            )
         else:
-            return f"{first_keyword}: control structure not implemented"
+            return CompiledError(f"{first_keyword}: control structure not implemented")
 
-    def _execute_if_statement(self, tokens: List[Token]) -> str:
+    @staticmethod
+    def _join(tokens: List[Token]) -> str:
+        """Reconstruct command text from tokens."""
+        return " ".join(token.value for token in tokens)
+
+    def _compile_block(self, command_tokens: List[Token]) -> CompiledBlock:
         """
-        Execute if/then/elif/else/fi statement.
+        Compile a list of command tokens into a block.
 
         Args:
-            tokens: Tokenized command
+            command_tokens: Tokens making up the commands
 
         Returns:
-            Output from executed branch
+            CompiledBlock with one step per command
+        """
+        # Group tokens into individual commands
+        # Need to be careful with control flow statements that contain semicolons
+        commands = []
+        current_cmd: List[Token] = []
+        depth = 0  # Track control flow depth
+
+        for token in command_tokens:
+            if token.type == TokenType.KEYWORD and token.value in [
+                "if",
+                "for",
+                "while",
+                "until",
+            ]:
+                depth += 1
+                current_cmd.append(token)
+            elif token.type == TokenType.KEYWORD and token.value in ["fi", "done"]:
+                current_cmd.append(token)
+                depth -= 1
+                # If we're back at depth 0, this command is complete
+                if depth == 0 and current_cmd:
+                    commands.append(current_cmd)
+                    current_cmd = []
+            elif token.type == TokenType.SEPARATOR and depth == 0:
+                # Only split on separators when not inside control flow
+                if current_cmd:
+                    commands.append(current_cmd)
+                    current_cmd = []
+            else:
+                current_cmd.append(token)
+
+        if current_cmd:
+            commands.append(current_cmd)
+
+        steps: List[Any] = []
+        for cmd_tokens in commands:
+            first = cmd_tokens[0]
+            if (
+                len(cmd_tokens) == 1
+                and first.type == TokenType.KEYWORD
+                and first.value in ("break", "continue")
+            ):
+                steps.append(LoopControl(first.value))
+            elif first.type == TokenType.KEYWORD and first.value in (
+                "if",
+                "for",
+                "while",
+                "until",
+            ):
+                # Nested structures are compiled along with their parent
+                steps.append(self._compile_structure(cmd_tokens))
+            else:
+                steps.append(self._join(cmd_tokens))
+
+        return CompiledBlock(steps)
+
+    def _run(self, node) -> str:
+        """Execute a compiled node."""
+        if node is None:
+            return ""
+        if isinstance(node, CompiledIf):
+            return self._execute_if_statement(node)
+        if isinstance(node, CompiledFor):
+            return self._execute_for_loop(node)
+        if isinstance(node, CompiledWhile):
+            return self._execute_while_loop(node)
+        if isinstance(node, CompiledError):
+            return node.message
+        return self._execute_commands(node)
+
+    def _execute_if_statement(self, node: CompiledIf) -> str:
         """
-        # Parse the if statement structure
-        structure = self._parse_if_structure(tokens)
+        Execute if/then/elif/else/fi statement.
 
-        if not structure:
-            return "if: syntax error"
+        Args:
+            node: Compiled if statement
 
+        Returns:
+            Output from executed branch
+        """
         # Execute conditions and find which branch to run
-        for branch in structure["branches"]:
-            if branch["type"] == "else":
+        for branch in node.branches:
+            if branch.condition is None:
                 # Else branch always executes if we reach it
-                return self._execute_commands(branch["commands"])
-            else:
-                # Execute condition
-                condition_result = self._execute_condition(branch["condition"])
-                if condition_result:  # Condition succeeded (exit code 0)
-                    return self._execute_commands(branch["commands"])
+                return self._execute_commands(branch.body)
+            # Execute condition
+            if self._execute_condition(branch.condition):
+                return self._execute_commands(branch.body)
 
         return ""
 
@@ -371,104 +553,57 @@ class ControlFlowExecutor:
 
         return structure if structure["branches"] else None
 
-    def _execute_condition(self, condition_tokens: List[Token]) -> bool:
+    def _execute_condition(self, condition_cmd: str) -> bool:
         """
         Execute a condition and return success/failure.
         Uses the existing test command implementation.
 
         Args:
-            condition_tokens: Tokens making up the condition
+            condition_cmd: Command making up the condition
 
         Returns:
             True if condition succeeded (exit code 0), False otherwise
         """
-        if not condition_tokens:
+        if not condition_cmd:
             return False
 
-        # Reconstruct command from tokens
-        cmd_parts = []
-        for token in condition_tokens:
-            cmd_parts.append(token.value)
-
-        condition_cmd = " ".join(cmd_parts)
-
         # Execute the condition command
         # The test command or [ command will set the return code
-        self.shell.execute(condition_cmd)
+        self.shell.executor.execute_line(condition_cmd)
 
         # Check return code
         return self.shell.return_code == 0
 
-    def _execute_commands(self, command_tokens: List[Token]) -> str:
+    def _execute_commands(self, block: CompiledBlock) -> str:
         """
-        Execute a list of command tokens.
+        Execute a compiled block of commands.
 
         Args:
-            command_tokens: Tokens making up the commands
+            block: Compiled commands
 
         Returns:
             Combined output from commands
         """
-        if not command_tokens:
-            return ""
-
-        # Group tokens into individual commands
-        # Need to be careful with control flow statements that contain semicolons
-        commands = []
-        current_cmd = []
-        depth = 0  # Track control flow depth
-
-        for token in command_tokens:
-            if token.type == TokenType.KEYWORD and token.value in [
-                "if",
-                "for",
-                "while",
-                "until",
-            ]:
-                depth += 1
-                current_cmd.append(token)
-            elif token.type == TokenType.KEYWORD and token.value in ["fi", "done"]:
-                current_cmd.append(token)
-                depth -= 1
-                # If we're back at depth 0, this command is complete
-                if depth == 0 and current_cmd:
-                    commands.append(current_cmd)
-                    current_cmd = []
-            elif token.type == TokenType.SEPARATOR and depth == 0:
-                # Only split on separators when not inside control flow
-                if current_cmd:
-                    commands.append(current_cmd)
-                    current_cmd = []
-            else:
-                current_cmd.append(token)
-
-        if current_cmd:
-            commands.append(current_cmd)
-
-        # Execute each command
         results = []
-        for cmd_tokens in commands:
+        for step in block.steps:
+            # Stop at a command boundary when an interrupt was requested
+            if getattr(self.shell, "_interrupted", False):
+                break
+
             # Check for break/continue keywords
-            if (
-                cmd_tokens
-                and len(cmd_tokens) == 1
-                and cmd_tokens[0].type == TokenType.KEYWORD
-            ):
-                if cmd_tokens[0].value == "break":
+            if isinstance(step, LoopControl):
+                if step.keyword == "break":
                     self.shell._break_loop = True
-                    self.shell.return_code = 0
-                    break
-                elif cmd_tokens[0].value == "continue":
+                else:
                     self.shell._continue_loop = True
-                    self.shell.return_code = 0
-                    continue
-
-            # Reconstruct command string
-            cmd_parts = [t.value for t in cmd_tokens]
-            cmd = " ".join(cmd_parts)
+                self.shell.return_code = 0
+                break
 
-            # Execute command through shell (which will handle nested control flow)
-            output = self.shell.execute(cmd)
+            if isinstance(step, str):
+                # Execute command through the shell executor (plans are cached)
+                output = self.shell.executor.execute_line(step)
+            else:
+                output = self._run(step)
             if output:
                 results.append(output)
 
@@ -480,28 +615,20 @@ class ControlFlowExecutor:
 
         return "\n".join(results)
 
-    def _execute_for_loop(self, tokens: List[Token]) -> str:
+    def _execute_for_loop(self, node: CompiledFor) -> str:
         """
         Execute for loop: for var in items; do commands; done
 
         Args:
-            tokens: Tokenized command
+            node: Compiled for loop
 
         Returns:
             Output from loop execution
         """
-        # Parse the for loop structure
-        structure = self._parse_for_structure(tokens)
+        var_name = node.variable
 
-        if not structure:
-            return "for: syntax error"
-
-        var_name = structure["variable"]
-        items = structure["items"]
-        commands = structure["commands"]
-
-        # Expand items (variables and globs)
-        expanded_items = self._expand_items(items)
+        # Expand items (command substitution, variables and globs)
+        expanded_items = self._expand_items(node.items)
 
         # Execute loop
         results = []
@@ -509,6 +636,9 @@ class ControlFlowExecutor:
         prev_value = self.shell.environ.get(var_name)
 
         for item in expanded_items:
+            if getattr(self.shell, "_interrupted", False):
+                break
+
             # Set loop variable
             self.shell.environ[var_name] = item
 
@@ -517,7 +647,7 @@ class ControlFlowExecutor:
                 self.shell._continue_loop = False
 
             # Execute commands
-            output = self._execute_commands(commands)
+            output = self._execute_commands(node.body)
             if output:
                 results.append(output)
 
@@ -609,18 +739,23 @@ class ControlFlowExecutor:
             return structure
         return None
 
-    def _expand_items(self, item_tokens: List[Token]) -> List[str]:
+    def _expand_items(self, items_str: str) -> List[str]:
         """
-        Expand item tokens (variables, globs, etc.) into actual items.
+        Expand the item list (substitutions, variables, globs) into items.
 
         Args:
-            item_tokens: Tokens representing items
+            items_str: Item list text
 
         Returns:
             List of expanded item strings
         """
-        # Reconstruct items string
-        items_str = " ".join(t.value for t in item_tokens)
+        items = self.shell.expansion.expand_words(items_str)
+        if items is not None:
+            return items
+
+        # Expand command substitutions
+        if "$(" in items_str or "`" in items_str:
+            items_str = self.shell.expansion.expand_command_substitution(items_str)
 
         # Expand variables
         items_str = self.shell._expand_variables(items_str)
@@ -636,83 +771,39 @@ class ControlFlowExecutor:
 
         return items
 
-    def _execute_while_loop(self, tokens: List[Token]) -> str:
+    def _execute_while_loop(self, node: CompiledWhile) -> str:
         """
-        Execute while loop: while condition; do commands; done
+        Execute while/until loop: while condition; do commands; done
 
         Args:
-            tokens: Tokenized command
+            node: Compiled while or until loop
 
         Returns:
             Output from loop execution
         """
-        # Parse structure
-        structure = self._parse_while_structure(tokens, "while")
-
-        if not structure:
-            return "while: syntax error"
-
-        condition = structure["condition"]
-        commands = structure["commands"]
-
-        # Execute loop
+        # Execute loop (an until loop runs while the condition fails)
         results = []
-        max_iterations = 10000
         iteration = 0
+        # Status of the last body command, 0 if the body never ran
+        status = 0
 
-        while iteration < max_iterations:
-            # Check condition
-            if not self._execute_condition(condition):
+        while iteration < self.MAX_ITERATIONS:
+            if getattr(self.shell, "_interrupted", False):
                 break
 
-            # Execute commands
-            output = self._execute_commands(commands)
-            if output:
-                results.append(output)
-
-            # Check for break
-            if hasattr(self.shell, "_break_loop") and self.shell._break_loop:
-                self.shell._break_loop = False
+            # Check condition
+            if self._execute_condition(node.condition) == node.until:
+                # The failed test does not decide the loop's status
+                self.shell.return_code = status
                 break
 
-            iteration += 1
-
-        if iteration >= max_iterations:
-            return "while: maximum iterations exceeded\n" + "\n".join(results)
-
-        return "\n".join(results)
-
-    def _execute_until_loop(self, tokens: List[Token]) -> str:
-        """
-        Execute until loop: until condition; do commands; done
-
-        Args:
-            tokens: Tokenized command
-
-        Returns:
-            Output from loop execution
-        """
-        # Parse structure
-        structure = self._parse_while_structure(tokens, "until")
-
-        if not structure:
-            return "until: syntax error"
-
-        condition = structure["condition"]
-        commands = structure["commands"]
-
-        # Execute loop (opposite of while)
-        results = []
-        max_iterations = 10000
-        iteration = 0
-
-        while iteration < max_iterations:
-            # Check condition (opposite of while)
-            if self._execute_condition(condition):
-                break
+            # Reset continue flag
+            if hasattr(self.shell, "_continue_loop"):
+                self.shell._continue_loop = False
 
             # Execute commands
-            output = self._execute_commands(commands)
+            output = self._execute_commands(node.body)
+            status = self.shell.return_code
             if output:
                 results.append(output)
 
@@ -723,8 +814,9 @@ class ControlFlowExecutor:
 
             iteration += 1
 
-        if iteration >= max_iterations:
-            return "until: maximum iterations exceeded\n" + "\n".join(results)
+        if iteration >= self.MAX_ITERATIONS:
+            loop_type = "until" if node.until else "while"
+            return f"{loop_type}: maximum iterations exceeded\n" + "\n".join(results)
 
         return "\n".join(results)
 
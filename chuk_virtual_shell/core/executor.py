@@ -7,7 +7,32 @@ Handles command execution, pipelines, redirection, and operators.
 
 import time
 import logging
-from typing import TYPE_CHECKING
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Iterator, List, Optional, Union
+
+from chuk_virtual_shell.core.arithmetic import ExpressionError
+from chuk_virtual_shell.core.command_ast import (
+    ArithmeticCommand,
+    BraceGroup,
+    CommandList,
+    ControlFlow,
+    FunctionDefinition,
+    LRUCache,
+    Node,
+    Pipeline,
+    SimpleCommand,
+    plan_cache,
+)
+from chuk_virtual_shell.core.expansion import ExpansionHandler
+from chuk_virtual_shell.core.parser import CommandParser
+from chuk_virtual_shell.core.redirection import RedirectionInfo, RedirectionParser
+from chuk_virtual_shell.core.streaming import (
+    PipelineAbort,
+    close_stream,
+    iter_chunks,
+    peek_stream,
+)
+from chuk_virtual_shell.core.words import CompiledCommand
 
 if TYPE_CHECKING:
     from chuk_virtual_shell.shell_interpreter import ShellInterpreter
@@ -15,32 +40,50 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
+def _compile_command(cmd_line: str) -> CompiledCommand:
+    """Parse redirections and arguments of an expanded command line."""
+    redirect_info = RedirectionParser().parse(cmd_line)
+    cmd, args = CommandParser.parse_command(redirect_info.command)
+    if cmd:
+        # Restore escaped spaces in arguments after parsing
+        cmd = cmd.replace(ExpansionHandler.ESCAPED_SPACE, " ")
+        args = [arg.replace(ExpansionHandler.ESCAPED_SPACE, " ") for arg in args]
+    return CompiledCommand(redirect_info=redirect_info, name=cmd, args=tuple(args))
+
+
+# Commands repeated in loops and scripts expand to the same text every time,
+# so their parsed form is reused instead of re-running the regex and shlex
+# passes.
+_command_cache = LRUCache(_compile_command, maxsize=1024)
+
+
+def compile_command(cmd_line: str) -> CompiledCommand:
+    """Return the (cached) parsed form of an expanded command line."""
+    return _command_cache.get(cmd_line)
+
+
 class CommandExecutor:
     """Handles command execution, pipelines, and redirection."""
 
     def __init__(self, shell: "ShellInterpreter"):
         self.shell = shell
 
-        # Lazy imports to avoid circular dependencies
+        # Helpers are created on first use
         self._parser = None
         self._expansion = None
         self._redirection_parser = None
 
     @property
     def parser(self):
-        """Lazy load parser to avoid circular imports."""
+        """Lazy load parser."""
         if self._parser is None:
-            from chuk_virtual_shell.core.parser import CommandParser
-
             self._parser = CommandParser()
         return self._parser
 
     @property
     def expansion(self):
-        """Lazy load expansion handler to avoid circular imports."""
+        """Lazy load expansion handler."""
         if self._expansion is None:
-            from chuk_virtual_shell.core.expansion import ExpansionHandler
-
             self._expansion = ExpansionHandler(self.shell)
         return self._expansion
 
@@ -48,8 +91,6 @@ class CommandExecutor:
     def redirection_parser(self):
         """Lazy load advanced redirection parser."""
         if self._redirection_parser is None:
-            from chuk_virtual_shell.core.redirection import RedirectionParser
-
             self._redirection_parser = RedirectionParser()
         return self._redirection_parser
 
@@ -57,39 +98,80 @@ class CommandExecutor:
         """
         Main execution entry point for a command line.
 
+        The line is parsed once into an AST (cached by line text) and the
+        resulting plan is executed; expansions are applied per command.
+
         Args:
             cmd_line: Full command line to execute
 
         Returns:
             Command output or error message
         """
+        return "".join(self.stream_line(cmd_line))
+
+    def stream_line(self, cmd_line: str) -> Iterator[str]:
+        """
+        Execute a command line, yielding output as it is produced.
+
+        Commands run lazily as the returned iterator is consumed; the
+        concatenation of the chunks equals the execute_line() result.
+
+        Args:
+            cmd_line: Full command line to execute
+
+        Returns:
+            Iterator of output chunks
+        """
         cmd_line = cmd_line.strip()
         if not cmd_line:
-            return ""
+            return iter(())
 
         # Handle exit command
         if cmd_line == "exit":
             self.shell.running = False
-            return "Goodbye!"
+            return iter(("Goodbye!",))
 
-        # Check for control flow
-        if self._is_control_flow(cmd_line):
-            return self.shell._control_flow_executor.execute_control_flow(cmd_line)
+        return self.stream_node(plan_cache.get(cmd_line))
 
-        # Check for logical operators (&&, ||, ;)
-        if self._has_operators(cmd_line):
-            return self._execute_with_operators(cmd_line)
+    def execute_node(self, node: Node, expand_aliases: bool = True) -> str:
+        """
+        Execute a parsed command line node.
 
-        # Check for pipes (not quoted or escaped)
-        if "|" in cmd_line:
-            pipe_idx = cmd_line.index("|")
-            if not self.parser.is_quoted(
-                cmd_line, pipe_idx
-            ) and not self.parser.is_escaped(cmd_line, pipe_idx):
-                return self._execute_pipeline(cmd_line)
+        Args:
+            node: AST node produced by the command line parser
+            expand_aliases: Whether aliases are expanded for this node
 
-        # Simple command with possible redirection
-        return self._execute_single(cmd_line)
+        Returns:
+            Command output
+        """
+        return "".join(self.stream_node(node, expand_aliases))
+
+    def stream_node(self, node: Node, expand_aliases: bool = True) -> Iterator[str]:
+        """
+        Execute a parsed command line node, yielding output as it is produced.
+
+        Args:
+            node: AST node produced by the command line parser
+            expand_aliases: Whether aliases are expanded for this node
+
+        Returns:
+            Iterator of output chunks
+        """
+        if isinstance(node, CommandList):
+            return self._stream_list(
+                node, lambda item: self.stream_node(item, expand_aliases)
+            )
+        if isinstance(node, Pipeline):
+            return self._stream_pipeline_node(node, expand_aliases)
+        if isinstance(node, ControlFlow):
+            return self._stream_control_flow(node)
+        if isinstance(node, ArithmeticCommand):
+            return self._stream_arithmetic(node)
+        if isinstance(node, BraceGroup):
+            return self._stream_group(node, expand_aliases)
+        if isinstance(node, FunctionDefinition):
+            return self._define_function(node)
+        return self._stream_command(node, expand_aliases)
 
     def execute_without_substitution(self, cmd_line: str) -> str:
         """
@@ -106,6 +188,18 @@ class CommandExecutor:
         if not cmd_line:
             return ""
 
+        # Run each command of a list (e.g. "$(cd /tmp; ls)") on its own
+        node = plan_cache.get(cmd_line)
+        if isinstance(node, CommandList):
+            return "".join(
+                self._stream_list(
+                    node,
+                    lambda item: iter((self.execute_without_substitution(item.text),)),
+                )
+            )
+        if isinstance(node, ArithmeticCommand):
+            return "".join(self._stream_arithmetic(node))
+
         # Apply expansions except command substitution
         cmd_line = self.expansion.expand_variables(cmd_line)
         cmd_line = self.expansion.expand_arithmetic(cmd_line)
@@ -162,205 +256,527 @@ class CommandExecutor:
         else:
             return f"{cmd}: command not found"
 
-    def _is_control_flow(self, cmd_line: str) -> bool:
-        """Check if command is a control flow structure."""
-        parts = cmd_line.split(None, 1)
-        if not parts:
-            return False
-        return parts[0] in ["if", "for", "while", "until", "case", "function"]
-
-    def _has_operators(self, cmd_line: str) -> bool:
-        """Check if command has logical operators."""
-        return any(
-            op in cmd_line for op in ["&&", "||", ";"]
-        ) and not self.parser.contains_quoted_operator(cmd_line)
-
-    def _execute_with_operators(self, cmd_line: str) -> str:
+    def _stream_list(
+        self, node: CommandList, stream_item: Callable[[Node], Iterator[str]]
+    ) -> Iterator[str]:
         """
-        Execute command line with logical operators (&&, ||) and semicolon separator.
+        Execute commands joined by logical operators (&&, ||) and semicolons.
+
+        Outputs of the commands that produce any are separated by newlines.
 
         Args:
-            cmd_line: Command line with operators
+            node: Parsed command list
+            stream_item: Function executing one item of the list
 
-        Returns:
-            Combined output from commands
+        Yields:
+            Output chunks from the commands
         """
-        parts = self.parser.split_by_operators(cmd_line)
-        results = []
+        produced = False
         skip_next = False
 
-        for i, (command, operator) in enumerate(parts):
+        for item, operator in node.items:
+            # Stop at a command boundary when an interrupt was requested
+            if getattr(self.shell, "_interrupted", False):
+                break
+
             if not skip_next:
                 # Execute the individual command
-                result = self._execute_single(command)
+                stream = peek_stream(stream_item(item))
 
-                # Store the result if there's output
-                if result:
-                    results.append(result)
+                # Emit the output if there is any
+                if stream is not None:
+                    if produced:
+                        yield "\n"
+                    produced = True
+                    yield from stream
 
                 # Check operator to determine flow
-                if operator == "&&":
-                    # Continue only if command succeeded (return code 0)
-                    skip_next = self.shell.return_code != 0
-                elif operator == "||":
-                    # Continue only if command failed (return code != 0)
-                    skip_next = self.shell.return_code == 0
-                elif operator == ";":
-                    # Always continue with semicolon
-                    skip_next = False
+                skip_next = self._skips_next(operator)
             else:
                 skip_next = False
 
-        return "\n".join(results)
-
-    def _execute_pipeline(self, cmd_line: str) -> str:
+    def _skips_next(self, operator: str) -> bool:
+        """Whether the command after an operator is skipped, given $?."""
+        if operator == "&&":
+            # Continue only if command succeeded (return code 0)
+            return self.shell.return_code != 0
+        if operator == "||":
+            # Continue only if command failed (return code != 0)
+            return self.shell.return_code == 0
+        # Always continue with semicolon
+        return False
+
+    def _stream_arithmetic(self, node: ArithmeticCommand) -> Iterator[str]:
+        """Evaluate ((expression)); it succeeds if the value is not zero."""
+        try:
+            value = self.expansion.evaluate_arithmetic(node.expression)
+        except ExpressionError as e:
+            self.shell.return_code = 1
+            yield f"((: {e}"
+            return
+        self.shell.return_code = 0 if value else 1
+
+    def _stream_control_flow(self, node: ControlFlow) -> Iterator[str]:
+        """Execute a control flow structure."""
+        # Substitutions are expanded per command as the structure runs
+        result = self.shell._control_flow_executor.execute_control_flow(node.text)
+        if result:
+            yield result
+
+    def _define_function(self, node: FunctionDefinition) -> Iterator[str]:
+        """Define (or redefine) a shell function; it produces no output."""
+        self.shell.functions[node.name] = node.body
+        self.shell.return_code = 0
+        return iter(())
+
+    def _function(self, name: Optional[str]) -> Optional[BraceGroup]:
+        """Return the body of the shell function called name, if any."""
+        functions = getattr(self.shell, "functions", None)
+        return functions.get(name) if functions and name else None
+
+    def _stream_group(
+        self,
+        node: BraceGroup,
+        expand_aliases: bool = True,
+        stdin: Optional[Iterator[str]] = None,
+    ) -> Iterator[str]:
         """
-        Execute a pipeline of commands connected by pipes.
+        Run the list of a { list; } group in the current shell.
 
         Args:
-            cmd_line: Pipeline command line
+            node: Parsed brace group
+            expand_aliases: Whether aliases are expanded in the group
+            stdin: Upstream pipeline output, if the group is a later stage
 
-        Returns:
-            Output from the last command in the pipeline
+        Yields:
+            Output chunks of the group (nothing if redirected to a file)
         """
-        # Apply expansions to whole pipeline
-        cmd_line = self.expansion.expand_all(cmd_line)
-
-        # Restore escaped pipes in pipeline
-        cmd_line = self.expansion.restore_escaped_pipes(cmd_line)
+        redirect_info = RedirectionInfo(command="")
+        if node.redirections:
+            compiled = self.expansion.expand_command(node.redirections)
+            if compiled is None:
+                compiled = compile_command(self.expansion.expand_all(node.redirections))
+            if compiled.name:
+                self.shell.return_code = 2
+                yield f"syntax error near unexpected token `{compiled.name}'"
+                return
+            redirect_info = compiled.redirect_info
+        yield from self._stream_redirected(
+            redirect_info, lambda: self.stream_node(node.body, expand_aliases), stdin
+        )
+
+    def _stream_function(
+        self,
+        body: BraceGroup,
+        compiled: CompiledCommand,
+        stdin: Optional[Iterator[str]] = None,
+    ) -> Iterator[str]:
+        """Call a shell function; its arguments are $1, $2, ... while it runs."""
+
+        def run() -> Iterator[str]:
+            saved = getattr(self.shell, "positional", [])
+            self.shell.positional = list(compiled.args)
+            try:
+                yield from self._stream_group(body)
+            finally:
+                self.shell.positional = saved
+
+        with self._assigned(compiled.assignments):
+            yield from self._stream_redirected(compiled.redirect_info, run, stdin)
+
+    def _stream_redirected(
+        self,
+        redirect_info: RedirectionInfo,
+        run: Callable[[], Iterator[str]],
+        stdin: Optional[Iterator[str]] = None,
+    ) -> Iterator[str]:
+        """
+        Run a group or function call with redirections applied to it as a whole.
 
-        # Parse for redirection
-        pipeline_info = self.parser.parse_pipeline_redirection(cmd_line)
-        cmd_line = pipeline_info["pipeline"]
+        Its input (a file, here-document or upstream output) is left in the
+        shell's stdin buffer, where the first command inside reads it.
+        """
+        content = None
+        if redirect_info.stdin_file:
+            stdin_file = self.expansion.restore_escaped_spaces(redirect_info.stdin_file)
+            content = self.shell.fs.read_file(stdin_file)
+            if content is None:
+                self.shell.return_code = 1
+                yield f"bash: {stdin_file}: No such file or directory"
+                return
+            if isinstance(content, bytes):
+                content = content.decode("utf-8")
+        elif redirect_info.heredoc_content is not None:
+            content = redirect_info.heredoc_content
+        elif stdin is not None:
+            content = "".join(stdin)
+        if content:
+            self.shell._stdin_buffer = content
 
-        # Execute pipeline
-        commands = cmd_line.split("|")
-        result = ""
+        if not (
+            redirect_info.stdout_file
+            or redirect_info.combined_file
+            or redirect_info.stderr_file
+        ):
+            yield from run()
+            return
+        result = self._handle_advanced_redirection(redirect_info, "".join(run()), "")
+        if result:
+            yield result
+
+    def _expand_alias(self, node: SimpleCommand) -> Optional[Node]:
+        """Return the re-parsed plan if the command starts with an alias."""
+        aliases = getattr(self.shell, "aliases", None)
+        if not aliases or node.first_word not in aliases:
+            return None
+        expanded = self.expansion.expand_aliases(node.text)
+        if expanded == node.text:
+            return None
+        return plan_cache.get(expanded.strip())
+
+    def _stream_command(
+        self, node: SimpleCommand, expand_aliases: bool
+    ) -> Iterator[str]:
+        """
+        Execute a single command with expansions.
 
-        for i, cmd_str in enumerate(commands):
-            cmd_str = cmd_str.strip()
-            if not cmd_str:
-                continue
+        Args:
+            node: Parsed simple command
+            expand_aliases: Whether the first word may be an alias
 
-            cmd, args = self.parser.parse_command(cmd_str)
-            if not cmd:
-                continue
+        Yields:
+            Command output chunks
+        """
+        if expand_aliases:
+            aliased = self._expand_alias(node)
+            if aliased is not None:
+                yield from self.stream_node(aliased, expand_aliases=False)
+                return
 
-            if cmd not in self.shell.commands:
-                return f"{cmd}: command not found"
+        # Expand the words of the command into its argv
+        compiled = self.expansion.expand_command(node.text)
+        if compiled is not None:
+            yield from self._stream_compiled(compiled)
+            return
 
-            try:
-                # Handle stdin
-                if i == 0 and pipeline_info["input"]:
-                    # Read input file for the first command
-                    content = self.shell.fs.read_file(pipeline_info["input"])
-                    if content is None:
-                        return f"{pipeline_info['input']}: No such file or directory"
-                    self.shell._stdin_buffer = content
-                elif i > 0 and result:
-                    # Store the previous command's output as stdin for this command
-                    self.shell._stdin_buffer = result
+        # Lines that cannot be tokenized go through the string expansions
+        cmd_line = self.expansion.expand_all(node.text)
 
-                # Execute command
-                result = self.shell.commands[cmd].run(args)
+        # Restore escaped pipes before simple execution
+        cmd_line = self.expansion.restore_escaped_pipes(cmd_line)
+        yield from self._stream_simple(cmd_line)
 
-                # Clear stdin buffer
-                if hasattr(self.shell, "_stdin_buffer"):
-                    del self.shell._stdin_buffer
+    def _stream_pipeline_node(
+        self, node: Pipeline, expand_aliases: bool
+    ) -> Iterator[str]:
+        """
+        Execute a pipeline of commands connected by pipes.
 
-                # Check if the command returned an error
-                if result and (
-                    result.startswith(f"{cmd}: ")
-                    and ("No such file" in result or "error" in result.lower())
-                ):
-                    # Error occurred, stop pipeline and return error
-                    return result
+        Each stage is expanded on its own, so pipes produced by expansions
+        are never mistaken for pipeline separators.
 
-            except Exception as e:
-                logger.error(f"Error executing command '{cmd}' in pipeline: {e}")
-                return f"Error executing command in pipeline: {e}"
+        Args:
+            node: Parsed pipeline
+            expand_aliases: Whether aliases are expanded for the stages
 
-        # Handle output redirection
-        if pipeline_info["output"]:
-            self._write_redirect(
-                pipeline_info["output"], result, pipeline_info["append"]
-            )
-            return ""
+        Yields:
+            Output chunks from the last command in the pipeline
+        """
+        stages: List[Union[str, CompiledCommand, BraceGroup]] = []
+        for stage in node.stages:
+            if isinstance(stage, BraceGroup):
+                stages.append(stage)
+                continue
+            cmd_line = stage.text
+            if expand_aliases:
+                cmd_line = self.expansion.expand_aliases(cmd_line)
+            compiled = self.expansion.expand_command(cmd_line)
+            if compiled is not None:
+                stages.append(compiled)
+                continue
+            cmd_line = self.expansion.expand_all(cmd_line)
+            stages.append(self.expansion.restore_escaped_pipes(cmd_line))
 
-        return result
+        yield from self._stream_pipeline(stages, stop_on_error=True)
 
     def _execute_pipeline_no_substitution(self, cmd_line: str) -> str:
         """Execute pipeline without command substitution."""
         # Restore escaped pipes first
         cmd_line = self.expansion.restore_escaped_pipes(cmd_line)
 
-        # Similar to _execute_pipeline but without expansion
-        commands = cmd_line.split("|")
-        result = ""
+        # Similar to _stream_pipeline_node but without expansion
+        return "".join(self._stream_pipeline(cmd_line.split("|")))
 
-        for i, cmd_str in enumerate(commands):
-            cmd_str = cmd_str.strip()
-            if not cmd_str:
-                continue
-
-            cmd, args = self.parser.parse_command(cmd_str)
-            if not cmd:
-                continue
+    def _stream_pipeline(
+        self,
+        stages: List[Union[str, CompiledCommand, BraceGroup]],
+        stop_on_error: bool = False,
+    ) -> Iterator[str]:
+        """
+        Run pipeline stages as a chain of lazy streams.
 
-            if cmd not in self.shell.commands:
-                return f"{cmd}: command not found"
+        Each stage receives the previous stage's output stream through
+        ShellCommand.stream(), so commands that support streaming process
+        input incrementally and a stage that stops reading (e.g. head) stops
+        upstream work. Stages only run when downstream asks for their output.
+        Input redirections and here-documents replace a stage's input, and
+        output redirections write the stage's output to a file.
 
-            try:
-                if i > 0 and result:
-                    self.shell._stdin_buffer = result
+        Args:
+            stages: Expanded commands (compiled, or as text), one per stage
+            stop_on_error: Abort when a stage's output starts with an error
 
-                result = self.shell.commands[cmd].run(args)
+        Yields:
+            Output chunks from the last command in the pipeline
+        """
+        stream: Optional[Iterator[str]] = None
+        streams = []
+        try:
+            for stage in stages:
+                if isinstance(stage, BraceGroup):
+                    # Groups (and functions) read upstream output if it is not empty
+                    stream = self._stream_group(
+                        stage, stdin=peek_stream(stream) if streams else None
+                    )
+                    streams.append(stream)
+                    continue
+                if isinstance(stage, CompiledCommand):
+                    compiled = stage
+                elif stage.strip():
+                    compiled = compile_command(stage.strip())
+                else:
+                    continue
+                if not compiled.name:
+                    continue
+
+                body = self._function(compiled.name)
+                if body is not None:
+                    stream = self._stream_function(
+                        body, compiled, stdin=peek_stream(stream) if streams else None
+                    )
+                    streams.append(stream)
+                    continue
 
-                if hasattr(self.shell, "_stdin_buffer"):
-                    del self.shell._stdin_buffer
+                if compiled.name not in self.shell.commands:
+                    yield f"{compiled.name}: command not found"
+                    return
 
-            except Exception as e:
-                return f"Error executing command in pipeline: {e}"
+                redirect_info = compiled.redirect_info
+                if redirect_info.stdin_file:
+                    stdin_file = self.expansion.restore_escaped_spaces(
+                        redirect_info.stdin_file
+                    )
+                    content = self.shell.fs.read_file(stdin_file)
+                    if content is None:
+                        yield f"{stdin_file}: No such file or directory"
+                        return
+                    if isinstance(content, bytes):
+                        content = content.decode("utf-8")
+                    stream = iter_chunks(content)
+                elif redirect_info.heredoc_content is not None:
+                    stream = iter_chunks(redirect_info.heredoc_content)
+                elif streams:
+                    # Later stages only see input if the previous stage produced output
+                    stream = peek_stream(stream)
+                else:
+                    stream = self._take_stdin()
 
-        return result
+                stream = self.shell.commands[compiled.name].stream(
+                    list(compiled.args), stream
+                )
+                if compiled.assignments:
+                    stream = self._assigned_stream(compiled.assignments, stream)
+                if stop_on_error:
+                    stream = self._check_stage_error(compiled.name, stream)
+                streams.append(stream)
+
+                output_file = redirect_info.stdout_file or redirect_info.combined_file
+                if output_file:
+                    append = (
+                        redirect_info.stdout_append
+                        if redirect_info.stdout_file
+                        else redirect_info.combined_append
+                    )
+                    self._write_redirect(output_file, "".join(stream), append)
+                    stream = iter(())
+
+            if streams:
+                yield from self._until_interrupted(stream)
+
+        except PipelineAbort as e:
+            yield e.message
+        except Exception as e:
+            if stop_on_error:
+                logger.error(f"Error executing command in pipeline: {e}")
+            yield f"Error executing command in pipeline: {e}"
+        finally:
+            for stage_stream in reversed(streams):
+                close_stream(stage_stream)
+
+    def _until_interrupted(self, stream: Iterator[str]) -> Iterator[str]:
+        """Pass chunks through until an interrupt is requested."""
+        for chunk in stream:
+            if getattr(self.shell, "_interrupted", False):
+                return
+            yield chunk
+
+    def _check_stage_error(self, cmd: str, stream: Iterator[str]) -> Iterator[str]:
+        """Abort the pipeline if a stage's output begins with an error message."""
+        started = False
+        for chunk in stream:
+            if not started and chunk:
+                started = True
+                if chunk.startswith(f"{cmd}: ") and (
+                    "No such file" in chunk or "error" in chunk.lower()
+                ):
+                    raise PipelineAbort(chunk)
+            yield chunk
 
-    def _execute_single(self, cmd_line: str) -> str:
+    def _stream_simple(self, cmd_line: str) -> Iterator[str]:
         """
-        Execute a single command with expansions.
+        Execute an expanded simple command, streaming its output.
+
+        Commands without redirections run through ShellCommand.stream() so
+        their output is available as it is produced; anything else is
+        delegated to _execute_simple().
 
         Args:
-            cmd_line: Single command (no operators)
+            cmd_line: Expanded command line
 
-        Returns:
-            Command output
+        Yields:
+            Command output chunks
         """
-        # Apply expansions
-        cmd_line = self.expansion.expand_all(cmd_line)
+        if self._assign_variable(cmd_line):
+            return
+        yield from self._stream_compiled(compile_command(cmd_line))
 
-        # Check for pipes after expansion (not quoted or escaped)
-        # Also check for escaped pipe placeholders - they should not be treated as pipes
-        if "|" in cmd_line and self.expansion.ESCAPED_PIPE not in cmd_line:
-            pipe_idx = cmd_line.index("|")
-            if not self.parser.is_quoted(
-                cmd_line, pipe_idx
-            ) and not self.parser.is_escaped(cmd_line, pipe_idx):
-                return self._execute_pipeline(cmd_line)
+    def _stream_compiled(self, compiled: CompiledCommand) -> Iterator[str]:
+        """
+        Execute an expanded command, streaming its output.
 
-        # Restore escaped pipes before simple execution
-        cmd_line = self.expansion.restore_escaped_pipes(cmd_line)
-        return self._execute_simple(cmd_line)
+        Args:
+            compiled: Expanded command
 
-    def _execute_simple(self, cmd_line: str) -> str:
+        Yields:
+            Command output chunks
         """
-        Execute a simple command with possible redirection.
+        cmd = compiled.name
+        if not cmd and compiled.assignments:
+            self._apply_assignments(compiled.assignments)
+            self.shell.return_code = 0
+            return
+
+        body = self._function(cmd)
+        if body is not None:
+            yield from self._stream_function(body, compiled)
+            return
+
+        if (
+            not cmd
+            or cmd not in self.shell.commands
+            or self._has_redirection(compiled.redirect_info)
+        ):
+            with self._assigned(compiled.assignments):
+                result = self._execute_compiled(compiled)
+            if result:
+                yield result
+            return
+
+        with self._assigned(compiled.assignments):
+            yield from self._run_streaming(cmd, compiled)
+
+    def _run_streaming(self, cmd: str, compiled: CompiledCommand) -> Iterator[str]:
+        """Run a command without redirections through ShellCommand.stream()."""
+
+        # Track command timing if enabled
+        start_time = time.time() if self.shell.enable_timing else None
+
+        stdin = self._take_stdin()
+
+        # Reset return code before execution
+        self.shell.return_code = 0
+        try:
+            yield from self.shell.commands[cmd].stream(list(compiled.args), stdin)
+        except Exception as e:
+            logger.error(f"Error executing command '{cmd}': {e}")
+            self.shell.return_code = 1
+            yield f"Error executing command: {e}"
+            return
+
+        # Record timing statistics
+        if self.shell.enable_timing and start_time:
+            self._record_timing(cmd, time.time() - start_time)
+
+        # Update PWD for cd command
+        if cmd == "cd":
+            self.shell.environ["PWD"] = self.shell.fs.pwd()
+
+        # Clear stdin and stderr buffers
+        if hasattr(self.shell, "_stdin_buffer"):
+            del self.shell._stdin_buffer
+        if hasattr(self.shell, "_stderr_buffer"):
+            del self.shell._stderr_buffer
+
+    def _take_stdin(self) -> Optional[Iterator[str]]:
+        """Input left by an enclosing group's redirection or pipe (read once)."""
+        if not getattr(self.shell, "_stdin_buffer", None):
+            return None
+        stdin = iter_chunks(self.shell._stdin_buffer)
+        del self.shell._stdin_buffer
+        return stdin
+
+    @staticmethod
+    def _has_redirection(redirect_info: RedirectionInfo) -> bool:
+        """Check whether a command has any input/output redirection."""
+        return bool(
+            redirect_info.stdin_file
+            or redirect_info.stdout_file
+            or redirect_info.stderr_file
+            or redirect_info.stderr_to_stdout
+            or redirect_info.combined_file
+            or redirect_info.heredoc_content is not None
+        )
+
+    def _apply_assignments(self, assignments) -> None:
+        """Set shell variables from (name, value) pairs."""
+        for name, value in assignments:
+            self.shell.environ[name] = value
+
+    @contextmanager
+    def _assigned(self, assignments):
+        """Set variables for the duration of one command (VAR=value cmd)."""
+        if not assignments:
+            yield
+            return
+        missing = object()
+        saved = [
+            (name, self.shell.environ.get(name, missing)) for name, _ in assignments
+        ]
+        self._apply_assignments(assignments)
+        try:
+            yield
+        finally:
+            for name, value in reversed(saved):
+                if value is missing:
+                    self.shell.environ.pop(name, None)
+                else:
+                    self.shell.environ[name] = value
+
+    def _assigned_stream(self, assignments, stream: Iterator[str]) -> Iterator[str]:
+        """Keep a pipeline stage's VAR=value settings while it produces output."""
+        with self._assigned(assignments):
+            yield from stream
+
+    def _assign_variable(self, cmd_line: str) -> bool:
+        """
+        Handle a variable assignment (VAR=value).
 
         Args:
-            cmd_line: Command with possible redirection
+            cmd_line: Expanded command line
 
         Returns:
-            Command output
+            True if the line was an assignment and has been applied
         """
-        # Check for variable assignment (VAR=value)
         if "=" in cmd_line and " " not in cmd_line.split("=")[0]:
             # Simple variable assignment without spaces before =
             parts = cmd_line.split("=", 1)
@@ -373,11 +789,57 @@ class CommandExecutor:
                     var_value = var_value.strip(var_value[0])
                 self.shell.environ[var_name] = var_value
                 self.shell.return_code = 0
-                return ""
+                return True
+        return False
+
+    def _execute_simple(self, cmd_line: str) -> str:
+        """
+        Execute a simple command with possible redirection.
+
+        Args:
+            cmd_line: Command with possible redirection
+
+        Returns:
+            Command output
+        """
+        # Check for variable assignment (VAR=value)
+        if self._assign_variable(cmd_line):
+            return ""
+
+        # Parse advanced redirection and the command itself (cached)
+        return self._execute_compiled(compile_command(cmd_line))
+
+    def _execute_compiled(self, compiled: CompiledCommand) -> str:
+        """
+        Execute an expanded command with possible redirection.
+
+        Args:
+            compiled: Expanded command
+
+        Returns:
+            Command output
+        """
+        early = self._prepare_compiled(compiled)
+        if early is not None:
+            return early
+
+        # Track command timing if enabled
+        start_time = time.time() if self.shell.enable_timing else None
+        try:
+            result = self.shell.commands[compiled.name].run(list(compiled.args))
+            return self._complete_compiled(compiled, result, start_time)
+        except Exception as e:
+            return self._command_failed(compiled, e)
+
+    def _prepare_compiled(self, compiled: CompiledCommand) -> Optional[str]:
+        """
+        Set up input and stderr capture before a command runs.
 
-        # Parse advanced redirection
-        redirect_info = self.redirection_parser.parse(cmd_line)
-        cmd_line = redirect_info.command
+        Returns:
+            None if the command should run, otherwise the line's output
+            (missing input file, empty or unknown command)
+        """
+        redirect_info = compiled.redirect_info
 
         # Handle input redirection
         if redirect_info.stdin_file:
@@ -395,88 +857,11 @@ class CommandExecutor:
         elif redirect_info.heredoc_content is not None:
             self.shell._stdin_buffer = redirect_info.heredoc_content
 
-        # Parse and execute command
-        cmd, args = self.parser.parse_command(cmd_line)
+        cmd = compiled.name
         if not cmd:
             return ""
 
-        # Restore escaped spaces in arguments after parsing
-        cmd = self.expansion.restore_escaped_spaces(cmd)
-        args = self.expansion.restore_escaped_spaces_in_args(args)
-
-        if cmd in self.shell.commands:
-            try:
-                # Track command timing if enabled
-                start_time = time.time() if self.shell.enable_timing else None
-
-                # Execute command and capture both stdout and stderr
-                # Reset return code before execution
-                self.shell.return_code = 0
-
-                # Store original stderr if we need to redirect it
-                original_stderr = None
-                if (
-                    redirect_info.stderr_file
-                    or redirect_info.stderr_to_stdout
-                    or redirect_info.combined_file
-                ):
-                    original_stderr = getattr(self.shell, "_stderr_buffer", "")
-                    self.shell._stderr_buffer = ""
-
-                result = self.shell.commands[cmd].run(args)
-
-                # Get stderr if it was captured
-                stderr_output = ""
-                if original_stderr is not None:
-                    stderr_output = getattr(self.shell, "_stderr_buffer", "")
-                    # For commands that don't produce stderr, simulate it for errors
-                    if not stderr_output and self.shell.return_code != 0:
-                        if (
-                            "No such file or directory" in result
-                            or "not found" in result
-                        ):
-                            stderr_output = result
-                            result = ""  # Move error to stderr
-
-                # Record timing statistics
-                if self.shell.enable_timing and start_time:
-                    self._record_timing(cmd, time.time() - start_time)
-
-                # Update PWD for cd command
-                if cmd == "cd":
-                    self.shell.environ["PWD"] = self.shell.fs.pwd()
-
-                # Clear stdin buffer
-                if hasattr(self.shell, "_stdin_buffer"):
-                    del self.shell._stdin_buffer
-
-                # Clear stderr buffer
-                if hasattr(self.shell, "_stderr_buffer"):
-                    del self.shell._stderr_buffer
-
-                # Handle output redirection with advanced features
-                return self._handle_advanced_redirection(
-                    redirect_info, result, stderr_output
-                )
-
-            except Exception as e:
-                logger.error(f"Error executing command '{cmd}': {e}")
-                self.shell.return_code = 1
-                error_msg = f"Error executing command: {e}"
-
-                # Handle stderr redirection for errors
-                if redirect_info.stderr_file:
-                    self._write_redirect(
-                        redirect_info.stderr_file,
-                        error_msg,
-                        redirect_info.stderr_append,
-                    )
-                    return ""
-                elif redirect_info.stderr_to_stdout or redirect_info.combined_file:
-                    return error_msg
-                else:
-                    return error_msg
-        else:
+        if cmd not in self.shell.commands:
             self.shell.return_code = 127  # Command not found
             error_msg = f"{cmd}: command not found"
 
@@ -498,6 +883,86 @@ class CommandExecutor:
             else:
                 return error_msg
 
+        # Reset return code before execution
+        self.shell.return_code = 0
+
+        # Capture stderr if it is redirected
+        if self._captures_stderr(redirect_info):
+            self.shell._stderr_buffer = ""
+        return None
+
+    def _complete_compiled(
+        self, compiled: CompiledCommand, result: str, start_time: Optional[float]
+    ) -> str:
+        """
+        Finish a command that has run: stderr, timing, buffers, redirection.
+
+        Args:
+            compiled: Expanded command
+            result: The command's output
+            start_time: When the command started, if timing is enabled
+
+        Returns:
+            Command output after redirection
+        """
+        redirect_info = compiled.redirect_info
+        cmd = compiled.name
+
+        # Get stderr if it was captured
+        stderr_output = ""
+        if self._captures_stderr(redirect_info):
+            stderr_output = getattr(self.shell, "_stderr_buffer", "")
+            # For commands that don't produce stderr, simulate it for errors
+            if not stderr_output and self.shell.return_code != 0:
+                if "No such file or directory" in result or "not found" in result:
+                    stderr_output = result
+                    result = ""  # Move error to stderr
+
+        # Record timing statistics
+        if self.shell.enable_timing and start_time:
+            self._record_timing(cmd, time.time() - start_time)
+
+        # Update PWD for cd command
+        if cmd == "cd":
+            self.shell.environ["PWD"] = self.shell.fs.pwd()
+
+        # Clear stdin buffer
+        if hasattr(self.shell, "_stdin_buffer"):
+            del self.shell._stdin_buffer
+
+        # Clear stderr buffer
+        if hasattr(self.shell, "_stderr_buffer"):
+            del self.shell._stderr_buffer
+
+        # Handle output redirection with advanced features
+        return self._handle_advanced_redirection(redirect_info, result, stderr_output)
+
+    def _command_failed(self, compiled: CompiledCommand, error: Exception) -> str:
+        """Report a command that raised, honouring stderr redirection."""
+        logger.error(f"Error executing command '{compiled.name}': {error}")
+        self.shell.return_code = 1
+        error_msg = f"Error executing command: {error}"
+
+        # Handle stderr redirection for errors
+        redirect_info = compiled.redirect_info
+        if redirect_info.stderr_file:
+            self._write_redirect(
+                redirect_info.stderr_file,
+                error_msg,
+                redirect_info.stderr_append,
+            )
+            return ""
+        return error_msg
+
+    @staticmethod
+    def _captures_stderr(redirect_info: RedirectionInfo) -> bool:
+        """Check whether a command's stderr is redirected."""
+        return bool(
+            redirect_info.stderr_file
+            or redirect_info.stderr_to_stdout
+            or redirect_info.combined_file
+        )
+
     def _handle_advanced_redirection(
         self, redirect_info, stdout: str, stderr: str
     ) -> str:
@@ -573,6 +1038,11 @@ class CommandExecutor:
         filename = self.expansion.restore_escaped_spaces(filename)
 
         if append:
+            append_file = getattr(self.shell.fs, "append_file", None)
+            if callable(append_file):
+                # Appends to a separate line without rewriting the file
+                append_file(filename, content, separator="\n")
+                return
             # Append to file
             existing = self.shell.fs.read_file(filename) or ""
             # Handle both bytes and string content
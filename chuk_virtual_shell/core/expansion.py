@@ -3,18 +3,27 @@
 chuk_virtual_shell/core/expansion.py - Shell expansion utilities
 
 Handles all shell expansions including variables, globs, tildes, aliases,
-and command substitution.
+and command substitution. Commands are expanded word by word into their
+argv (expand_command, see words.py); the string-based passes below remain
+for callers that expand text, and for command lines that cannot be
+tokenized (e.g. an unterminated quote).
 """
 
 import re
 import shlex
-import fnmatch
-import os
-from typing import TYPE_CHECKING, List
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, List, Optional
+
+from chuk_virtual_shell.core.arithmetic import ExpressionError, evaluate
+from chuk_virtual_shell.core.globbing import ListingCache, glob
+from chuk_virtual_shell.core.words import CompiledCommand, WordExpander
 
 if TYPE_CHECKING:
     from chuk_virtual_shell.shell_interpreter import ShellInterpreter
 
+# $NAME and ${NAME} inside $(( )), which the arithmetic evaluator reads itself
+_ARITHMETIC_VARIABLE = re.compile(r"\$(?:[A-Za-z_]\w*|\{[A-Za-z_]\w*\})")
+
 
 class ExpansionHandler:
     """Handles all shell expansions (variables, globs, tilde, command substitution)."""
@@ -29,6 +38,52 @@ class ExpansionHandler:
 
     def __init__(self, shell: "ShellInterpreter"):
         self.shell = shell
+        self._words: Optional[WordExpander] = None
+        # Directory listings shared by the globs of the command being expanded
+        self._listings: Optional[ListingCache] = None
+
+    @property
+    def words(self) -> WordExpander:
+        """Lazy load the word expander."""
+        if self._words is None:
+            self._words = WordExpander(self)
+        return self._words
+
+    def expand_command(self, cmd_line: str) -> Optional[CompiledCommand]:
+        """
+        Expand a simple command into its argv and redirections.
+
+        All expansions are applied word by word in POSIX order; the fields
+        become the arguments directly.
+
+        Args:
+            cmd_line: Unexpanded simple command (aliases already applied)
+
+        Returns:
+            CompiledCommand, or None if the line cannot be tokenized
+        """
+        return self.words.expand_command(cmd_line)
+
+    def expand_words(self, text: str) -> Optional[List[str]]:
+        """
+        Expand a list of words (e.g. for loop items) into fields.
+
+        Returns:
+            The fields, or None if text cannot be tokenized
+        """
+        return self.words.split_and_expand(text)
+
+    @contextmanager
+    def glob_listings(self):
+        """Share directory listings between the globs expanded inside."""
+        if self._listings is not None:
+            yield self._listings
+            return
+        self._listings = ListingCache(self.shell.fs)
+        try:
+            yield self._listings
+        finally:
+            self._listings = None
 
     def expand_all(self, cmd_line: str) -> str:
         """
@@ -195,6 +250,11 @@ class ExpansionHandler:
         Returns:
             Command line with variables expanded
         """
+        with self.glob_listings():
+            return self._expand_globs(cmd_line)
+
+    def _expand_globs(self, cmd_line: str) -> str:
+        """Expand globs in a command line, leaving heredoc content alone."""
         # Check if this is a heredoc command - if so, only process the first line
         if "\n" in cmd_line and ("<<" in cmd_line):
             lines = cmd_line.split("\n")
@@ -385,7 +445,8 @@ class ExpansionHandler:
             cmd_line: Command line containing arithmetic expressions
 
         Returns:
-            Command line with arithmetic evaluated
+            Command line with arithmetic evaluated; an expression that
+            fails to evaluate is left as written
         """
         result = []
         i = 0
@@ -404,44 +465,17 @@ class ExpansionHandler:
                     result.append(cmd_line[i : end + 1])
                     i = end + 1
             # Check for arithmetic expansion
-            elif cmd_line[i : i + 3] == "$((" and not self._is_in_single_quotes(
-                cmd_line, i
-            ):
-                # Find closing ))
-                end = cmd_line.find("))", i + 3)
+            elif cmd_line.startswith("$((", i):
+                end = self._arithmetic_end(cmd_line, i + 3)
                 if end == -1:
                     result.append(cmd_line[i])
                     i += 1
                 else:
                     expr = cmd_line[i + 3 : end]
-
-                    # First expand any $VAR references to their values
-                    def expand_var(m):
-                        var_name = m.group(1)
-                        return self.shell.environ.get(var_name, "0")
-
-                    expr = re.sub(r"\$([A-Za-z_][A-Za-z0-9_]*)", expand_var, expr)
-
-                    # Then replace bare variable names
-                    for var_name in re.findall(r"[A-Za-z_][A-Za-z0-9_]*", expr):
-                        if var_name in self.shell.environ:
-                            var_value = self.shell.environ[var_name]
-                            # Try to convert to int, default to 0 if not numeric
-                            try:
-                                var_value = str(int(var_value))
-                            except (ValueError, TypeError):
-                                var_value = "0"
-                            expr = re.sub(r"\b" + var_name + r"\b", var_value, expr)
-
-                    # Safely evaluate the arithmetic expression
                     try:
-                        # Only allow safe operations
-                        evaluated = eval(expr, {"__builtins__": {}}, {})
-                        result.append(str(evaluated))
-                    except Exception:
-                        # If evaluation fails, return the original expression
-                        result.append(f"$(({expr}))")
-
+                        result.append(str(self.evaluate_arithmetic(expr)))
+                    except ExpressionError:
+                        result.append(cmd_line[i : end + 2])
                     i = end + 2
             else:
                 # Regular character
@@ -450,6 +484,38 @@ class ExpansionHandler:
 
         return "".join(result)
 
+    def evaluate_arithmetic(self, expr: str) -> int:
+        """
+        Evaluate an arithmetic expression against the shell variables.
+
+        Plain $NAME and ${NAME} references are read by the evaluator itself;
+        other parameters and command substitutions are expanded first.
+
+        Raises:
+            ExpressionError: if the expression is invalid
+        """
+        if "`" in expr or "$" in _ARITHMETIC_VARIABLE.sub("", expr):
+            expr = self.expand_command_substitution(expr)
+            expr = expr.replace("$?", str(self.shell.return_code))
+            expr = self.expand_variables(expr)
+        return evaluate(expr, self.shell.environ)
+
+    @staticmethod
+    def _arithmetic_end(text: str, start: int) -> int:
+        """Index of the "))" closing an expression that starts at start."""
+        depth = 0
+        i = start
+        while i < len(text):
+            char = text[i]
+            if char == "(":
+                depth += 1
+            elif char == ")":
+                if depth == 0:
+                    return i if text.startswith("))", i) else -1
+                depth -= 1
+            i += 1
+        return -1
+
     def expand_globs(self, cmd_line: str) -> str:
         """
         Expand glob patterns (wildcards) in the command line.
@@ -462,6 +528,11 @@ class ExpansionHandler:
         Returns:
             Command line with globs expanded
         """
+        with self.glob_listings():
+            return self._expand_globs(cmd_line)
+
+    def _expand_globs(self, cmd_line: str) -> str:
+        """Expand globs in a command line, leaving heredoc content alone."""
         # Check if this is a heredoc command - if so, only process the first line
         if "\n" in cmd_line and ("<<" in cmd_line):
             lines = cmd_line.split("\n")
@@ -607,6 +678,11 @@ class ExpansionHandler:
         Returns:
             Command line with tildes expanded
         """
+        with self.glob_listings():
+            return self._expand_globs(cmd_line)
+
+    def _expand_globs(self, cmd_line: str) -> str:
+        """Expand globs in a command line, leaving heredoc content alone."""
         # Check if this is a heredoc command - if so, only process the first line
         if "\n" in cmd_line and ("<<" in cmd_line):
             lines = cmd_line.split("\n")
@@ -657,131 +733,45 @@ class ExpansionHandler:
         """
         Expand command aliases.
 
+        Only the first word is replaced; the rest of the line is kept as
+        written, quoting included.
+
         Args:
             cmd_line: Command line potentially starting with an alias
 
         Returns:
             Command line with alias expanded
         """
-        if not hasattr(self.shell, "aliases") or not self.shell.aliases:
+        aliases = getattr(self.shell, "aliases", None)
+        if not aliases:
             return cmd_line
 
-        # Split the command line to get the first word (command)
-        try:
-            parts = shlex.split(cmd_line)
-            if not parts:
+        seen = set()
+        while True:
+            stripped = cmd_line.lstrip()
+            match = re.match(r"[^\s'\"\\$`<>|;&()]+", stripped)
+            if match is None:
                 return cmd_line
-        except ValueError:
-            # If shlex fails, try simple split
-            parts = cmd_line.split()
-            if not parts:
+            cmd = match.group(0)
+            rest = stripped[match.end() :]
+            # Each alias is expanded once, which also stops recursion
+            if cmd in seen or cmd not in aliases or (rest and not rest[0].isspace()):
                 return cmd_line
-
-        # Check if the first word is an alias
-        cmd = parts[0]
-        if cmd in self.shell.aliases:
-            # Replace with alias value
-            alias_value = self.shell.aliases[cmd]
-            if len(parts) > 1:
-                # Append remaining arguments
-                expanded = alias_value + " " + " ".join(parts[1:])
-            else:
-                expanded = alias_value
-
-            # Prevent infinite recursion by tracking expansion depth
-            if not hasattr(self, "_alias_depth"):
-                self._alias_depth = 0
-
-            self._alias_depth += 1
-            if self._alias_depth < 10:  # Max recursion depth
-                # Recursively expand in case alias contains other aliases
-                expanded = self.expand_aliases(expanded)
-
-            self._alias_depth -= 1
-            if self._alias_depth == 0:
-                del self._alias_depth
-
-            return expanded
-
-        return cmd_line
+            seen.add(cmd)
+            cmd_line = aliases[cmd] + rest
 
     def _match_glob_pattern(self, pattern: str) -> List[str]:
         """
         Match glob pattern against files in the virtual filesystem.
 
         Args:
-            pattern: Glob pattern to match
+            pattern: Glob pattern to match (may contain directories and **)
 
         Returns:
-            List of matching file paths
+            List of matching paths, relative if the pattern is relative
         """
-        matches = []
-        original_pattern = pattern
-
-        # Handle absolute vs relative patterns
-        if pattern.startswith("/"):
-            # Absolute pattern
-            search_path = "/"
-            pattern = pattern[1:] if len(pattern) > 1 else ""
-            is_absolute = True
-        else:
-            # Relative pattern
-            search_path = self.shell.fs.pwd()
-            is_absolute = False
-
-        # Get the directory to search in
-        if "/" in pattern:
-            # Pattern includes directory
-            dir_parts = pattern.rsplit("/", 1)
-            if is_absolute:
-                # For absolute patterns, build from root
-                search_dir = "/" + dir_parts[0] if dir_parts[0] else "/"
-            else:
-                # For relative patterns, join with base path
-                search_dir = (
-                    os.path.join(search_path, dir_parts[0])
-                    if dir_parts[0]
-                    else search_path
-                )
-            file_pattern = dir_parts[1]
-        else:
-            # Pattern is just for files in current/base directory
-            search_dir = search_path
-            file_pattern = pattern
-
-        # Normalize the search directory path
-        search_dir = search_dir.replace("\\", "/")
-        if search_dir != "/" and search_dir.endswith("/"):
-            search_dir = search_dir[:-1]
-
-        # List files in the search directory
-        try:
-            entries = self.shell.fs.ls(search_dir)
-            if entries:
-                for entry in entries:
-                    # Skip . and ..
-                    if entry in [".", ".."]:
-                        continue
-
-                    # Check if the entry matches the pattern
-                    if fnmatch.fnmatch(entry, file_pattern):
-                        # Build the full path
-                        if search_dir == "/":
-                            full_path = "/" + entry
-                        else:
-                            full_path = search_dir + "/" + entry
-
-                        # For patterns with directories, always return full paths
-                        # For simple patterns in current dir, return just filenames
-                        if "/" in original_pattern or is_absolute:
-                            matches.append(full_path)
-                        else:
-                            # Simple pattern in current directory
-                            matches.append(entry)
-        except Exception:
-            pass
-
-        return sorted(matches)
+        listings = self._listings or ListingCache(self.shell.fs)
+        return glob(pattern, self.shell.fs.pwd(), listings)
 
     def _reconstruct_command_line(self, parts: List[str]) -> str:
         """
@@ -0,0 +1,169 @@
+# chuk_virtual_shell/core/globbing.py
+"""
+chuk_virtual_shell/core/globbing.py - Pathname expansion
+
+A pattern is split at "/" and expanded one segment at a time: literal
+segments are looked up in their parent's listing, wildcard segments are
+matched against it with a regex compiled once per distinct segment, and
+"**" matches any number of directories (itself included). So
+"src/*/test_*.py" lists src and each of its subdirectories once, and
+"docs/**/*.md" walks docs once.
+
+Listings are kept in a ListingCache for as long as the caller holds on to
+it. The shell uses one per simple command, so "cp *.py *.txt *.md dest/"
+lists the current directory once rather than three times; on remote
+providers each listing saved is a round trip.
+"""
+
+import fnmatch
+import posixpath
+import re
+from typing import Dict, List, Tuple
+
+from chuk_virtual_shell.core.command_ast import LRUCache
+from chuk_virtual_shell.filesystem_compat import scan_dir
+
+_GLOB_CHARS = "*?["
+
+
+def has_magic(pattern: str) -> bool:
+    """Whether a pattern contains wildcard characters."""
+    return any(char in pattern for char in _GLOB_CHARS)
+
+
+def _compile_segment(segment: str) -> "re.Pattern":
+    return re.compile(fnmatch.translate(segment))
+
+
+# Compiled regex of every pattern segment seen (shared by all shells)
+_segment_cache = LRUCache(_compile_segment, maxsize=512)
+
+
+def compile_segment(segment: str) -> "re.Pattern":
+    """Return the (cached) regex matching one pattern segment."""
+    return _segment_cache.get(segment)
+
+
+class ListingCache:
+    """Directory listings read from a filesystem, kept until dropped."""
+
+    def __init__(self, fs):
+        self.fs = fs
+        self.listings = 0
+        self._entries: Dict[str, Dict[str, bool]] = {}
+
+    def entries(self, directory: str) -> Dict[str, bool]:
+        """Return {name: is_dir} for a directory; empty if it can't be listed."""
+        entries = self._entries.get(directory)
+        if entries is None:
+            self.listings += 1
+            try:
+                listing = scan_dir(self.fs, directory)
+            except Exception:
+                listing = []
+            entries = {
+                name: bool(info is not None and info.is_dir)
+                for name, info in listing
+                if name not in (".", "..")
+            }
+            self._entries[directory] = entries
+        return entries
+
+    def clear(self) -> None:
+        """Forget all listings (after the filesystem may have changed)."""
+        self._entries.clear()
+
+
+def glob(pattern: str, cwd: str, listings: ListingCache) -> List[str]:
+    """
+    Expand a pathname pattern.
+
+    Relative patterns are matched below cwd and give relative paths;
+    absolute patterns give absolute paths. A pattern ending in "/" only
+    matches directories.
+
+    Args:
+        pattern: Pattern with *, ?, [...] and ** wildcards
+        cwd: Directory relative patterns start from
+        listings: Listing cache to read directories through
+
+    Returns:
+        Sorted matching paths; empty if nothing matches
+    """
+    absolute = pattern.startswith("/")
+    dirs_only = pattern.endswith("/")
+    segments = [segment for segment in pattern.split("/") if segment]
+    if not segments:
+        return []
+
+    # (path as written, real directory) of every partial match
+    matches: List[Tuple[str, str]] = [
+        ("/" if absolute else "", "/" if absolute else cwd)
+    ]
+    last = len(segments) - 1
+    for index, segment in enumerate(segments):
+        want_dir = index < last or dirs_only
+        if segment == "**":
+            matches = _descend(matches, listings, index == last, not want_dir)
+            if not matches:
+                return []
+            continue
+        found: List[Tuple[str, str]] = []
+        if has_magic(segment):
+            regex = compile_segment(segment)
+            for shown, real in matches:
+                for name, is_dir in listings.entries(real).items():
+                    if regex.match(name) and (is_dir or not want_dir):
+                        found.append((shown + name, posixpath.join(real, name)))
+        else:
+            for shown, real in matches:
+                if segment in (".", ".."):
+                    parent = posixpath.normpath(posixpath.join(real, segment))
+                    found.append((shown + segment, parent))
+                    continue
+                is_dir = listings.entries(real).get(segment)
+                if is_dir is not None and (is_dir or not want_dir):
+                    found.append((shown + segment, posixpath.join(real, segment)))
+        matches = (
+            [(shown + "/", real) for shown, real in found] if index < last else found
+        )
+        if not matches:
+            return []
+
+    suffix = "/" if dirs_only else ""
+    return sorted({(shown.rstrip("/") or "/") + suffix for shown, _ in matches})
+
+
+def _descend(
+    matches: List[Tuple[str, str]],
+    listings: ListingCache,
+    last: bool,
+    include_files: bool,
+) -> List[Tuple[str, str]]:
+    """
+    Expand "**" to every directory below each match.
+
+    Inside a pattern the matches themselves are kept (** matches zero
+    directories too); as the last segment they are not, and files are
+    included when include_files is set.
+    """
+    result: List[Tuple[str, str]] = []
+    starts = set(matches)
+    seen = set()
+    stack = list(reversed(matches))
+    while stack:
+        shown, real = stack.pop()
+        if real in seen:
+            continue
+        seen.add(real)
+        if not last or (shown, real) not in starts:
+            result.append((shown, real))
+        children = []
+        for name, is_dir in listings.entries(real).items():
+            if is_dir:
+                child = posixpath.join(real, name)
+                children.append((shown + name + "/", child))
+            elif include_files:
+                result.append((shown + name, posixpath.join(real, name)))
+        stack.extend(reversed(children))
+    return result
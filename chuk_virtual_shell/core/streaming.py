@@ -0,0 +1,204 @@
+# chuk_virtual_shell/core/streaming.py
+"""
+chuk_virtual_shell/core/streaming.py - Lazy text streams for pipelines
+
+A stream is any iterator of ``str`` chunks whose concatenation is the full
+output of a command. Chunk boundaries are arbitrary; consumers that need
+lines use ``iter_lines`` to re-split the stream lazily, so a pipeline only
+ever holds a bounded window of data per stage. Commands that can apply str
+methods to many lines at once use ``iter_line_blocks`` instead, which keeps
+the per-line work out of Python loops.
+"""
+
+import re
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
+
+# Default size of the text slices produced when a large string is streamed
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Characters str.splitlines() treats as line boundaries (besides "\r\n")
+_LINE_BOUNDARIES = "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+
+# Line boundaries other than "\n"
+_OTHER_LINE_BREAKS = re.compile("[\r\x0b\x0c\x1c-\x1e\x85\u2028\u2029]")
+
+
+class PipelineAbort(Exception):
+    """Raised by a pipeline stage to stop the pipeline with an error message."""
+
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.message = message
+
+
+def iter_chunks(text: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Stream a string as slices of at most ``chunk_size`` characters.
+
+    Args:
+        text: Text to stream
+        chunk_size: Maximum slice length
+
+    Yields:
+        Consecutive slices of text
+    """
+    for start in range(0, len(text), chunk_size):
+        yield text[start : start + chunk_size]
+
+
+def strip_line_ending(line: str) -> str:
+    """Remove a single trailing line boundary (as produced by iter_lines)."""
+    if line.endswith("\r\n"):
+        return line[:-2]
+    if line and line[-1] in _LINE_BOUNDARIES:
+        return line[:-1]
+    return line
+
+
+def iter_lines(chunks: Iterable[str], keepends: bool = False) -> Iterator[str]:
+    """
+    Re-split a chunk stream into lines, lazily.
+
+    Line boundaries follow ``str.splitlines`` so that streaming commands see
+    exactly the lines their buffered ``execute()`` counterparts see.
+
+    Args:
+        chunks: Iterable of text chunks
+        keepends: Keep the line terminators on yielded lines
+
+    Yields:
+        One line at a time
+    """
+    pending = ""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        pieces = (pending + chunk).splitlines(True)
+        pending = ""
+        last = pieces.pop()
+        # A trailing "\r" may be the first half of a "\r\n" split across chunks
+        if last[-1] in _LINE_BOUNDARIES and last[-1] != "\r":
+            pieces.append(last)
+        else:
+            pending = last
+        for line in pieces:
+            yield line if keepends else strip_line_ending(line)
+    if pending:
+        yield pending if keepends else strip_line_ending(pending)
+
+
+def iter_line_blocks(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Re-split a chunk stream into blocks of whole lines, lazily.
+
+    Each block is the run of complete lines (with their terminators) that
+    arrived with a chunk; only the last block may lack a final terminator.
+    The lines of a block are the lines ``str.splitlines`` finds in it.
+
+    Args:
+        chunks: Iterable of text chunks
+
+    Yields:
+        Non-empty blocks of text
+    """
+    pending = ""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        text = pending + chunk if pending else chunk
+        cut = text.rfind("\n") + 1
+        if not cut:
+            # Other line boundaries; a trailing "\r" may precede a "\n"
+            last = text.splitlines(True)[-1]
+            if last[-1] in _LINE_BOUNDARIES and last[-1] != "\r":
+                cut = len(text)
+            else:
+                cut = len(text) - len(last)
+        if cut:
+            yield text[:cut]
+        pending = text[cut:]
+    if pending:
+        yield pending
+
+
+def has_other_line_breaks(text: str) -> bool:
+    """Whether text has line breaks other than "\\n" that splitlines() honours."""
+    if text.isascii():
+        return any(char in text for char in "\r\x0b\x0c\x1c\x1d\x1e")
+    return _OTHER_LINE_BREAKS.search(text) is not None
+
+
+def count_lines(block: str) -> int:
+    """Number of lines str.splitlines() finds in a block of text."""
+    if has_other_line_breaks(block):
+        return len(block.splitlines())
+    return block.count("\n") + (not block.endswith("\n"))
+
+
+def join_lines(lines: Iterable[str], separator: str = "\n") -> Iterator[str]:
+    """
+    Stream the equivalent of ``separator.join(lines)`` without building it.
+
+    Args:
+        lines: Lines without terminators
+        separator: Separator placed between consecutive lines
+
+    Yields:
+        Chunks whose concatenation equals ``separator.join(lines)``
+    """
+    first = True
+    for line in lines:
+        if first:
+            first = False
+            yield line
+        else:
+            yield separator + line
+
+
+def batch_lines(lines: Iterable[str], size: int = 4096) -> Iterator[List[str]]:
+    """
+    Group a stream of lines into lists of up to ``size`` lines.
+
+    Joining each batch (``"\n".join``) lets a stage that produces single
+    lines hand downstream stages a chunk per batch, not per line.
+    """
+    iterator = iter(lines)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def peek_stream(stream: Iterable[str]) -> Optional[Iterator[str]]:
+    """
+    Check whether a stream produces any non-empty output.
+
+    Consumes chunks up to the first non-empty one.
+
+    Args:
+        stream: Stream to inspect
+
+    Returns:
+        An equivalent iterator including the consumed chunk, or None if the
+        stream was empty
+    """
+    iterator = iter(stream)
+    for chunk in iterator:
+        if chunk:
+            return _prepend(chunk, iterator)
+    return None
+
+
+def _prepend(first: str, rest: Iterator[str]) -> Iterator[str]:
+    """Yield ``first`` followed by the remainder of ``rest``."""
+    yield first
+    yield from rest
+
+
+def close_stream(stream) -> None:
+    """Close a generator-based stream so its upstream stages are released."""
+    close = getattr(stream, "close", None)
+    if close is not None:
+        close()
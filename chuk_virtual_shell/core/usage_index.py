@@ -0,0 +1,261 @@
+# chuk_virtual_shell/core/usage_index.py
+"""
+chuk_virtual_shell/core/usage_index.py - Incremental disk usage accounting
+
+Every directory holds the total bytes, files and subdirectories below it.
+A write adjusts the totals of the file's ancestors, so keeping them current
+costs O(depth) per change, and reading the usage of any directory is a
+dictionary lookup; du -s, df and quota no longer walk the tree.
+
+FileSystemCompat keeps the index current the same way it keeps the content
+index: sizes passed to write_file are applied directly, and every other
+mutation marks the affected path dirty. A dirty path is re-read, together
+with everything below it, before the next query. check() recomputes the
+totals from the filesystem and reports where they disagree.
+"""
+
+import posixpath
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+
+@dataclass(frozen=True)
+class Usage:
+    """Bytes, files and directories at or below a path."""
+
+    bytes: int
+    files: int
+    dirs: int
+
+
+class UsageIndex:
+    """Per-directory size and inode totals for one filesystem."""
+
+    def __init__(self, max_age: Optional[float] = None):
+        """
+        Initialize an empty index; it is built on the first sync().
+
+        Args:
+            max_age: Seconds after which the whole tree is re-read, for
+                filesystems that other clients may change (None = never)
+        """
+        self.max_age = max_age
+        # directory path -> {child name: is_dir}, in listing order
+        self.children: Dict[str, Dict[str, bool]] = {}
+        # file path -> size in bytes
+        self.sizes: Dict[str, int] = {}
+        # directory path -> [bytes, files, dirs] below it
+        self.totals: Dict[str, List[int]] = {}
+        self.built_at: Optional[float] = None
+        self._dirty: Set[str] = {"/"}
+        self._lock = threading.RLock()
+
+    # Change tracking
+
+    def mark_dirty(self, path: str) -> None:
+        """Re-read path (and everything below it) before the next query."""
+        with self._lock:
+            if path == "/":
+                self.children.clear()
+                self.sizes.clear()
+                self.totals.clear()
+                self.built_at = None
+                self._dirty = {"/"}
+            elif "/" not in self._dirty:
+                self._dirty.add(path)
+
+    def update_file(self, path: str, size: int) -> None:
+        """Account for size bytes just written to path."""
+        with self._lock:
+            if "/" in self._dirty:
+                # Not built yet (or being rebuilt); nothing to adjust
+                return
+            parent, name = posixpath.split(path)
+            siblings = self.children.get(parent)
+            if siblings is None or siblings.get(name) or not name:
+                # Unknown parent or a directory of that name: re-read it
+                self._dirty.add(path)
+                return
+            self._dirty.discard(path)
+            old = self.sizes.get(path)
+            if old is None:
+                siblings[name] = False
+                self._add_up(parent, size, 1, 0)
+            else:
+                self._add_up(parent, size - old, 0, 0)
+            self.sizes[path] = size
+
+    # Queries
+
+    def sync(self, fs) -> None:
+        """
+        Bring dirty paths up to date.
+
+        Args:
+            fs: FileSystemCompat the index belongs to (stat and scan_dir
+                are used)
+        """
+        with self._lock:
+            if (
+                self.max_age is not None
+                and self.built_at is not None
+                and time.monotonic() - self.built_at > self.max_age
+            ):
+                self.mark_dirty("/")
+            while self._dirty:
+                done: List[str] = []
+                dirty = sorted(self._dirty, key=lambda p: p.count("/"))
+                self._dirty = set()
+                for path in dirty:
+                    if any(_is_below(path, ancestor) for ancestor in done):
+                        continue
+                    self._resync(fs, path)
+                    done.append(path)
+            if self.built_at is None:
+                self.built_at = time.monotonic()
+
+    def usage(self, path: str) -> Optional[Usage]:
+        """Return the usage at or below path, or None if it is unknown."""
+        with self._lock:
+            totals = self.totals.get(path)
+            if totals is not None:
+                return Usage(*totals)
+            size = self.sizes.get(path)
+            if size is not None:
+                return Usage(size, 1, 0)
+            return None
+
+    def check(self, fs) -> List[str]:
+        """
+        Recompute every total from the filesystem.
+
+        Returns:
+            Paths whose totals disagree with a fresh count, shallowest first
+        """
+        with self._lock:
+            self.sync(fs)
+            fresh = UsageIndex()
+            fresh.sync(fs)
+            paths = set(self.totals) | set(fresh.totals)
+            paths |= set(self.sizes) | set(fresh.sizes)
+            wrong = [
+                path
+                for path in paths
+                if self.totals.get(path) != fresh.totals.get(path)
+                or self.sizes.get(path) != fresh.sizes.get(path)
+            ]
+            return sorted(wrong, key=lambda p: (p.count("/"), p))
+
+    def stats(self) -> Dict[str, int]:
+        """Return sizes of the index."""
+        with self._lock:
+            return {
+                "directories": len(self.totals),
+                "files": len(self.sizes),
+                "dirty": len(self._dirty),
+            }
+
+    # Internals
+
+    def _add_up(self, directory: str, size: int, files: int, dirs: int) -> None:
+        """Add to the totals of directory and all its ancestors."""
+        while True:
+            totals = self.totals.get(directory)
+            if totals is not None:
+                totals[0] += size
+                totals[1] += files
+                totals[2] += dirs
+            if directory == "/":
+                return
+            directory = posixpath.dirname(directory)
+
+    def _resync(self, fs, path: str) -> None:
+        """Replace everything known about path with what fs reports now."""
+        parent, name = posixpath.split(path)
+        siblings = self.children.get(parent) if name else None
+        self._drop(path, siblings)
+        node = fs.stat(path)
+        if node is None:
+            return
+        if name:
+            if siblings is None:
+                # Created below a directory the index has not seen yet
+                self._dirty.add(parent)
+                return
+            siblings[name] = node.is_dir
+        if not node.is_dir:
+            self.sizes[path] = node.size
+            self._add_up(parent, node.size, 1, 0)
+            return
+        total = self._add_tree(fs, path)
+        if name:
+            self._add_up(parent, total[0], total[1], total[2] + 1)
+
+    def _add_tree(self, fs, top: str) -> List[int]:
+        """Count a directory tree, filling in totals bottom-up."""
+        order = []
+        stack = [top]
+        while stack:
+            directory = stack.pop()
+            order.append(directory)
+            siblings = self.children[directory] = {}
+            self.totals[directory] = [0, 0, 0]
+            for name, info in fs.scan_dir(directory):
+                if info is None:
+                    continue
+                child = posixpath.join(directory, name)
+                siblings[name] = bool(info.is_dir)
+                if info.is_dir:
+                    stack.append(child)
+                else:
+                    node = fs.stat(child)
+                    self.sizes[child] = node.size if node is not None else 0
+
+        # Children are counted before their parents
+        for directory in reversed(order):
+            totals = self.totals[directory]
+            for name, is_dir in self.children[directory].items():
+                child = posixpath.join(directory, name)
+                if is_dir:
+                    below = self.totals[child]
+                    totals[0] += below[0]
+                    totals[1] += below[1]
+                    totals[2] += below[2] + 1
+                else:
+                    totals[0] += self.sizes[child]
+                    totals[1] += 1
+        return self.totals[top]
+
+    def _drop(self, path: str, siblings: Optional[Dict[str, bool]]) -> None:
+        """Forget path and everything below it, and subtract it upwards."""
+        parent, name = posixpath.split(path)
+        size = self.sizes.pop(path, None)
+        if size is not None:
+            self._add_up(parent, -size, -1, 0)
+        totals = self.totals.get(path)
+        if totals is not None:
+            if name:
+                self._add_up(parent, -totals[0], -totals[1], -totals[2] - 1)
+            stack = [path]
+            while stack:
+                directory = stack.pop()
+                self.totals.pop(directory, None)
+                for child, is_dir in self.children.pop(directory, {}).items():
+                    child_path = posixpath.join(directory, child)
+                    if is_dir:
+                        stack.append(child_path)
+                    else:
+                        self.sizes.pop(child_path, None)
+        if siblings is not None:
+            siblings.pop(name, None)
+
+
+def _is_below(path: str, ancestor: str) -> bool:
+    """Whether path is ancestor or lies below it."""
+    return (
+        path == ancestor
+        or ancestor == "/"
+        or path.startswith(ancestor.rstrip("/") + "/")
+    )
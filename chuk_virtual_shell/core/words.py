@@ -0,0 +1,598 @@
+# chuk_virtual_shell/core/words.py
+"""
+chuk_virtual_shell/core/words.py - Word-based shell expansion
+
+A simple command is tokenized once (cached by its text) into words,
+redirection operators and here-document content; quoted text, escapes and
+substitutions stay inside the word they belong to. Every word then goes
+through the POSIX expansions in order - tilde, parameter, arithmetic and
+command substitution, field splitting, pathname expansion and quote removal
+- in a single left-to-right scan, and the resulting fields are the argv of
+the command. Nothing is joined back into a command line and split again, so
+expansion is linear in the length of the line and quoting survives it
+exactly: a "$VAR" holding spaces or quotes stays one argument, and a ">"
+inside a quoted awk program is not a redirection.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from chuk_virtual_shell.core.command_ast import LRUCache
+from chuk_virtual_shell.core.redirection import RedirectionInfo
+
+if TYPE_CHECKING:
+    from chuk_virtual_shell.core.expansion import ExpansionHandler
+
+# Redirection operators, longest first; "1>" is the same as ">"
+_OPERATORS = (
+    ("2>&1", "2>&1"),
+    ("2>>", "2>>"),
+    ("2>", "2>"),
+    ("&>>", "&>>"),
+    ("&>", "&>"),
+    ("1>>", ">>"),
+    ("1>", ">"),
+    (">>", ">>"),
+    (">|", ">"),
+    (">", ">"),
+    ("<<-", "<<-"),
+    ("<<", "<<"),
+    ("<", "<"),
+)
+
+_BLANKS = " \t\n"
+_GLOB_CHARS = "*?["
+_NAME = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_ASSIGNMENT = re.compile(r"([A-Za-z_][A-Za-z0-9_]*)=")
+
+# Kinds of text in an expanded word: quoted text is neither split nor
+# globbed, literal text is globbed, and expansion results are both
+QUOTED, LITERAL, EXPANDED = 0, 1, 2
+
+
+@dataclass(frozen=True)
+class CompiledCommand:
+    """
+    An expanded command split into redirections, name and arguments.
+
+    Instances are shared through the compile cache and must not be modified.
+    """
+
+    redirect_info: RedirectionInfo
+    name: Optional[str]
+    args: Tuple[str, ...]
+    # NAME=value words before the command (all of them if there is none)
+    assignments: Tuple[Tuple[str, str], ...] = ()
+
+
+@dataclass(frozen=True)
+class CommandWords:
+    """A simple command tokenized into unexpanded words and redirections."""
+
+    words: Tuple[str, ...]
+    # (operator, unexpanded target word); the target of 2>&1 is ""
+    redirects: Tuple[Tuple[str, str], ...]
+    heredoc: Optional[str] = None
+
+
+class _Unbalanced(ValueError):
+    """An unterminated quote, substitution or here-document."""
+
+
+def tokenize(text: str) -> Optional[CommandWords]:
+    """
+    Split a simple command into words and redirections.
+
+    Returns:
+        CommandWords, or None if a quote, substitution or here-document is
+        not terminated
+    """
+    try:
+        return _tokenize(text)
+    except _Unbalanced:
+        return None
+
+
+# Loops and scripts run the same command text many times
+_token_cache = LRUCache(tokenize, maxsize=1024)
+
+
+def tokenize_cached(text: str) -> Optional[CommandWords]:
+    """Return the (cached) tokenized form of a simple command."""
+    return _token_cache.get(text)
+
+
+def _tokenize(text: str) -> CommandWords:
+    words: List[str] = []
+    redirects: List[Tuple[str, str]] = []
+    heredoc = None
+    pending: Optional[Tuple[str, bool]] = None
+    i, n = 0, len(text)
+    while i < n:
+        char = text[i]
+        if char in _BLANKS:
+            if char == "\n" and pending is not None:
+                heredoc = _heredoc_body(text[i + 1 :], *pending)
+                break
+            i += 1
+            continue
+
+        operator = _operator_at(text, i)
+        if operator is not None:
+            source, op = operator
+            i += len(source)
+            if op == "2>&1":
+                redirects.append((op, ""))
+                continue
+            while i < n and text[i] in " \t":
+                i += 1
+            end = _scan_word(text, i)
+            if end == i:
+                raise _Unbalanced(op)
+            target = text[i:end]
+            redirects.append((op, target))
+            if op in ("<<", "<<-"):
+                pending = (_unquote(target), op == "<<-")
+            i = end
+            continue
+
+        end = _scan_word(text, i)
+        if end == i:
+            # A lone "&" or similar: keep it as a word
+            end = i + 1
+        words.append(text[i:end])
+        i = end
+
+    return CommandWords(tuple(words), tuple(redirects), heredoc)
+
+
+def _operator_at(text: str, i: int) -> Optional[Tuple[str, str]]:
+    char = text[i]
+    if char not in "<>&12":
+        return None
+    for source, op in _OPERATORS:
+        if text.startswith(source, i):
+            return source, op
+    return None
+
+
+def _heredoc_body(rest: str, delimiter: str, strip_tabs: bool) -> str:
+    lines = []
+    for line in rest.split("\n"):
+        if line.strip() == delimiter:
+            return "\n".join(lines)
+        lines.append(line.lstrip("\t") if strip_tabs else line)
+    raise _Unbalanced(delimiter)
+
+
+def _scan_word(text: str, i: int) -> int:
+    """Return the end of the word starting at i."""
+    n = len(text)
+    while i < n:
+        char = text[i]
+        if char in _BLANKS or char in "<>":
+            break
+        if char == "&" and text.startswith("&>", i):
+            break
+        if char == "\\":
+            i += 2
+        elif char == "'":
+            i = _skip_single(text, i)
+        elif char == '"':
+            i = _skip_double(text, i)
+        elif char == "`":
+            i = _skip_backtick(text, i)
+        elif char == "$":
+            i = _skip_dollar(text, i)
+        else:
+            i += 1
+    return min(i, n)
+
+
+def _skip_single(text: str, i: int) -> int:
+    end = text.find("'", i + 1)
+    if end < 0:
+        raise _Unbalanced("'")
+    return end + 1
+
+
+def _skip_double(text: str, i: int) -> int:
+    i += 1
+    n = len(text)
+    while i < n:
+        char = text[i]
+        if char == '"':
+            return i + 1
+        if char == "\\":
+            i += 2
+        elif char == "`":
+            i = _skip_backtick(text, i)
+        elif char == "$":
+            i = _skip_dollar(text, i)
+        else:
+            i += 1
+    raise _Unbalanced('"')
+
+
+def _skip_backtick(text: str, i: int) -> int:
+    i += 1
+    n = len(text)
+    while i < n:
+        if text[i] == "\\":
+            i += 2
+        elif text[i] == "`":
+            return i + 1
+        else:
+            i += 1
+    raise _Unbalanced("`")
+
+
+def _skip_dollar(text: str, i: int) -> int:
+    if text.startswith("$(", i):
+        return _skip_group(text, i + 1)
+    if text.startswith("${", i):
+        end = text.find("}", i + 2)
+        if end < 0:
+            raise _Unbalanced("${")
+        return end + 1
+    return i + 1
+
+
+def _skip_group(text: str, i: int) -> int:
+    """Return the index after the ")" matching the "(" at i."""
+    depth = 0
+    n = len(text)
+    while i < n:
+        char = text[i]
+        if char == "(":
+            depth += 1
+            i += 1
+        elif char == ")":
+            depth -= 1
+            i += 1
+            if depth == 0:
+                return i
+        elif char == "\\":
+            i += 2
+        elif char == "'":
+            i = _skip_single(text, i)
+        elif char == '"':
+            i = _skip_double(text, i)
+        elif char == "`":
+            i = _skip_backtick(text, i)
+        else:
+            i += 1
+    raise _Unbalanced("$(")
+
+
+def _unquote(word: str) -> str:
+    """Quote removal without expansion (here-document delimiters)."""
+    result = []
+    i, n = 0, len(word)
+    while i < n:
+        char = word[i]
+        if char == "\\" and i + 1 < n:
+            result.append(word[i + 1])
+            i += 2
+        elif char in "'\"":
+            end = word.find(char, i + 1)
+            result.append(word[i + 1 : end])
+            i = end + 1
+        else:
+            result.append(char)
+            i += 1
+    return "".join(result)
+
+
+def escape_glob(text: str) -> str:
+    """Make text match itself literally in a glob pattern."""
+    if not any(char in text for char in _GLOB_CHARS):
+        return text
+    return re.sub(r"([*?\[])", r"[\1]", text)
+
+
+class WordExpander:
+    """Expand tokenized words into fields for one shell."""
+
+    def __init__(self, handler: "ExpansionHandler"):
+        self.handler = handler
+        self.shell = handler.shell
+        self._splitters: Dict[str, "re.Pattern"] = {}
+
+    # Commands
+
+    def expand_command(self, text: str) -> Optional[CompiledCommand]:
+        """
+        Expand a simple command into its name, arguments and redirections.
+
+        Returns:
+            CompiledCommand, or None if the command cannot be tokenized
+        """
+        tokens = tokenize_cached(text)
+        if tokens is None:
+            return None
+        with self.handler.glob_listings():
+            return self._expand_tokens(text, tokens)
+
+    def _expand_tokens(self, text: str, tokens: CommandWords) -> CompiledCommand:
+        """Expand the assignments, argv and redirections of a command."""
+        words = tokens.words
+        assignments = []
+        for word in words:
+            match = _ASSIGNMENT.match(word)
+            if match is None:
+                break
+            value = self.expand_word(word[match.end() :], split=False, glob=False)
+            assignments.append((match.group(1), value[0] if value else ""))
+        argv = self.expand_words(words[len(assignments) :])
+
+        info = RedirectionInfo(command=text)
+        for op, target in tokens.redirects:
+            if op == "2>&1":
+                info.stderr_to_stdout = True
+            elif op in ("<<", "<<-"):
+                info.heredoc_delimiter = _unquote(target)
+                info.heredoc_strip_tabs = op == "<<-"
+                info.heredoc_content = tokens.heredoc
+            else:
+                fields = self.expand_word(target, split=False, glob=False)
+                path = fields[0] if fields else ""
+                if op == "<":
+                    info.stdin_file = path
+                elif op in (">", ">>"):
+                    info.stdout_file = path
+                    info.stdout_append = op == ">>"
+                elif op in ("2>", "2>>"):
+                    info.stderr_file = path
+                    info.stderr_append = op == "2>>"
+                else:
+                    info.combined_file = path
+                    info.combined_append = op == "&>>"
+
+        return CompiledCommand(
+            redirect_info=info,
+            name=argv[0] if argv else None,
+            args=tuple(argv[1:]),
+            assignments=tuple(assignments),
+        )
+
+    def expand_words(self, words) -> List[str]:
+        """Expand words into fields with all expansions applied."""
+        fields: List[str] = []
+        for word in words:
+            fields.extend(self.expand_word(word))
+        return fields
+
+    def split_and_expand(self, text: str) -> Optional[List[str]]:
+        """
+        Tokenize text as a list of words and expand them (for loop items).
+
+        Returns:
+            The fields, or None if text cannot be tokenized
+        """
+        tokens = tokenize_cached(text)
+        if tokens is None or tokens.redirects:
+            return None
+        with self.handler.glob_listings():
+            return self.expand_words(tokens.words)
+
+    # Words
+
+    def expand_word(
+        self, word: str, split: bool = True, glob: bool = True
+    ) -> List[str]:
+        """
+        Expand one word.
+
+        Args:
+            word: Unexpanded word as written
+            split: Split unquoted expansion results into fields
+            glob: Expand unquoted glob patterns to matching paths
+
+        Returns:
+            The resulting fields (none for an unquoted empty expansion)
+        """
+        segments, quoted = self._segments(word)
+        if not split:
+            if not segments and not quoted:
+                return []
+            return ["".join(text for text, _ in segments)]
+
+        fields: List[List[Tuple[str, int]]] = []
+        current: List[Tuple[str, int]] = []
+        # Quoted text (even "") makes a field; empty expansions do not
+        started = False
+        for text, kind in segments:
+            if kind != EXPANDED:
+                current.append((text, kind))
+                started = True
+                continue
+            pieces = self._splitter().split(text)
+            for index, piece in enumerate(pieces):
+                if index and (started or current):
+                    fields.append(current)
+                    current = []
+                    started = False
+                if piece:
+                    current.append((piece, kind))
+                    started = True
+        if started or current:
+            fields.append(current)
+
+        result = []
+        for field in fields:
+            text = "".join(text for text, _ in field)
+            if glob and any(
+                kind != QUOTED and any(char in piece for char in _GLOB_CHARS)
+                for piece, kind in field
+            ):
+                pattern = "".join(
+                    escape_glob(piece) if kind == QUOTED else piece
+                    for piece, kind in field
+                )
+                matches = self.handler._match_glob_pattern(pattern)
+                if matches:
+                    result.extend(matches)
+                    continue
+            result.append(text)
+        return result
+
+    def _splitter(self) -> "re.Pattern":
+        """Regex splitting text into fields on $IFS."""
+        ifs = self.shell.environ.get("IFS", " \t\n")
+        splitter = self._splitters.get(ifs)
+        if splitter is None:
+            white = "".join(char for char in ifs if char in _BLANKS)
+            other = "".join(char for char in ifs if char not in _BLANKS)
+            parts = []
+            if other:
+                parts.append(
+                    f"[{re.escape(white)}]*[{re.escape(other)}][{re.escape(white)}]*"
+                    if white
+                    else f"[{re.escape(other)}]"
+                )
+            if white:
+                parts.append(f"[{re.escape(white)}]+")
+            splitter = re.compile("|".join(parts) or "(?!)")
+            self._splitters[ifs] = splitter
+        return splitter
+
+    def _segments(self, word: str) -> Tuple[List[Tuple[str, int]], bool]:
+        """
+        Expand a word into (text, kind) segments.
+
+        Returns:
+            The segments and whether the word contained quotes
+        """
+        segments: List[Tuple[str, int]] = []
+        quoted = False
+        i, n = 0, len(word)
+
+        # Tilde prefix
+        if word.startswith("~") and (n == 1 or word[1] == "/"):
+            segments.append((self.shell.environ.get("HOME", "/home/user"), QUOTED))
+            i = 1
+
+        start = i
+        while i < n:
+            char = word[i]
+            if char not in "\\'\"$`":
+                i += 1
+                continue
+            if i > start:
+                segments.append((word[start:i], LITERAL))
+            if char == "\\":
+                if i + 1 < n and word[i + 1] != "\n":
+                    segments.append((word[i + 1], QUOTED))
+                    quoted = True
+                i += 2
+            elif char == "'":
+                end = word.index("'", i + 1)
+                segments.append((word[i + 1 : end], QUOTED))
+                quoted = True
+                i = end + 1
+            elif char == '"':
+                i = self._double_quoted(word, i + 1, segments)
+                quoted = True
+            else:
+                value, i = self._substitution(word, i)
+                if value is None:
+                    segments.append(("$", LITERAL))
+                else:
+                    segments.append((value, EXPANDED))
+            start = i
+        if start < n:
+            segments.append((word[start:], LITERAL))
+        return segments, quoted
+
+    def _double_quoted(self, word: str, i: int, segments: List[Tuple[str, int]]) -> int:
+        """Expand the inside of double quotes; returns the index after them."""
+        parts = []
+        n = len(word)
+        while i < n:
+            char = word[i]
+            if char == '"':
+                i += 1
+                break
+            if char == "\\" and i + 1 < n and word[i + 1] in '$`"\\\n':
+                if word[i + 1] != "\n":
+                    parts.append(word[i + 1])
+                i += 2
+            elif char in "$`":
+                value, i = self._substitution(word, i)
+                parts.append("$" if value is None else value)
+            else:
+                end = i + 1
+                while end < n and word[end] not in '"\\$`':
+                    end += 1
+                parts.append(word[i:end])
+                i = end
+        segments.append(("".join(parts), QUOTED))
+        return i
+
+    def _substitution(self, word: str, i: int) -> Tuple[Optional[str], int]:
+        """
+        Expand the $ or ` construct at i.
+
+        Returns:
+            (value, index after it); value is None for a literal "$"
+        """
+        if word[i] == "`":
+            end = _skip_backtick(word, i)
+            command = re.sub(r"\\([$`\\])", r"\1", word[i + 1 : end - 1])
+            return self._command_output(command), end
+        if word.startswith("$((", i):
+            end = _skip_group(word, i + 1)
+            if word[end - 2 : end] == "))":
+                return self.handler.expand_arithmetic(word[i:end]), end
+        if word.startswith("$(", i):
+            end = _skip_group(word, i + 1)
+            return self._command_output(word[i + 2 : end - 1]), end
+        if word.startswith("${", i):
+            end = word.index("}", i + 2)
+            name = word[i + 2 : end]
+            if name.isdigit():
+                return self._positional(int(name)), end + 1
+            return self.shell.environ.get(name, ""), end + 1
+
+        following = word[i + 1 : i + 2]
+        if following == "?":
+            return str(self.shell.return_code), i + 2
+        if following == "$":
+            return str(id(self.shell)), i + 2
+        if following == "#":
+            return str(len(getattr(self.shell, "positional", ()))), i + 2
+        if following in ("@", "*"):
+            return " ".join(getattr(self.shell, "positional", ())), i + 2
+        if following.isdigit() and following != "0":
+            return self._positional(int(following)), i + 2
+        match = _NAME.match(word, i + 1)
+        if match is None:
+            return None, i + 1
+        return self.shell.environ.get(match.group(0), ""), match.end()
+
+    def _positional(self, number: int) -> str:
+        """Value of positional parameter $number (a function argument)."""
+        arguments = getattr(self.shell, "positional", ())
+        return arguments[number - 1] if 0 < number <= len(arguments) else ""
+
+    def _command_output(self, command: str) -> str:
+        """Run a command substitution and return its output."""
+        depth = getattr(self.shell, "_substitution_depth", 0)
+        if depth > 5 or not command.strip():
+            return ""
+        from chuk_virtual_shell.core.executor import CommandExecutor
+
+        # The substitution expands its own globs, and may change directories
+        listings = self.handler._listings
+        self.handler._listings = None
+        self.shell._substitution_depth = depth + 1
+        try:
+            output = CommandExecutor(self.shell).execute_line(command)
+        finally:
+            self.shell._substitution_depth = depth
+            self.handler._listings = listings
+            if listings is not None:
+                listings.clear()
+        return output.rstrip("\n")
@@ -3,33 +3,303 @@ Compatibility wrapper for VirtualFileSystem to provide consistent API
 """
 
 import asyncio
+import calendar
+import copy
 import inspect
+import logging
+import posixpath
 import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from chuk_virtual_shell.core.content_index import ContentIndex
+from chuk_virtual_shell.core.streaming import DEFAULT_CHUNK_SIZE, iter_chunks
+from chuk_virtual_shell.core.usage_index import Usage, UsageIndex
+
+logger = logging.getLogger(__name__)
+
+# Marker for "not cached" (None is a valid cached value: missing path)
+_MISS = object()
+
+# Characters read by the first read_range of read_head and read_tail; each
+# further read doubles it
+RANGE_BLOCK = 8 * 1024
+
+
+async def _call_async(method, *args):
+    """Call a provider method, awaiting the result if it is a coroutine."""
+    result = method(*args)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+async def _gather_calls(calls):
+    """Run (method, args) calls concurrently; failed calls give None."""
+    results = await asyncio.gather(
+        *(_call_async(method, *args) for method, args in calls),
+        return_exceptions=True,
+    )
+    return [None if isinstance(r, BaseException) else r for r in results]
+
+
+def _text(content) -> str:
+    """File content as text."""
+    if isinstance(content, bytes):
+        return content.decode("utf-8", errors="replace")
+    return content
+
+
+def _slice(text: str, offset: int, length: Optional[int]) -> str:
+    return text[offset:] if length is None else text[offset : offset + length]
+
+
+def _is_memory_provider(fs) -> bool:
+    """Whether fs keeps its files in this process's memory."""
+    try:
+        name = fs.get_provider_name()
+    except Exception:
+        return False
+    return isinstance(name, str) and "memory" in name.lower()
+
+
+def _timestamp() -> str:
+    """The current time as providers stamp modified_at."""
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+class _PendingAppend:
+    """Appends to one file that have not been written to the provider yet."""
+
+    def __init__(self, base: str):
+        self.chunks = [base]
+        self.size = content_size(base)
+        self.length = len(base)
+        self.buffered = 0
+        self._last = base[-1:]
+        # When the file was last appended to (its modified_at until written)
+        self.modified_at: Optional[str] = None
+
+    def add(self, content: str) -> None:
+        self.modified_at = _timestamp()
+        if content:
+            self.chunks.append(content)
+            added = content_size(content)
+            self.size += added
+            self.length += len(content)
+            self.buffered += added
+            self._last = content[-1:]
+
+    def endswith(self, suffix: str) -> bool:
+        if len(suffix) <= len(self._last):
+            return self._last.endswith(suffix)
+        return self.text().endswith(suffix)
+
+    def text(self) -> str:
+        if len(self.chunks) > 1:
+            self.chunks = ["".join(self.chunks)]
+        return self.chunks[0]
+
+
+class MetadataCache:
+    """
+    Path-keyed cache for node info and directory listings.
+
+    Entries are keyed by resolved absolute path. Mutations invalidate the
+    affected path, everything below it and the listing of its parent.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, maxsize: int = 8192):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl: Seconds an entry stays valid (None keeps entries until
+                invalidated, which is only safe for local providers)
+            maxsize: Maximum entries per table before the table is cleared
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._info: Dict[str, Tuple[Any, Optional[float]]] = {}
+        self._listings: Dict[str, Tuple[Any, Optional[float]]] = {}
+        self._sizes: Dict[str, Tuple[Any, Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    def get_info(self, path: str) -> Any:
+        return self._get(self._info, path)
+
+    def put_info(self, path: str, info: Any) -> None:
+        self._put(self._info, path, info)
+
+    def get_listing(self, path: str) -> Any:
+        return self._get(self._listings, path)
+
+    def put_listing(self, path: str, listing: Any) -> None:
+        self._put(self._listings, path, listing)
+
+    def get_size(self, path: str) -> Any:
+        return self._get(self._sizes, path)
+
+    def put_size(self, path: str, size: int) -> None:
+        self._put(self._sizes, path, size)
+
+    def invalidate(self, path: str, recursive: bool = True) -> None:
+        """
+        Drop entries affected by a change at path.
+
+        Args:
+            path: Resolved path that was created, modified or removed
+            recursive: Also drop entries below path (directory changes)
+        """
+        parent = posixpath.dirname(path) or "/"
+        with self._lock:
+            if recursive and path == "/":
+                self._info.clear()
+                self._listings.clear()
+                self._sizes.clear()
+                return
+            self._info.pop(path, None)
+            self._info.pop(parent, None)
+            self._listings.pop(path, None)
+            self._listings.pop(parent, None)
+            self._sizes.pop(path, None)
+            if recursive:
+                prefix = path.rstrip("/") + "/"
+                for table in (self._info, self._listings, self._sizes):
+                    for key in [k for k in table if k.startswith(prefix)]:
+                        del table[key]
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._info.clear()
+            self._listings.clear()
+            self._sizes.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and table sizes."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "nodes": len(self._info),
+                "listings": len(self._listings),
+                "sizes": len(self._sizes),
+                "ttl": self.ttl,
+            }
+
+    def _get(self, table: Dict[str, Tuple[Any, Optional[float]]], path: str) -> Any:
+        with self._lock:
+            entry = table.get(path)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or expires > time.monotonic():
+                    self.hits += 1
+                    return value
+                del table[path]
+            self.misses += 1
+            return _MISS
+
+    def _put(
+        self, table: Dict[str, Tuple[Any, Optional[float]]], path: str, value: Any
+    ) -> None:
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            if len(table) >= self.maxsize:
+                table.clear()
+            table[path] = (value, expires)
 
 
 class FileSystemCompat:
     """Wrapper to provide compatible filesystem API across different implementations"""
 
-    _executor = None  # Shared thread pool executor
-    _loop = None  # Shared event loop
-    _loop_thread = None  # Thread running the event loop
+    # Async providers run on a small pool of background event loops; each
+    # wrapper is pinned to one loop so provider state stays on one loop
+    # while different sessions do not all queue behind the same thread.
+    LOOP_POOL_SIZE = 4
+    _loops: List[asyncio.AbstractEventLoop] = []
+    _loops_lock = threading.Lock()
+    _next_loop = 0
 
     @classmethod
     def _get_or_create_loop(cls):
-        """Get or create a shared event loop running in a background thread"""
-        if cls._loop is None or not cls._loop.is_running():
-            cls._loop = asyncio.new_event_loop()
-            cls._loop_thread = threading.Thread(
-                target=cls._loop.run_forever, daemon=True
-            )
-            cls._loop_thread.start()
-        return cls._loop
+        """Pick an event loop from the shared pool, starting it if needed"""
+        with cls._loops_lock:
+            index = cls._next_loop % cls.LOOP_POOL_SIZE
+            cls._next_loop += 1
+            if index < len(cls._loops) and not cls._loops[index].is_closed():
+                return cls._loops[index]
 
-    def __init__(self, fs):
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, daemon=True, name=f"fs-loop-{index}"
+            ).start()
+            if index < len(cls._loops):
+                cls._loops[index] = loop
+            else:
+                cls._loops.append(loop)
+            return loop
+
+    # Default metadata TTL (seconds) for providers other than memory,
+    # whose contents may also be changed by other clients
+    REMOTE_CACHE_TTL = 5.0
+
+    # Buffered appends are written out once they exceed this many
+    # characters and the size of the file they extend
+    APPEND_BUFFER = 64 * 1024
+
+    def __init__(
+        self,
+        fs,
+        cache: bool = True,
+        cache_ttl: Optional[float] = None,
+        index: bool = False,
+        usage: bool = True,
+        buffer_appends: Optional[bool] = None,
+    ):
+        """
+        Initialize the wrapper.
+
+        Args:
+            fs: Filesystem to wrap
+            cache: Cache node info and directory listings
+            cache_ttl: Seconds cached metadata stays valid (None = until
+                invalidated by a mutation through this wrapper)
+            index: Keep a path and content index for searches (built on
+                first use; see enable_index)
+            usage: Keep per-directory size and inode totals (built on
+                first use; see usage)
+            buffer_appends: Coalesce append_file calls in memory (see
+                append_file); by default only for the in-memory provider,
+                where no other client reads the files
+        """
         self.fs = fs
         self._cwd = None
         # Provide provider attribute for compatibility
         self.provider = fs
+        self.cache = MetadataCache(cache_ttl) if cache else None
+        self.index: Optional[ContentIndex] = ContentIndex() if index else None
+        self.usage_index: Optional[UsageIndex] = (
+            UsageIndex(max_age=cache_ttl) if usage else None
+        )
+        self._is_async = inspect.iscoroutinefunction(getattr(fs, "get_node_info", None))
+        if buffer_appends is None:
+            buffer_appends = _is_memory_provider(fs)
+        self.buffer_appends = buffer_appends
+        # Parts of files can be read without reading them whole
+        self._ranged_reads = _is_memory_provider(fs) or (
+            callable(getattr(fs, "read_range", None))
+            and callable(getattr(fs, "size", None))
+        )
+        # Buffered appends by resolved path, written out by _flush_appends
+        self._appends: Dict[str, _PendingAppend] = {}
+        self._appends_lock = threading.RLock()
 
         # Setup shared event loop
         self._loop = self._get_or_create_loop()
@@ -66,30 +336,303 @@ class FileSystemCompat:
                 raise e
         return result
 
+    async def _on_loop(self, coroutine):
+        """Await a coroutine on this wrapper's loop from any event loop"""
+        if not self._is_async:
+            # Sync providers never block on the loop, so run in place
+            return await coroutine
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            return await coroutine
+        return await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        )
+
+    def _call_many(self, calls):
+        """
+        Run several provider calls with a single hop to the event loop.
+
+        Args:
+            calls: List of (method, args) tuples
+
+        Returns:
+            List of results in call order (None for calls that failed)
+        """
+        if not self._is_async:
+            results = []
+            for method, args in calls:
+                try:
+                    results.append(method(*args))
+                except Exception:
+                    results.append(None)
+            return results
+        if not calls:
+            return []
+        return self._sync_wrapper(_gather_calls, calls)
+
     # Basic file operations
     def read_file(self, path):
+        if not self._flush_appends(path):
+            return None
         return self._sync_wrapper(self.fs.read_file, path)
 
     def write_file(self, path, content):
-        return self._sync_wrapper(self.fs.write_file, path, content)
+        # Overwriting discards appends that were not written out yet
+        self._drop_appends(path)
+        return self._write_file(path, content)
+
+    def _write_file(self, path, content):
+        try:
+            result = self._sync_wrapper(self.fs.write_file, path, content)
+        finally:
+            self._invalidate(path, recursive=False)
+        if result is not False:
+            key = self._cache_key(path)
+            # The size of what was just written is known for free
+            size = content_size(content)
+            if self.cache is not None:
+                self.cache.put_size(key, size)
+            if self.usage_index is not None:
+                self.usage_index.update_file(key, size)
+            if self.index is not None:
+                self.index.update_file(key, content)
+        return result
 
     def mkdir(self, path):
-        return self._sync_wrapper(self.fs.mkdir, path)
+        try:
+            return self._sync_wrapper(self.fs.mkdir, path)
+        finally:
+            self._invalidate(path)
 
     def rm(self, path):
-        return self._sync_wrapper(self.fs.rm, path)
+        self._drop_appends(path, below=True)
+        try:
+            return self._sync_wrapper(self.fs.rm, path)
+        finally:
+            self._invalidate(path)
 
     def rmdir(self, path):
-        return self._sync_wrapper(self.fs.rmdir, path)
+        self._drop_appends(path, below=True)
+        try:
+            return self._sync_wrapper(self.fs.rmdir, path)
+        finally:
+            self._invalidate(path)
 
     def touch(self, path):
-        return self._sync_wrapper(self.fs.touch, path)
+        if not self._flush_appends(path):
+            return False
+        try:
+            return self._sync_wrapper(self.fs.touch, path)
+        finally:
+            self._invalidate(path, recursive=False)
 
     def cp(self, source, dest):
-        return self._sync_wrapper(self.fs.cp, source, dest)
+        if not self._flush_appends(source, below=True):
+            return False
+        self._drop_appends(dest)
+        try:
+            return self._sync_wrapper(self.fs.cp, source, dest)
+        finally:
+            self._invalidate(dest)
 
     def mv(self, source, dest):
-        return self._sync_wrapper(self.fs.mv, source, dest)
+        if not self._flush_appends(source, below=True):
+            return False
+        self._drop_appends(dest)
+        try:
+            return self._sync_wrapper(self.fs.mv, source, dest)
+        finally:
+            self._invalidate(source)
+            self._invalidate(dest)
+
+    # Appending
+    def append_file(self, path, content, separator: str = "") -> bool:
+        """
+        Append text to a file, creating the file if it does not exist.
+
+        A provider's own append_file is used when it has one. Otherwise, with
+        buffer_appends, appends are collected in memory and written out in
+        one write once they outgrow the file (or when the file is next read,
+        copied, moved or flushed), so n appends cost O(n) in total instead
+        of a full rewrite each. Without buffering the file is rewritten.
+
+        Args:
+            path: File to append to
+            content: Text to append
+            separator: Written first unless the file is empty or already
+                ends with it (e.g. "\n" to keep appended records on their
+                own lines)
+
+        Returns:
+            True on success, False if the file cannot be written
+        """
+        native = getattr(self.fs, "append_file", None)
+        if callable(native):
+            if separator:
+                end = self.size(path)
+                if end:
+                    last = self.read_range(path, max(end - len(separator), 0))
+                    if last != separator:
+                        content = separator + content
+            try:
+                return self._sync_wrapper(native, path, content)
+            finally:
+                self._invalidate(path, recursive=False)
+
+        key = self._cache_key(path)
+        with self._appends_lock:
+            pending = self._appends.get(key)
+            if pending is None:
+                existing = self._sync_wrapper(self.fs.read_file, key)
+                if existing is None or not self.buffer_appends:
+                    if existing and separator:
+                        existing = _text(existing)
+                        if not existing.endswith(separator):
+                            content = separator + content
+                    return self.write_file(path, _text(existing or "") + content)
+                pending = _PendingAppend(_text(existing))
+                self._appends[key] = pending
+
+            if separator and pending.size and not pending.endswith(separator):
+                content = separator + content
+            pending.add(content)
+            if pending.buffered >= max(
+                pending.size - pending.buffered, self.APPEND_BUFFER
+            ):
+                self._flush_appends(key)
+                return True
+
+        # Keep sizes and indexes in step with the buffered content
+        if self.cache is not None:
+            self.cache.put_size(key, pending.size)
+        if self.usage_index is not None:
+            self.usage_index.update_file(key, pending.size)
+        if self.index is not None:
+            self.index.mark_dirty(key)
+        return True
+
+    def flush(self) -> None:
+        """Write out all buffered appends."""
+        self._flush_appends()
+
+    # Ranged reads
+    def has_ranged_reads(self) -> bool:
+        """
+        Whether size and read_range avoid reading the whole file.
+
+        True for providers with their own size and read_range, and for the
+        in-memory provider, which hands out its stored string. Elsewhere
+        both read the whole file, so callers needing several ranges should
+        read the file once instead.
+        """
+        return self._ranged_reads
+
+    def size(self, path) -> Optional[int]:
+        """
+        Length of a file's text in characters, the unit of read_range.
+
+        Unlike get_size (UTF-8 bytes) this is what offsets into the text
+        count. Uses the provider's own size when it has one.
+
+        Returns:
+            Length, or None if path is not a file
+        """
+        if self._appends:
+            pending = self._appends.get(self._cache_key(path))
+            if pending is not None:
+                return pending.length
+        native = getattr(self.fs, "size", None)
+        if callable(native):
+            return self._sync_wrapper(native, path)
+        content = self._sync_wrapper(self.fs.read_file, path)
+        return None if content is None else len(_text(content))
+
+    def read_range(self, path, offset: int, length: Optional[int] = None):
+        """
+        Read part of a file's text.
+
+        Uses the provider's own read_range when it has one; otherwise the
+        file is read and sliced, which is only cheap for the in-memory
+        provider (see has_ranged_reads).
+
+        Args:
+            path: File to read
+            offset: Character offset to start at
+            length: Characters to read (None = to the end)
+
+        Returns:
+            The text (shorter at the end of the file), or None if path is
+            not a file
+        """
+        if self._appends:
+            pending = self._appends.get(self._cache_key(path))
+            if pending is not None:
+                return _slice(pending.text(), offset, length)
+        native = getattr(self.fs, "read_range", None)
+        if callable(native):
+            return self._sync_wrapper(native, path, offset, length)
+        content = self._sync_wrapper(self.fs.read_file, path)
+        return None if content is None else _slice(_text(content), offset, length)
+
+    def _flush_appends(self, path=None, below: bool = False) -> bool:
+        """
+        Write out buffered appends to path (or below it, or all).
+
+        Appends stay buffered until their write succeeds, so a failed write
+        loses nothing and is tried again on the next flush. Providers have
+        no call for setting times: a written file has the time of the
+        flush, not of its last append.
+
+        Returns:
+            False if a file could not be written
+        """
+        if not self._appends:
+            return True
+        flushed = True
+        with self._appends_lock:
+            for key in self._append_keys(path, below):
+                try:
+                    written = self._write_file(key, self._appends[key].text())
+                except Exception as e:
+                    logger.warning("Could not write buffered appends to %s: %s", key, e)
+                    written = False
+                if written is False:
+                    flushed = False
+                else:
+                    del self._appends[key]
+        return flushed
+
+    def _with_appends(self, key: str, info: Any) -> Any:
+        """Node info showing the time of appends not written out yet."""
+        pending = self._appends.get(key) if self._appends else None
+        if pending is None or pending.modified_at is None:
+            return info
+        if info is None or not hasattr(info, "modified_at"):
+            return info
+        info = copy.copy(info)
+        info.modified_at = pending.modified_at
+        return info
+
+    def _drop_appends(self, path, below: bool = False) -> None:
+        """Forget buffered appends to a file that is replaced or removed."""
+        if not self._appends:
+            return
+        with self._appends_lock:
+            for key in self._append_keys(path, below):
+                del self._appends[key]
+
+    def _append_keys(self, path, below) -> List[str]:
+        """Keys of the buffered appends to path (or below it, or all)."""
+        if path is None:
+            return list(self._appends)
+        key = self._cache_key(path)
+        prefix = key.rstrip("/") + "/"
+        return [
+            k for k in self._appends if k == key or (below and k.startswith(prefix))
+        ]
 
     # Directory operations
     def cd(self, path):
@@ -109,11 +652,19 @@ class FileSystemCompat:
         return self._cwd
 
     def ls(self, path=None):
-        return self._sync_wrapper(self.fs.ls, path)
+        if self.cache is None:
+            return self._sync_wrapper(self.fs.ls, path)
+        key = self._cache_key(path)
+        listing = self.cache.get_listing(key)
+        if listing is _MISS:
+            listing = self._sync_wrapper(self.fs.ls, path)
+            self.cache.put_listing(key, listing)
+        # Callers may sort or modify the list they get back
+        return list(listing) if isinstance(listing, list) else listing
 
     def list_dir(self, path):
         """List directory contents"""
-        result = self._sync_wrapper(self.fs.ls, path)
+        result = self.ls(path)
         return result if result is not None else []
 
     def list_directory(self, path):
@@ -128,7 +679,7 @@ class FileSystemCompat:
     def exists(self, path):
         """Check if path exists"""
         try:
-            info = self._sync_wrapper(self.fs.get_node_info, path)
+            info = self.get_node_info(path)
             return info is not None
         except Exception:
             return False
@@ -136,7 +687,7 @@ class FileSystemCompat:
     def is_file(self, path):
         """Check if path is a file"""
         try:
-            info = self._sync_wrapper(self.fs.get_node_info, path)
+            info = self.get_node_info(path)
             return info is not None and not info.is_dir
         except Exception:
             return False
@@ -144,24 +695,446 @@ class FileSystemCompat:
     def is_dir(self, path):
         """Check if path is a directory"""
         try:
-            info = self._sync_wrapper(self.fs.get_node_info, path)
+            info = self.get_node_info(path)
             return info is not None and info.is_dir
         except Exception:
             return False
 
     def get_node_info(self, path):
         """Get node information for a path"""
-        return self._sync_wrapper(self.fs.get_node_info, path)
+        if self.cache is None:
+            info = self._sync_wrapper(self.fs.get_node_info, path)
+            return (
+                self._with_appends(self._cache_key(path), info)
+                if self._appends
+                else info
+            )
+        key = self._cache_key(path)
+        info = self.cache.get_info(key)
+        if info is _MISS:
+            info = self._sync_wrapper(self.fs.get_node_info, path)
+            self.cache.put_info(key, info)
+        return self._with_appends(key, info)
+
+    def stat(self, path) -> Optional["FileStat"]:
+        """
+        Get the type, size and modification time of a node.
+
+        The size comes from the node info or the provider's get_size when
+        either has it, and from the size of the last write through this
+        wrapper; only as a last resort is the file read, and the size is
+        then cached until the file changes.
+
+        Returns:
+            FileStat, or None if the path does not exist
+        """
+        info = self.get_node_info(path)
+        if info is None:
+            return None
+        is_dir = bool(getattr(info, "is_dir", False))
+        size = 0 if is_dir else self._file_size(path, info)
+        return FileStat(is_dir, size, node_mtime(info))
+
+    def get_size(self, path) -> int:
+        """Size of a file in bytes (0 for directories and missing paths)."""
+        node = self.stat(path)
+        return node.size if node is not None else 0
+
+    def _file_size(self, path, info) -> int:
+        if self._appends:
+            pending = self._appends.get(self._cache_key(path))
+            if pending is not None:
+                return pending.size
+        size = node_size(info)
+        if size is not None:
+            return size
+        key = None
+        if self.cache is not None:
+            key = self._cache_key(path)
+            size = self.cache.get_size(key)
+            if size is not _MISS:
+                return size
+        provider_size = getattr(self.fs, "get_size", None)
+        if callable(provider_size):
+            size = self._sync_wrapper(provider_size, path) or 0
+        else:
+            size = content_size(self.read_file(path))
+        if key is not None:
+            self.cache.put_size(key, size)
+        return size
+
+    # Batched access
+    def stat_many(self, paths: Iterable[str]) -> Dict[str, Any]:
+        """
+        Get node information for several paths at once.
+
+        Cached entries are served directly; the rest are fetched with a
+        single round-trip for async providers.
+
+        Args:
+            paths: Paths to look up
+
+        Returns:
+            dict: path -> node info (None for missing paths)
+        """
+        results: Dict[str, Any] = {}
+        missing: List[Tuple[str, str]] = []
+        for path in paths:
+            if self.cache is None:
+                missing.append((path, path))
+                continue
+            key = self._cache_key(path)
+            info = self.cache.get_info(key)
+            if info is _MISS:
+                missing.append((path, key))
+            else:
+                results[path] = info
+
+        fetched = self._call_many(
+            [(self.fs.get_node_info, (path,)) for path, _ in missing]
+        )
+        for (path, key), info in zip(missing, fetched):
+            results[path] = info
+            if self.cache is not None:
+                self.cache.put_info(key, info)
+        if self._appends:
+            for path, info in results.items():
+                results[path] = self._with_appends(self._cache_key(path), info)
+        return results
+
+    def read_many(self, paths: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Read several files at once (one round-trip for async providers).
+
+        Args:
+            paths: Files to read
+
+        Returns:
+            dict: path -> content (None for unreadable paths)
+        """
+        paths = list(paths)
+        unflushed = {path for path in paths if not self._flush_appends(path)}
+        contents = self._call_many([(self.fs.read_file, (path,)) for path in paths])
+        return {
+            path: None if path in unflushed else content
+            for path, content in zip(paths, contents)
+        }
+
+    def walk(self, top: str) -> Iterator[Tuple[str, List[str], List[str]]]:
+        """
+        Walk a directory tree top-down, like os.walk.
+
+        Yields (dirpath, dirnames, filenames); callers may prune dirnames in
+        place. Each directory costs at most one provider round-trip.
+
+        Args:
+            top: Directory to start from
+
+        Yields:
+            Tuples of (dirpath, dirnames, filenames)
+        """
+        top = self._cache_key(top)
+        if not self.is_dir(top):
+            return
+
+        stack = [top]
+        while stack:
+            dirpath = stack.pop()
+            dirnames: List[str] = []
+            filenames: List[str] = []
+            for name, info in self.scan_dir(dirpath):
+                if info is not None:
+                    (dirnames if info.is_dir else filenames).append(name)
+            yield dirpath, dirnames, filenames
+            stack.extend(posixpath.join(dirpath, name) for name in reversed(dirnames))
+
+    def scan_dir(self, path: str) -> List[Tuple[str, Any]]:
+        """
+        List a directory together with the node info of each entry.
+
+        Args:
+            path: Directory to list
+
+        Returns:
+            List of (name, node info) in listing order
+        """
+        key = self._cache_key(path)
+        listing = _MISS if self.cache is None else self.cache.get_listing(key)
+        if listing is _MISS and self._is_async:
+            # Listing and stats in one round-trip
+            listing, infos = self._sync_wrapper(self._scan_dir_async, key)
+            if self.cache is not None:
+                self.cache.put_listing(key, listing)
+                for name, info in zip(listing or [], infos):
+                    self.cache.put_info(posixpath.join(key, name), info)
+            return [
+                (name, self._with_appends(posixpath.join(key, name), info))
+                for name, info in zip(listing or [], infos)
+            ]
+
+        if listing is _MISS:
+            listing = self._sync_wrapper(self.fs.ls, key)
+            if self.cache is not None:
+                self.cache.put_listing(key, listing)
+        names = list(listing or [])
+        children = [posixpath.join(key, name) for name in names]
+        infos = self.stat_many(children)
+        return [(name, infos[child]) for name, child in zip(names, children)]
+
+    async def _scan_dir_async(self, path: str):
+        listing = await _call_async(self.fs.ls, path)
+        infos = await _gather_calls(
+            [
+                (self.fs.get_node_info, (posixpath.join(path, name),))
+                for name in listing or []
+            ]
+        )
+        return listing, infos
+
+    # Async access (for callers already running in an event loop)
+    async def read_file_async(self, path):
+        if not self._flush_appends(path):
+            return None
+        return await self._on_loop(_call_async(self.fs.read_file, path))
+
+    async def write_file_async(self, path, content):
+        self._drop_appends(path)
+        try:
+            return await self._on_loop(_call_async(self.fs.write_file, path, content))
+        finally:
+            self._invalidate(path, recursive=False)
+
+    async def ls_async(self, path=None):
+        return await self._on_loop(_call_async(self.fs.ls, path))
+
+    async def get_node_info_async(self, path):
+        info = await self._on_loop(_call_async(self.fs.get_node_info, path))
+        return (
+            self._with_appends(self._cache_key(path), info) if self._appends else info
+        )
+
+    async def stat_many_async(self, paths: Iterable[str]) -> Dict[str, Any]:
+        """Async version of stat_many (uncached)."""
+        paths = list(paths)
+        infos = await self._on_loop(
+            _gather_calls([(self.fs.get_node_info, (path,)) for path in paths])
+        )
+        return {
+            path: self._with_appends(self._cache_key(path), info)
+            if self._appends
+            else info
+            for path, info in zip(paths, infos)
+        }
+
+    async def read_many_async(self, paths: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Async version of read_many."""
+        paths = list(paths)
+        unflushed = {path for path in paths if not self._flush_appends(path)}
+        contents = await self._on_loop(
+            _gather_calls([(self.fs.read_file, (path,)) for path in paths])
+        )
+        return {
+            path: None if path in unflushed else content
+            for path, content in zip(paths, contents)
+        }
+
+    # Metadata cache
+    def _cache_key(self, path):
+        """Cache key for a path: the resolved absolute path."""
+        if path is None:
+            return self._sync_wrapper(self.fs.pwd)
+        if path.startswith("/") and "/." not in path and "//" not in path:
+            return path.rstrip("/") or "/"
+        return self._sync_wrapper(self.fs.resolve_path, path)
+
+    def _invalidate(self, path, recursive=True):
+        """Drop cached metadata and index entries affected by a change at path."""
+        if path is None or (
+            self.cache is None and self.index is None and self.usage_index is None
+        ):
+            return
+        key = self._cache_key(path)
+        if self.cache is not None:
+            self.cache.invalidate(key, recursive)
+        if self.index is not None:
+            self.index.mark_dirty(key)
+        if self.usage_index is not None:
+            self.usage_index.mark_dirty(key)
+
+    def clear_cache(self):
+        """Drop all cached metadata (e.g. after changing the provider)."""
+        self._flush_appends()
+        if self.cache is not None:
+            self.cache.clear()
+        # Changes bypassed the wrapper; re-read everything on next use
+        if self.index is not None:
+            self.index.mark_dirty("/")
+        if self.usage_index is not None:
+            self.usage_index.mark_dirty("/")
+
+    def cache_stats(self):
+        """Return metadata cache counters ({} when caching is disabled)."""
+        return self.cache.stats() if self.cache is not None else {}
+
+    # Usage accounting
+    def usage(self, path) -> Optional[Usage]:
+        """
+        Get the bytes, files and directories at or below a path.
+
+        Totals are kept up to date as files change, so this does not walk
+        the tree (except once, to build them, and below paths changed by
+        operations other than write_file).
+
+        Returns:
+            Usage, or None when accounting is off or the path does not exist
+        """
+        if self.usage_index is None:
+            return None
+        self.usage_index.sync(self)
+        return self.usage_index.usage(self._cache_key(path))
+
+    def check_usage(self, repair: bool = False) -> List[str]:
+        """
+        Recount usage from the filesystem and compare with the kept totals.
+
+        Args:
+            repair: Rebuild the totals when they disagree
+
+        Returns:
+            Paths whose totals were wrong ([] when accounting is off)
+        """
+        if self.usage_index is None:
+            return []
+        wrong = self.usage_index.check(self)
+        if wrong and repair:
+            self.usage_index.mark_dirty("/")
+            self.usage_index.sync(self)
+        return wrong
+
+    # Content index
+    def enable_index(self, **limits) -> ContentIndex:
+        """
+        Start keeping a content index; it is built on first use.
+
+        Args:
+            limits: max_file_size / max_trigrams for ContentIndex
+        """
+        if self.index is None or limits:
+            self.index = ContentIndex(**limits)
+        return self.index
+
+    def disable_index(self) -> None:
+        """Drop the content index."""
+        self.index = None
+
+    def rebuild_index(self) -> Dict[str, Any]:
+        """Re-read the whole tree into the content index (enabling it)."""
+        index = self.enable_index()
+        index.mark_dirty("/")
+        index.sync(self)
+        return index.stats()
+
+    def index_stats(self) -> Dict[str, Any]:
+        """Return content index sizes ({} when there is no index)."""
+        return self.index.stats() if self.index is not None else {}
+
+    def walk_index(
+        self,
+        top: str,
+        max_depth: Optional[int] = None,
+        prune: Optional[Callable[["WalkEntry"], bool]] = None,
+    ) -> Optional[Iterator["WalkEntry"]]:
+        """
+        Walk a tree from the content index, in walk_tree() order.
+
+        Entries carry IndexedNode info, which only knows is_dir. Returns
+        None when there is no index or top is not in it.
+        """
+        walk = self._walk_index(top, max_depth, prune)
+        if walk is None:
+            return None
+        return (entry for entry, _ in walk)
+
+    def indexed_files(
+        self,
+        top: str,
+        needles: Optional[List[str]] = None,
+        ignore_case: bool = False,
+    ) -> Optional[List[str]]:
+        """
+        List the files below top from the content index, in walk order.
+
+        Args:
+            top: Directory (or file) to list
+            needles: Literal strings; when given, only files that may
+                contain at least one of them are returned
+            ignore_case: The needles are matched case-insensitively
+
+        Returns:
+            Paths built from top, or None when the index cannot answer
+        """
+        walk = self._walk_index(top)
+        if walk is None:
+            return None
+        files = [(key, entry.path) for entry, key in walk if not entry.is_dir]
+        if needles is None:
+            return [path for _, path in files]
+        paths = dict(files)
+        keys = self.index.candidates(paths, needles, ignore_case)
+        return [paths[key] for key in keys]
+
+    def _walk_index(self, top, max_depth=None, prune=None):
+        """Yield (WalkEntry, index key) pairs, or return None (see walk_index)."""
+        if self.index is None:
+            return None
+        key = self._cache_key(top)
+        self.index.sync(self)
+        is_dir = self.index.kind(key)
+        if is_dir is None:
+            return None
+        return self._iter_index(top, key, is_dir, max_depth, prune)
+
+    def _iter_index(self, top, key, is_dir, max_depth, prune):
+        children = self.index.children
+        name = top.rstrip("/").split("/")[-1] or top
+        stack = [(WalkEntry(top, name, _INDEXED[is_dir], 0), key)]
+        while stack:
+            entry, entry_key = stack.pop()
+            yield entry, entry_key
+
+            if not entry.is_dir:
+                continue
+            if max_depth is not None and entry.depth >= max_depth:
+                continue
+            if prune is not None and prune(entry):
+                continue
+
+            depth = entry.depth + 1
+            siblings = list(children.get(entry_key, {}).items())
+            stack.extend(
+                (
+                    WalkEntry(
+                        join_path(entry.path, child),
+                        child,
+                        _INDEXED[child_is_dir],
+                        depth,
+                    ),
+                    join_path(entry_key, child),
+                )
+                for child, child_is_dir in reversed(siblings)
+            )
 
     # Search operations
     def find(self, pattern, path=None):
         """Find files matching pattern"""
+        self._flush_appends()
         if hasattr(self.fs, "find"):
             return self._sync_wrapper(self.fs.find, pattern, path)
         return []
 
     def search(self, pattern, path=None):
         """Search for pattern in files"""
+        self._flush_appends()
         if hasattr(self.fs, "search"):
             return self._sync_wrapper(self.fs.search, pattern, path)
         return []
@@ -175,6 +1148,7 @@ class FileSystemCompat:
 
     def get_storage_stats(self):
         """Get storage statistics"""
+        self._flush_appends()
         if hasattr(self.fs, "get_storage_stats"):
             return self._sync_wrapper(self.fs.get_storage_stats)
         return {}
@@ -189,6 +1163,7 @@ class FileSystemCompat:
     def change_provider(self, provider, **kwargs):
         """Change filesystem provider"""
         if hasattr(self.fs, "change_provider"):
+            self.clear_cache()
             return self._sync_wrapper(self.fs.change_provider, provider, **kwargs)
         return False
 
@@ -204,3 +1179,334 @@ class FileSystemCompat:
         if hasattr(self.fs, "set_read_only"):
             return self._sync_wrapper(self.fs.set_read_only, value)
         return False
+
+
+@dataclass(frozen=True)
+class WalkEntry:
+    """A node visited by walk_tree()."""
+
+    path: str
+    name: str
+    info: Any
+    depth: int
+
+    @property
+    def is_dir(self) -> bool:
+        return bool(getattr(self.info, "is_dir", False))
+
+
+@dataclass(frozen=True)
+class IndexedNode:
+    """Node info served from the content index (only the type is known)."""
+
+    is_dir: bool
+
+
+_INDEXED = {True: IndexedNode(True), False: IndexedNode(False)}
+
+
+@dataclass(frozen=True)
+class FileStat:
+    """Type, size in bytes and modification time (epoch seconds) of a node."""
+
+    is_dir: bool
+    size: int
+    mtime: Optional[float]
+
+
+def content_size(content: Any) -> int:
+    """Size in bytes of file content as stored (str is counted as UTF-8)."""
+    if content is None:
+        return 0
+    if isinstance(content, str):
+        if content.isascii():
+            return len(content)
+        return len(content.encode("utf-8", "surrogatepass"))
+    try:
+        return len(content)
+    except TypeError:
+        return len(str(content))
+
+
+def node_size(info: Any) -> Optional[int]:
+    """Size a node info carries (as ``size`` or in its metadata), if any."""
+    size = getattr(info, "size", None)
+    if not isinstance(size, int) or isinstance(size, bool):
+        metadata = getattr(info, "metadata", None)
+        size = metadata.get("size") if isinstance(metadata, dict) else None
+    if isinstance(size, int) and not isinstance(size, bool):
+        return size
+    return None
+
+
+def node_mtime(info: Any) -> Optional[float]:
+    """Modification time of a node info as epoch seconds, if it has one."""
+    for attr in ("mtime", "modified_at"):
+        value = getattr(info, attr, None)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(value)
+        if isinstance(value, str) and value:
+            try:
+                return float(
+                    calendar.timegm(time.strptime(value, "%Y-%m-%dT%H:%M:%SZ"))
+                )
+            except ValueError:
+                pass
+            try:
+                parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            except ValueError:
+                continue
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            return parsed.timestamp()
+    return None
+
+
+def stat_node(fs, path: str) -> Optional[FileStat]:
+    """
+    Get the type, size and modification time of a node on any filesystem.
+
+    Uses the filesystem's own stat (cached, reads content only as a last
+    resort) when it has one. Otherwise the size comes from the node info,
+    then get_size, then the length of the content.
+
+    Args:
+        fs: Filesystem (FileSystemCompat or a compatible object)
+        path: Path to look up
+
+    Returns:
+        FileStat, or None if the path does not exist
+    """
+    stat = getattr(fs, "stat", None)
+    if callable(stat):
+        result = stat(path)
+        if result is None or isinstance(result, FileStat):
+            return result
+    info = fs.get_node_info(path)
+    if info is None:
+        return None
+    is_dir = bool(getattr(info, "is_dir", False))
+    size = 0
+    if not is_dir:
+        size = node_size(info)
+        if size is None:
+            get_size = getattr(fs, "get_size", None)
+            if callable(get_size):
+                size = get_size(path) or 0
+            else:
+                size = content_size(fs.read_file(path))
+    return FileStat(is_dir, size, node_mtime(info))
+
+
+def read_head(fs, path: str, lines: int) -> Optional[List[str]]:
+    """
+    Read the first lines of a file on any filesystem.
+
+    With ranged reads (see has_ranged_reads) the file is read forward in
+    growing blocks until the lines are complete, so the rest of a large
+    file is never read; otherwise it is read once.
+
+    Args:
+        fs: Filesystem (FileSystemCompat or a compatible object)
+        path: File to read
+        lines: Number of lines (at least 0)
+
+    Returns:
+        The lines as str.splitlines() splits them, or None if path is not
+        a file
+    """
+    if not has_ranged_reads(fs):
+        content = fs.read_file(path)
+        return None if content is None else _text(content).splitlines()[:lines]
+    end = fs.size(path)
+    if end is None:
+        return None
+    text = ""
+    block = RANGE_BLOCK
+    while len(text) < end:
+        chunk = fs.read_range(path, len(text), block)
+        if not chunk:
+            break
+        text += chunk
+        found = text.splitlines()
+        # One more (possibly partial) line proves the first ones complete
+        if len(found) > lines:
+            return found[:lines]
+        block *= 2
+    return text.splitlines()[:lines]
+
+
+def read_tail(fs, path: str, lines: int) -> Optional[List[str]]:
+    """
+    Read the last lines of a file on any filesystem.
+
+    With ranged reads (see has_ranged_reads) the file is read backwards
+    in growing blocks until the lines are complete, so the start of a
+    large file is never read; otherwise it is read once.
+
+    Args:
+        fs: Filesystem (FileSystemCompat or a compatible object)
+        path: File to read
+        lines: Number of lines (at least 0)
+
+    Returns:
+        The lines as str.splitlines() splits them, or None if path is not
+        a file
+    """
+    if not has_ranged_reads(fs):
+        content = fs.read_file(path)
+        if content is None:
+            return None
+        return _text(content).splitlines()[-lines:] if lines else []
+    start = fs.size(path)
+    if start is None:
+        return None
+    text = ""
+    found: List[str] = []
+    block = RANGE_BLOCK
+    while start > 0 and len(found) <= lines:
+        begin = max(start - block, 0)
+        text = (fs.read_range(path, begin, start - begin) or "") + text
+        start = begin
+        # Until the start is reached the first line may be partial
+        found = text.splitlines()
+        block *= 2
+    return found[-lines:] if lines else []
+
+
+def read_chunks(
+    fs, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Optional[Iterator[str]]:
+    """
+    Read a file as a stream of text chunks on any filesystem.
+
+    With ranged reads (see has_ranged_reads) each chunk is fetched as the
+    stream is consumed, so the whole file is never held at once; otherwise
+    the file is read once and streamed from that copy.
+
+    Args:
+        fs: Filesystem (FileSystemCompat or a compatible object)
+        path: File to read
+        chunk_size: Characters per chunk
+
+    Returns:
+        Iterator of chunks, or None if path is not a file
+    """
+    if not has_ranged_reads(fs):
+        content = fs.read_file(path)
+        return None if content is None else iter_chunks(_text(content), chunk_size)
+    if fs.size(path) is None:
+        return None
+    return _ranged_chunks(fs, path, chunk_size)
+
+
+def _ranged_chunks(fs, path: str, chunk_size: int) -> Iterator[str]:
+    offset = 0
+    while True:
+        chunk = fs.read_range(path, offset, chunk_size)
+        if chunk:
+            yield chunk
+            offset += len(chunk)
+        if not chunk or len(chunk) < chunk_size:
+            return
+
+
+def has_ranged_reads(fs) -> bool:
+    """
+    Whether fs reads parts of a file without reading all of it.
+
+    Uses the filesystem's own has_ranged_reads when it has one; other
+    filesystems qualify when they have size and read_range.
+    """
+    ranged = getattr(fs, "has_ranged_reads", None)
+    if callable(ranged):
+        return bool(ranged())
+    return callable(getattr(fs, "read_range", None)) and callable(
+        getattr(fs, "size", None)
+    )
+
+
+def join_path(parent: str, name: str) -> str:
+    """Join a directory path and an entry name with a single slash."""
+    return parent.rstrip("/") + "/" + name
+
+
+def scan_dir(fs, path: str) -> List[Tuple[str, Any]]:
+    """
+    List a directory with the node info of each entry, on any filesystem.
+
+    Uses the filesystem's own scan_dir (batched and cached) when it has
+    one, and falls back to ls plus get_node_info per entry otherwise.
+
+    Args:
+        fs: Filesystem (FileSystemCompat or a compatible object)
+        path: Directory to list
+
+    Returns:
+        List of (name, node info) in listing order
+    """
+    if hasattr(fs, "scan_dir"):
+        return fs.scan_dir(path)
+    names = fs.ls(path) or []
+    return [
+        (name, fs.get_node_info(join_path(path, name)))
+        for name in names
+        if name not in (".", "..")
+    ]
+
+
+def walk_tree(
+    fs,
+    top: str,
+    max_depth: Optional[int] = None,
+    prune: Optional[Callable[[WalkEntry], bool]] = None,
+    onerror: Optional[Callable[[str, Exception], None]] = None,
+) -> Iterator[WalkEntry]:
+    """
+    Walk a tree depth-first, yielding each node with its node info.
+
+    Entries come in pre-order (a directory before its contents, siblings in
+    listing order), starting with top itself at depth 0. Each directory is
+    listed with a single scan_dir call.
+
+    Args:
+        fs: Filesystem (FileSystemCompat or a compatible object)
+        top: Path to start from (returned paths are built from it)
+        max_depth: Do not descend into directories at this depth
+        prune: Called for each directory after it was yielded; returning
+            True skips its contents
+        onerror: Called with (path, exception) when a directory cannot be
+            listed
+
+    Yields:
+        WalkEntry objects
+    """
+    info = fs.get_node_info(top)
+    if info is None:
+        return
+
+    stack = [WalkEntry(top, top.rstrip("/").split("/")[-1] or top, info, 0)]
+    while stack:
+        entry = stack.pop()
+        yield entry
+
+        if not entry.is_dir:
+            continue
+        if max_depth is not None and entry.depth >= max_depth:
+            continue
+        if prune is not None and prune(entry):
+            continue
+
+        try:
+            children = scan_dir(fs, entry.path)
+        except Exception as e:
+            if onerror is not None:
+                onerror(entry.path, e)
+            continue
+
+        depth = entry.depth + 1
+        stack.extend(
+            WalkEntry(join_path(entry.path, name), name, child_info, depth)
+            for name, child_info in reversed(children)
+            if child_info is not None
+        )
@@ -8,6 +8,8 @@ import types
 import traceback
 from typing import Dict, Any, List, Optional
 
+from chuk_virtual_shell.interpreters.virtual_file import open_virtual_file
+
 
 class VirtualPythonInterpreter:
     """Execute Python scripts with virtual FS access"""
@@ -70,119 +72,19 @@ class VirtualPythonInterpreter:
         # Create virtual open function
         shell = self.shell  # Capture shell reference for closure
 
-        def virtual_open(filepath, mode="r", encoding="utf-8"):
+        def virtual_open(
+            filepath, mode="r", buffering=-1, encoding=None, errors=None, newline=None
+        ):
             """Virtual file open function"""
-
-            class VirtualFile:
-                def __init__(self, path, mode, encoding):
-                    self.path = shell.fs.resolve_path(path)
-                    self.mode = mode
-                    self.encoding = encoding
-                    self.position = 0
-                    self.closed = False
-
-                    # Initialize content
-                    if "r" in mode:
-                        self.content = shell.fs.read_file(self.path)
-                        if self.content is None:
-                            raise FileNotFoundError(f"No such file: {path}")
-                        self.lines = self.content.splitlines(True)
-                    elif "w" in mode:
-                        self.content = ""
-                        self.lines = []
-                        if "a" not in mode:
-                            # Create empty file for write mode
-                            shell.fs.write_file(self.path, "")
-                    elif "a" in mode:
-                        self.content = shell.fs.read_file(self.path) or ""
-                        self.lines = self.content.splitlines(True)
-
-                def read(self, size=-1):
-                    if self.closed:
-                        raise ValueError("I/O operation on closed file")
-                    if "r" not in self.mode:
-                        raise IOError("File not open for reading")
-
-                    if size == -1:
-                        result = self.content[self.position :]
-                        self.position = len(self.content)
-                    else:
-                        result = self.content[self.position : self.position + size]
-                        self.position += len(result)
-                    return result
-
-                def readline(self):
-                    if self.closed:
-                        raise ValueError("I/O operation on closed file")
-                    if "r" not in self.mode:
-                        raise IOError("File not open for reading")
-
-                    if self.position >= len(self.content):
-                        return ""
-
-                    # Find next newline
-                    newline_pos = self.content.find("\n", self.position)
-                    if newline_pos == -1:
-                        result = self.content[self.position :]
-                        self.position = len(self.content)
-                    else:
-                        result = self.content[self.position : newline_pos + 1]
-                        self.position = newline_pos + 1
-                    return result
-
-                def readlines(self):
-                    if self.closed:
-                        raise ValueError("I/O operation on closed file")
-                    if "r" not in self.mode:
-                        raise IOError("File not open for reading")
-
-                    lines = []
-                    while True:
-                        line = self.readline()
-                        if not line:
-                            break
-                        lines.append(line)
-                    return lines
-
-                def write(self, data):
-                    if self.closed:
-                        raise ValueError("I/O operation on closed file")
-                    if "w" not in self.mode and "a" not in self.mode:
-                        raise IOError("File not open for writing")
-
-                    self.content += str(data)
-                    shell.fs.write_file(self.path, self.content)
-                    return len(data)
-
-                def writelines(self, lines):
-                    for line in lines:
-                        self.write(line)
-
-                def flush(self):
-                    if "w" in self.mode or "a" in self.mode:
-                        shell.fs.write_file(self.path, self.content)
-
-                def close(self):
-                    if not self.closed:
-                        self.flush()
-                        self.closed = True
-
-                def __enter__(self):
-                    return self
-
-                def __exit__(self, exc_type, exc_val, exc_tb):
-                    self.close()
-
-                def __iter__(self):
-                    return self
-
-                def __next__(self):
-                    line = self.readline()
-                    if not line:
-                        raise StopIteration
-                    return line
-
-            return VirtualFile(filepath, mode, encoding)
+            return open_virtual_file(
+                shell.fs,
+                shell.fs.resolve_path(filepath),
+                mode,
+                buffering=buffering,
+                encoding=encoding,
+                errors=errors,
+                newline=newline,
+            )
 
         # Create virtual subprocess module
         virtual_subprocess = types.ModuleType("subprocess")
@@ -0,0 +1,413 @@
+"""
+chuk_virtual_shell/interpreters/virtual_file.py - File objects for the virtual filesystem
+
+open_virtual_file() builds the same io stack as the built-in open(): a
+TextIOWrapper (text modes) over a buffered binary file over a raw file, so
+seek/tell, binary modes, readline and lazy iteration behave as usual. A file
+stands for the UTF-8 encoding of the text the provider stores. Data that is
+not UTF-8 is handed to the provider as bytes; providers that only store text
+(the bundled ones) refuse it and the write raises OSError.
+
+The raw files avoid holding a whole copy of the file:
+
+* r: text is fetched a chunk at a time with read_range and encoded. The
+  start of every chunk is remembered, so seeking back re-reads one chunk.
+  Filesystems without cheap ranged reads (see has_ranged_reads) are read
+  once and the chunks are served from that copy.
+* w, a, x: each flush of the write buffer is decoded and appended to the
+  file with append_file. Once the data turns out not to be UTF-8 the file
+  is rewritten as bytes on each flush instead.
+* r+, w+, a+: the file is copied into a SpooledTemporaryFile, which stays
+  in memory up to SPOOL_MAX bytes and moves to the host's scratch space
+  beyond that. It is written back on flush and close when it changed.
+"""
+
+import bisect
+import codecs
+import errno
+import io
+import tempfile
+from typing import Callable, List, Optional
+
+from chuk_virtual_shell.filesystem_compat import has_ranged_reads
+
+# Characters fetched from the provider per read
+READ_CHUNK = 64 * 1024
+
+# Bytes buffered before writes reach the filesystem
+WRITE_BUFFER = 64 * 1024
+
+# Bytes of an update-mode (+) file kept in memory before it is spilled
+SPOOL_MAX = 1024 * 1024
+
+
+def open_virtual_file(
+    fs,
+    path: str,
+    mode: str = "r",
+    buffering: int = -1,
+    encoding: Optional[str] = None,
+    errors: Optional[str] = None,
+    newline: Optional[str] = None,
+):
+    """
+    Open a file on the virtual filesystem like the built-in open().
+
+    Args:
+        fs: Filesystem (FileSystemCompat or a compatible object)
+        path: Resolved path of the file
+        mode: Mode string as for open() ("r", "wb", "a+", ...)
+        buffering: Buffer size in bytes (-1 = default; 0 only in binary modes)
+        encoding: Text encoding (default UTF-8)
+        errors: Encoding error handler
+        newline: Newline translation as for open()
+
+    Returns:
+        A TextIOWrapper, or in binary modes a buffered binary file
+
+    Raises:
+        ValueError: for an invalid mode or argument combination
+        FileNotFoundError: if the file must exist and does not
+        FileExistsError: for mode "x" when the file exists
+    """
+    kind, binary, update = _parse_mode(mode)
+    if binary and (encoding is not None or errors is not None or newline is not None):
+        raise ValueError(
+            "binary mode doesn't take an encoding, errors or newline argument"
+        )
+    if buffering == 0 and not binary:
+        raise ValueError("can't have unbuffered text I/O")
+
+    exists = _exists(fs, path)
+    if kind == "r" and not exists:
+        raise FileNotFoundError(f"No such file: {path}")
+    if kind == "x" and exists:
+        raise FileExistsError(f"File exists: {path}")
+    if exists and _is_dir(fs, path):
+        raise IsADirectoryError(f"Is a directory: {path}")
+    if kind in "wx" or not exists:
+        fs.write_file(path, "")
+
+    if update:
+        raw: io.RawIOBase = SpooledFile(fs, path, append=kind == "a")
+    elif kind == "r":
+        raw = RangeReader(fs, path)
+    else:
+        raw = AppendWriter(fs, path)
+    raw.name = path
+    raw.mode = mode
+
+    if buffering == 0:
+        return raw
+    size = buffering if buffering > 1 else WRITE_BUFFER
+    if update:
+        buffer = SpooledBuffer(raw, size)
+    elif kind == "r":
+        buffer = io.BufferedReader(raw, size)
+    else:
+        buffer = io.BufferedWriter(raw, size)
+    if binary:
+        return buffer
+
+    text = io.TextIOWrapper(
+        buffer,
+        encoding=encoding or "utf-8",
+        errors=errors,
+        newline=newline,
+        line_buffering=buffering == 1,
+    )
+    text.mode = mode
+    return text
+
+
+class RangeReader(io.RawIOBase):
+    """Read-only raw file that fetches the text a chunk at a time."""
+
+    def __init__(self, fs, path: str):
+        self._fetch = _range_function(fs, path)
+        # Byte and character offset of every chunk seen so far
+        self._byte_starts: List[int] = [0]
+        self._char_starts: List[int] = [0]
+        self._at_end = False
+        self._chunk_index = -1
+        self._chunk = b""
+        self._pos = 0
+        self._load(0)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        self._checkClosed()
+        index = self._chunk_at(self._pos)
+        if index is None:
+            return 0
+        offset = self._pos - self._byte_starts[index]
+        data = self._chunk[offset : offset + len(buffer)]
+        buffer[: len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self._checkClosed()
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self._size()
+        elif whence != io.SEEK_SET:
+            raise ValueError(f"invalid whence ({whence})")
+        if offset < 0:
+            raise ValueError(f"negative seek position {offset}")
+        self._pos = offset
+        return offset
+
+    def tell(self) -> int:
+        self._checkClosed()
+        return self._pos
+
+    def _size(self) -> int:
+        """Total bytes; reads through the file once if the end is unseen."""
+        while not self._at_end:
+            self._load(len(self._byte_starts) - 1)
+        return self._byte_starts[-1]
+
+    def _chunk_at(self, pos: int) -> Optional[int]:
+        """Load the chunk holding byte pos; None past the end."""
+        while pos >= self._byte_starts[-1] and not self._at_end:
+            self._load(len(self._byte_starts) - 1)
+        if pos >= self._byte_starts[-1]:
+            return None
+        index = bisect.bisect_right(self._byte_starts, pos) - 1
+        if index != self._chunk_index:
+            self._load(index)
+        return index
+
+    def _load(self, index: int) -> None:
+        """Fetch chunk index, recording where the next chunk starts."""
+        text = self._fetch(self._char_starts[index], READ_CHUNK)
+        if text is None:
+            if index == 0:
+                raise FileNotFoundError("No such file")
+            text = ""
+        self._chunk = encode_text(text)
+        self._chunk_index = index
+        if index == len(self._byte_starts) - 1 and not self._at_end:
+            if len(text) < READ_CHUNK:
+                self._at_end = True
+            if text:
+                self._byte_starts.append(self._byte_starts[-1] + len(self._chunk))
+                self._char_starts.append(self._char_starts[-1] + len(text))
+
+
+class AppendWriter(io.RawIOBase):
+    """Write-only raw file that appends each write to the file."""
+
+    def __init__(self, fs, path: str):
+        self._fs = fs
+        self._path = path
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        # Whole content once the data is not UTF-8 (None while it is)
+        self._binary: Optional[bytearray] = None
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._checkClosed()
+        data = bytes(data)
+        if self._binary is None:
+            # Bytes of a character cut off by the previous write
+            pending = self._decoder.getstate()[0]
+            try:
+                text = self._decoder.decode(data)
+            except UnicodeDecodeError:
+                text = None
+            if text is None:
+                self._to_binary(pending + data)
+            elif text:
+                append_text(self._fs, self._path, text)
+            return len(data)
+        self._binary += data
+        write_bytes(self._fs, self._path, bytes(self._binary))
+        return len(data)
+
+    def close(self) -> None:
+        if not self.closed and self._binary is None:
+            # A character cut off at the end makes the data binary
+            pending = self._decoder.getstate()[0]
+            if pending:
+                self._to_binary(pending)
+        super().close()
+
+    def _to_binary(self, data: bytes) -> None:
+        """Rewrite the file as bytes: what it holds so far, then data."""
+        self._binary = bytearray(read_bytes(self._fs, self._path))
+        self._binary += data
+        write_bytes(self._fs, self._path, bytes(self._binary))
+
+
+class SpooledFile(io.RawIOBase):
+    """Read-write raw file over a spooled copy, written back when changed."""
+
+    def __init__(self, fs, path: str, append: bool = False):
+        self._fs = fs
+        self._path = path
+        self._append = append
+        self._dirty = False
+        self._spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX)
+        reader = RangeReader(fs, path)
+        while True:
+            data = reader.read(READ_CHUNK)
+            if not data:
+                break
+            self._spool.write(data)
+        self._spool.seek(0, io.SEEK_END if append else io.SEEK_SET)
+
+    def readable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        self._checkClosed()
+        return self._spool.readinto(buffer)
+
+    def write(self, data) -> int:
+        self._checkClosed()
+        if self._append:
+            self._spool.seek(0, io.SEEK_END)
+        self._dirty = True
+        return self._spool.write(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self._checkClosed()
+        return self._spool.seek(offset, whence)
+
+    def tell(self) -> int:
+        self._checkClosed()
+        return self._spool.tell()
+
+    def truncate(self, size: Optional[int] = None) -> int:
+        self._checkClosed()
+        self._dirty = True
+        return self._spool.truncate(size)
+
+    def flush(self) -> None:
+        super().flush()
+        if self._dirty:
+            pos = self._spool.tell()
+            self._spool.seek(0)
+            write_bytes(self._fs, self._path, self._spool.read())
+            self._spool.seek(pos)
+            self._dirty = False
+
+    def close(self) -> None:
+        if not self.closed:
+            try:
+                self.flush()
+            finally:
+                self._spool.close()
+        super().close()
+
+
+class SpooledBuffer(io.BufferedRandom):
+    """Buffer whose flush also writes the spooled copy back."""
+
+    def flush(self) -> None:
+        super().flush()
+        self.raw.flush()
+
+
+def encode_text(text: str) -> bytes:
+    """The bytes a stored text stands for (UTF-8, escapes undone)."""
+    try:
+        return text.encode("utf-8", "surrogateescape")
+    except UnicodeEncodeError:
+        return text.encode("utf-8", "surrogatepass")
+
+
+def read_bytes(fs, path: str) -> bytes:
+    """The bytes a file holds (empty if it does not exist)."""
+    content = fs.read_file(path)
+    if content is None:
+        return b""
+    if isinstance(content, bytes):
+        return content
+    return encode_text(content)
+
+
+def write_bytes(fs, path: str, data: bytes) -> None:
+    """
+    Replace a file's content: as text when data is UTF-8, else as bytes.
+
+    Raises:
+        OSError: if the filesystem does not take the content (providers
+            that store text only fail on bytes)
+    """
+    try:
+        content = data.decode("utf-8")
+    except UnicodeDecodeError:
+        content = data
+    try:
+        written = fs.write_file(path, content)
+    except (AttributeError, TypeError, ValueError):
+        raise OSError(errno.EINVAL, f"Cannot store binary data: {path}") from None
+    if written is False:
+        raise OSError(errno.EIO, f"Cannot write file: {path}")
+
+
+def append_text(fs, path: str, text: str) -> None:
+    """Append text to a file, rewriting it if fs cannot append."""
+    append_file = getattr(fs, "append_file", None)
+    if callable(append_file):
+        append_file(path, text)
+    else:
+        fs.write_file(path, (fs.read_file(path) or "") + text)
+
+
+def _range_function(fs, path: str) -> Callable[[int, int], Optional[str]]:
+    """Return fetch(offset, length) for a file's text."""
+    if has_ranged_reads(fs):
+        return lambda offset, length: fs.read_range(path, offset, length)
+    # Ranged reads would read the whole file each time: hold one copy
+    content = fs.read_file(path)
+    if isinstance(content, bytes):
+        content = content.decode("utf-8", "surrogateescape")
+
+    def fetch(offset: int, length: int) -> Optional[str]:
+        return None if content is None else content[offset : offset + length]
+
+    return fetch
+
+
+def _parse_mode(mode: str):
+    """Return (one of "rwax", binary, update) or raise ValueError."""
+    if (
+        not isinstance(mode, str)
+        or not set(mode) <= set("rwaxbt+")
+        or len(set(mode)) != len(mode)
+        or sum(char in mode for char in "rwax") != 1
+        or ("b" in mode and "t" in mode)
+    ):
+        raise ValueError(f"invalid mode: '{mode}'")
+    kind = next(char for char in mode if char in "rwax")
+    return kind, "b" in mode, "+" in mode
+
+
+def _exists(fs, path: str) -> bool:
+    exists = getattr(fs, "exists", None)
+    if callable(exists):
+        return bool(exists(path))
+    return fs.read_file(path) is not None
+
+
+def _is_dir(fs, path: str) -> bool:
+    is_dir = getattr(fs, "is_dir", None)
+    return bool(is_dir(path)) if callable(is_dir) else False
@@ -37,7 +37,12 @@ from chuk_virtual_shell.shell_interpreter import ShellInterpreter
 mcp = ChukMCPServer("virtual-shell-mcp")
 
 # Initialize the virtual shell session manager
-session_manager = ShellSessionManager(shell_factory=lambda: ShellInterpreter())
+# Pre-built interpreters kept ready so new sessions start without the
+# filesystem and command setup cost
+SESSION_POOL_SIZE = int(os.environ.get("VIRTUAL_SHELL_POOL_SIZE", "4"))
+session_manager = ShellSessionManager(
+    shell_factory=lambda: ShellInterpreter(), pool_size=SESSION_POOL_SIZE
+)
 
 
 # Store for session information with user isolation
@@ -57,6 +62,9 @@ class SessionInfo:
 sessions: dict[str, SessionInfo] = {}
 background_tasks: dict[str, dict[str, Any]] = {}  # task_id -> {user_id, task}
 
+# Maximum characters of stdout/stderr returned to the client
+MAX_OUTPUT_CHARS = 30000
+
 
 def get_user_id() -> str:
     """
@@ -102,7 +110,7 @@ def get_user_tasks(user_id: str) -> dict[str, Any]:
     }
 
 
-def truncate_output(output: str, max_chars: int = 30000) -> str:
+def truncate_output(output: str, max_chars: int = MAX_OUTPUT_CHARS) -> str:
     """Truncate output if it exceeds max_chars"""
     # Ensure output is a string
     if not isinstance(output, str):
@@ -110,7 +118,7 @@ def truncate_output(output: str, max_chars: int = 30000) -> str:
 
     # Ensure max_chars is an int
     if not isinstance(max_chars, int):
-        max_chars = int(max_chars) if max_chars else 30000
+        max_chars = int(max_chars) if max_chars else MAX_OUTPUT_CHARS
 
     if len(output) <= max_chars:
         return output
@@ -120,45 +128,61 @@ def truncate_output(output: str, max_chars: int = 30000) -> str:
 
 
 async def collect_command_output(
-    session_id: str, command: str, timeout_seconds: float
+    session_id: str,
+    command: str,
+    timeout_seconds: float,
+    max_chars: int | None = MAX_OUTPUT_CHARS,
 ) -> dict[str, Any]:
     """
     Collect output from the async generator returned by run_command.
     Returns a dict with stdout, stderr, and exit_code.
+
+    Chunks arrive while the command runs and each stream's chunks are
+    concatenated as-is (chunk boundaries are arbitrary). Each stream keeps
+    at most max_chars + 1 characters (None keeps everything) so oversized
+    output is never held in full, and is then cut to max_chars with
+    truncate_output().
     """
-    stdout_lines = []
-    stderr_lines = []
+    stdout_parts: list[str] = []
+    stderr_parts: list[str] = []
+    sizes = {"stdout": 0, "stderr": 0}
     exit_code = 0
 
+    def append(stream_type: str, data: str) -> None:
+        parts = stderr_parts if stream_type == "stderr" else stdout_parts
+        if max_chars is not None:
+            room = max_chars + 1 - sizes[stream_type]
+            if room <= 0:
+                return
+            data = data[:room]
+        sizes[stream_type] += len(data)
+        parts.append(data)
+
     try:
         # Wrap the async generator in wait_for for timeout
         async def collect():
             async for chunk in session_manager.run_command(session_id, command):
                 # Extract data from StreamChunk
                 if hasattr(chunk, "data"):
-                    data = chunk.data
-                    if hasattr(chunk, "stream_type"):
-                        if chunk.stream_type == "stderr":
-                            stderr_lines.append(data)
-                        else:
-                            stdout_lines.append(data)
-                    else:
-                        stdout_lines.append(data)
+                    stream_type = getattr(chunk, "stream_type", "stdout")
+                    append(stream_type, chunk.data)
 
         await asyncio.wait_for(collect(), timeout=timeout_seconds)
 
     except TimeoutError:
-        stderr_lines.append(f"Command timed out after {timeout_seconds} seconds")
+        error = f"Command timed out after {timeout_seconds} seconds"
+        append("stderr", "\n" + error if sizes["stderr"] else error)
         exit_code = -1
     except Exception as e:
-        stderr_lines.append(str(e))
+        append("stderr", "\n" + str(e) if sizes["stderr"] else str(e))
         exit_code = -1
 
-    return {
-        "stdout": "\n".join(stdout_lines) if stdout_lines else "",
-        "stderr": "\n".join(stderr_lines) if stderr_lines else "",
-        "exit_code": exit_code,
-    }
+    stdout = "".join(stdout_parts)
+    stderr = "".join(stderr_parts)
+    if max_chars is not None:
+        stdout = truncate_output(stdout, max_chars)
+        stderr = truncate_output(stderr, max_chars)
+    return {"stdout": stdout, "stderr": stderr, "exit_code": exit_code}
 
 
 @mcp.tool  # type: ignore[arg-type]
@@ -264,10 +288,6 @@ async def bash(
                 # If state retrieval fails, keep existing values
                 pass
 
-            # Truncate output if needed
-            result["stdout"] = truncate_output(result["stdout"])
-            result["stderr"] = truncate_output(result["stderr"])
-
             # Add session info to result
             result["session_id"] = session_id
             result["working_directory"] = session_info.working_directory
@@ -582,10 +602,16 @@ async def cleanup():
         all_tasks = [t["task"] for t in background_tasks.values()]
         await asyncio.gather(*all_tasks, return_exceptions=True)
 
+    if session_manager.pool is not None:
+        session_manager.pool.close()
+
 
 def main():
     """Main entry point for the MCP server"""
     try:
+        # Build pooled interpreters in the background while the server starts
+        session_manager.warm_pool()
+
         # Run the server using stdio
         mcp.run(stdio=True)
     except KeyboardInterrupt:
@@ -5,6 +5,7 @@ Provides stateful shell sessions with PTY support, streaming output,
 and process management.
 """
 
+from .interpreter_pool import InterpreterPool
 from .shell_session import (
     ShellSession,
     ShellSessionManager,
@@ -16,6 +17,7 @@ from .shell_session import (
 )
 
 __all__ = [
+    "InterpreterPool",
     "ShellSession",
     "ShellSessionManager",
     "ShellSessionState",
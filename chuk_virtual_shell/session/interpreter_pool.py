@@ -0,0 +1,125 @@
+"""
+Pool of pre-built shell interpreters for fast session creation.
+
+Building a ShellInterpreter creates a filesystem, discovers and instantiates
+every command and runs the environment setup. The pool keeps a number of
+interpreters ready and rebuilds them on a background thread, so creating a
+session only has to take one off the shelf.
+"""
+
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class InterpreterPool:
+    """
+    Keeps pre-built shell interpreters ready for new sessions.
+
+    Each interpreter is handed out once. Taking one schedules a background
+    rebuild so the pool returns to its target size; when the pool is empty
+    the interpreter is built on the spot.
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int = 4):
+        """
+        Initialize the pool.
+
+        Args:
+            factory: Callable that creates shell interpreter instances
+            size: Number of interpreters kept ready
+        """
+        self.factory = factory
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._ready: Deque[Any] = deque()
+        self._building = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._closed = False
+
+    def acquire(self) -> Any:
+        """
+        Take a ready interpreter, building one if the pool is empty.
+
+        Returns:
+            A shell interpreter that has not been used before
+        """
+        with self._lock:
+            shell = self._ready.popleft() if self._ready else None
+            if shell is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if shell is None:
+            shell = self.factory()
+
+        self.refill()
+        return shell
+
+    def refill(self) -> None:
+        """Schedule background builds up to the target size."""
+        with self._lock:
+            if self._closed:
+                return
+            missing = self.size - len(self._ready) - self._building
+            if missing <= 0:
+                return
+            self._building += missing
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="shell-pool"
+                )
+            executor = self._executor
+
+        for _ in range(missing):
+            executor.submit(self._build_one)
+
+    def fill(self) -> None:
+        """Build interpreters synchronously until the pool is full."""
+        while True:
+            with self._lock:
+                if self._closed or len(self._ready) + self._building >= self.size:
+                    return
+            shell = self.factory()
+            with self._lock:
+                self._ready.append(shell)
+
+    def close(self) -> None:
+        """Stop background builds and drop the ready interpreters."""
+        with self._lock:
+            self._closed = True
+            self._ready.clear()
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, int]:
+        """Return pool counters."""
+        with self._lock:
+            return {
+                "size": self.size,
+                "ready": len(self._ready),
+                "building": self._building,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _build_one(self) -> None:
+        """Build one interpreter and add it to the pool (background thread)."""
+        shell = None
+        try:
+            shell = self.factory()
+        except Exception as e:
+            logger.error(f"Failed to build pooled shell interpreter: {e}")
+        finally:
+            with self._lock:
+                self._building -= 1
+                if shell is not None and not self._closed:
+                    self._ready.append(shell)
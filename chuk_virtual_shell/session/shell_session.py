@@ -12,17 +12,25 @@ import asyncio
 import os
 import signal
 import sys
+import threading
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple, AsyncIterator
+from typing import Any, Dict, List, Optional, Set, Tuple, AsyncIterator
 import logging
 
 from chuk_sessions import SessionManager  # type: ignore[import-untyped]
 
+from chuk_virtual_shell.session.interpreter_pool import InterpreterPool
+
 logger = logging.getLogger(__name__)
 
+# Exit codes reported for commands stopped by a timeout (128 + signal number)
+SOFT_TIMEOUT_EXIT_CODE = 130  # SIGINT
+HARD_TIMEOUT_EXIT_CODE = 137  # SIGKILL
+
 
 class SessionMode(Enum):
     """Shell session modes."""
@@ -85,26 +93,148 @@ class ShellSessionState:
     pty_size: Optional[Tuple[int, int]] = None  # (rows, cols)
 
 
+class OutputWriter:
+    """
+    Carries command output from a session worker thread to the event loop.
+
+    Writes are coalesced into chunks of at most ``max_chunk_size``
+    characters. A chunk is handed over as soon as it is full or
+    ``flush_interval`` seconds after the previous one; the consumer also
+    flushes partial output while waiting, so slow producers still stream.
+    At most ``max_pending`` chunks wait for the consumer; beyond that the
+    worker blocks (backpressure) until the consumer catches up or the
+    writer is abandoned.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        max_chunk_size: int,
+        max_pending: int,
+        flush_interval: float,
+    ):
+        self.max_chunk_size = max_chunk_size
+        self.flush_interval = flush_interval
+        self._loop = loop
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._slots = threading.Semaphore(max_pending)
+        self._abandoned = threading.Event()
+        # Guards the buffer and keeps hand-overs in write order
+        self._lock = threading.Lock()
+        self._buffer: List[str] = []
+        self._buffered = 0
+        self._last_emit = 0.0
+
+    def write(self, data: str) -> None:
+        """Buffer output and hand over full chunks (worker thread)."""
+        if not data or self._abandoned.is_set():
+            return
+        with self._lock:
+            self._buffer.append(data)
+            self._buffered += len(data)
+            if (
+                self._buffered >= self.max_chunk_size
+                or time.monotonic() - self._last_emit >= self.flush_interval
+            ):
+                for chunk in self._take_chunks():
+                    self._send(chunk)
+
+    def close(self) -> None:
+        """Hand over remaining output and signal the end (worker thread)."""
+        with self._lock:
+            for chunk in self._take_chunks():
+                self._send(chunk)
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, None)
+
+    def flush(self) -> None:
+        """Hand over partial output without blocking (event loop thread)."""
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            for chunk in self._take_chunks():
+                # Scheduled like worker hand-overs so ordering is preserved
+                self._loop.call_soon(self._queue.put_nowait, (chunk, False))
+        finally:
+            self._lock.release()
+
+    def abandon(self) -> None:
+        """Stop delivering output; blocked and later writes are dropped."""
+        self._abandoned.set()
+
+    async def get(self) -> Optional[str]:
+        """Wait for the next chunk; None marks the end of the output."""
+        item = await self._queue.get()
+        if item is None:
+            return None
+        chunk, holds_slot = item
+        if holds_slot:
+            self._slots.release()
+        return chunk
+
+    def _take_chunks(self) -> List[str]:
+        """Split buffered output into chunks and clear the buffer."""
+        if not self._buffer:
+            return []
+        text = "".join(self._buffer)
+        self._buffer = []
+        self._buffered = 0
+        self._last_emit = time.monotonic()
+        size = self.max_chunk_size
+        return [text[start : start + size] for start in range(0, len(text), size)]
+
+    def _send(self, chunk: str) -> None:
+        """Queue a chunk for the consumer, waiting for a free slot."""
+        while not self._slots.acquire(timeout=0.1):
+            if self._abandoned.is_set():
+                return
+        if self._abandoned.is_set():
+            self._slots.release()
+            return
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (chunk, True))
+
+
 class ShellSession:
     """
     Individual shell session with stateful execution.
 
     Maintains working directory, environment, and command history
     across multiple command executions.
+
+    Commands run on a dedicated worker thread per session, so a slow
+    command only delays later commands of the same session and never
+    blocks the event loop serving other sessions. Output is streamed
+    while the command runs.
     """
 
+    # Longest time partial output is held back before being sent
+    FLUSH_INTERVAL = 0.05
+
     def __init__(
         self,
         session_id: str,
         shell_interpreter,
         mode: SessionMode = SessionMode.PIPE,
         pty_size: Optional[Tuple[int, int]] = None,
+        max_chunk_size: int = 16 * 1024,
+        max_pending_chunks: int = 16,
     ):
-        """Initialize a shell session."""
+        """
+        Initialize a shell session.
+
+        Args:
+            session_id: Session identifier
+            shell_interpreter: Shell interpreter executing the commands
+            mode: Session mode (PTY or PIPE)
+            pty_size: Terminal size for PTY mode
+            max_chunk_size: Maximum characters per streamed output chunk
+            max_pending_chunks: Chunks buffered before a command is paused
+        """
         self.session_id = session_id
         self.shell = shell_interpreter
         self.mode = mode
         self.pty_size = pty_size or (24, 80)  # Default terminal size
+        self.max_chunk_size = max_chunk_size
+        self.max_pending_chunks = max_pending_chunks
 
         # Session state
         self.state = ShellSessionState(
@@ -123,6 +253,16 @@ class ShellSession:
         self.sequence_counter = 0
         self.stream_buffers: Dict[str, List[StreamChunk]] = {}
 
+        # Worker running this session's commands in submission order
+        self._worker: Optional[ThreadPoolExecutor] = None
+        self.pending_commands: Dict[str, asyncio.Future] = {}
+        # Commands waiting for the worker, the one it runs, and queued
+        # commands to skip (guarded by _command_lock)
+        self._queued_commands: Set[str] = set()
+        self._running_command: Optional[str] = None
+        self._skipped_commands: Set[str] = set()
+        self._command_lock = threading.Lock()
+
         # PTY support
         self.pty_master = None
         self.pty_slave = None
@@ -235,45 +375,104 @@ class ShellSession:
         soft_timeout_ms: Optional[int],
         stream: bool,
     ) -> AsyncIterator[StreamChunk]:
-        """Execute command in pipe mode with the virtual shell."""
+        """
+        Execute command in pipe mode with the virtual shell.
+
+        The command runs on the session worker and its output is yielded
+        chunk by chunk while it runs. When the soft timeout expires the
+        shell is asked to interrupt the command; loops, command lists and
+        pipelines stop at the next command or chunk boundary. When the hard
+        timeout expires the command is interrupted the same way, its output
+        is abandoned and a timeout is reported. A command interrupted before
+        the worker reaches it is skipped.
+        """
         result = self.command_results[command_id]
         result.state = CommandState.RUNNING
 
-        # Execute through the shell interpreter
-        try:
-            # Change to session's working directory
-            original_cwd = self.shell.fs.pwd()
-            if self.state.cwd != original_cwd:
-                self.shell.execute(f"cd {self.state.cwd}")
-
-            # Apply session environment
-            for key, value in self.state.env.items():
-                if key not in self.shell.environ or self.shell.environ[key] != value:
-                    self.shell.environ[key] = value
+        loop = asyncio.get_running_loop()
+        writer = OutputWriter(
+            loop, self.max_chunk_size, self.max_pending_chunks, self.FLUSH_INTERVAL
+        )
 
-            # Execute command and capture output
-            output = self.shell.execute(command)
+        # Execute through the shell interpreter on the session worker
+        with self._command_lock:
+            self._queued_commands.add(command_id)
+        future = loop.run_in_executor(
+            self._get_worker(), self._execute_sync, command_id, command, writer
+        )
+        self.pending_commands[command_id] = future
 
-            # Update session state
-            self.state.cwd = self.shell.fs.pwd()
-            self.state.env = dict(self.shell.environ)
+        started = loop.time()
+        hard_deadline = started + timeout_ms / 1000 if timeout_ms else None
+        soft_deadline = started + soft_timeout_ms / 1000 if soft_timeout_ms else None
+        stdout_parts = []
 
-            # Stream output as chunks
-            if output:
+        try:
+            while True:
+                wait = self.FLUSH_INTERVAL
+                for deadline in (soft_deadline, hard_deadline):
+                    if deadline is not None:
+                        wait = max(0.0, min(wait, deadline - loop.time()))
+                try:
+                    data = await asyncio.wait_for(writer.get(), wait)
+                except asyncio.TimeoutError:
+                    now = loop.time()
+                    if soft_deadline is not None and now >= soft_deadline:
+                        soft_deadline = None
+                        self._interrupt(command_id)
+                        result.state = CommandState.TIMEOUT
+                    if hard_deadline is not None and now >= hard_deadline:
+                        # Free the worker for the session's next command
+                        self._interrupt(command_id)
+                        writer.abandon()
+                        raise
+                    writer.flush()
+                    continue
+
+                if data is None:
+                    break
+
+                # Stream output as chunks
                 chunk = StreamChunk(
                     sequence_id=self._next_sequence(),
                     stream_type="stdout",
-                    data=output,
+                    data=data,
                     timestamp=time.time(),
                     command_id=command_id,
                 )
                 result.chunks.append(chunk)
-                result.stdout = output
+                stdout_parts.append(data)
                 if stream:
                     yield chunk
 
-            result.state = CommandState.COMPLETED
-            result.exit_code = self.shell.return_code
+            # Surface errors raised by the command
+            await future
+            result.stdout = "".join(stdout_parts)
+
+            if result.state == CommandState.RUNNING:
+                result.state = CommandState.COMPLETED
+                result.exit_code = self.shell.return_code
+            elif result.state == CommandState.TIMEOUT:
+                result.exit_code = SOFT_TIMEOUT_EXIT_CODE
+            else:
+                result.exit_code = self.shell.return_code
+
+        except asyncio.TimeoutError:
+            result.stdout = "".join(stdout_parts)
+            message = f"{command}: timed out after {timeout_ms} ms"
+            timeout_chunk = StreamChunk(
+                sequence_id=self._next_sequence(),
+                stream_type="stderr",
+                data=message,
+                timestamp=time.time(),
+                command_id=command_id,
+            )
+            result.chunks.append(timeout_chunk)
+            result.stderr = message
+            result.state = CommandState.TIMEOUT
+            result.exit_code = HARD_TIMEOUT_EXIT_CODE
+            if stream:
+                yield timeout_chunk
 
         except Exception as e:
             error_chunk = StreamChunk(
@@ -289,6 +488,72 @@ class ShellSession:
             result.exit_code = 1
             if stream:
                 yield error_chunk
+        finally:
+            # A consumer that stops early must not leave the worker blocked
+            writer.abandon()
+            self.pending_commands.pop(command_id, None)
+
+    def _get_worker(self) -> ThreadPoolExecutor:
+        """Get the session's single worker thread, creating it on first use."""
+        if self._worker is None:
+            self._worker = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix=f"shell-session-{self.session_id}"
+            )
+        return self._worker
+
+    def _interrupt(self, command_id: str) -> None:
+        """
+        Stop a command: interrupt it if it is running, skip it if queued.
+
+        The shell's interrupt flag is only set for the command the worker
+        is running, so other commands of the session are not affected.
+        """
+        with self._command_lock:
+            if self._running_command == command_id:
+                self.shell._interrupted = True
+            elif command_id in self._queued_commands:
+                self._skipped_commands.add(command_id)
+
+    def _execute_sync(
+        self, command_id: str, command: str, writer: OutputWriter
+    ) -> None:
+        """Run a command against the session state (called on the worker)."""
+        try:
+            with self._command_lock:
+                self._queued_commands.discard(command_id)
+                if command_id in self._skipped_commands:
+                    # Interrupted before it started
+                    self._skipped_commands.discard(command_id)
+                    return
+                self._running_command = command_id
+                # Start with a clear interrupt request
+                self.shell._interrupted = False
+
+            # Change to session's working directory
+            original_cwd = self.shell.fs.pwd()
+            if self.state.cwd != original_cwd:
+                self.shell.execute(f"cd {self.state.cwd}")
+
+            # Apply session environment
+            for key, value in self.state.env.items():
+                if key not in self.shell.environ or self.shell.environ[key] != value:
+                    self.shell.environ[key] = value
+
+            # Execute command, forwarding output as it is produced
+            if hasattr(self.shell, "execute_stream"):
+                for data in self.shell.execute_stream(command):
+                    writer.write(data)
+            else:
+                writer.write(self.shell.execute(command))
+
+            # Update session state
+            self.state.cwd = self.shell.fs.pwd()
+            self.state.env = dict(self.shell.environ)
+        finally:
+            with self._command_lock:
+                if self._running_command == command_id:
+                    self._running_command = None
+            writer.close()
 
     async def _run_pty(
         self,
@@ -322,6 +587,12 @@ class ShellSession:
 
     async def cancel(self, command_id: str) -> bool:
         """Cancel a running command."""
+        if command_id in self.pending_commands:
+            # Stop at the next command boundary, or skip it if still queued
+            self._interrupt(command_id)
+            self.command_results[command_id].state = CommandState.CANCELLED
+            return True
+
         if command_id not in self.active_commands:
             return False
 
@@ -378,6 +649,13 @@ class ShellSession:
         for command_id in list(self.active_commands.keys()):
             asyncio.create_task(self.cancel(command_id))
 
+        # Interrupt pending virtual shell commands and release the worker
+        if self.pending_commands:
+            self.shell._interrupted = True
+        if self._worker is not None:
+            self._worker.shutdown(wait=False)
+            self._worker = None
+
         # Close PTY if open
         if self.pty_master:
             os.close(self.pty_master)
@@ -397,6 +675,7 @@ class ShellSessionManager:
         shell_factory,
         session_backend: Optional[SessionManager] = None,
         default_ttl: int = 3600,
+        pool_size: int = 0,
     ):
         """
         Initialize session manager.
@@ -405,11 +684,25 @@ class ShellSessionManager:
             shell_factory: Callable that creates shell interpreter instances
             session_backend: chuk-sessions SessionManager instance
             default_ttl: Default session TTL in seconds
+            pool_size: Number of pre-built interpreters kept ready for new
+                sessions (0 builds each one on demand)
         """
         self.shell_factory = shell_factory
         self.session_backend = session_backend or SessionManager()
         self.default_ttl = default_ttl
         self.active_sessions: Dict[str, ShellSession] = {}
+        self.pool = InterpreterPool(shell_factory, pool_size) if pool_size > 0 else None
+
+    def _new_shell(self):
+        """Get a fresh shell interpreter, from the pool when enabled."""
+        if self.pool is not None:
+            return self.pool.acquire()
+        return self.shell_factory()
+
+    def warm_pool(self) -> None:
+        """Start building pooled interpreters in the background."""
+        if self.pool is not None:
+            self.pool.refill()
 
     async def create_session(
         self,
@@ -436,7 +729,7 @@ class ShellSessionManager:
         )
 
         # Create shell instance
-        shell = self.shell_factory()
+        shell = self._new_shell()
 
         # Create session wrapper
         session = ShellSession(
@@ -541,7 +834,7 @@ class ShellSessionManager:
     ) -> ShellSession:
         """Restore a session from persisted state."""
         # Create new shell instance
-        shell = self.shell_factory()
+        shell = self._new_shell()
 
         # Restore working directory
         if "cwd" in session_data:
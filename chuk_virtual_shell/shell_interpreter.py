@@ -10,8 +10,7 @@ execution, and environment management.
 import asyncio
 import logging
 import time
-import inspect
-from typing import Optional, Tuple
+from typing import Iterator, Optional, Tuple
 
 # Virtual file system imports
 from chuk_virtual_fs import VirtualFileSystem  # type: ignore
@@ -22,6 +21,7 @@ from chuk_virtual_shell.filesystem_compat import FileSystemCompat
 from chuk_virtual_shell.core.expansion import ExpansionHandler
 from chuk_virtual_shell.core.parser import CommandParser
 from chuk_virtual_shell.core.executor import CommandExecutor
+from chuk_virtual_shell.core.async_executor import AsyncCommandExecutor
 from chuk_virtual_shell.core.environment import EnvironmentManager
 from chuk_virtual_shell.core.control_flow_executor import ControlFlowExecutor
 
@@ -67,6 +67,7 @@ class ShellInterpreter:
         self.parser = CommandParser()
         self.expansion = ExpansionHandler(self)
         self.executor = CommandExecutor(self)
+        self.async_executor = AsyncCommandExecutor(self)
         self._control_flow_executor = ControlFlowExecutor(self)
 
         # Initialize shell state
@@ -75,6 +76,10 @@ class ShellInterpreter:
         self.return_code = 0
         self.start_time = time.time()
 
+        # Shell functions (name -> body) and the running function's arguments
+        self.functions = {}
+        self.positional = []
+
         # Command timing statistics
         self.command_timing = {}
         self.enable_timing = False
@@ -127,7 +132,11 @@ class ShellInterpreter:
         """Initialize filesystem using the specified provider and arguments."""
         try:
             raw_fs = VirtualFileSystem(fs_provider, **(fs_provider_args or {}))
-            self.fs = FileSystemCompat(raw_fs)
+            # Other clients may change remote stores, so cached metadata expires
+            cache_ttl = (
+                None if fs_provider == "memory" else FileSystemCompat.REMOTE_CACHE_TTL
+            )
+            self.fs = FileSystemCompat(raw_fs, cache_ttl=cache_ttl)
         except Exception as e:
             logger.error(f"Error initializing filesystem provider '{fs_provider}': {e}")
 
@@ -222,6 +231,8 @@ class ShellInterpreter:
             init_commands = config.get("initialization", [])
             if init_commands:
                 execute_initialization(self.fs.fs, init_commands)
+                # Initialization writes to the raw filesystem directly
+                self.fs.clear_cache()
 
             # Load MCP servers if specified
             if "mcp_servers" in config:
@@ -252,8 +263,7 @@ class ShellInterpreter:
 
     def _load_commands(self) -> None:
         """Dynamically load all available commands using the command loader."""
-        discovered_commands = CommandLoader.discover_commands(self)
-        self.commands.update(discovered_commands)
+        self.commands = CommandLoader.discover_commands(self)
 
     def parse_command(self, cmd_line: str) -> Tuple[Optional[str], list]:
         """
@@ -267,11 +277,10 @@ class ShellInterpreter:
         """
         Execute a command line synchronously.
 
-        This is the main entry point for command execution. It handles:
-        - Command history
-        - Command substitution
-        - Alias expansion
-        - Delegates actual execution to CommandExecutor
+        This is the main entry point for command execution. It records the
+        line in the command history and delegates to CommandExecutor, which
+        parses the line once (cached) and applies command substitution,
+        alias expansion and the other expansions to each command in turn.
 
         Args:
             cmd_line (str): The full command line string.
@@ -283,66 +292,54 @@ class ShellInterpreter:
         if not cmd_line:
             return ""
 
-        # Store original for history before any expansions
-        original_cmd_line = cmd_line
-
-        # Handle command substitution $(command) and backticks
-        cmd_line = self.expansion.expand_command_substitution(cmd_line)
-
-        # Handle alias expansion
-        cmd_line = self.expansion.expand_aliases(cmd_line)
-
-        # Add to history
-        self.history.append(original_cmd_line)
+        # Add to history before any expansions
+        self.history.append(cmd_line)
 
         # Delegate execution to the executor
         return self.executor.execute_line(cmd_line)
 
-    async def execute_async(self, cmd_line: str) -> str:
+    def execute_stream(self, cmd_line: str) -> Iterator[str]:
         """
-        Execute a command line asynchronously.
+        Execute a command line, yielding output chunks as they are produced.
+
+        Commands run as the iterator is consumed, so callers can forward
+        output while a long command is still running. The concatenated
+        chunks equal the result of execute().
 
         Args:
             cmd_line (str): The full command line string.
 
         Returns:
-            str: The output from the command execution.
+            Iterator[str]: Output chunks.
         """
         cmd_line = cmd_line.strip()
         if not cmd_line:
-            return ""
+            return iter(())
 
         self.history.append(cmd_line)
+        return self.executor.stream_line(cmd_line)
 
-        if cmd_line == "exit":
-            self.running = False
-            return "Goodbye!"
+    async def execute_async(self, cmd_line: str) -> str:
+        """
+        Execute a command line asynchronously.
 
-        cmd, args = self.parse_command(cmd_line)
-        if not cmd:
-            return ""
+        The line gets the same parsing and semantics as execute() (pipes,
+        operators, redirection, control flow). Async commands are awaited on
+        the running loop and synchronous work runs on a thread pool, so the
+        loop stays free for other sessions.
 
-        if cmd in self.commands:
-            try:
-                command = self.commands[cmd]
-                # Check if command supports async execution
-                if hasattr(command, "execute_async") and inspect.iscoroutinefunction(
-                    command.execute_async
-                ):
-                    result = await command.execute_async(args)
-                else:
-                    # Fall back to synchronous execution
-                    result = command.execute(args)
+        Args:
+            cmd_line (str): The full command line string.
 
-                if cmd == "cd":
-                    self.environ["PWD"] = self.fs.pwd()
+        Returns:
+            str: The output from the command execution.
+        """
+        cmd_line = cmd_line.strip()
+        if not cmd_line:
+            return ""
 
-                return result
-            except Exception as e:
-                logger.error(f"Error executing command '{cmd}' asynchronously: {e}")
-                return f"Error executing command: {e}"
-        else:
-            return f"{cmd}: command not found"
+        self.history.append(cmd_line)
+        return await self.async_executor.execute_line_async(cmd_line)
 
     def prompt(self) -> str:
         """Return the formatted command prompt."""
@@ -451,7 +448,7 @@ class ShellInterpreter:
             Node info or None if not found
         """
         resolved_path = self.resolve_path(path)
-        return self.fs.provider.get_node_info(resolved_path)
+        return self.fs.get_node_info(resolved_path)
 
     def _register_command(self, command):
         """
@@ -0,0 +1,37 @@
+"""
+tests/chuk_virtual_shell/commands/environment/test_let_command.py
+"""
+
+import pytest
+from chuk_virtual_shell.commands.environment.let import LetCommand
+from tests.dummy_shell import DummyShell
+
+
+@pytest.fixture
+def let_command():
+    dummy_shell = DummyShell({})
+    dummy_shell.environ = {"i": "4"}
+    return LetCommand(shell_context=dummy_shell)
+
+
+def test_let_assigns_in_order(let_command):
+    assert let_command.execute(["i++", "total = i * 10"]) == ""
+    assert let_command.shell.environ["i"] == "5"
+    assert let_command.shell.environ["total"] == "50"
+    assert let_command.shell.return_code == 0
+
+
+def test_let_status_follows_last_value(let_command):
+    let_command.execute(["x = 0"])
+    assert let_command.shell.return_code == 1
+
+
+def test_let_reports_errors(let_command):
+    result = let_command.execute(["i / 0"])
+    assert result == "let: division by 0"
+    assert let_command.shell.return_code == 1
+
+
+def test_let_without_arguments(let_command):
+    assert let_command.execute([]) == "let: expression expected"
+    assert let_command.shell.return_code == 2
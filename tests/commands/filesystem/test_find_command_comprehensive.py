@@ -3,6 +3,8 @@ Comprehensive tests for the find command.
 Tests all find functionality including various flags and edge cases.
 """
 
+import time
+
 import pytest
 from chuk_virtual_shell.commands.filesystem.find import FindCommand
 from tests.dummy_shell import DummyShell
@@ -548,3 +550,39 @@ class TestFindRealWorldScenarios:
         result = cmd.execute(["/", "-name", "*.log"])
         # Should find log files
         assert "log" in result
+
+
+class TestFindTimesFromMetadata:
+    """Test -mtime and -newer against real modification times."""
+
+    def make_shell(self):
+        from chuk_virtual_shell.shell_interpreter import ShellInterpreter
+
+        shell = ShellInterpreter()
+        shell.execute("mkdir -p /t")
+        shell.fs.write_file("/t/old.txt", "old")
+        shell.fs.write_file("/t/new.txt", "new")
+        times = {"/t/old.txt": time.time() - 3 * 86400, "/t/new.txt": time.time()}
+        get_node_info = shell.fs.get_node_info
+
+        def dated_node_info(path):
+            info = get_node_info(path)
+            if info is not None and path in times:
+                info.modified_at = time.strftime(
+                    "%Y-%m-%dT%H:%M:%SZ", time.gmtime(times[path])
+                )
+            return info
+
+        shell.fs.get_node_info = dated_node_info
+        return shell
+
+    def test_find_mtime_compares_age_in_days(self):
+        shell = self.make_shell()
+        assert shell.execute("find /t -type f -mtime +1") == "/t/old.txt"
+        assert shell.execute("find /t -type f -mtime -1") == "/t/new.txt"
+        assert shell.execute("find /t -type f -mtime 3") == "/t/old.txt"
+
+    def test_find_newer_compares_mtimes(self):
+        shell = self.make_shell()
+        assert shell.execute("find /t -type f -newer /t/old.txt") == "/t/new.txt"
+        assert shell.execute("find /t -type f -newer /t/new.txt") == ""
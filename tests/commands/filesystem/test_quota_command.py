@@ -578,3 +578,23 @@ def test_quota_real_quota_info():
     # Should return None in current implementation
     result = quota_cmd._get_real_quota_info("user", False, 1000, 10)
     assert result is None
+
+
+def test_quota_usage_stats_from_usage_totals():
+    """
+    Test that totals kept by the filesystem are used instead of a walk
+    """
+    from chuk_virtual_shell.core.usage_index import Usage
+
+    dummy_shell = DummyShell({"/home/user": {}})
+    dummy_shell.current_user = "user"
+    dummy_shell.environ = {"HOME": "/home/user"}
+    dummy_shell.fs.usage = lambda path: Usage(bytes=10 * 1024, files=3, dirs=1)
+
+    def mock_find(path, recursive=True):
+        raise AssertionError("should not walk")
+
+    dummy_shell.fs.find = mock_find
+
+    quota_cmd = QuotaCommand(shell_context=dummy_shell)
+    assert quota_cmd._calculate_usage_stats("user", is_group=False) == (10, 3)
@@ -0,0 +1,48 @@
+"""
+Tests for the updatedb command and index-backed find.
+"""
+
+from chuk_virtual_shell.shell_interpreter import ShellInterpreter
+from tests.dummy_shell import DummyShell
+from chuk_virtual_shell.commands.filesystem.updatedb import UpdatedbCommand
+
+
+def make_shell():
+    shell = ShellInterpreter()
+    shell.execute("mkdir -p /proj/src /proj/docs")
+    shell.fs.write_file("/proj/src/main.py", "print('hi')\n")
+    shell.fs.write_file("/proj/docs/readme.md", "# Readme\n")
+    return shell
+
+
+def test_updatedb_builds_and_reports():
+    shell = make_shell()
+    assert "no index" in shell.execute("updatedb --status")
+    output = shell.execute("updatedb")
+    assert "files: 2 (0 not content-indexed)" in output
+    assert "built in" in output
+    assert shell.execute("updatedb --status").startswith("directories:")
+    assert shell.execute("updatedb --disable") == "updatedb: index disabled"
+    assert shell.fs.index is None
+
+
+def test_find_same_with_index():
+    shell = make_shell()
+    commands = [
+        "find /proj",
+        "find /proj -type d",
+        "find /proj -name main.py",
+        "find /proj -maxdepth 1",
+    ]
+    expected = [shell.execute(command) for command in commands]
+    shell.execute("updatedb")
+    assert [shell.execute(command) for command in commands] == expected
+    shell.execute("touch /proj/src/new.py")
+    assert "/proj/src/new.py" in shell.execute("find /proj -type f")
+
+
+def test_updatedb_unsupported_filesystem():
+    shell = DummyShell({})
+    output = UpdatedbCommand(shell).execute([])
+    assert "does not support indexing" in output
+    assert shell.return_code == 1
@@ -2,11 +2,23 @@
 tests/chuk_virtual_shell/commands/test_command_loader.py
 """
 
+from collections.abc import Mapping
+
+import pytest
+
 from chuk_virtual_shell.commands.command_loader import CommandLoader
 from chuk_virtual_shell.commands.command_base import ShellCommand
 from tests.dummy_shell import DummyShell
 
 
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    """Rescan the commands package in each test (some tests mock the scan)."""
+    CommandLoader.clear_registry()
+    yield
+    CommandLoader.clear_registry()
+
+
 # Test for discover_commands
 def test_discover_commands():
     # Create a dummy shell with an empty file system and minimal environment.
@@ -83,7 +95,7 @@ def test_discover_commands_with_import_error():
         # This should not raise an error and should continue processing other modules
         commands = CommandLoader.discover_commands(dummy_shell)
         # The function should handle the error gracefully and continue
-        assert isinstance(commands, dict)
+        assert isinstance(commands, Mapping)
 
 
 # Test error handling during command instantiation
@@ -121,12 +133,11 @@ def test_discover_commands_with_instantiation_error():
     ):
         mock_walk.return_value = [("/mock/commands", [], ["failing_command.py"])]
 
-        # This should handle the instantiation error gracefully
+        # Commands are instantiated lazily, so the error surfaces on lookup
         commands = CommandLoader.discover_commands(dummy_shell)
-        assert isinstance(commands, dict)
-        assert "failing_cmd" not in commands  # Should not be added due to error
-        # The fact that this doesn't raise an exception and returns an empty dict
-        # shows that the error handling path (lines 50-51) was executed
+        assert isinstance(commands, Mapping)
+        assert commands.get("failing_cmd") is None
+        assert "failing_cmd" not in commands  # Dropped after the failed lookup
 
 
 # Test load_commands_from_path with existing path and files
@@ -224,3 +235,44 @@ def test_load_commands_from_path_instantiation_error():
         # Should handle instantiation error gracefully
         commands = CommandLoader.load_commands_from_path(dummy_shell, "/mock/path")
         assert commands == {}
+
+
+# Test the shared registry and lazy instantiation
+def test_registry_is_scanned_once():
+    first = CommandLoader.registry()
+    assert CommandLoader.registry() is first
+    assert first["ls"].category == "navigation"
+    assert first["ls"].command_class.name == "ls"
+
+
+def test_commands_are_instantiated_on_first_use():
+    dummy_shell = DummyShell({})
+    dummy_shell.environ = {}
+
+    commands = CommandLoader.discover_commands(dummy_shell)
+    assert "cat" in commands
+    assert commands.loaded() == []
+
+    cat = commands["cat"]
+    assert commands["cat"] is cat
+    assert commands.loaded() == ["cat"]
+    assert sorted(commands) == sorted(CommandLoader.registry())
+
+
+def test_registered_commands_override_discovered():
+    dummy_shell = DummyShell({})
+    dummy_shell.environ = {}
+
+    class CustomLs(ShellCommand):
+        name = "ls"
+
+        def execute(self, args):
+            return "custom"
+
+    commands = CommandLoader.discover_commands(dummy_shell)
+    commands["ls"] = CustomLs(dummy_shell)
+    assert commands["ls"].execute([]) == "custom"
+
+    del commands["ls"]
+    assert "ls" not in commands
+    assert len(commands) == len(CommandLoader.registry()) - 1
@@ -0,0 +1,102 @@
+"""
+tests/chuk_virtual_shell/commands/text/test_awk_program.py
+"""
+
+import pytest
+from chuk_virtual_shell.commands.text.awk import AwkCommand
+from chuk_virtual_shell.commands.text.awk_program import (
+    AwkError,
+    compile_program,
+    parse,
+)
+from tests.dummy_shell import DummyShell
+
+
+@pytest.fixture
+def awk_command():
+    files = {
+        "log.txt": "alice 10 x\nbob 20 y\ncarol 30 x",
+        "other.txt": "dave 40 y",
+    }
+    return AwkCommand(shell_context=DummyShell(files))
+
+
+def test_program_is_compiled_once():
+    program = "{ total += $2 } END { print total }"
+    assert compile_program(program) is compile_program(program)
+
+
+def test_parse_errors_are_reported(awk_command):
+    with pytest.raises(AwkError):
+        parse("{ print $1 ")
+    assert awk_command.execute(["{ print (", "log.txt"]).startswith("awk: ")
+
+
+def test_comparison_and_arithmetic(awk_command):
+    output = awk_command.execute(["$2 >= 20 { print $1, $2 * 2 }", "log.txt"])
+    assert output == "bob 40\ncarol 60"
+
+
+def test_string_and_numeric_comparison(awk_command):
+    output = awk_command.execute(['BEGIN { print ("10" < "9"), (10 < 9), 1/4 }'])
+    assert output == "1 0 0.25"
+
+
+def test_arrays_and_for_in(awk_command):
+    output = awk_command.execute(
+        ["{ s[$3] += $2 } END { for (k in s) print k, s[k] }", "log.txt"]
+    )
+    assert sorted(output.splitlines()) == ["x 40", "y 20"]
+
+
+def test_field_assignment_rebuilds_record(awk_command):
+    output = awk_command.execute(
+        ['BEGIN { OFS = "-" } { $2 = ""; NF = 2; print }', "log.txt"]
+    )
+    assert output.splitlines()[0] == "alice-"
+
+
+def test_range_pattern_and_next(awk_command):
+    program = '/bob/,/carol/ { print $1; next } { print "other" }'
+    output = awk_command.execute([program, "log.txt"])
+    assert output == "other\nbob\ncarol"
+
+
+def test_builtins(awk_command):
+    program = (
+        'BEGIN { s = "hello world"; n = gsub(/o/, "[&]", s); print n, s;'
+        ' print substr("hello", 2, 3), index("hello", "ll"), toupper("x");'
+        ' if (match("foobar", /ob+/)) print RSTART, RLENGTH;'
+        ' print split("a:b:c", parts, ":"), parts[3] }'
+    )
+    output = awk_command.execute([program])
+    assert output == "2 hell[o] w[o]rld\nell 3 X\n3 2\n3 c"
+
+
+def test_user_functions_and_loops(awk_command):
+    program = (
+        "function fact(n) { return n <= 1 ? 1 : n * fact(n - 1) }"
+        ' BEGIN { for (i = 1; i <= 5; i++) { if (i == 3) continue; r = r fact(i) " " }'
+        " print r }"
+    )
+    assert awk_command.execute([program]) == "1 2 24 120 "
+
+
+def test_printf_without_newline_joins_output(awk_command):
+    output = awk_command.execute(['{ printf "%s:", $1 }', "log.txt"])
+    assert output == "alice:bob:carol:"
+
+
+def test_exit_runs_end_and_sets_status(awk_command):
+    output = awk_command.execute(
+        ['NR == 2 { exit 3 } { print } END { print "end" }', "log.txt"]
+    )
+    assert output == "alice 10 x\nend"
+    assert awk_command.shell.return_code == 3
+
+
+def test_fnr_filename_and_assignment_operands(awk_command):
+    output = awk_command.execute(
+        ["{ print FILENAME, FNR, NR, tag }", "log.txt", "tag=b", "other.txt"]
+    )
+    assert output.splitlines()[-1] == "other.txt 1 4 b"
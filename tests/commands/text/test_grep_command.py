@@ -2,8 +2,12 @@
 tests/chuk_virtual_shell/commands/text/test_grep_command.py
 """
 
+from unittest.mock import patch
+
 import pytest
 from chuk_virtual_shell.commands.text.grep import GrepCommand
+from chuk_virtual_shell.commands.text.grep_engine import GrepMatcher
+from chuk_virtual_shell.core.streaming import iter_chunks
 from tests.dummy_shell import DummyShell
 
 
@@ -96,6 +100,25 @@ def test_grep_file_not_found(grep_command):
     assert "No such file or directory" in output
 
 
+def test_grep_missing_file_sets_error_status(grep_command):
+    output = grep_command.execute(["Hello", "nonexistent.txt", "file1.txt"])
+    assert "Hello world" in output
+    assert grep_command.shell.return_code == 2
+    grep_command.execute(["-q", "Hello", "nonexistent.txt", "file1.txt"])
+    assert grep_command.shell.return_code == 0
+
+
+def test_grep_stream_searches_blocks(grep_command):
+    content = "".join(f"line {i}\n" for i in range(1000))
+    with patch.object(GrepMatcher, "match_line") as match_line:
+        for args in (["-n", "line 9"], ["-v", "1"], ["-c", "5$"], ["-m", "3", "7"]):
+            grep_command.shell._stdin_buffer = content
+            expected = grep_command.execute(args)
+            streamed = "".join(grep_command.stream(args, iter_chunks(content, 100)))
+            assert streamed == expected, args
+        assert match_line.call_count == 0
+
+
 def test_grep_extended_regex(grep_command):
     output = grep_command.execute(["-E", "H.*o", "file1.txt"])
     assert "Hello world" in output
@@ -107,3 +130,66 @@ def test_grep_stdin_simulation(grep_command):
     grep_command.shell._stdin_buffer = "Test line 1\nMatching line\nTest line 2"
     output = grep_command.execute(["Matching"])
     assert output == "Matching line"
+
+
+def test_grep_multiple_patterns(grep_command):
+    output = grep_command.execute(
+        ["-e", "again", "-e", "quick", "file1.txt", "words.txt"]
+    )
+    assert output == "file1.txt:Hello again\nwords.txt:The quick brown fox"
+
+    grep_command.shell.fs.write_file("patterns.txt", "test\nlazy\n")
+    output = grep_command.execute(
+        ["-n", "-f", "patterns.txt", "words.txt", "file2.txt"]
+    )
+    assert output == "words.txt:3:lazy dog\nfile2.txt:2:Another test"
+
+
+def test_grep_fixed_strings(grep_command):
+    grep_command.shell.fs.write_file("regex.txt", "a.c\nabc\n(x)")
+    assert grep_command.execute(["-F", "a.c", "regex.txt"]) == "a.c"
+    assert grep_command.execute(["a.c", "regex.txt"]) == "a.c\nabc"
+    assert grep_command.execute(["-F", "(x)", "regex.txt"]) == "(x)"
+
+
+def test_grep_max_count_and_quiet(grep_command):
+    assert grep_command.execute(["-m", "2", "Line", "numbers.txt"]) == "Line 1\nLine 2"
+    assert grep_command.execute(["-c", "-m1", "Line", "numbers.txt"]) == "1"
+
+    assert grep_command.execute(["-q", "Line", "numbers.txt"]) == ""
+    assert grep_command.shell.return_code == 0
+    assert grep_command.execute(["-q", "absent", "numbers.txt"]) == ""
+    assert grep_command.shell.return_code == 1
+
+
+def test_grep_recursive_output_is_ordered(grep_command):
+    fs = grep_command.shell.fs
+    fs.mkdir("/tree")
+    for i in range(40):
+        fs.write_file(f"/tree/f{i:02}.txt", f"skip\nhit {i}\n")
+    output = grep_command.execute(["-r", "hit", "/tree"])
+    assert output.splitlines() == [f"/tree/f{i:02}.txt:hit {i}" for i in range(40)]
+    assert grep_command.execute(["-rl", "hit 1$", "/tree"]) == "/tree/f01.txt"
+
+
+def test_grep_recursive_same_with_content_index():
+    from chuk_virtual_shell.shell_interpreter import ShellInterpreter
+
+    shell = ShellInterpreter()
+    shell.execute("mkdir -p /src/pkg")
+    shell.fs.write_file("/src/a.py", "import os\n# TODO: tidy\n")
+    shell.fs.write_file("/src/pkg/b.py", "def todo():\n    pass\n")
+    shell.fs.write_file("/src/pkg/c.py", "x = 1\n")
+    commands = [
+        "grep -rn TODO /src",
+        "grep -ril todo /src",
+        "grep -rc todo /src",
+        "grep -rv pass /src/pkg",
+        "grep -rE 'x|os' /src",
+    ]
+    expected = [shell.execute(command) for command in commands]
+    assert shell.execute("updatedb").startswith("directories: 3")
+    assert [shell.execute(command) for command in commands] == expected
+
+    shell.fs.write_file("/src/pkg/c.py", "# TODO later\n")
+    assert shell.execute("grep -rl TODO /src") == "/src/pkg/c.py\n/src/a.py"
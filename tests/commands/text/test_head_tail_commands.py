@@ -197,3 +197,32 @@ def test_tail_file_not_found(commands):
     _, tail_command, _ = commands
     output = tail_command.execute(["nonexistent.txt"])
     assert "No such file or directory" in output
+
+
+# RANGED READS
+
+
+@pytest.fixture
+def large_log():
+    from chuk_virtual_shell.shell_interpreter import ShellInterpreter
+
+    shell = ShellInterpreter()
+    lines = [f"entry {i}" for i in range(100_000)]
+    shell.fs.write_file("/log.txt", "\n".join(lines) + "\n")
+    return shell, lines
+
+
+def test_head_tail_read_only_the_ends(large_log):
+    shell, lines = large_log
+    fs = shell.fs
+    reads = []
+    read_range = fs.read_range
+    fs.read_range = lambda *args: reads.append(args) or read_range(*args)
+
+    head = HeadCommand(shell_context=shell)
+    tail = TailCommand(shell_context=shell)
+    assert head.execute(["-n", "3", "/log.txt"]) == "\n".join(lines[:3])
+    assert tail.execute(["-n", "3", "/log.txt"]) == "\n".join(lines[-3:])
+    assert tail.execute(["-c", "8", "/log.txt"]) == "y 99999\n"
+    assert head.execute(["-c", "5", "/log.txt"]) == "entry"
+    assert sum(len(read_range(*args) or "") for args in reads) < 50_000
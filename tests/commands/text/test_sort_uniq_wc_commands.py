@@ -194,6 +194,128 @@ def test_sort_numeric_invalid_values(commands):
     assert len(lines) == 4
 
 
+def test_sort_spills_runs_beyond_buffer_size(commands):
+    sort_cmd, _, _, dummy_shell = commands
+    rows = [f"k{i % 17} {(i * 7919) % 101} Row{i}" for i in range(600)]
+    dummy_shell.fs.write_file("big.txt", "\n".join(rows))
+    for flags in (["-k", "2", "-n"], ["-r", "-f"], ["-u", "-k", "1"], ["-b"]):
+        expected = sort_cmd.execute(flags + ["big.txt"])
+        assert sort_cmd.execute(flags + ["-S", "1b", "big.txt"]) == expected
+        assert sort_cmd.execute(flags + ["--buffer-size=512b", "big.txt"]) == expected
+
+
+def test_sort_parallel_matches_serial(commands, monkeypatch):
+    from chuk_virtual_shell.commands.text import sort_engine
+
+    sort_cmd, _, _, dummy_shell = commands
+    monkeypatch.setattr(sort_engine, "PARALLEL_MIN_SIZE", 0)
+    rows = [f"{(i * 31) % 97} line{i}" for i in range(300)]
+    dummy_shell.fs.write_file("par.txt", "\n".join(rows))
+    expected = sort_cmd.execute(["-n", "par.txt"])
+    assert sort_cmd.execute(["--parallel=2", "-n", "par.txt"]) == expected
+    assert sort_cmd.execute(["--parallel", "2", "-S", "1K", "-n", "par.txt"]) == (
+        expected
+    )
+
+
+def test_sort_whole_lines_without_key_column(commands, monkeypatch):
+    from chuk_virtual_shell.commands.text import sort_engine
+
+    def no_key_column(*args, **kwargs):
+        raise AssertionError("whole-line sorts use sorted() directly")
+
+    sort_cmd, _, _, dummy_shell = commands
+    monkeypatch.setattr(sort_engine, "sort_keys", no_key_column)
+    monkeypatch.setattr(sort_engine, "sort_order", no_key_column)
+    rows = [
+        f"{'  ' * (i % 2)}{'Bb' if i % 3 else 'aA'}{(i * 7) % 10}" for i in range(60)
+    ]
+    dummy_shell.fs.write_file("lines.txt", "\n".join(rows))
+    for flags, key in [
+        ([], None),
+        (["-r"], None),
+        (["-f"], str.lower),
+        (["-b"], str.lstrip),
+        (["-u", "-f"], str.lower),
+    ]:
+        expected = sorted(rows, key=key, reverse="-r" in flags)
+        if "-u" in flags:
+            # The first line of each run of equal keys
+            expected = [
+                row
+                for i, row in enumerate(expected)
+                if i == 0 or key(row) != key(expected[i - 1])
+            ]
+        assert sort_cmd.execute(flags + ["lines.txt"]) == "\n".join(expected)
+
+
+def test_sort_parallel_process_context():
+    from chuk_virtual_shell.commands.text.sort_engine import _process_context
+
+    assert _process_context().get_start_method() in ("forkserver", "spawn")
+
+
+def test_sort_blocks_from_chunks_cut_mid_line():
+    from chuk_virtual_shell.commands.text.sort_engine import join_texts, split_blocks
+
+    texts = ["b1\r\na2\nc3", "z\r", "\ny\n"]
+    chunks = join_texts([iter([t[:3], t[3:]]) for t in texts])
+    blocks = list(split_blocks(chunks, 4))
+    assert [line for block, _ in blocks for line in block] == [
+        "b1",
+        "a2",
+        "c3",
+        "z",
+        "",
+        "y",
+    ]
+    assert [more for _, more in blocks] == [True] * (len(blocks) - 1) + [False]
+
+
+def test_sort_streams_files_and_output():
+    from unittest.mock import patch
+
+    from chuk_virtual_shell.shell_interpreter import ShellInterpreter
+
+    shell = ShellInterpreter()
+    rows = [f"row {(i * 7919) % 10007:05d}" for i in range(10000)]
+    shell.fs.write_file("/big.txt", "\n".join(rows))
+    sort_cmd = SortCommand(shell_context=shell)
+
+    with (
+        patch.object(shell.fs, "read_file", wraps=shell.fs.read_file) as read_file,
+        patch.object(shell.fs, "read_range", wraps=shell.fs.read_range) as ranges,
+    ):
+        output = sort_cmd.stream(["-S", "8K", "/big.txt"])
+        first = next(output)
+        assert read_file.call_count == 0
+        assert ranges.call_count == 2
+    assert first + "".join(output) == "\n".join(sorted(rows))
+    assert shell.execute("cat /big.txt | sort -S 8K | head -n 2") == "\n".join(
+        sorted(rows)[:2]
+    )
+
+
+def test_sort_buffer_and_parallel_errors(commands):
+    sort_cmd, _, _, _ = commands
+    assert sort_cmd.execute(["-S", "lots", "numbers.txt"]) == (
+        "sort: invalid -S argument 'lots'"
+    )
+    assert sort_cmd.execute(["--parallel=0", "numbers.txt"]) == (
+        "sort: invalid number after '--parallel': '0'"
+    )
+
+
+def test_parse_buffer_size():
+    from chuk_virtual_shell.commands.text.sort_engine import parse_buffer_size
+
+    assert parse_buffer_size("10") == 10 * 1024
+    assert parse_buffer_size("10b") == 10
+    assert parse_buffer_size("2M") == 2 * 1024 * 1024
+    with pytest.raises(ValueError):
+        parse_buffer_size("1.5G")
+
+
 # UNIQ COMMAND TESTS
 
 
@@ -0,0 +1,104 @@
+"""
+Tests for the shell arithmetic evaluator and (( )) commands.
+"""
+
+import re
+
+import pytest
+
+from chuk_virtual_shell.core.arithmetic import (
+    ExpressionError,
+    compile_expression,
+    evaluate,
+)
+from chuk_virtual_shell.shell_interpreter import ShellInterpreter
+
+
+class TestEvaluate:
+    """Test expression evaluation against a variable mapping."""
+
+    @pytest.mark.parametrize(
+        "expression, value",
+        [
+            ("1 + 2 * 3", 7),
+            ("(1 + 2) * 3", 9),
+            ("2 ** 3 ** 2", 512),
+            ("-2 ** 2", 4),
+            ("7 / -2", -3),
+            ("-7 % 3", -1),
+            ("1 << 4 | 1", 17),
+            ("~0 ^ 5 & 7", -6),
+            ("3 > 2 == 1", 1),
+            ("0 && 1 / 0", 0),
+            ("1 || 1 / 0", 1),
+            ("n > 5 ? 10 : 20", 20),
+            ("0x1f + 010 + 2#101", 44),
+            ("9223372036854775807 + 1", -9223372036854775808),
+            ("", 0),
+        ],
+    )
+    def test_operators(self, expression, value):
+        assert evaluate(expression, {"n": "3"}) == value
+
+    def test_variables(self):
+        env = {"a": "6", "b": "", "expr": "a * 2", "dollar": "1"}
+        assert evaluate("a + b + missing", env) == 6
+        assert evaluate("expr + 1", env) == 13
+        assert evaluate("$a + ${dollar}", env) == 7
+
+    def test_assignments(self):
+        env = {"i": "1"}
+        assert evaluate("i++", env) == 1
+        assert evaluate("++i", env) == 3
+        assert evaluate("i -= 1, i <<= 2", env) == 8
+        assert evaluate("x = y = i / 3", env) == 2
+        assert env == {"i": "8", "x": "2", "y": "2"}
+
+    @pytest.mark.parametrize(
+        "expression, message",
+        [
+            ("1 / 0", "division by 0"),
+            ("2 ** -1", "exponent less than 0"),
+            ("1 +", "operand expected"),
+            ("(1", "missing `)'"),
+            ("3 = 4", "attempted assignment to non-variable"),
+            ("08", "value too great for base"),
+            ("1 2", "syntax error in expression"),
+            ("self", "recursion level exceeded"),
+        ],
+    )
+    def test_errors(self, expression, message):
+        with pytest.raises(ExpressionError, match=re.escape(message)):
+            evaluate(expression, {"self": "self + 1"})
+
+    def test_compiled_once(self):
+        assert compile_expression("i + 1") is compile_expression("i + 1")
+
+
+class TestShellArithmetic:
+    """Test $(( )), (( )) and let in command lines."""
+
+    def setup_method(self):
+        self.shell = ShellInterpreter()
+
+    def test_expansion(self):
+        self.shell.execute("x=5")
+        assert self.shell.execute("echo $((x * 2)) $(( $x + $(echo 1) ))") == "10 6"
+
+    def test_invalid_expansion_left_as_written(self):
+        assert self.shell.execute("echo $((1 / 0))") == "$((1 / 0))"
+
+    def test_arithmetic_command_status(self):
+        assert self.shell.execute("((2 > 1)) && echo yes; ((0)) || echo no") == (
+            "yes\nno"
+        )
+        assert self.shell.execute("((1 / 0)); echo $?") == "((: division by 0\n1"
+
+    def test_counter_loop(self):
+        result = self.shell.execute(
+            "i=0; while ((i < 3)); do echo $i; ((i++)); done; let 'i *= 10'; echo $i"
+        )
+        assert result == "0\n1\n2\n30"
+
+    def test_operators_inside_arithmetic_command(self):
+        assert self.shell.execute("((1 && 0 || 2 > 1)) && echo ok") == "ok"
@@ -0,0 +1,122 @@
+"""
+Tests for executing command lines from coroutines.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from chuk_virtual_shell.commands.command_base import ShellCommand
+from chuk_virtual_shell.shell_interpreter import ShellInterpreter
+
+
+class LoopProbe(ShellCommand):
+    """Async command reporting which loop awaited it."""
+
+    name = "probe"
+
+    def __init__(self, shell):
+        super().__init__(shell)
+        self.loops = []
+
+    def execute(self, args):
+        return "sync"
+
+    async def execute_async(self, args):
+        self.loops.append(asyncio.get_running_loop())
+        await asyncio.sleep(0)
+        if args == ["fail"]:
+            self.shell.return_code = 1
+            return "probe: failed"
+        return " ".join(["probe", *args])
+
+
+class ThreadProbe(ShellCommand):
+    """Sync command reporting which thread ran it."""
+
+    name = "where"
+
+    def __init__(self, shell):
+        super().__init__(shell)
+        self.threads = []
+
+    def execute(self, args):
+        self.threads.append(threading.current_thread())
+        return "here"
+
+
+class TestAsyncExecution:
+    """Test execute_async() against the synchronous semantics."""
+
+    def setup_method(self):
+        self.shell = ShellInterpreter()
+        self.shell.execute("mkdir -p /w")
+        self.shell.execute("cd /w")
+        self.probe = LoopProbe(self.shell)
+        self.where = ThreadProbe(self.shell)
+        self.shell.commands["probe"] = self.probe
+        self.shell.commands["where"] = self.where
+
+    def run(self, line):
+        return asyncio.run(self.shell.execute_async(line))
+
+    @pytest.mark.parametrize(
+        "line",
+        [
+            "echo a b | wc -w",
+            "true && echo yes || echo no",
+            "false && echo yes || echo no",
+            "X=5; echo $((X * 2)); echo $X",
+            "for i in 1 2 3; do echo $i; done",
+            "if [ -d /w ]; then echo dir; fi",
+            "echo $(echo inner) out",
+            "nosuchcmd; echo $?",
+            "probe x && probe fail || echo recovered",
+        ],
+    )
+    def test_same_output_as_sync(self, line):
+        expected = self.shell.execute(line)
+        assert self.run(line) == expected
+
+    def test_redirection(self):
+        assert self.run("echo hi > f.txt && cat < f.txt") == "hi"
+        assert self.run("probe out > p.txt; cat p.txt") == "probe out"
+
+    def test_async_command_awaited_on_callers_loop(self):
+        async def main():
+            await self.shell.execute_async("probe a")
+            return asyncio.get_running_loop()
+
+        loop = asyncio.run(main())
+        assert self.probe.loops == [loop]
+
+    def test_sync_command_runs_off_the_loop(self):
+        self.run("where")
+        assert self.where.threads[0] is not threading.current_thread()
+
+    def test_prefix_assignment_is_temporary(self):
+        self.shell.environ["A"] = "1"
+        self.run("A=2 probe")
+        assert self.shell.environ["A"] == "1"
+
+    def test_exit(self):
+        assert self.run("exit") == "Goodbye!"
+        assert not self.shell.running
+
+
+class TestSessions:
+    """Test that shells sharing one loop interleave."""
+
+    def test_sleeps_overlap(self):
+        shells = [ShellInterpreter() for _ in range(4)]
+
+        async def main():
+            return await asyncio.gather(
+                *(shell.execute_async("sleep 0.2 && echo done") for shell in shells)
+            )
+
+        start = time.monotonic()
+        assert asyncio.run(main()) == ["done"] * 4
+        assert time.monotonic() - start < 0.6
@@ -0,0 +1,95 @@
+"""
+Tests for running async commands from synchronous code.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from chuk_virtual_shell.commands.command_base import ShellCommand
+from chuk_virtual_shell.core.async_runner import run_sync, thread_loop
+
+
+async def current_loop():
+    return asyncio.get_running_loop()
+
+
+class AsyncCommand(ShellCommand):
+    name = "async_cmd"
+
+    def execute(self, args):
+        return "sync"
+
+    async def execute_async(self, args):
+        await asyncio.sleep(0)
+        if args == ["fail"]:
+            raise ValueError("boom")
+        return " ".join(["async", *args])
+
+
+class TestRunSync:
+    """Test run_sync() with and without a running loop."""
+
+    def test_thread_loop_is_reused(self):
+        first = run_sync(current_loop())
+        second = run_sync(current_loop())
+        assert first is second is thread_loop()
+        assert not first.is_closed()
+
+    def test_threads_have_their_own_loop(self):
+        loops = []
+        thread = threading.Thread(target=lambda: loops.append(run_sync(current_loop())))
+        thread.start()
+        thread.join()
+        assert loops[0] is not thread_loop()
+
+    def test_inside_running_loop_uses_background_loop(self):
+        async def main():
+            outer = asyncio.get_running_loop()
+            inner = run_sync(current_loop())
+            return outer, inner
+
+        outer, inner = asyncio.run(main())
+        assert inner is not outer
+        assert inner.is_running()
+
+    def test_nested_blocking_calls_do_not_deadlock(self):
+        async def level(depth):
+            if depth == 0:
+                return asyncio.get_running_loop()
+            return run_sync(level(depth - 1))
+
+        async def main():
+            return run_sync(level(2))
+
+        assert asyncio.run(main()).is_running()
+
+    def test_exceptions_propagate(self):
+        async def fail():
+            raise KeyError("x")
+
+        with pytest.raises(KeyError):
+            run_sync(fail())
+
+
+class TestCommandRun:
+    """Test ShellCommand.run() and run_async() for async commands."""
+
+    def setup_method(self):
+        self.command = AsyncCommand(shell_context=None)
+
+    def test_run_outside_loop(self):
+        assert self.command.run(["a"]) == "async a"
+
+    def test_run_inside_loop(self):
+        async def main():
+            return self.command.run(["b"])
+
+        assert asyncio.run(main()) == "async b"
+
+    def test_run_reports_errors(self):
+        assert self.command.run(["fail"]) == "Error executing command 'async_cmd': boom"
+
+    def test_run_async_awaits_on_callers_loop(self):
+        assert asyncio.run(self.command.run_async(["c"])) == "async c"
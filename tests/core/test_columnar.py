@@ -0,0 +1,117 @@
+"""
+Tests for the column-at-a-time helpers used by awk, sort, uniq and wc.
+"""
+
+import pytest
+
+from chuk_virtual_shell.core import columnar
+from chuk_virtual_shell.core.columnar import (
+    ColumnTable,
+    run_lengths,
+    sort_order,
+    to_numbers,
+)
+from chuk_virtual_shell.shell_interpreter import ShellInterpreter
+
+
+@pytest.fixture(params=["builtin", "numpy"])
+def backend(request, monkeypatch):
+    """Run a test on the built-in path and, if installed, the NumPy path."""
+    if request.param == "numpy":
+        if not columnar.HAS_NUMPY:
+            pytest.skip("numpy not installed")
+        monkeypatch.setattr(columnar, "NUMPY_MIN_ROWS", 1)
+    else:
+        monkeypatch.setattr(columnar, "HAS_NUMPY", False)
+    return request.param
+
+
+class TestColumnHelpers:
+    """Test conversions and batched operations."""
+
+    def test_to_numbers_matches_awk_rules(self):
+        assert list(to_numbers(["1", "2.5", "-3", " 4 "])) == [1, 2.5, -3, 4]
+        assert list(to_numbers(["12abc", "x", "", "1e3", "inf", "1_0"])) == [
+            12,
+            0,
+            0,
+            1000,
+            0,
+            1,
+        ]
+
+    def test_columns_and_missing_fields(self):
+        table = ColumnTable(["a 1", "b", "c 3 z"])
+        assert table.column(1) == ["a", "b", "c"]
+        assert table.column(2) == ["1", "", "3"]
+        assert table.column(0) == ["a 1", "b", "c 3 z"]
+
+    def test_group_operations(self, backend):
+        table = ColumnTable(["b 1", "a 2", "b 3", "c x"])
+        assert table.sum(2) == 6
+        assert table.group_count(1) == {"b": 2, "a": 1, "c": 1}
+        assert list(table.group_sum(1, 2).items()) == [("b", 4), ("a", 2), ("c", 0)]
+
+    def test_sort_order_is_stable(self, backend):
+        keys = to_numbers(["2", "1", "2", "1"])
+        assert sort_order(keys) == [1, 3, 0, 2]
+        assert sort_order(keys, reverse=True) == [0, 2, 1, 3]
+        assert sort_order(["b", "a", "b"]) == [1, 0, 2]
+
+    def test_run_lengths(self, backend):
+        assert run_lengths(["a", "a", "b", "a", "a", "a"]) == ([0, 2, 3], [2, 1, 3])
+        assert run_lengths([]) == ([], [])
+
+
+class TestColumnarCommands:
+    """Test that the batched paths give the same output as before."""
+
+    def setup_method(self):
+        self.shell = ShellInterpreter()
+        self.shell.execute("mkdir -p /data")
+        rows = [f"host{i % 7} {i % 13} {i}" for i in range(2000)]
+        self.shell.fs.write_file("/data/rows", "\n".join(rows) + "\n")
+        self.rows = rows
+
+    def test_awk_group_sum_uses_columns(self, backend):
+        awk = self.shell.commands["awk"]
+        program = "{ s[$1] += $2; n++ } END { for (k in s) print k, s[k]; print n, $3 }"
+        output = awk.execute([program, "/data/rows"])
+
+        expected = {}
+        for row in self.rows:
+            host, value, _ = row.split()
+            expected[host] = expected.get(host, 0) + int(value)
+        lines = output.splitlines()
+        assert dict(line.split() for line in lines[:-1]) == {
+            k: str(v) for k, v in expected.items()
+        }
+        assert lines[-1] == "2000 1999"
+
+    def test_awk_plan_only_for_accumulating_programs(self):
+        from chuk_virtual_shell.commands.text.awk_program import compile_program
+
+        assert compile_program("{ s += $2 } END { print s }").columnar is not None
+        assert compile_program("{ c[$1]++ }").columnar is not None
+        assert compile_program("$2 > 1 { s += $2 }").columnar is None
+        assert compile_program("{ s += $2 * 2 }").columnar is None
+
+    def test_sort_numeric_field(self, backend):
+        output = self.shell.commands["sort"].execute(["-k", "2", "-n", "/data/rows"])
+        keys = [int(line.split()[1]) for line in output.splitlines()]
+        assert keys == sorted(keys)
+        # Stable: ties keep input order
+        first_zero = [line for line in output.splitlines() if line.split()[1] == "0"]
+        assert first_zero == [row for row in self.rows if row.split()[1] == "0"]
+
+    def test_sort_numeric_keeps_prefix_rules(self):
+        self.shell.fs.write_file("/data/n", "1e5\n.5\n3\n-2\nx\n")
+        assert self.shell.execute("sort -n /data/n") == "-2\n.5\nx\n1e5\n3"
+
+    def test_uniq_and_wc(self, backend):
+        self.shell.fs.write_file("/data/u", "a\na\nB\nb\nb\nc\n")
+        assert self.shell.execute("uniq -c /data/u") == (
+            "      2 a\n      1 B\n      2 b\n      1 c"
+        )
+        assert self.shell.execute("uniq -i -d /data/u") == "a\nB"
+        assert self.shell.execute("wc /data/u").split() == ["6", "6", "12", "/data/u"]
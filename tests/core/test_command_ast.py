@@ -0,0 +1,200 @@
+"""
+Tests for the command line AST parser and the cached execution plans.
+"""
+
+from chuk_virtual_shell.core.command_ast import (
+    BraceGroup,
+    CommandList,
+    ControlFlow,
+    FunctionDefinition,
+    LRUCache,
+    LineTokenizer,
+    Pipeline,
+    SimpleCommand,
+    TokenKind,
+    parse_line,
+    plan_cache,
+)
+from chuk_virtual_shell.shell_interpreter import ShellInterpreter
+
+
+class TestLineTokenizer:
+    """Test the quote-aware tokenizer."""
+
+    def words(self, line):
+        return [(t.kind, t.text) for t in LineTokenizer().tokenize(line)]
+
+    def test_operators_outside_quotes(self):
+        assert self.words("a && b || c; d | e") == [
+            (TokenKind.WORD, "a"),
+            (TokenKind.OPERATOR, "&&"),
+            (TokenKind.WORD, "b"),
+            (TokenKind.OPERATOR, "||"),
+            (TokenKind.WORD, "c"),
+            (TokenKind.OPERATOR, ";"),
+            (TokenKind.WORD, "d"),
+            (TokenKind.OPERATOR, "|"),
+            (TokenKind.WORD, "e"),
+        ]
+
+    def test_operators_inside_quotes_and_substitutions(self):
+        tokens = self.words("echo \"a|b\" 'c;d' $(x | y) `p && q` e\\|f")
+        assert all(kind == TokenKind.WORD for kind, _ in tokens)
+        assert len(tokens) == 6
+
+    def test_redirections_stay_in_words(self):
+        tokens = self.words("cmd 2>&1 &> out")
+        assert all(kind == TokenKind.WORD for kind, _ in tokens)
+
+    def test_heredoc_body_is_not_split(self):
+        line = "cat <<EOF\na | b; c\nEOF"
+        tokens = self.words(line)
+        assert all(kind == TokenKind.WORD for kind, _ in tokens)
+
+    def test_heredoc_body_attached_to_its_word(self):
+        line = "cat <<EOF | grep 2\nline1\nline2\nEOF"
+        tokens = LineTokenizer().tokenize(line)
+        assert [t.text for t in tokens] == ["cat", "<<EOF", "|", "grep", "2"]
+        start, end = tokens[1].heredoc
+        assert line[start:end] == "line1\nline2\nEOF"
+
+
+class TestCommandLineParser:
+    """Test the AST built for command lines."""
+
+    def test_simple_command(self):
+        node = parse_line("echo hello world")
+        assert node == SimpleCommand(text="echo hello world", first_word="echo")
+
+    def test_pipeline(self):
+        node = parse_line("cat f | grep x | wc -l")
+        assert isinstance(node, Pipeline)
+        assert [s.text for s in node.stages] == ["cat f", "grep x", "wc -l"]
+
+    def test_command_list(self):
+        node = parse_line("a && b | c; d")
+        assert isinstance(node, CommandList)
+        assert [op for _, op in node.items] == ["&&", ";", ""]
+        assert isinstance(node.items[1][0], Pipeline)
+
+    def test_heredoc_in_pipeline(self):
+        node = parse_line("cat <<EOF | grep 2\nline1\nline2\nEOF")
+        assert isinstance(node, Pipeline)
+        assert [s.text for s in node.stages] == [
+            "cat <<EOF\nline1\nline2\nEOF",
+            "grep 2",
+        ]
+
+    def test_control_flow_is_not_split(self):
+        node = parse_line("for i in 1 2; do echo $i; done")
+        assert node == ControlFlow(keyword="for", text="for i in 1 2; do echo $i; done")
+
+    def test_function_body_is_not_split(self):
+        node = parse_line("function hi { echo hi $1; }; echo after")
+        assert isinstance(node, CommandList)
+        definition = node.items[0][0]
+        assert isinstance(definition, FunctionDefinition)
+        assert definition.name == "hi"
+        assert definition.text == "function hi { echo hi $1; }"
+        assert definition.body.body == CommandList(
+            items=((SimpleCommand(text="echo hi $1", first_word="echo"), ";"),),
+            text="echo hi $1;",
+        )
+        assert node.items[1][0].text == "echo after"
+
+    def test_brace_group_is_a_pipeline_stage(self):
+        node = parse_line("{ echo a; echo b; } > out | wc -l")
+        assert isinstance(node, Pipeline)
+        group = node.stages[0]
+        assert isinstance(group, BraceGroup)
+        assert group.redirections == "> out"
+        assert [item.text for item, _ in group.body.items] == ["echo a", "echo b"]
+        assert node.stages[1] == SimpleCommand(text="wc -l", first_word="wc")
+
+    def test_brace_groups_nest_in_blocks(self):
+        node = parse_line("if true; then { echo a; }; fi; hi() { echo b; }")
+        assert [item.text for item, _ in node.items] == [
+            "if true; then { echo a; }; fi",
+            "hi() { echo b; }",
+        ]
+
+    def test_control_flow_inside_list(self):
+        node = parse_line("if true; then echo a; fi && echo b")
+        assert isinstance(node, CommandList)
+        assert isinstance(node.items[0][0], ControlFlow)
+        assert node.items[0][0].text == "if true; then echo a; fi"
+        assert node.items[1][0].text == "echo b"
+
+
+class TestLRUCache:
+    """Test the plan cache."""
+
+    def test_hits_misses_and_eviction(self):
+        calls = []
+        cache = LRUCache(lambda key: calls.append(key) or key.upper(), maxsize=2)
+
+        assert cache.get("a") == "A"
+        assert cache.get("a") == "A"
+        cache.get("b")
+        cache.get("c")
+
+        assert calls == ["a", "b", "c"]
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 3
+        assert len(cache) == 2
+        cache.get("a")
+        assert calls[-1] == "a"
+
+
+class TestPlanExecution:
+    """Test executing cached plans through the shell."""
+
+    def setup_method(self):
+        self.shell = ShellInterpreter()
+
+    def test_repeated_line_is_parsed_once(self):
+        line = "echo plan-cache-test | wc -w"
+        self.shell.execute(line)
+        misses = plan_cache.stats()["misses"]
+
+        assert self.shell.execute(line) == self.shell.execute(line)
+        assert plan_cache.stats()["misses"] == misses
+
+    def test_quoted_operators_are_literal(self):
+        assert self.shell.execute('echo "a|b"') == "a|b"
+        assert self.shell.execute('echo "a;b" ; echo c') == "a;b\nc"
+
+    def test_brace_group_runs_its_list(self):
+        assert self.shell.execute("{ echo a; echo b; } | wc -l") == "2"
+        assert self.shell.execute("{ echo a; false; }; echo $?") == "a\n1"
+        self.shell.execute("{ echo a; echo b; } > /group.txt")
+        assert self.shell.execute("cat /group.txt") == "a\nb"
+        assert self.shell.execute("{ cat; echo c; } < /group.txt") == "a\nb\nc"
+        assert self.shell.execute("echo x | { cat | wc -l; }") == "1"
+
+    def test_functions_are_defined_and_called(self):
+        assert self.shell.execute("function hi { echo hi $1 $#; }") == ""
+        assert self.shell.execute("hi there; echo $#") == "hi there 1\n0"
+        self.shell.execute("twice() { echo $@; echo $@; }")
+        assert self.shell.execute("twice a b | wc -l") == "2"
+        assert self.shell.execute("echo up | { cat; hi; }") == "up\nhi 0"
+
+    def test_heredoc_feeds_first_pipeline_stage(self):
+        line = "cat <<EOF | grep 2\nline1\nline2\nEOF"
+        assert self.shell.execute(line) == "line2"
+
+    def test_expansion_output_is_not_reparsed(self):
+        self.shell.environ["PIPE"] = "a|b"
+        assert self.shell.execute("echo $PIPE") == "a|b"
+
+    def test_variables_see_earlier_assignments(self):
+        assert self.shell.execute("X=5; echo $X") == "5"
+
+    def test_substitution_with_command_list(self):
+        assert self.shell.execute("echo $(echo a; echo b)") == "a b"
+
+    def test_alias_in_pipeline(self):
+        self.shell.execute("alias say='echo hi'")
+        assert self.shell.execute("say | wc -w") == self.shell.execute(
+            "echo hi | wc -w"
+        )
@@ -208,6 +208,23 @@ class TestWhileLoops:
         assert "should_not_appear" not in result
         assert result == ""
 
+    def test_while_exit_status(self):
+        """A finished loop has its last body command's status, not the test's."""
+        self.shell.execute("echo yes > /flag.txt")
+        result = self.shell.execute(
+            "while [ $(cat /flag.txt) = yes ]; do echo no > /flag.txt; true; done; "
+            "echo $?"
+        )
+        assert result == "0"
+        assert self.shell.execute("while false; do true; done; echo $?") == "0"
+        assert self.shell.execute("until true; do false; done; echo $?") == "0"
+        self.shell.execute("echo yes > /flag.txt")
+        result = self.shell.execute(
+            "while [ $(cat /flag.txt) = yes ]; do echo no > /flag.txt; false; done; "
+            "echo $?"
+        )
+        assert result == "1"
+
     def test_while_with_test(self):
         """Test while loop with test command."""
         # Simplified test without arithmetic
@@ -311,3 +328,52 @@ class TestControlFlowIntegration:
         assert "3" not in result
         assert "4" in result
         assert "5" in result
+
+
+class TestCompiledControlFlow:
+    """Test that control flow structures are compiled once and reused."""
+
+    def setup_method(self):
+        """Set up test environment."""
+        self.shell = ShellInterpreter()
+        self.executor = self.shell._control_flow_executor
+
+    def test_body_is_not_retokenized_per_iteration(self):
+        """Test that nested loops are tokenized once, not per iteration."""
+        calls = []
+        original = self.executor.tokenizer.tokenize
+
+        def counting_tokenize(text):
+            calls.append(text)
+            return original(text)
+
+        self.executor.tokenizer.tokenize = counting_tokenize
+
+        result = self.shell.execute(
+            "for i in 1 2 3; do for j in a b; do echo $i$j; done; done"
+        )
+
+        assert result == "1a\n1b\n2a\n2b\n3a\n3b"
+        assert len(calls) == 1
+
+    def test_compiled_structure_is_cached(self):
+        """Test that running the same structure again reuses the compiled tree."""
+        line = "for i in 1 2; do echo $i; done"
+        self.shell.execute(line)
+        misses = self.executor._compiled.stats()["misses"]
+
+        assert self.shell.execute(line) == "1\n2"
+        assert self.executor._compiled.stats()["misses"] == misses
+
+    def test_substitution_in_body_runs_per_iteration(self):
+        """Test that command substitutions in the body see the loop variable."""
+        result = self.shell.execute("for f in x y; do echo $(echo sub-$f); done")
+        assert result == "sub-x\nsub-y"
+
+    def test_continue_in_while_loop(self):
+        """Test continue inside a while loop only skips the current iteration."""
+        result = self.shell.execute(
+            "N=0; while [ $N -lt 4 ]; do N=$((N+1)); "
+            + "if [ $N -eq 2 ]; then continue; fi; echo $N; done"
+        )
+        assert result == "1\n3\n4"
@@ -0,0 +1,86 @@
+"""
+Tests for pathname expansion.
+"""
+
+from chuk_virtual_shell.core.globbing import ListingCache, compile_segment, glob
+from chuk_virtual_shell.shell_interpreter import ShellInterpreter
+
+
+class TestGlob:
+    """Test expanding patterns against the virtual filesystem."""
+
+    def setup_method(self):
+        self.shell = ShellInterpreter()
+        self.shell.execute("mkdir -p /p/src/a /p/src/b/c /p/docs")
+        self.shell.execute(
+            "touch /p/src/a/test_x.py /p/src/b/test_y.py /p/src/b/c/test_z.py "
+            "/p/src/m.py /p/docs/r.md /p/src/b/c/n.md /p/x.py"
+        )
+        self.listings = ListingCache(self.shell.fs)
+
+    def glob(self, pattern):
+        return glob(pattern, "/p", self.listings)
+
+    def test_single_directory(self):
+        assert self.glob("*.py") == ["x.py"]
+        assert self.glob("/p/src/?.py") == ["/p/src/m.py"]
+
+    def test_multiple_segments(self):
+        assert self.glob("src/*/test_*.py") == ["src/a/test_x.py", "src/b/test_y.py"]
+
+    def test_recursive(self):
+        assert self.glob("**/*.md") == ["docs/r.md", "src/b/c/n.md"]
+        assert self.glob("src/**/test_*.py") == [
+            "src/a/test_x.py",
+            "src/b/c/test_z.py",
+            "src/b/test_y.py",
+        ]
+
+    def test_trailing_slash_matches_directories(self):
+        assert self.glob("src/*/") == ["src/a/", "src/b/"]
+
+    def test_literal_and_relative_segments(self):
+        assert self.glob("./src/[ab]/../m.py") == [
+            "./src/a/../m.py",
+            "./src/b/../m.py",
+        ]
+        assert self.glob("missing/*.py") == []
+
+    def test_listings_are_shared(self):
+        self.glob("*.py")
+        self.glob("*.md")
+        self.glob("x*")
+        assert self.listings.listings == 1
+
+    def test_segments_compiled_once(self):
+        assert compile_segment("*.py") is compile_segment("*.py")
+
+
+class TestShellGlobbing:
+    """Test globs in command lines."""
+
+    def setup_method(self):
+        self.shell = ShellInterpreter()
+        self.shell.execute("mkdir -p /w/sub")
+        self.shell.execute("cd /w")
+        self.shell.execute("touch a.py b.txt sub/c.py")
+
+    def test_one_listing_per_command(self):
+        calls = []
+        scan_dir = self.shell.fs.scan_dir
+
+        def counting_scan_dir(path):
+            calls.append(path)
+            return scan_dir(path)
+
+        self.shell.fs.scan_dir = counting_scan_dir
+        assert self.shell.execute("echo *.py *.txt *.md") == "a.py b.txt *.md"
+        assert calls == ["/w"]
+
+    def test_substitution_sees_new_files(self):
+        result = self.shell.execute("echo *.log $(touch new.log) *.log")
+        assert result == "*.log new.log"
+
+    def test_for_loop_over_nested_pattern(self):
+        result = self.shell.execute("for f in **/*.py; do echo $f; done")
+        assert result == "a.py\nsub/c.py"
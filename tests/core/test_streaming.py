@@ -0,0 +1,141 @@
+"""
+Tests for the streaming pipeline engine and its helpers.
+"""
+
+from chuk_virtual_shell.commands.command_base import ShellCommand
+from chuk_virtual_shell.core.streaming import (
+    count_lines,
+    iter_chunks,
+    iter_line_blocks,
+    iter_lines,
+    join_lines,
+    peek_stream,
+)
+from chuk_virtual_shell.shell_interpreter import ShellInterpreter
+
+
+class CountingCommand(ShellCommand):
+    """Streaming command that emits numbered lines and records how many."""
+
+    name = "count"
+
+    def __init__(self, shell_context):
+        super().__init__(shell_context)
+        self.emitted = 0
+
+    def execute(self, args):
+        return "\n".join(str(i) for i in range(int(args[0])))
+
+    def stream(self, args, stdin=None):
+        for i in range(int(args[0])):
+            self.emitted += 1
+            yield f"{i}\n"
+
+
+class TestStreamHelpers:
+    """Test the chunk/line helpers."""
+
+    def test_iter_lines_matches_splitlines(self):
+        text = "a\nb\r\nc\rd\n\ne"
+        for size in (1, 2, 3, 100):
+            assert list(iter_lines(iter_chunks(text, size))) == text.splitlines()
+
+    def test_iter_lines_keepends_is_lossless(self):
+        text = "one\ntwo\r\nthree"
+        assert "".join(iter_lines(iter_chunks(text, 2), keepends=True)) == text
+
+    def test_iter_line_blocks_hold_whole_lines(self):
+        text = "a\nb\r\nc\rd\n\ne\x0cf"
+        for size in (1, 2, 3, 100):
+            blocks = list(iter_line_blocks(iter_chunks(text, size)))
+            assert "".join(blocks) == text
+            lines = [line for block in blocks for line in block.splitlines()]
+            assert lines == text.splitlines()
+            assert sum(map(count_lines, blocks)) == len(text.splitlines())
+
+    def test_join_lines(self):
+        assert "".join(join_lines(["a", "b", "c"])) == "a\nb\nc"
+        assert "".join(join_lines([])) == ""
+
+    def test_peek_stream(self):
+        assert peek_stream(iter(["", ""])) is None
+        stream = peek_stream(iter(["", "x", "y"]))
+        assert "".join(stream) == "xy"
+
+
+class TestStreamingPipeline:
+    """Test pipelines executed through ShellCommand.stream()."""
+
+    def setup_method(self):
+        self.shell = ShellInterpreter()
+        self.shell.execute("mkdir -p /data")
+        lines = [f"line {i} {'ERROR' if i % 3 == 0 else 'ok'}" for i in range(300)]
+        self.shell.fs.write_file("/data/log", "\n".join(lines) + "\n")
+
+    def test_head_short_circuits_upstream(self):
+        counter = CountingCommand(self.shell)
+        self.shell.commands["count"] = counter
+
+        result = self.shell.execute("count 100000 | head -n 3")
+
+        assert result == "0\n1\n2"
+        assert counter.emitted < 10
+
+    def test_grep_head_pipeline(self):
+        result = self.shell.execute("cat /data/log | grep ERROR | head -2")
+        assert result == "line 0 ERROR\nline 3 ERROR"
+
+    def test_streaming_matches_buffered_output(self):
+        for stage in ["grep -n ok", "grep -c ERROR", "tail -3", "wc", "uniq -c"]:
+            streamed = self.shell.execute(f"cat /data/log | {stage}")
+            self.shell._stdin_buffer = self.shell.fs.read_file("/data/log")
+            cmd, args = self.shell.parse_command(stage)
+            buffered = self.shell.commands[cmd].execute(args)
+            assert streamed == buffered, stage
+
+    def test_block_streams_match_buffered_output(self):
+        content = self.shell.fs.read_file("/data/log").replace("line 1", "a\r\nb")
+        for stage in ["wc", "wc -l", "wc -cm", "wc -L", "uniq -c", "head -n 7"]:
+            cmd, args = self.shell.parse_command(stage)
+            command = self.shell.commands[cmd]
+            streamed = "".join(command.stream(args, iter_chunks(content, 7)))
+            self.shell._stdin_buffer = content
+            assert streamed == command.execute(args), stage
+
+    def test_fallback_adapter_for_buffered_commands(self):
+        result = self.shell.execute("cat /data/log | sort | head -n 1")
+        assert result == "line 0 ERROR"
+
+    def test_stage_error_aborts_pipeline(self):
+        result = self.shell.execute("cat /missing | grep x")
+        assert result == "cat: /missing: No such file or directory"
+
+    def test_empty_stage_output_means_no_stdin(self):
+        result = self.shell.execute("echo hi | grep zz | wc -l")
+        assert result == "0"
+
+
+class TestExecuteStream:
+    """Test ShellInterpreter.execute_stream()."""
+
+    def setup_method(self):
+        self.shell = ShellInterpreter()
+        self.counter = CountingCommand(self.shell)
+        self.shell.commands["count"] = self.counter
+
+    def test_output_is_produced_lazily(self):
+        stream = self.shell.execute_stream("count 1000")
+        assert next(stream) == "0\n"
+        assert self.counter.emitted == 1
+        stream.close()
+
+    def test_matches_execute(self):
+        for line in [
+            "count 3; echo done",
+            "false && echo no; echo yes",
+            "echo a | wc -c",
+            "for i in 1 2; do echo $i; done",
+            "nosuchcommand",
+            "X=1",
+        ]:
+            assert "".join(self.shell.execute_stream(line)) == self.shell.execute(line)
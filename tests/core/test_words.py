@@ -0,0 +1,116 @@
+"""
+Tests for the word tokenizer and the single-pass word expansion engine.
+"""
+
+from chuk_virtual_shell.core.words import tokenize
+from chuk_virtual_shell.shell_interpreter import ShellInterpreter
+
+
+class TestTokenize:
+    """Test splitting a simple command into words and redirections."""
+
+    def test_quotes_stay_inside_words(self):
+        words = tokenize("echo \"a b\" 'c > d' e\\ f")
+        assert words.words == ("echo", '"a b"', "'c > d'", "e\\ f")
+        assert words.redirects == ()
+
+    def test_redirections_are_separated(self):
+        words = tokenize("cmd a>out 2>&1 >> log < in")
+        assert words.words == ("cmd", "a")
+        assert words.redirects == (
+            (">", "out"),
+            ("2>&1", ""),
+            (">>", "log"),
+            ("<", "in"),
+        )
+
+    def test_heredoc_body(self):
+        words = tokenize("cat <<EOF > out\nhi\nEOF")
+        assert words.words == ("cat",)
+        assert words.redirects == (("<<", "EOF"), (">", "out"))
+        assert words.heredoc == "hi"
+
+    def test_unbalanced_input(self):
+        assert tokenize('echo "a') is None
+        assert tokenize("echo $(date") is None
+        assert tokenize("cat <<EOF\nno end") is None
+
+
+class TestWordExpansion:
+    """Test expansion of whole commands into argv."""
+
+    def setup_method(self):
+        self.shell = ShellInterpreter()
+        self.shell.execute("mkdir -p /home/user/w")
+        self.shell.execute("cd /home/user/w")
+
+    def argv(self, line):
+        compiled = self.shell.expansion.expand_command(line)
+        return [compiled.name, *compiled.args]
+
+    def test_quoted_variable_is_one_argument(self):
+        self.shell.environ["V"] = "a  b 'c'"
+        assert self.argv('printf "$V" $V') == ["printf", "a  b 'c'", "a", "b", "'c'"]
+
+    def test_expanded_text_is_not_reparsed(self):
+        self.shell.environ["V"] = "x > y; rm -rf /"
+        assert self.argv('echo "$V"') == ["echo", "x > y; rm -rf /"]
+
+    def test_assignments_and_redirects(self):
+        self.shell.environ["D"] = "my dir"
+        compiled = self.shell.expansion.expand_command('A="1 2" B=$D cmd "x" > "$D/f"')
+        assert compiled.assignments == (("A", "1 2"), ("B", "my dir"))
+        assert compiled.name == "cmd"
+        assert compiled.args == ("x",)
+        assert compiled.redirect_info.stdout_file == "my dir/f"
+
+    def test_tilde_only_unquoted(self):
+        home = self.shell.environ["HOME"]
+        assert self.argv('echo ~ "~" ~/x') == ["echo", home, "~", home + "/x"]
+
+    def test_globs_respect_quotes(self):
+        self.shell.execute("touch a.txt b.txt")
+        assert self.argv('echo *.txt "*.txt" c*.txt') == [
+            "echo",
+            "a.txt",
+            "b.txt",
+            "*.txt",
+            "c*.txt",
+        ]
+
+    def test_command_substitution_fields(self):
+        assert self.argv('echo $(echo a  b) "$(echo c)"') == ["echo", "a", "b", "c"]
+
+    def test_ifs_splitting(self):
+        self.shell.environ["IFS"] = ":"
+        self.shell.environ["P"] = "x:y z"
+        assert self.argv("echo $P") == ["echo", "x", "y z"]
+
+
+class TestShellBehaviour:
+    """Test commands that depend on exact word expansion."""
+
+    def setup_method(self):
+        self.shell = ShellInterpreter()
+
+    def test_assignment_keeps_spaces(self):
+        assert self.shell.execute('X="a  b"; echo "$X"') == "a  b"
+
+    def test_prefix_assignment_is_temporary(self):
+        result = self.shell.execute("A=1; A=2 env | grep ^A=; echo $A")
+        assert result == "A=2\n1"
+
+    def test_echo_escape_in_double_quotes(self):
+        assert self.shell.execute('echo -e "a\\nb"') == "a\nb"
+
+    def test_redirect_inside_quoted_program(self):
+        assert self.shell.execute("echo x | awk '{ if (2 > 1) print \"gt\" }'") == "gt"
+
+    def test_alias_preserves_quoting(self):
+        self.shell.execute("alias say='echo \"a  b\"'")
+        assert self.shell.execute("say 'c  d'") == "a  b c  d"
+
+    def test_for_items_are_words(self):
+        self.shell.environ["V"] = "x y"
+        result = self.shell.execute('for i in $V "$V"; do echo "[$i]"; done')
+        assert result == "[x]\n[y]\n[x y]"
@@ -90,6 +90,26 @@ with open('append.txt', 'a') as f:
     assert content == "Initial\nAppended"
 
 
+@pytest.mark.asyncio
+async def test_file_operations_binary_and_seek(python_setup):
+    interpreter, _, shell = python_setup
+
+    code = """
+with open('blob.bin', 'wb') as f:
+    f.write(bytes([0, 1, 2]) + "é".encode())
+with open('numbers.txt') as f:
+    f.seek(4)
+    print(f.readline().strip(), f.tell())
+with open('raw.bin', 'wb') as f:
+    f.write(bytes([255]))
+"""
+    result = await interpreter.execute_code(code)
+    assert "3 6" in result
+    assert shell.fs.read_file("/blob.bin") == "\x00\x01\x02é"
+    # Data that is not UTF-8 reaches the filesystem as bytes
+    assert shell.fs.read_file("/raw.bin") == bytes([255])
+
+
 @pytest.mark.asyncio
 async def test_os_module_operations(python_setup):
     interpreter, _, shell = python_setup
@@ -0,0 +1,172 @@
+"""
+tests/interpreters/test_virtual_file.py - Tests for virtual filesystem file objects
+"""
+
+from unittest.mock import patch
+
+import pytest
+from chuk_virtual_fs import VirtualFileSystem
+
+from chuk_virtual_shell.filesystem_compat import FileSystemCompat
+from chuk_virtual_shell.interpreters.virtual_file import open_virtual_file
+
+TEXT = "héllo wörld\nline 2\r\nline 3\n" + "x" * 50 + "\nend"
+
+
+@pytest.fixture
+def fs():
+    fs = FileSystemCompat(VirtualFileSystem())
+    fs.write_file("/data.txt", TEXT)
+    return fs
+
+
+@pytest.fixture
+def small_chunks():
+    with patch("chuk_virtual_shell.interpreters.virtual_file.READ_CHUNK", 7):
+        yield
+
+
+def test_text_read_and_iteration(fs, small_chunks):
+    with open_virtual_file(fs, "/data.txt") as f:
+        assert f.readline() == "héllo wörld\n"
+        assert next(f) == "line 2\n"
+        assert list(f)[-1] == "end"
+        f.seek(0)
+        assert f.read() == TEXT.replace("\r\n", "\n")
+
+
+def test_binary_read_and_seek(fs, small_chunks):
+    data = TEXT.encode("utf-8")
+    with open_virtual_file(fs, "/data.txt", "rb") as f:
+        assert f.read(2) == data[:2]
+        f.seek(-3, 2)
+        assert f.read() == b"end"
+        f.seek(13)
+        assert f.tell() == 13
+        assert f.read() == data[13:]
+
+
+def test_reads_fetch_ranges_not_whole_file(fs):
+    fs.write_file("/big.txt", "line\n" * 100_000)
+    with patch.object(fs, "read_file", wraps=fs.read_file) as read_file:
+        with open_virtual_file(fs, "/big.txt") as f:
+            assert f.readline() == "line\n"
+        assert read_file.call_count == 0
+
+
+def test_without_ranged_reads_file_is_read_once(fs, small_chunks):
+    with (
+        patch.object(fs, "has_ranged_reads", return_value=False),
+        patch.object(fs, "read_file", wraps=fs.read_file) as read_file,
+        patch.object(fs, "read_range", wraps=fs.read_range) as read_range,
+    ):
+        with open_virtual_file(fs, "/data.txt") as f:
+            assert list(f)[-1] == "end"
+        assert read_file.call_count == 1
+        assert read_range.call_count == 0
+
+
+def test_write_appends_incrementally(fs):
+    with patch.object(fs, "append_file", wraps=fs.append_file) as append_file:
+        with open_virtual_file(fs, "/out.txt", "w") as f:
+            for i in range(20_000):
+                f.write(f"{i} é\n")
+        assert 1 < append_file.call_count < 20
+    content = fs.read_file("/out.txt")
+    assert content.splitlines()[-1] == "19999 é"
+    assert len(content.splitlines()) == 20_000
+
+
+class BinaryProvider:
+    """Memory filesystem that also stores bytes (the bundled ones store text)."""
+
+    def __init__(self):
+        self.inner = VirtualFileSystem()
+        self.blobs = {}
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def get_provider_name(self):
+        return "binary"
+
+    def write_file(self, path, content):
+        self.blobs.pop(path, None)
+        if not isinstance(content, bytes):
+            return self.inner.write_file(path, content)
+        if not self.inner.write_file(path, ""):
+            return False
+        self.blobs[path] = content
+        return True
+
+    def read_file(self, path):
+        if path in self.blobs:
+            return self.blobs[path]
+        return self.inner.read_file(path)
+
+
+def test_append_and_utf8_bytes(fs):
+    with open_virtual_file(fs, "/data.txt", "a") as f:
+        f.write("!")
+    assert fs.read_file("/data.txt") == TEXT + "!"
+    with open_virtual_file(fs, "/u.bin", "wb", buffering=0) as f:
+        # A character split across writes is still text
+        f.write("é".encode()[:1])
+        f.write("é".encode()[1:])
+    assert fs.read_file("/u.bin") == "é"
+
+
+@pytest.mark.parametrize("buffering", [-1, 0, 16])
+def test_binary_round_trip(buffering, small_chunks):
+    fs = FileSystemCompat(BinaryProvider())
+    data = b"text first\n" + bytes(range(256)) * 3
+    with open_virtual_file(fs, "/blob", "wb", buffering=buffering) as f:
+        for i in range(0, len(data), 100):
+            f.write(data[i : i + 100])
+    assert fs.read_file("/blob") == data
+    with open_virtual_file(fs, "/blob", "rb") as f:
+        assert f.read() == data
+    with open_virtual_file(fs, "/blob", "r+b") as f:
+        f.seek(1)
+        f.write(b"E")
+    assert fs.read_file("/blob") == data[:1] + b"E" + data[2:]
+
+
+@pytest.mark.parametrize("buffer_appends", [True, False])
+def test_binary_data_refused_by_text_provider(buffer_appends):
+    fs = FileSystemCompat(VirtualFileSystem(), buffer_appends=buffer_appends)
+    with pytest.raises(OSError):
+        with open_virtual_file(fs, "/b.bin", "wb") as f:
+            f.write(bytes(range(256)))
+    assert fs.read_file("/b.bin") == ""
+    assert fs.get_size("/b.bin") == 0
+
+
+def test_update_modes(fs):
+    fs.write_file("/u.txt", "hello")
+    with open_virtual_file(fs, "/u.txt", "r+") as f:
+        f.write("J")
+        f.flush()
+        assert fs.read_file("/u.txt") == "Jello"
+    with open_virtual_file(fs, "/u.txt", "a+") as f:
+        f.write("!")
+        f.seek(0)
+        assert f.read() == "Jello!"
+    with open_virtual_file(fs, "/new.txt", "w+") as f:
+        f.write("abc")
+        f.seek(0)
+        assert f.read() == "abc"
+    assert fs.read_file("/new.txt") == "abc"
+
+
+def test_open_errors(fs):
+    with pytest.raises(FileNotFoundError):
+        open_virtual_file(fs, "/missing.txt")
+    with pytest.raises(FileExistsError):
+        open_virtual_file(fs, "/data.txt", "x")
+    with pytest.raises(IsADirectoryError):
+        open_virtual_file(fs, "/")
+    with pytest.raises(ValueError):
+        open_virtual_file(fs, "/data.txt", "rw")
+    with pytest.raises(ValueError):
+        open_virtual_file(fs, "/data.txt", "rb", encoding="utf-8")
@@ -0,0 +1,119 @@
+"""
+Tests for the pre-built shell interpreter pool.
+"""
+
+import threading
+import time
+
+import pytest
+
+from chuk_virtual_shell.session import InterpreterPool, ShellSessionManager
+from chuk_virtual_shell.shell_interpreter import ShellInterpreter
+
+
+def wait_for(predicate, timeout=10.0):
+    """Poll until predicate() is true or the timeout expires."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class CountingFactory:
+    """Factory that records how many objects it built."""
+
+    def __init__(self):
+        self.built = 0
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            self.built += 1
+            return object()
+
+
+class TestInterpreterPool:
+    """Test pool acquisition and background refills."""
+
+    def test_fill_and_acquire(self):
+        factory = CountingFactory()
+        pool = InterpreterPool(factory, size=3)
+        pool.fill()
+        assert pool.stats()["ready"] == 3
+
+        first = pool.acquire()
+        second = pool.acquire()
+        assert first is not second
+        assert pool.stats()["hits"] == 2
+        assert pool.stats()["misses"] == 0
+
+        assert wait_for(lambda: pool.stats()["ready"] == 3)
+        assert factory.built == 5
+        pool.close()
+
+    def test_empty_pool_builds_on_demand(self):
+        factory = CountingFactory()
+        pool = InterpreterPool(factory, size=2)
+
+        assert pool.acquire() is not None
+        assert pool.stats()["misses"] == 1
+
+        assert wait_for(lambda: pool.stats()["ready"] == 2)
+        pool.acquire()
+        assert pool.stats()["hits"] == 1
+        pool.close()
+
+    def test_factory_errors_do_not_break_pool(self):
+        calls = []
+
+        def factory():
+            calls.append(1)
+            if len(calls) > 1:
+                raise RuntimeError("boom")
+            return object()
+
+        pool = InterpreterPool(factory, size=1)
+        pool.acquire()
+        assert wait_for(lambda: pool.stats()["building"] == 0)
+        assert pool.stats()["ready"] == 0
+        pool.close()
+
+    def test_close_drops_ready_interpreters(self):
+        pool = InterpreterPool(CountingFactory(), size=2)
+        pool.fill()
+        pool.close()
+        assert pool.stats()["ready"] == 0
+        pool.refill()
+        assert pool.stats()["building"] == 0
+
+
+class TestPooledSessionManager:
+    """Test ShellSessionManager with a warm pool."""
+
+    @pytest.mark.asyncio
+    async def test_sessions_use_pooled_interpreters(self):
+        manager = ShellSessionManager(shell_factory=ShellInterpreter, pool_size=2)
+        manager.pool.fill()
+
+        first = await manager.create_session()
+        second = await manager.create_session()
+
+        shell_a = manager.active_sessions[first].shell
+        shell_b = manager.active_sessions[second].shell
+        assert shell_a is not shell_b
+        assert shell_a.fs is not shell_b.fs
+        assert manager.pool.stats()["hits"] == 2
+
+        shell_a.execute("echo a > /tmp/only-a")
+        assert not shell_b.exists("/tmp/only-a")
+
+        await manager.close_session(first)
+        await manager.close_session(second)
+        manager.pool.close()
+
+    def test_pool_disabled_by_default(self):
+        manager = ShellSessionManager(shell_factory=ShellInterpreter)
+        assert manager.pool is None
+        manager.warm_pool()
@@ -2,6 +2,7 @@
 Tests for shell session management.
 """
 
+import asyncio
 import pytest
 import pytest_asyncio
 import time
@@ -13,6 +14,7 @@ from chuk_virtual_shell.session import (
     CommandState,
     StreamChunk,
 )
+from chuk_virtual_shell.commands.command_base import ShellCommand
 from chuk_virtual_shell.shell_interpreter import ShellInterpreter
 
 
@@ -194,6 +196,193 @@ class TestShellSession:
         assert session._next_sequence() == 3
 
 
+class TestSessionWorker:
+    """Test that session commands run off the event loop with timeouts."""
+
+    @pytest.mark.asyncio
+    async def test_slow_command_does_not_block_event_loop(self):
+        """Test other coroutines keep running while a command executes."""
+        slow = ShellSession(session_id="slow", shell_interpreter=ShellInterpreter())
+        fast = ShellSession(session_id="fast", shell_interpreter=ShellInterpreter())
+
+        async def run(session, command):
+            return [chunk.data async for chunk in session.run(command)]
+
+        started = time.time()
+        slow_task = asyncio.create_task(run(slow, "sleep 0.5; echo slow"))
+        await asyncio.sleep(0.05)
+        fast_output = await run(fast, "echo fast")
+        fast_elapsed = time.time() - started
+
+        assert fast_output == ["fast"]
+        assert fast_elapsed < 0.4
+        assert await slow_task == ["slow"]
+
+        slow.cleanup()
+        fast.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_commands_in_a_session_keep_order(self):
+        """Test concurrently submitted commands of one session run in order."""
+        session = ShellSession(
+            session_id="ordered", shell_interpreter=ShellInterpreter()
+        )
+
+        async def run(command):
+            return [chunk.data async for chunk in session.run(command)]
+
+        results = await asyncio.gather(
+            run("sleep 0.2; export STEP=one"), run("echo $STEP")
+        )
+
+        assert results[1] == ["one"]
+        session.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_hard_timeout(self):
+        """Test the hard timeout stops waiting and reports a timeout."""
+        session = ShellSession(session_id="hard", shell_interpreter=ShellInterpreter())
+
+        chunks = [chunk async for chunk in session.run("sleep 1", timeout_ms=50)]
+
+        result = list(session.command_results.values())[0]
+        assert result.state == CommandState.TIMEOUT
+        assert result.exit_code == 137
+        assert chunks[-1].stream_type == "stderr"
+        assert "timed out" in chunks[-1].data
+        session.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_hard_timeout_frees_the_worker(self):
+        """Test a runaway loop is interrupted so later commands can run."""
+        session = ShellSession(session_id="loop", shell_interpreter=ShellInterpreter())
+
+        async for _ in session.run("while true; do sleep 0.01; done", timeout_ms=100):
+            pass
+
+        started = time.time()
+        output = [chunk.data async for chunk in session.run("echo next")]
+        assert output == ["next"]
+        assert time.time() - started < 1
+        session.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_cancel_queued_command(self):
+        """Test cancelling a queued command skips it and spares the running one."""
+        session = ShellSession(session_id="queue", shell_interpreter=ShellInterpreter())
+
+        async def run(command):
+            return [chunk.data async for chunk in session.run(command)]
+
+        first = asyncio.create_task(run("sleep 0.2; echo first"))
+        second = asyncio.create_task(run("export HIT=1"))
+        await asyncio.sleep(0.05)
+        queued = next(
+            command_id
+            for command_id, result in session.command_results.items()
+            if result.command == "export HIT=1"
+        )
+
+        assert await session.cancel(queued)
+        assert await first == ["first"]
+        await second
+        assert "HIT" not in session.shell.environ
+        assert session.command_results[queued].state == CommandState.CANCELLED
+        session.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_soft_timeout_interrupts_loop(self):
+        """Test the soft timeout stops a loop at the next command boundary."""
+        session = ShellSession(session_id="soft", shell_interpreter=ShellInterpreter())
+
+        started = time.time()
+        async for _ in session.run(
+            "while true; do sleep 0.02; done", soft_timeout_ms=100, timeout_ms=5000
+        ):
+            pass
+
+        result = list(session.command_results.values())[0]
+        assert time.time() - started < 2
+        assert result.state == CommandState.TIMEOUT
+        assert result.exit_code == 130
+        session.cleanup()
+
+
+class TickerCommand(ShellCommand):
+    """Streaming command emitting numbered chunks with an optional delay."""
+
+    name = "ticker"
+
+    def __init__(self, shell_context):
+        super().__init__(shell_context)
+        self.emitted = 0
+
+    def execute(self, args):
+        return "".join(self.stream(args))
+
+    def stream(self, args, stdin=None):
+        count, size, delay = int(args[0]), int(args[1]), float(args[2])
+        for i in range(count):
+            if i and delay:
+                time.sleep(delay)
+            self.emitted += 1
+            yield str(i % 10) * size
+
+
+class TestIncrementalOutput:
+    """Test that output is streamed while a command runs."""
+
+    def make_session(self, **kwargs):
+        shell = ShellInterpreter()
+        ticker = TickerCommand(shell)
+        shell.commands["ticker"] = ticker
+        return ShellSession("stream", shell, **kwargs), ticker
+
+    @pytest.mark.asyncio
+    async def test_first_chunk_arrives_before_command_finishes(self):
+        """Test time to first byte does not depend on command duration."""
+        session, _ = self.make_session()
+
+        started = time.time()
+        arrivals = []
+        async for chunk in session.run("ticker 3 4 0.3"):
+            arrivals.append((time.time() - started, chunk))
+
+        assert arrivals[0][0] < 0.25
+        assert "".join(chunk.data for _, chunk in arrivals) == "000011112222"
+        sequence_ids = [chunk.sequence_id for _, chunk in arrivals]
+        assert sequence_ids == sorted(sequence_ids)
+        result = list(session.command_results.values())[0]
+        assert result.stdout == "000011112222"
+        session.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_max_chunk_size(self):
+        """Test streamed chunks never exceed the configured size."""
+        session, _ = self.make_session(max_chunk_size=100)
+
+        chunks = [chunk.data async for chunk in session.run("ticker 50 33 0")]
+
+        assert all(len(data) <= 100 for data in chunks)
+        assert "".join(chunks) == "".join(str(i % 10) * 33 for i in range(50))
+        session.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_backpressure_pauses_producer(self):
+        """Test a slow consumer holds back the command."""
+        session, ticker = self.make_session(max_chunk_size=10, max_pending_chunks=2)
+
+        received = 0
+        async for chunk in session.run("ticker 200 10 0"):
+            received += 1
+            if received == 1:
+                await asyncio.sleep(0.2)
+                assert ticker.emitted < 20
+
+        assert received == 200
+        session.cleanup()
+
+
 class TestShellSessionManager:
     """Test ShellSessionManager class."""
 
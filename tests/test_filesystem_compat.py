@@ -0,0 +1,657 @@
+"""
+Tests for the FileSystemCompat metadata cache.
+"""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+from chuk_virtual_fs import VirtualFileSystem
+
+from chuk_virtual_shell.core.usage_index import Usage
+from chuk_virtual_shell.filesystem_compat import (
+    FileSystemCompat,
+    read_head,
+    read_tail,
+    walk_tree,
+)
+from chuk_virtual_shell.shell_interpreter import ShellInterpreter
+
+
+class TestMetadataCache:
+    """Test caching and invalidation of node info and listings."""
+
+    def setup_method(self):
+        self.fs = FileSystemCompat(VirtualFileSystem())
+        self.fs.mkdir("/data")
+        self.fs.write_file("/data/a.txt", "a")
+
+    def test_repeated_lookups_hit_cache(self):
+        with patch.object(
+            self.fs.fs, "get_node_info", wraps=self.fs.fs.get_node_info
+        ) as info:
+            for _ in range(5):
+                assert self.fs.is_file("/data/a.txt")
+                assert self.fs.is_dir("/data")
+            assert info.call_count == 2
+
+        assert self.fs.cache_stats()["hits"] >= 8
+
+    def test_negative_results_are_cached_and_invalidated(self):
+        assert not self.fs.exists("/data/b.txt")
+        self.fs.write_file("/data/b.txt", "b")
+        assert self.fs.exists("/data/b.txt")
+        assert sorted(self.fs.ls("/data")) == ["a.txt", "b.txt"]
+
+    def test_listing_invalidated_by_mutations(self):
+        assert self.fs.ls("/data") == ["a.txt"]
+        self.fs.touch("/data/t")
+        assert sorted(self.fs.ls("/data")) == ["a.txt", "t"]
+        self.fs.rm("/data/t")
+        assert self.fs.ls("/data") == ["a.txt"]
+        self.fs.mv("/data/a.txt", "/data/c.txt")
+        assert self.fs.ls("/data") == ["c.txt"]
+        assert not self.fs.exists("/data/a.txt")
+
+    def test_prefix_invalidation_for_directories(self):
+        self.fs.mkdir("/data/sub")
+        self.fs.write_file("/data/sub/x", "x")
+        assert self.fs.is_file("/data/sub/x")
+        assert self.fs.ls("/data/sub") == ["x"]
+
+        self.fs.rm("/data/sub/x")
+        self.fs.rmdir("/data/sub")
+        assert not self.fs.exists("/data/sub/x")
+        assert not self.fs.exists("/data/sub")
+
+    def test_relative_paths_share_entries(self):
+        self.fs.cd("/data")
+        assert self.fs.is_file("a.txt")
+        assert self.fs.is_file("/data/a.txt")
+        assert self.fs.ls() == ["a.txt"]
+        self.fs.write_file("n.txt", "n")
+        assert sorted(self.fs.ls("/data")) == ["a.txt", "n.txt"]
+
+    def test_returned_listing_is_a_copy(self):
+        self.fs.ls("/data").append("bogus")
+        assert self.fs.ls("/data") == ["a.txt"]
+
+    def test_ttl_expires_entries(self):
+        fs = FileSystemCompat(VirtualFileSystem(), cache_ttl=0.01)
+        assert not fs.exists("/late")
+        fs.fs.write_file("/late", "x")  # bypasses the wrapper
+        assert not fs.exists("/late")
+        time.sleep(0.02)
+        assert fs.exists("/late")
+
+    def test_cache_can_be_disabled(self):
+        fs = FileSystemCompat(VirtualFileSystem(), cache=False)
+        assert fs.cache_stats() == {}
+        fs.fs.write_file("/direct", "x")
+        assert fs.exists("/direct")
+
+
+class TestShellWithMetadataCache:
+    """Test shell commands on top of the cached wrapper."""
+
+    def test_commands_see_their_own_changes(self):
+        shell = ShellInterpreter()
+        shell.execute("mkdir -p /w/a/b")
+        shell.execute("echo hi > /w/a/b/f")
+        assert "f" in shell.execute("ls /w/a/b")
+        shell.execute("rm -r /w/a")
+        assert shell.execute("ls /w") == ""
+        shell.execute("mkdir /w/a")
+        assert shell.execute("ls /w/a") == ""
+
+
+class AsyncProvider:
+    """Async facade over VirtualFileSystem, as used by remote providers."""
+
+    def __init__(self):
+        self.inner = VirtualFileSystem()
+
+    async def get_node_info(self, path):
+        return self.inner.get_node_info(path)
+
+    async def ls(self, path=None):
+        return self.inner.ls(path)
+
+    async def read_file(self, path):
+        return self.inner.read_file(path)
+
+    async def write_file(self, path, content):
+        return self.inner.write_file(path, content)
+
+    async def mkdir(self, path):
+        return self.inner.mkdir(path)
+
+    def resolve_path(self, path):
+        return self.inner.resolve_path(path)
+
+    def pwd(self):
+        return self.inner.pwd()
+
+
+class TestBatchedAccess:
+    """Test stat_many/read_many/walk and the async access path."""
+
+    def build(self, fs):
+        fs.mkdir("/t")
+        fs.mkdir("/t/a")
+        fs.mkdir("/t/b")
+        for path in ("/t/f1", "/t/a/f2", "/t/a/f3", "/t/b/f4"):
+            fs.write_file(path, path)
+
+    def hops(self):
+        """Count hand-offs to the filesystem event loop."""
+        return patch(
+            "chuk_virtual_shell.filesystem_compat.asyncio.run_coroutine_threadsafe",
+            wraps=asyncio.run_coroutine_threadsafe,
+        )
+
+    def test_walk_matches_tree(self):
+        fs = FileSystemCompat(VirtualFileSystem())
+        self.build(fs)
+        walked = {d: (sorted(ds), sorted(fs_)) for d, ds, fs_ in fs.walk("/t")}
+        assert walked == {
+            "/t": (["a", "b"], ["f1"]),
+            "/t/a": ([], ["f2", "f3"]),
+            "/t/b": ([], ["f4"]),
+        }
+
+    def test_walk_pruning(self):
+        fs = FileSystemCompat(VirtualFileSystem())
+        self.build(fs)
+        visited = []
+        for dirpath, dirnames, _ in fs.walk("/t"):
+            visited.append(dirpath)
+            dirnames[:] = [d for d in dirnames if d != "a"]
+        assert visited == ["/t", "/t/b"]
+
+    def test_async_provider_one_hop_per_directory(self):
+        fs = FileSystemCompat(AsyncProvider(), cache=False)
+        self.build(fs)
+        with self.hops() as hop:
+            dirs = [d for d, _, _ in fs.walk("/t")]
+        assert sorted(dirs) == ["/t", "/t/a", "/t/b"]
+        # One is_dir check on the top plus one scan per directory
+        assert hop.call_count == 1 + len(dirs)
+
+    def test_stat_and_read_many_single_hop(self):
+        fs = FileSystemCompat(AsyncProvider(), cache=False)
+        self.build(fs)
+        paths = ["/t/f1", "/t/a/f2", "/t/missing"]
+        with self.hops() as hop:
+            infos = fs.stat_many(paths)
+            contents = fs.read_many(paths)
+        assert hop.call_count == 2
+        assert infos["/t/missing"] is None
+        assert not infos["/t/f1"].is_dir
+        assert contents == {"/t/f1": "/t/f1", "/t/a/f2": "/t/a/f2", "/t/missing": None}
+
+    def test_stat_many_uses_cache(self):
+        fs = FileSystemCompat(AsyncProvider())
+        self.build(fs)
+        fs.stat_many(["/t/f1", "/t/a"])
+        with self.hops() as hop:
+            fs.stat_many(["/t/f1", "/t/a"])
+        assert hop.call_count == 0
+
+    def test_async_path_from_event_loop(self):
+        fs = FileSystemCompat(AsyncProvider())
+
+        async def scenario():
+            await fs.write_file_async("/x", "hello")
+            infos = await fs.stat_many_async(["/x", "/y"])
+            return await fs.read_file_async("/x"), infos
+
+        content, infos = asyncio.run(scenario())
+        assert content == "hello"
+        assert infos["/y"] is None
+        assert fs.exists("/x")
+
+    def test_wrappers_spread_over_loop_pool(self):
+        loops = {FileSystemCompat(VirtualFileSystem())._loop for _ in range(8)}
+        assert len(loops) == FileSystemCompat.LOOP_POOL_SIZE
+
+
+class TestWalkTree:
+    """Test the shared pre-order walk used by the tree-walking commands."""
+
+    def setup_method(self):
+        self.fs = FileSystemCompat(VirtualFileSystem())
+        self.fs.mkdir("/r")
+        self.fs.mkdir("/r/a")
+        self.fs.mkdir("/r/a/deep")
+        self.fs.write_file("/r/a/deep/x", "x")
+        self.fs.write_file("/r/a/f", "f")
+        self.fs.mkdir("/r/b")
+        self.fs.write_file("/r/top", "t")
+
+    def paths(self, **kwargs):
+        return [(e.path, e.depth) for e in walk_tree(self.fs, "/r", **kwargs)]
+
+    def test_preorder_with_depths(self):
+        walked = self.paths()
+        assert walked[0] == ("/r", 0)
+        index = {path: i for i, (path, _) in enumerate(walked)}
+        assert index["/r/a"] < index["/r/a/deep"] < index["/r/a/deep/x"]
+        assert dict(walked)["/r/a/deep/x"] == 3
+        assert len(walked) == 7
+
+    def test_max_depth_and_prune(self):
+        assert {p for p, _ in self.paths(max_depth=1)} == {
+            "/r",
+            "/r/a",
+            "/r/b",
+            "/r/top",
+        }
+        pruned = {p for p, _ in self.paths(prune=lambda e: e.name == "a")}
+        assert "/r/a" in pruned and "/r/a/f" not in pruned
+
+    def test_missing_top_yields_nothing(self):
+        assert list(walk_tree(self.fs, "/nope")) == []
+
+    def test_one_node_lookup_per_entry(self):
+        fs = FileSystemCompat(VirtualFileSystem(), cache=False)
+        fs.mkdir("/r")
+        for i in range(5):
+            fs.mkdir(f"/r/d{i}")
+            fs.write_file(f"/r/d{i}/f", "x")
+        with patch.object(fs.fs, "get_node_info", wraps=fs.fs.get_node_info) as info:
+            entries = list(walk_tree(fs, "/r"))
+        assert len(entries) == 11
+        assert info.call_count == len(entries)
+
+    def test_generic_filesystem_fallback(self):
+        from tests.dummy_filesystem import DummyFileSystem
+
+        dummy = DummyFileSystem(
+            {"/": {"d": None}, "/d": {"f": None}, "/d/f": "content"}
+        )
+        assert [e.path for e in walk_tree(dummy, "/d")] == ["/d", "/d/f"]
+
+    def test_listing_errors_are_reported(self):
+        errors = []
+        with patch.object(self.fs, "scan_dir", side_effect=RuntimeError("boom")):
+            walked = list(
+                walk_tree(self.fs, "/r", onerror=lambda p, e: errors.append(p))
+            )
+        assert [e.path for e in walked] == ["/r"]
+        assert errors == ["/r"]
+
+
+class TestContentIndex:
+    """Test the optional path and trigram index."""
+
+    def setup_method(self):
+        self.fs = FileSystemCompat(VirtualFileSystem(), index=True)
+        self.fs.mkdir("/r")
+        self.fs.mkdir("/r/a")
+        self.fs.write_file("/r/a/one.txt", "alpha beta")
+        self.fs.write_file("/r/a/two.txt", "gamma delta")
+        self.fs.mkdir("/r/b")
+        self.fs.write_file("/r/top.txt", "Alpha")
+
+    def walked(self, **kwargs):
+        return [(e.path, e.depth, e.is_dir) for e in walk_tree(self.fs, "/r", **kwargs)]
+
+    def indexed(self, **kwargs):
+        return [(e.path, e.depth, e.is_dir) for e in self.fs.walk_index("/r", **kwargs)]
+
+    def test_walk_matches_walk_tree(self):
+        assert self.indexed() == self.walked()
+        assert self.indexed(max_depth=1) == self.walked(max_depth=1)
+        prune = lambda e: e.name == "a"  # noqa: E731
+        assert self.indexed(prune=prune) == self.walked(prune=prune)
+
+    def test_candidates_narrow_by_literal(self):
+        assert self.fs.indexed_files("/r", ["beta"]) == ["/r/a/one.txt"]
+        # Contents are indexed case-folded, so candidates may differ in case
+        assert self.fs.indexed_files("/r", ["ALPHA"]) == [
+            "/r/a/one.txt",
+            "/r/top.txt",
+        ]
+        # Too short to check: every file is a candidate
+        assert len(self.fs.indexed_files("/r", ["al"])) == 3
+        assert self.fs.indexed_files("/r", ["zzz"]) == []
+
+    def test_mutations_keep_index_current(self):
+        assert self.fs.indexed_files("/r") == [
+            "/r/a/one.txt",
+            "/r/a/two.txt",
+            "/r/top.txt",
+        ]
+        self.fs.write_file("/r/a/one.txt", "replaced")
+        self.fs.write_file("/r/b/new.txt", "beta")
+        self.fs.rm("/r/a/two.txt")
+        self.fs.mkdir("/r/c")
+        assert self.fs.indexed_files("/r", ["beta"]) == ["/r/b/new.txt"]
+        assert self.indexed() == self.walked()
+
+    def test_changes_behind_the_wrapper_need_clear_cache(self):
+        self.fs.indexed_files("/r")
+        self.fs.fs.write_file("/r/b/direct.txt", "beta")
+        self.fs.clear_cache()
+        assert self.fs.indexed_files("/r", ["beta"]) == [
+            "/r/a/one.txt",
+            "/r/b/direct.txt",
+        ]
+
+    def test_memory_bound_leaves_files_unindexed(self):
+        fs = FileSystemCompat(VirtualFileSystem())
+        fs.enable_index(max_trigrams=12)
+        fs.write_file("/small", "abcdef")
+        fs.write_file("/large", "the quick brown fox")
+        stats = fs.rebuild_index()
+        assert stats["files"] == 2
+        assert stats["indexed_files"] == 1
+        assert stats["trigrams"] <= 12
+        # Unindexed files are always candidates
+        assert fs.indexed_files("/", ["zzz"]) == ["/large"]
+
+    def test_disabled_index_answers_nothing(self):
+        self.fs.disable_index()
+        assert self.fs.walk_index("/r") is None
+        assert self.fs.indexed_files("/r") is None
+        assert self.fs.index_stats() == {}
+
+
+class SizedProvider:
+    """Provider whose node info carries sizes and times, counting reads."""
+
+    def __init__(self):
+        self.inner = VirtualFileSystem()
+        self.reads = 0
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def read_file(self, path):
+        self.reads += 1
+        return self.inner.read_file(path)
+
+    def get_node_info(self, path):
+        info = self.inner.get_node_info(path)
+        if info is not None and not info.is_dir:
+            content = self.inner.read_file(path) or ""
+            info.metadata["size"] = len(content.encode("utf-8"))
+            info.modified_at = "2024-03-01T12:00:00Z"
+        return info
+
+
+class TestStat:
+    """Test the uniform stat API used by find, ls, du and quota."""
+
+    def test_sizes_from_node_info_never_read_content(self):
+        provider = SizedProvider()
+        provider.inner.mkdir("/d")
+        provider.inner.write_file("/d/big", "x" * 5000)
+        provider.inner.write_file("/d/empty", "")
+        shell = ShellInterpreter()
+        shell.fs = FileSystemCompat(provider)
+
+        assert shell.execute("find /d -size +1k") == "/d/big"
+        assert shell.execute("find /d -type f -empty") == "/d/empty"
+        assert "5000" in shell.execute("ls -l /d")
+        assert provider.reads == 0
+
+        node = shell.fs.stat("/d/big")
+        assert node.size == 5000 and not node.is_dir
+        assert node.mtime == 1709294400.0
+
+    def test_written_sizes_are_remembered(self):
+        fs = FileSystemCompat(VirtualFileSystem())
+        fs.write_file("/a.txt", "héllo")
+        with patch.object(fs.fs, "read_file", wraps=fs.fs.read_file) as read:
+            assert fs.get_size("/a.txt") == 6
+            assert read.call_count == 0
+        fs.fs.write_file("/b.txt", "abc")
+        with patch.object(fs.fs, "read_file", wraps=fs.fs.read_file) as read:
+            assert fs.get_size("/b.txt") == 3
+            assert fs.get_size("/b.txt") == 3
+            # Read once, then cached until the file changes
+            assert read.call_count == 1
+
+    def test_directories_and_missing_paths(self):
+        fs = FileSystemCompat(VirtualFileSystem())
+        fs.mkdir("/d")
+        assert fs.stat("/d").is_dir
+        assert fs.stat("/d").size == 0
+        assert fs.stat("/missing") is None
+        assert fs.get_size("/missing") == 0
+
+
+class TestUsageAccounting:
+    """Test the incrementally maintained per-directory usage totals."""
+
+    def setup_method(self):
+        self.fs = FileSystemCompat(VirtualFileSystem())
+        self.fs.mkdir("/w")
+        self.fs.mkdir("/w/sub")
+        self.fs.write_file("/w/a.txt", "12345")
+        self.fs.write_file("/w/sub/b.txt", "héllo")
+
+    def test_totals_per_directory(self):
+        assert self.fs.usage("/w") == Usage(bytes=11, files=2, dirs=1)
+        assert self.fs.usage("/w/sub") == Usage(bytes=6, files=1, dirs=0)
+        assert self.fs.usage("/w/a.txt") == Usage(bytes=5, files=1, dirs=0)
+        assert self.fs.usage("/missing") is None
+
+    def test_writes_update_totals_without_walking(self):
+        self.fs.usage("/")
+        with patch.object(self.fs, "scan_dir", wraps=self.fs.scan_dir) as scan:
+            self.fs.write_file("/w/sub/b.txt", "x")
+            self.fs.write_file("/w/sub/c.txt", "abc")
+            assert self.fs.usage("/w") == Usage(bytes=9, files=3, dirs=1)
+            assert scan.call_count == 0
+
+    def test_other_mutations_resync_lazily(self):
+        self.fs.usage("/")
+        self.fs.rm("/w/a.txt")
+        self.fs.cp("/w/sub/b.txt", "/w/copy.txt")
+        self.fs.mkdir("/w/empty")
+        assert self.fs.usage("/w") == Usage(bytes=12, files=2, dirs=2)
+        self.fs.mv("/w/copy.txt", "/w/sub/moved.txt")
+        assert self.fs.usage("/w/sub") == Usage(bytes=12, files=2, dirs=0)
+        assert self.fs.check_usage() == []
+
+    def test_check_reports_and_repairs_drift(self):
+        self.fs.usage("/")
+        self.fs.usage_index.totals["/w/sub"][0] += 100
+        assert self.fs.check_usage(repair=True) == ["/w/sub"]
+        assert self.fs.check_usage() == []
+        assert self.fs.usage("/w/sub").bytes == 6
+
+    def test_du_summarize_reads_totals(self):
+        shell = ShellInterpreter()
+        shell.fs = self.fs
+        shell.environ["HOME"] = "/w"
+        expected = shell.execute("du -s -B1 /w")
+        self.fs.usage_index = None
+        assert shell.execute("du -s -B1 /w") == expected == "11\t/w"
+
+
+class TestAppendFile:
+    """Test appending without rewriting the whole file."""
+
+    def setup_method(self):
+        self.fs = FileSystemCompat(VirtualFileSystem())
+        self.fs.write_file("/log", "start")
+
+    def test_append_creates_and_extends(self):
+        assert self.fs.append_file("/new", "a")
+        assert self.fs.append_file("/new", "b")
+        assert self.fs.read_file("/new") == "ab"
+
+    def test_separator_only_between_records(self):
+        self.fs.append_file("/log", "one\n", separator="\n")
+        self.fs.append_file("/log", "two", separator="\n")
+        self.fs.append_file("/log", "three", separator="\n")
+        assert self.fs.read_file("/log") == "start\none\ntwo\nthree"
+        self.fs.append_file("/fresh", "x", separator="\n")
+        assert self.fs.read_file("/fresh") == "x"
+
+    def test_buffered_append_keeps_its_time(self):
+        later = "2099-01-01T00:00:00Z"
+        with patch(
+            "chuk_virtual_shell.filesystem_compat._timestamp", return_value=later
+        ):
+            self.fs.append_file("/log", "more")
+        assert self.fs._appends
+        assert self.fs.get_node_info("/log").modified_at == later
+        assert dict(self.fs.scan_dir("/"))["log"].modified_at == later
+        assert self.fs.read_file("/log") == "startmore"
+        # Once written the file has the time of the write
+        assert self.fs.get_node_info("/log").modified_at < later
+
+    def test_find_newer_sees_buffered_append(self):
+        shell = ShellInterpreter()
+        shell.execute("mkdir -p /w && touch /w/f && touch /w/ref")
+        later = "2099-01-01T00:00:00Z"
+        with patch(
+            "chuk_virtual_shell.filesystem_compat._timestamp", return_value=later
+        ):
+            shell.execute("echo b >> /w/f")
+        assert shell.execute("find /w -newer /w/ref") == "/w/f"
+
+    def test_failed_flush_keeps_appends(self):
+        self.fs.append_file("/log", " more")
+        with patch.object(self.fs.fs, "write_file", side_effect=OSError("full")):
+            assert self.fs.read_file("/log") is None
+            assert self.fs.read_many(["/log"]) == {"/log": None}
+            assert self.fs.cp("/log", "/copy") is False
+            assert self.fs.get_size("/log") == len("start more")
+        with patch.object(self.fs.fs, "write_file", return_value=False):
+            assert self.fs.read_file("/log") is None
+        assert self.fs.read_file("/log") == "start more"
+        assert not self.fs._appends
+
+    def test_appends_are_coalesced(self):
+        with patch.object(
+            self.fs.fs, "write_file", wraps=self.fs.fs.write_file
+        ) as write:
+            for i in range(1000):
+                self.fs.append_file("/log", f"line {i}\n")
+            assert write.call_count < 10
+        content = self.fs.read_file("/log")
+        assert content.startswith("startline 0\n")
+        assert content.endswith("line 999\n")
+        assert self.fs.get_size("/log") == len(content)
+        assert self.fs.check_usage() == []
+
+    def test_overwrite_and_remove_discard_pending(self):
+        self.fs.append_file("/log", " more")
+        self.fs.write_file("/log", "new")
+        assert self.fs.read_file("/log") == "new"
+        self.fs.append_file("/log", " more")
+        self.fs.rm("/log")
+        self.fs.flush()
+        assert not self.fs.exists("/log")
+
+    def test_copy_sees_pending_appends(self):
+        self.fs.append_file("/log", " more")
+        self.fs.cp("/log", "/copy")
+        assert self.fs.read_file("/copy") == "start more"
+
+    def test_unbuffered_rewrites(self):
+        fs = FileSystemCompat(VirtualFileSystem(), buffer_appends=False)
+        fs.write_file("/log", "a")
+        fs.append_file("/log", "b")
+        assert fs._appends == {}
+        assert fs.fs.read_file("/log") == "ab"
+
+
+class RangedProvider(SizedProvider):
+    """Provider with its own size and read_range."""
+
+    def __init__(self):
+        super().__init__()
+        self.range_calls = 0
+
+    def size(self, path):
+        content = self.read_file(path)
+        return None if content is None else len(content)
+
+    def read_range(self, path, offset, length=None):
+        self.range_calls += 1
+        content = self.read_file(path)
+        if content is None:
+            return None
+        return content[offset:] if length is None else content[offset : offset + length]
+
+
+class RemoteProvider(SizedProvider):
+    """Provider without ranged reads that is not kept in memory."""
+
+    def get_provider_name(self):
+        return "sqlite"
+
+
+class TestRangedReads:
+    """Test size, read_range and the block readers built on them."""
+
+    def setup_method(self):
+        self.fs = FileSystemCompat(VirtualFileSystem())
+        self.text = "".join(f"line {i}\n" for i in range(5000))
+        self.fs.write_file("/log", self.text)
+
+    def test_size_and_read_range(self):
+        self.fs.write_file("/u", "héllo")
+        assert self.fs.size("/u") == 5
+        assert self.fs.get_size("/u") == 6
+        assert self.fs.read_range("/u", 1, 3) == "éll"
+        assert self.fs.read_range("/u", 3) == "lo"
+        assert self.fs.read_range("/u", 10, 3) == ""
+        assert self.fs.size("/missing") is None
+        assert self.fs.read_range("/", 0, 1) is None
+
+    def test_ranges_include_pending_appends(self):
+        self.fs.append_file("/log", "tail")
+        assert self.fs.size("/log") == len(self.text) + 4
+        assert self.fs.read_range("/log", len(self.text)) == "tail"
+
+    def test_head_and_tail_read_blocks(self):
+        with patch.object(
+            self.fs, "read_range", wraps=self.fs.read_range
+        ) as read_range:
+            assert read_head(self.fs, "/log", 2) == ["line 0", "line 1"]
+            assert read_tail(self.fs, "/log", 2) == ["line 4998", "line 4999"]
+            assert read_range.call_count == 2
+        assert read_head(self.fs, "/log", 10_000) == self.text.splitlines()
+        assert read_tail(self.fs, "/log", 10_000) == self.text.splitlines()
+        assert read_tail(self.fs, "/missing", 1) is None
+
+    def test_line_breaks_across_blocks(self):
+        text = "a\r\nb\rc\n\nd\x0be\r\n"
+        self.fs.write_file("/mixed", text)
+        with patch("chuk_virtual_shell.filesystem_compat.RANGE_BLOCK", 1):
+            for n in range(8):
+                assert read_head(self.fs, "/mixed", n) == text.splitlines()[:n]
+                expected = text.splitlines()[-n:] if n else []
+                assert read_tail(self.fs, "/mixed", n) == expected
+
+    def test_native_ranges_and_append(self):
+        provider = RangedProvider()
+        provider.write_file("/log", "one")
+        provider.append_file = lambda path, content: provider.write_file(
+            path, provider.read_file(path) + content
+        )
+        fs = FileSystemCompat(provider)
+        fs.append_file("/log", "two", separator="\n")
+        fs.append_file("/log", "\n")
+        fs.append_file("/log", "three", separator="\n")
+        assert provider.read_file("/log") == "one\ntwo\nthree"
+        assert read_tail(fs, "/log", 1) == ["three"]
+        assert provider.range_calls > 0
+
+    def test_without_ranges_files_are_read_once(self):
+        provider = RemoteProvider()
+        provider.inner.write_file("/log", self.text)
+        fs = FileSystemCompat(provider)
+        assert not fs.has_ranged_reads()
+        assert self.fs.has_ranged_reads()
+        assert read_head(fs, "/log", 2) == ["line 0", "line 1"]
+        assert read_tail(fs, "/log", 2) == ["line 4998", "line 4999"]
+        assert provider.reads == 2
@@ -164,7 +164,7 @@ class TestCollectCommandOutput:
         # Mock the async generator
         async def mock_run_command(*args):
             chunk1 = MagicMock()
-            chunk1.data = "Hello"
+            chunk1.data = "Hello\n"
             chunk1.stream_type = "stdout"
             yield chunk1
 
@@ -181,6 +181,47 @@ class TestCollectCommandOutput:
         assert result["stderr"] == ""
         assert result["exit_code"] == 0
 
+    @pytest.mark.asyncio
+    async def test_collect_command_output_max_chars(self, mock_session_manager):
+        """Test output beyond max_chars is not accumulated"""
+
+        async def mock_run_command(*args):
+            for _ in range(100):
+                chunk = MagicMock()
+                chunk.data = "x" * 10
+                chunk.stream_type = "stdout"
+                yield chunk
+
+        mock_session_manager.run_command = mock_run_command
+
+        result = await collect_command_output("session_id", "yes", 30, max_chars=100)
+
+        assert result["stdout"] == truncate_output("x" * 1000, 100)
+        assert len(result["stdout"]) == 100
+
+    @pytest.mark.asyncio
+    async def test_collect_command_output_streams_alike(self, mock_session_manager):
+        """Test stderr chunks are concatenated and capped like stdout"""
+
+        async def mock_run_command(*args):
+            for i in range(60):
+                for stream_type in ("stdout", "stderr"):
+                    chunk = MagicMock()
+                    chunk.data = f"{stream_type} {i} "
+                    chunk.stream_type = stream_type
+                    yield chunk
+
+        mock_session_manager.run_command = mock_run_command
+
+        result = await collect_command_output("session_id", "both", 30)
+        assert result["stdout"] == "".join(f"stdout {i} " for i in range(60))
+        assert result["stderr"] == "".join(f"stderr {i} " for i in range(60))
+
+        result = await collect_command_output("session_id", "both", 30, max_chars=100)
+        for stream_type in ("stdout", "stderr"):
+            full = "".join(f"{stream_type} {i} " for i in range(60))
+            assert result[stream_type] == truncate_output(full, 100)
+
     @pytest.mark.asyncio
     async def test_collect_command_output_with_stderr(self, mock_session_manager):
         """Test command output with stderr"""
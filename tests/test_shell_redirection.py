@@ -39,6 +39,16 @@ def test_append_redirection(shell):
     assert content == "Line 1\nLine 2\nLine 3"
 
 
+def test_append_redirection_many_lines(shell):
+    """Test that repeated >> appends are all visible to later commands"""
+    for i in range(200):
+        shell.execute(f"echo entry {i} >> /tmp/log.txt")
+
+    assert shell.execute("wc -l /tmp/log.txt").split()[0] == "200"
+    assert shell.execute("tail -n 1 /tmp/log.txt") == "entry 199"
+    assert shell.execute("cat /tmp/log.txt").startswith("entry 0\nentry 1\n")
+
+
 def test_overwrite_redirection(shell):
     """Test that > overwrites existing files"""
     # Create initial file